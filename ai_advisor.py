@@ -0,0 +1,201 @@
+"""
+🧠 AI ADVISOR
+=============
+Filtro de sinais com OpenAI sem bloquear o event loop.
+
+- Cliente assíncrono (AsyncOpenAI) com timeout rígido
+- Cache por símbolo + vetor de sinais quantizado, com TTL
+- Requisições iguais em paralelo viram uma única chamada paga
+- Avaliação concorrente dos TOP-N candidatos
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+
+PROMPT_TEMPLATE = """
+            Você é um "Scalper Agressivo de Alta Frequência" especialista em capturar pequenos movimentos rápidos (scalping) em criptomoedas.
+
+            Analise o cenário para {symbol} e decida se entramos para um trade rápido.
+
+            DADOS TÉCNICOS:
+            - Tendência: {trend}
+            - Preço: ${entry}
+            - RSI: {rsi:.2f} (Alvo: Scalping aceita RSI até 75 para LONG ou 25 para SHORT)
+            - MACD: {macd:.6f}
+            - Volume: {rel_volume:.2f}x (0.5x+ já é aceitável se a tendência for forte)
+
+            REGRAS DE DECISÃO:
+            1. Seja menos rígido: Se a tendência (EMA) for clara, ignore se o volume estiver um pouco baixo.
+            2. Não tenha medo de "comprar o topo" se o momentum for forte.
+            3. Responda APENAS em JSON.
+
+            JSON FORMAT:
+            {{
+                "decision": "GO" ou "NO-GO",
+                "sentiment": 0-100,
+                "reason": "Explicação curta e agressiva"
+            }}
+            """
+
+
+def build_prompt(symbol: str, signal_data: Dict) -> str:
+    """Prompt do filtro de scalping a partir do sinal técnico."""
+    signals = signal_data.get('signals', {})
+    return PROMPT_TEMPLATE.format(
+        symbol=symbol,
+        trend=signal_data['trend'],
+        entry=signal_data.get('entry'),
+        rsi=signals.get('rsi'),
+        macd=signals.get('macd'),
+        rel_volume=signals.get('rel_volume')
+    )
+
+
+def _finite(value, default: float) -> float:
+    """Valor numérico finito ou o padrão (RSI é NaN em janela sem variação)."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return value if math.isfinite(value) else default
+
+
+def signal_key(symbol: str, signal_data: Dict) -> Tuple:
+    """
+    Chave de cache: símbolo + sinais quantizados.
+
+    Pequenas variações (RSI em faixas de 5 pontos, volume em passos de 0.25x,
+    só o sinal do MACD) reaproveitam a mesma resposta.
+    """
+    signals = signal_data.get('signals', {})
+    rsi = _finite(signals.get('rsi'), 50.0)
+    rel_volume = min(_finite(signals.get('rel_volume'), 1.0), 3.0)
+    macd = _finite(signals.get('macd'), 0.0)
+    return (
+        symbol,
+        signal_data.get('trend'),
+        int(rsi // 5),
+        macd > 0,
+        round(rel_volume * 4) / 4
+    )
+
+
+class AIAdvisor:
+    """
+    Consulta a IA de forma assíncrona, com cache e limite de concorrência.
+
+    evaluate() nunca lança exceção: em erro/timeout retorna GO com 'error'
+    preenchido (mesmo comportamento de antes: segue o sinal técnico).
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        timeout: float = 8.0,
+        cache_ttl: float = 900,
+        max_concurrency: int = 3,
+        client=None
+    ):
+        self.client = client or AsyncOpenAI(api_key=api_key)
+        self.model = model
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._cache: Dict[Tuple, Tuple[float, Dict]] = {}
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+        self.calls = 0
+        self.cache_hits = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls, api_key: str) -> 'AIAdvisor':
+        """Criar advisor a partir das variáveis de ambiente."""
+        return cls(
+            api_key=api_key,
+            timeout=float(os.getenv('AI_TIMEOUT', 8)),
+            cache_ttl=float(os.getenv('AI_CACHE_TTL', 900)),
+            max_concurrency=int(os.getenv('AI_TOP_N', 3))
+        )
+
+    async def evaluate(self, symbol: str, signal_data: Dict) -> Dict:
+        """Decisão GO/NO-GO para um sinal (cache -> chamada em andamento -> API)."""
+        try:
+            key = signal_key(symbol, signal_data)
+        except Exception:
+            # Sinal malformado: sem cache, mas ainda consulta a IA (nunca lança)
+            return await self._ask(symbol, signal_data)
+
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.cache_hits += 1
+            return dict(cached[1], cached=True)
+
+        # Mesmo sinal já sendo avaliado: aguardar a mesma resposta
+        pending = self._inflight.get(key)
+        if pending:
+            self.cache_hits += 1
+            return dict(await asyncio.shield(pending), cached=True)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._ask(symbol, signal_data)
+            if not result.get('error'):
+                self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.set_result({"decision": "GO", "reason": "Avaliação cancelada", "error": "cancelled"})
+            self._inflight.pop(key, None)
+
+    async def evaluate_many(self, candidates: List[Dict]) -> Dict[str, Dict]:
+        """Avaliar vários candidatos em paralelo (retorna symbol -> resultado)."""
+        results = await asyncio.gather(*(self.evaluate(c['symbol'], c) for c in candidates))
+        return {c['symbol']: r for c, r in zip(candidates, results)}
+
+    async def _ask(self, symbol: str, signal_data: Dict) -> Dict:
+        async with self._semaphore:
+            self.calls += 1
+            try:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[{"role": "user", "content": build_prompt(symbol, signal_data)}],
+                        response_format={"type": "json_object"}
+                    ),
+                    timeout=self.timeout
+                )
+                return json.loads(response.choices[0].message.content)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                return {"decision": "GO", "reason": f"IA sem resposta em {self.timeout:.0f}s, seguindo sinal técnico.",
+                        "error": "timeout"}
+            except Exception as e:
+                self.errors += 1
+                return {"decision": "GO", "reason": f"Erro na IA ({e}), seguindo sinal técnico.", "error": str(e)}
+
+    def purge_expired(self):
+        """Remover entradas vencidas do cache."""
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[key]
+
+    def stats(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'cache_hits': self.cache_hits,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'cached': len(self._cache)
+        }
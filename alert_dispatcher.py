@@ -0,0 +1,333 @@
+"""
+📣 ALERT DISPATCHER
+===================
+Envio assíncrono de alertas (Telegram) fora do caminho das ordens.
+
+- send() não bloqueia: só coloca o alerta numa fila limitada (cheia = descarta)
+- Rajadas agrupadas por chave dentro de uma janela: 5 stops seguidos viram
+  uma mensagem "🔁 5x STOP LOSS" com as linhas de cada um
+- Duplicatas (mesmo alerta dentro de ALERT_DEDUP_TTL) são ignoradas
+- Intervalo mínimo entre mensagens, respeita o retry_after do 429 e tenta de
+  novo com backoff em erro de rede / 5xx
+- HTTP via aiohttp (sessão própria ou injetada)
+- Roda no event loop de quem chamou start() / o primeiro send(); chamado de
+  código síncrono (sem loop), sobe uma thread própria com um loop privado
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from metrics import MetricsRegistry, get_metrics
+
+
+TELEGRAM_API = 'https://api.telegram.org'
+MAX_MESSAGE_LENGTH = 4096   # Limite do sendMessage
+MAX_LINES_PER_GROUP = 10    # Linhas listadas numa mensagem agrupada
+
+
+@dataclass
+class Alert:
+    """Um alerta na fila."""
+    text: str
+    key: Optional[str] = None       # Alertas com a mesma chave são agrupados
+    at: float = field(default_factory=time.time)
+
+
+class AlertDispatcher:
+    """Fila de alertas com agrupamento, deduplicação, rate limit e retry."""
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        chat_id: Optional[str] = None,
+        max_queue: int = 100,
+        window: float = 3.0,
+        min_interval: float = 1.0,
+        dedup_ttl: float = 300.0,
+        retries: int = 3,
+        backoff: float = 1.0,
+        timeout: float = 10.0,
+        api_url: str = TELEGRAM_API,
+        session: Optional[aiohttp.ClientSession] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        self.token = token
+        self.chat_id = chat_id
+        self.window = window
+        self.min_interval = min_interval
+        self.dedup_ttl = dedup_ttl
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.api_url = api_url.rstrip('/')
+
+        # Recriada em _start_worker: asyncio.Queue fica presa ao loop que a usa primeiro
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.sent: List[str] = []   # Últimas mensagens entregues (diagnóstico)
+
+        metrics = metrics or get_metrics()
+        self.alerts = metrics.counter(
+            'bot_alerts_total', 'Alertas por resultado (sent, grouped, duplicate, dropped, failed)', ('result',)
+        )
+        self.queue_size = metrics.gauge('bot_alert_queue_size', 'Alertas aguardando envio')
+
+        self._session = session
+        self._own_session = False
+        self._recent: 'OrderedDict[str, float]' = OrderedDict()
+        self._last_sent = 0.0
+        self._flushing = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None   # Modo sem loop do chamador
+        self._start_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, token: Optional[str] = None, chat_id: Optional[str] = None) -> 'AlertDispatcher':
+        return cls(
+            token=token or os.getenv('TELEGRAM_BOT_TOKEN'),
+            chat_id=chat_id or os.getenv('TELEGRAM_CHAT_ID'),
+            max_queue=int(os.getenv('ALERT_QUEUE_SIZE', 100)),
+            window=float(os.getenv('ALERT_BATCH_WINDOW', 3)),
+            min_interval=float(os.getenv('ALERT_MIN_INTERVAL', 1)),
+            dedup_ttl=float(os.getenv('ALERT_DEDUP_TTL', 300)),
+            retries=int(os.getenv('ALERT_RETRIES', 3))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token and self.chat_id)
+
+    # ------------------------------------------------------------------
+    # Enfileirar (síncrono, nunca bloqueia)
+    # ------------------------------------------------------------------
+
+    def send(self, text: str, key: Optional[str] = None, dedup: Optional[str] = None) -> bool:
+        """
+        Enfileirar um alerta. Retorna False se descartado (desabilitado,
+        duplicado ou fila cheia). Pode ser chamado de qualquer thread.
+        """
+        if not self.enabled:
+            return False
+
+        now = time.monotonic()
+        dedup = dedup or text
+        while self._recent and next(iter(self._recent.values())) < now - self.dedup_ttl:
+            self._recent.popitem(last=False)
+        if dedup in self._recent:
+            self.alerts.inc(result='duplicate')
+            return False
+
+        if self.queue.full():
+            self.alerts.inc(result='dropped')
+            print(f"⚠️ [alertas] Fila cheia ({self.queue.maxsize}), alerta descartado")
+            return False
+        self._recent[dedup] = now
+        self._recent.move_to_end(dedup)
+
+        alert = Alert(text=text, key=key)
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            # asyncio.Queue não é thread-safe: entregar pelo loop dono da fila
+            self._loop.call_soon_threadsafe(self._put, alert)
+        else:
+            self._put(alert)
+            self._ensure_started()
+        return True
+
+    def _put(self, alert: Alert):
+        try:
+            self.queue.put_nowait(alert)
+        except asyncio.QueueFull:
+            self.alerts.inc(result='dropped')
+        self.queue_size.set(self.queue.qsize())
+
+    def _ensure_started(self):
+        """Primeiro send() inicia o worker: no loop atual ou, sem loop, numa thread própria."""
+        with self._start_lock:
+            if self._task is not None or self._thread is not None:
+                return
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                self._start_thread()
+                return
+            self._start_worker()
+
+    def _start_thread(self):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(lambda: (self._start_worker(), ready.set()))
+            loop.run_forever()
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name='alert-dispatcher', daemon=True)
+        self._thread.start()
+        ready.wait()
+        atexit.register(self.close)  # Enviar o que sobrou ao sair do processo
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        # Task de outro loop (ex.: loop recriado após restart): worker novo neste
+        if self._task is None or self._task.get_loop() is not asyncio.get_running_loop():
+            self._start_worker()
+
+    def _start_worker(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._flushing = False
+
+        # Fila nova neste loop, com o que ficou pendente (antes do start ou após um stop)
+        pending, self.queue = self.queue, asyncio.Queue(maxsize=self.queue.maxsize)
+        while not pending.empty():
+            self.queue.put_nowait(pending.get_nowait())
+
+        self._task = asyncio.create_task(self._run(), name='alert-dispatcher')
+
+    def close(self, timeout: float = 5.0):
+        """Versão síncrona de stop() para o modo thread (código sem event loop)."""
+        thread, loop = self._thread, self._loop
+        if thread is None or loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.stop(timeout), loop).result(timeout + 1)
+        except Exception as e:
+            print(f"⚠️ [alertas] Falha ao encerrar: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=1)
+        self._thread = None
+        atexit.unregister(self.close)
+
+    async def stop(self, timeout: float = 5.0):
+        """Enviar o que estiver na fila (até `timeout` segundos) e encerrar."""
+        if self._task is not None:
+            self._flushing = True
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"⚠️ [alertas] {self.queue.qsize()} alertas não enviados no encerramento")
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+        self._loop_thread = None
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._own_session = False
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            try:
+                await self._collect(batch)
+                for message in self._group(batch):
+                    await self._deliver(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ [alertas] Erro no envio: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+                self.queue_size.set(self.queue.qsize())
+
+    async def _collect(self, batch: List[Alert]):
+        """Juntar ao lote o que chegar dentro da janela (no encerramento, só o que já está na fila)."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (0 if self._flushing else self.window)
+        while True:
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0 or self._flushing:
+                    batch.append(self.queue.get_nowait())
+                else:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                return
+
+    def _group(self, batch: List[Alert]) -> List[str]:
+        """Uma mensagem por chave (na ordem de chegada); sem chave = mensagem própria."""
+        groups: Dict[object, List[Alert]] = OrderedDict()
+        for i, alert in enumerate(batch):
+            groups.setdefault(alert.key if alert.key is not None else i, []).append(alert)
+
+        messages = []
+        for key, alerts in groups.items():
+            if len(alerts) == 1:
+                messages.append(alerts[0].text)
+                continue
+            self.alerts.inc(len(alerts) - 1, result='grouped')
+            lines = [f"🔁 {len(alerts)}x {key}"]
+            for alert in alerts[:MAX_LINES_PER_GROUP]:
+                lines.append('• ' + alert.text.replace('\n', ' | '))
+            if len(alerts) > MAX_LINES_PER_GROUP:
+                lines.append(f"... e mais {len(alerts) - MAX_LINES_PER_GROUP}")
+            messages.append('\n'.join(lines))
+        return messages
+
+    async def _deliver(self, text: str) -> bool:
+        if len(text) > MAX_MESSAGE_LENGTH:
+            text = text[:MAX_MESSAGE_LENGTH - 3] + '...'
+
+        session = self._get_session()
+        url = f"{self.api_url}/bot{self.token}/sendMessage"
+        payload = {'chat_id': self.chat_id, 'text': text, 'parse_mode': 'HTML'}
+
+        for attempt in range(self.retries + 1):
+            wait = self.min_interval - (time.monotonic() - self._last_sent)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_sent = time.monotonic()
+
+            delay = self.backoff * 2 ** attempt
+            try:
+                async with session.post(url, json=payload) as response:
+                    if response.status < 400:
+                        self.alerts.inc(result='sent')
+                        self.sent = (self.sent + [text])[-20:]
+                        return True
+                    body = await response.json(content_type=None)
+                    if response.status == 429:
+                        delay = float((body or {}).get('parameters', {}).get('retry_after', delay))
+                    elif response.status < 500:
+                        # 400/401/403: token, chat_id ou HTML inválido - repetir não resolve
+                        print(f"⚠️ [alertas] Telegram recusou ({response.status}): {(body or {}).get('description')}")
+                        break
+                    error = f"HTTP {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                error = str(e) or type(e).__name__
+
+            if attempt < self.retries:
+                print(f"⚠️ [alertas] Falha no envio ({error}), nova tentativa em {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        self.alerts.inc(result='failed')
+        return False
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._own_session = True
+        return self._session
+
@@ -13,96 +13,43 @@ from typing import Dict, List
 from binance.client import Client
 from colorama import Fore, Style, init
 
+from backtest_engine import run_vectorized, signals_from_indicators
+from candle_store import CandleStore
+from indicators import add_indicators
+
 init(autoreset=True)
 
 
 class Backtester:
     """Backtester para estratégias de futures."""
 
-    def __init__(self, api_key: str, api_secret: str):
+    def __init__(self, api_key: str, api_secret: str, store: CandleStore = None):
         self.client = Client(api_key, api_secret)
+        self.store = store or CandleStore.from_env()
 
     def get_historical_data(self, symbol: str, interval: str, days: int = 30) -> pd.DataFrame:
-        """Obter dados históricos."""
-        print(f"{Fore.CYAN}📥 Baixando dados de {days} dias...")
-
-        klines = self.client.futures_historical_klines(
-            symbol=symbol,
-            interval=interval,
-            start_date=str(datetime.now() - timedelta(days=days))
-        )
+        """Obter dados históricos (store local; só baixa o que falta)."""
+        end_ms = int(datetime.now().timestamp() * 1000)
+        start_ms = end_ms - days * 86_400_000
 
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-            'taker_buy_quote', 'ignore'
-        ])
+        added = self.store.fill_sync(self.client, symbol, interval, start_ms, end_ms)
+        print(f"{Fore.CYAN}📥 {days} dias de dados ({added} candles baixados, resto do cache local)")
 
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df['close'] = df['close'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['open'] = df['open'].astype(float)
-        df['volume'] = df['volume'].astype(float)
+        arrays = self.store.read_arrays(symbol, interval, start_ms, end_ms)
+        df = pd.DataFrame({key: arrays[key] for key in ('open', 'high', 'low', 'close', 'volume')})
+        df.insert(0, 'timestamp', pd.to_datetime(arrays['open_time'], unit='ms'))
 
         return df
 
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calcular indicadores."""
-        df = df.copy()
-
-        # EMA's
-        df['ema_9'] = df['close'].ewm(span=9).mean()
-        df['ema_21'] = df['close'].ewm(span=21).mean()
-        df['ema_50'] = df['close'].ewm(span=50).mean()
-
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-
-        # MACD
-        df['ema_12'] = df['close'].ewm(span=12).mean()
-        df['ema_26'] = df['close'].ewm(span=26).mean()
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9).mean()
-        df['macd_hist'] = df['macd'] - df['macd_signal']
-
-        # ATR
-        high_low = df['high'] - df['low']
-        high_close = abs(df['high'] - df['close'].shift())
-        low_close = abs(df['low'] - df['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        df['atr'] = ranges.max(axis=1).rolling(window=14).mean()
-
-        return df
+        return add_indicators(df)
 
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Gerar sinais de entrada/saída."""
+        """Gerar sinais de entrada/saída (regras de backtest_engine.signals_from_indicators)."""
         df = df.copy()
-
-        # Sinais LONG
-        long_conditions = (
-            (df['ema_9'] > df['ema_21']) &
-            (df['ema_21'] > df['ema_50']) &
-            (df['rsi'] > 30) & (df['rsi'] < 70) &
-            (df['macd_hist'] > 0)
-        )
-
-        # Sinais SHORT
-        short_conditions = (
-            (df['ema_9'] < df['ema_21']) &
-            (df['ema_21'] < df['ema_50']) &
-            (df['rsi'] > 30) & (df['rsi'] < 70) &
-            (df['macd_hist'] < 0)
-        )
-
-        df['signal'] = 0
-        df.loc[long_conditions, 'signal'] = 1
-        df.loc[short_conditions, 'signal'] = -1
-
+        columns = ('close', 'ema_9', 'ema_21', 'ema_50', 'rsi', 'macd_hist')
+        df['signal'] = signals_from_indicators({c: df[c].to_numpy(dtype=np.float64) for c in columns})
         return df
 
     def run_backtest(
@@ -123,131 +70,30 @@ class Backtester:
         print(f"{Fore.CYAN}📊 BACKTEST: {symbol} | {interval} | {days} dias")
         print(f"{Fore.CYAN}{'='*60}")
 
-        # Obter e preparar dados
+        # Obter dados e simular com o engine vetorizado
         df = self.get_historical_data(symbol, interval, days)
-        df = self.calculate_indicators(df)
-        df = self.generate_signals(df)
-
-        capital = initial_capital
-        position = None
-        trades = []
-        max_drawdown = 0
-        peak_capital = initial_capital
-
-        for i in range(50, len(df)):
-            row = df.iloc[i]
-            prev_row = df.iloc[i-1]
-
-            # Atualizar pico e drawdown
-            if capital > peak_capital:
-                peak_capital = capital
-            drawdown = (peak_capital - capital) / peak_capital
-            max_drawdown = max(max_drawdown, drawdown)
-
-            # Fechar posição existente
-            if position:
-                entry_price = position['entry']
-                sl = position['sl']
-                tp = position['tp']
-                side = position['side']
-
-                # Verificar SL ou TP
-                if side == 'LONG':
-                    if row['low'] <= sl:
-                        # Hit SL
-                        pnl = (sl - entry_price) / entry_price * leverage
-                        capital *= (1 + pnl * risk_per_trade)
-                        trades.append({
-                            'type': 'SL',
-                            'side': side,
-                            'entry': entry_price,
-                            'exit': sl,
-                            'pnl': pnl * 100,
-                            'capital': capital
-                        })
-                        position = None
-                    elif row['high'] >= tp:
-                        # Hit TP
-                        pnl = (tp - entry_price) / entry_price * leverage
-                        capital *= (1 + pnl * risk_per_trade)
-                        trades.append({
-                            'type': 'TP',
-                            'side': side,
-                            'entry': entry_price,
-                            'exit': tp,
-                            'pnl': pnl * 100,
-                            'capital': capital
-                        })
-                        position = None
-                else:  # SHORT
-                    if row['high'] >= sl:
-                        # Hit SL
-                        pnl = (entry_price - sl) / entry_price * leverage
-                        capital *= (1 + pnl * risk_per_trade)
-                        trades.append({
-                            'type': 'SL',
-                            'side': side,
-                            'entry': entry_price,
-                            'exit': sl,
-                            'pnl': pnl * 100,
-                            'capital': capital
-                        })
-                        position = None
-                    elif row['low'] <= tp:
-                        # Hit TP
-                        pnl = (entry_price - tp) / entry_price * leverage
-                        capital *= (1 + pnl * risk_per_trade)
-                        trades.append({
-                            'type': 'TP',
-                            'side': side,
-                            'entry': entry_price,
-                            'exit': tp,
-                            'pnl': pnl * 100,
-                            'capital': capital
-                        })
-                        position = None
-
-            # Abrir nova posição
-            if not position and row['signal'] != 0:
-                entry = row['close']
-                atr = row['atr']
-
-                if row['signal'] == 1:  # LONG
-                    sl = entry - (atr * 1.5)
-                    tp = entry + (atr * 3)
-                    position = {
-                        'side': 'LONG',
-                        'entry': entry,
-                        'sl': sl,
-                        'tp': tp
-                    }
-                else:  # SHORT
-                    sl = entry + (atr * 1.5)
-                    tp = entry - (atr * 3)
-                    position = {
-                        'side': 'SHORT',
-                        'entry': entry,
-                        'sl': sl,
-                        'tp': tp
-                    }
-
-        # Calcular estatísticas
-        total_trades = len(trades)
-        winning_trades = len([t for t in trades if t['pnl'] > 0])
-        losing_trades = len([t for t in trades if t['pnl'] < 0])
-        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+        stats, trades = run_vectorized(
+            df['high'].to_numpy(dtype=np.float64),
+            df['low'].to_numpy(dtype=np.float64),
+            df['close'].to_numpy(dtype=np.float64),
+            df['volume'].to_numpy(dtype=np.float64),
+            initial_capital=initial_capital,
+            leverage=leverage,
+            risk_per_trade=risk_per_trade
+        )
 
-        total_return = ((capital - initial_capital) / initial_capital) * 100
+        capital = stats['final_capital']
+        total_return = stats['total_return']
+        total_trades = stats['total_trades']
+        win_rate = stats['win_rate']
+        profit_factor = stats['profit_factor']
+        max_drawdown = stats['max_drawdown']
 
-        if trades:
-            avg_win = np.mean([t['pnl'] for t in trades if t['pnl'] > 0])
-            avg_loss = np.mean([t['pnl'] for t in trades if t['pnl'] < 0])
-            profit_factor = abs(
-                sum([t['pnl'] for t in trades if t['pnl'] > 0]) /
-                sum([t['pnl'] for t in trades if t['pnl'] < 0])
-            ) if losing_trades > 0 else 0
-        else:
-            avg_win = avg_loss = profit_factor = 0
+        pnl = trades['pnl']
+        winning_trades = int((pnl > 0).sum())
+        losing_trades = int((pnl < 0).sum())
+        avg_win = pnl[pnl > 0].mean() if winning_trades else 0
+        avg_loss = pnl[pnl < 0].mean() if losing_trades else 0
 
         # Exibir resultados
         print(f"\n{Fore.WHITE}📈 RESULTADOS DO BACKTEST")
@@ -265,23 +111,17 @@ class Backtester:
         print(f"{Fore.WHITE}Max Drawdown:       {Fore.RED}{max_drawdown*100:.2f}%")
 
         # Últimos trades
-        if trades:
+        if total_trades:
             print(f"\n{Fore.YELLOW}📋 ÚLTIMOS 5 TRADES:")
-            for trade in trades[-5:]:
-                color = Fore.GREEN if trade['pnl'] > 0 else Fore.RED
-                print(f"  {color}{trade['type']} {trade['side']} | "
-                      f"Entry: ${trade['entry']:.2f} | "
-                      f"Exit: ${trade['exit']:.2f} | "
-                      f"PnL: {trade['pnl']:.2f}%")
-
-        return {
-            'total_return': total_return,
-            'total_trades': total_trades,
-            'win_rate': win_rate,
-            'profit_factor': profit_factor,
-            'max_drawdown': max_drawdown,
-            'final_capital': capital
-        }
+            for i in range(max(0, total_trades - 5), total_trades):
+                color = Fore.GREEN if pnl[i] > 0 else Fore.RED
+                side = 'LONG' if trades['side'][i] > 0 else 'SHORT'
+                print(f"  {color}{'SL' if trades['is_sl'][i] else 'TP'} {side} | "
+                      f"Entry: ${trades['entry'][i]:.2f} | "
+                      f"Exit: ${trades['exit'][i]:.2f} | "
+                      f"PnL: {pnl[i]:.2f}%")
+
+        return stats
 
 
 def main():
@@ -0,0 +1,226 @@
+"""
+🏎️ BACKTEST ENGINE (VETORIZADO)
+================================
+Simulação da estratégia EMA/RSI/MACD com saídas por ATR sobre arrays NumPy.
+
+- Sinais calculados de uma vez para todos os candles
+- Cada trade é resolvido com uma busca vetorizada pelo primeiro candle que
+  toca SL ou TP (sem loop por candle em Python)
+- Mesmas regras e mesmo dicionário de estatísticas do Backtester original
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+from indicators import compute_indicators
+
+
+LONG = 1
+SHORT = -1
+
+TRADE_FIELDS = ('entry_idx', 'exit_idx', 'side', 'entry', 'exit', 'is_sl', 'pnl', 'capital')
+
+
+# ============================================================================
+# SINAIS
+# ============================================================================
+
+def signals_from_indicators(ind: Dict[str, np.ndarray]) -> np.ndarray:
+    """Sinal por candle: 1 = LONG, -1 = SHORT, 0 = nada (EMAs alinhadas, RSI 30-70, histograma do MACD)."""
+    rsi_ok = (ind['rsi'] > 30) & (ind['rsi'] < 70)
+    long_cond = (ind['ema_9'] > ind['ema_21']) & (ind['ema_21'] > ind['ema_50']) & rsi_ok & (ind['macd_hist'] > 0)
+    short_cond = (ind['ema_9'] < ind['ema_21']) & (ind['ema_21'] < ind['ema_50']) & rsi_ok & (ind['macd_hist'] < 0)
+
+    signal = np.zeros(len(ind['close']), dtype=np.int8)
+    signal[long_cond] = LONG
+    signal[short_cond] = SHORT
+    return signal
+
+
+def strength_scores(ind: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Scores bullish/bearish por candle (mesma pontuação de AutonomousBot._score_symbol)."""
+    close = ind['close']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rel_volume = np.where(ind['volume_ma'] > 0, ind['volume'] / ind['volume_ma'], 1.0)
+    macd_up = (ind['macd'] - ind['macd_signal']) > 0
+    volume_ok = rel_volume > 0.8
+
+    bullish = (
+        25 * ((ind['ema_9'] > ind['ema_21']) & (ind['ema_21'] > ind['ema_50'])) +
+        20 * (ind['rsi'] < 35) +
+        15 * macd_up +
+        15 * (close < ind['bb_lower']) +
+        10 * volume_ok
+    )
+    bearish = (
+        25 * ((ind['ema_9'] < ind['ema_21']) & (ind['ema_21'] < ind['ema_50'])) +
+        20 * (ind['rsi'] > 65) +
+        15 * ~macd_up +
+        15 * (close > ind['bb_upper']) +
+        10 * volume_ok
+    )
+    return bullish.astype(np.int16), bearish.astype(np.int16)
+
+
+def signals_from_strength(bullish: np.ndarray, bearish: np.ndarray, min_strength: int) -> np.ndarray:
+    """Sinal do bot: tendência com folga de 7 pontos e força >= MIN_SIGNAL_STRENGTH."""
+    strength = np.maximum(bullish, bearish)
+    signal = np.zeros(len(bullish), dtype=np.int8)
+    signal[(bullish > bearish + 7) & (strength >= min_strength)] = LONG
+    signal[(bearish > bullish + 7) & (strength >= min_strength)] = SHORT
+    return signal
+
+
+# ============================================================================
+# SIMULAÇÃO
+# ============================================================================
+
+def _first_exit(high: np.ndarray, low: np.ndarray, start: int, side: int,
+                sl: float, tp: float) -> Tuple[int, bool]:
+    """
+    Primeiro candle >= start que toca SL ou TP.
+
+    Busca em janelas que dobram de tamanho: trades curtos olham poucos
+    candles, trades longos não reprocessam o array inteiro várias vezes.
+    SL tem prioridade quando os dois são tocados no mesmo candle.
+    """
+    n = len(high)
+    pos = start
+    size = 256
+    while pos < n:
+        stop = min(n, pos + size)
+        if side == LONG:
+            sl_hit = low[pos:stop] <= sl
+            tp_hit = high[pos:stop] >= tp
+        else:
+            sl_hit = high[pos:stop] >= sl
+            tp_hit = low[pos:stop] <= tp
+        hit = sl_hit | tp_hit
+        if hit.any():
+            k = int(hit.argmax())
+            return pos + k, bool(sl_hit[k])
+        pos = stop
+        size *= 2
+    return -1, False
+
+
+def simulate(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    signal: np.ndarray,
+    initial_capital: float = 100,
+    leverage: int = 10,
+    risk_per_trade: float = 0.05,
+    sl_mult: float = 1.5,
+    tp_mult: float = 3.0,
+    warmup: int = 50
+) -> Tuple[Dict[str, np.ndarray], float, float]:
+    """
+    Simular trades (uma posição por vez) e retornar (trades, capital final, max drawdown).
+
+    Entrada no fechamento do candle com sinal; saída no preço de SL/TP a partir
+    do candle seguinte. Após uma saída, um sinal no mesmo candle já abre nova posição.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    atr = np.asarray(atr, dtype=np.float64)
+    n = len(close)
+
+    signal_idx = np.flatnonzero(np.asarray(signal) != 0)
+    signal_idx = signal_idx[signal_idx >= warmup]
+
+    records = {field: [] for field in TRADE_FIELDS}
+    capital = float(initial_capital)
+    peak = capital
+    max_drawdown = 0.0
+
+    k = 0
+    while k < len(signal_idx):
+        entry_idx = int(signal_idx[k])
+        side = int(signal[entry_idx])
+        entry = close[entry_idx]
+        if side == LONG:
+            sl, tp = entry - atr[entry_idx] * sl_mult, entry + atr[entry_idx] * tp_mult
+        else:
+            sl, tp = entry + atr[entry_idx] * sl_mult, entry - atr[entry_idx] * tp_mult
+
+        exit_idx, is_sl = _first_exit(high, low, entry_idx + 1, side, sl, tp)
+        if exit_idx < 0:
+            break  # Posição ainda aberta no fim dos dados
+
+        exit_price = sl if is_sl else tp
+        pnl = (exit_price - entry) / entry * leverage * side
+        capital *= (1 + pnl * risk_per_trade)
+
+        # Drawdown é medido no início de cada candle (só vê saídas antes do último)
+        if exit_idx < n - 1:
+            peak = max(peak, capital)
+            max_drawdown = max(max_drawdown, (peak - capital) / peak)
+
+        for field, value in zip(TRADE_FIELDS, (entry_idx, exit_idx, side, entry, exit_price, is_sl, pnl * 100, capital)):
+            records[field].append(value)
+
+        # Próximo sinal no próprio candle de saída ou depois
+        k = int(np.searchsorted(signal_idx, exit_idx, side='left'))
+
+    trades = {
+        'entry_idx': np.array(records['entry_idx'], dtype=np.int64),
+        'exit_idx': np.array(records['exit_idx'], dtype=np.int64),
+        'side': np.array(records['side'], dtype=np.int8),
+        'entry': np.array(records['entry'], dtype=np.float64),
+        'exit': np.array(records['exit'], dtype=np.float64),
+        'is_sl': np.array(records['is_sl'], dtype=bool),
+        'pnl': np.array(records['pnl'], dtype=np.float64),
+        'capital': np.array(records['capital'], dtype=np.float64)
+    }
+    return trades, capital, max_drawdown
+
+
+# ============================================================================
+# ESTATÍSTICAS
+# ============================================================================
+
+def summarize(trades: Dict[str, np.ndarray], initial_capital: float,
+              capital: float, max_drawdown: float) -> Dict:
+    """Estatísticas no mesmo formato de Backtester.run_backtest."""
+    pnl = trades['pnl']
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+
+    total_trades = len(pnl)
+    win_rate = (len(wins) / total_trades * 100) if total_trades > 0 else 0
+    profit_factor = abs(wins.sum() / losses.sum()) if len(losses) > 0 else 0
+
+    return {
+        'total_return': ((capital - initial_capital) / initial_capital) * 100,
+        'total_trades': total_trades,
+        'win_rate': win_rate,
+        'profit_factor': profit_factor,
+        'max_drawdown': max_drawdown,
+        'final_capital': capital
+    }
+
+
+def run_vectorized(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    initial_capital: float = 100,
+    leverage: int = 10,
+    risk_per_trade: float = 0.05
+) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """Candles -> indicadores -> sinais -> trades. Retorna (stats, trades)."""
+    ind = compute_indicators(close, high, low, volume)
+    signal = signals_from_indicators(ind)
+    trades, capital, max_drawdown = simulate(
+        high, low, close, ind['atr'], signal,
+        initial_capital=initial_capital,
+        leverage=leverage,
+        risk_per_trade=risk_per_trade
+    )
+    return summarize(trades, initial_capital, capital, max_drawdown), trades
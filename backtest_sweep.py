@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+🧪 BACKTEST SWEEP
+=================
+Grid search dos parâmetros do bot com walk-forward, em paralelo.
+
+- Indicadores e scores calculados uma única vez no processo principal
+- Candles/scores em shared memory: os workers leem sem cópia nem pickle
+- Cada configuração roda em todos os folds (treino → teste fora da amostra)
+- Tabela ranqueada pelo desempenho fora da amostra + seleção walk-forward
+"""
+
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from colorama import Fore, init
+
+from backtest_engine import signals_from_strength, simulate, strength_scores, summarize
+from indicators import compute_indicators
+
+init(autoreset=True)
+
+
+# Colunas na matriz compartilhada (float64, colunas × candles)
+SHARED_COLUMNS = ('high', 'low', 'close', 'hl_range', 'bullish', 'bearish')
+
+DEFAULT_GRID = {
+    'min_strength': [20, 28, 35, 45, 55],
+    'sl_mult': [1.2, 1.5, 1.8, 2.2],
+    'tp_mult': [2.0, 3.0, 4.0, 5.0],
+    'leverage': [5, 10, 20],
+    'risk_per_trade': [0.05]
+}
+
+WARMUP = 50
+
+
+# ============================================================================
+# GRID E SPLITS
+# ============================================================================
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict]:
+    """Produto cartesiano do grid -> lista de configurações."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def walk_forward_splits(n: int, folds: int = 4, train_ratio: float = 0.7,
+                        start: int = WARMUP) -> List[Tuple[int, int, int]]:
+    """
+    Janelas deslizantes (início treino, início teste, fim teste).
+
+    Cada fold treina em `train_ratio` da janela e testa no trecho seguinte;
+    os trechos de teste são consecutivos e não se sobrepõem.
+    """
+    usable = n - start
+    if usable <= 0 or folds < 1 or not 0 < train_ratio < 1:
+        return []
+    test_len = int(usable / (folds + train_ratio / (1 - train_ratio)))
+    train_len = usable - folds * test_len
+    if test_len < 1 or train_len < 1:
+        return []
+
+    splits = []
+    for k in range(folds):
+        train_start = start + k * test_len
+        test_start = train_start + train_len
+        splits.append((train_start, test_start, test_start + test_len))
+    return splits
+
+
+# ============================================================================
+# AVALIAÇÃO (WORKER)
+# ============================================================================
+
+_shared: Dict[str, np.ndarray] = {}
+_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _attach(name: str, shape: Tuple[int, int]):
+    """Inicializador do worker: mapear a matriz compartilhada (sem cópia)."""
+    global _shm
+    _shm = shared_memory.SharedMemory(name=name)  # unlink fica a cargo do processo principal
+    matrix = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _shared.clear()
+    _shared.update({col: matrix[i] for i, col in enumerate(SHARED_COLUMNS)})
+
+
+def _signal_for(data: Dict, min_strength: int) -> np.ndarray:
+    """Sinais por força mínima (calculados uma vez por processo e reaproveitados)."""
+    cache = data.setdefault('signals', {})
+    if min_strength not in cache:
+        cache[min_strength] = signals_from_strength(data['bullish'], data['bearish'], min_strength)
+    return cache[min_strength]
+
+
+def _run_window(data: Dict[str, np.ndarray], signal: np.ndarray, config: Dict,
+                start: int, end: int, initial_capital: float) -> Tuple[Dict, np.ndarray]:
+    trades, capital, max_drawdown = simulate(
+        data['high'][start:end], data['low'][start:end], data['close'][start:end],
+        data['hl_range'][start:end], signal[start:end],
+        initial_capital=initial_capital,
+        leverage=config['leverage'],
+        risk_per_trade=config['risk_per_trade'],
+        sl_mult=config['sl_mult'],
+        tp_mult=config['tp_mult'],
+        warmup=0
+    )
+    return summarize(trades, initial_capital, capital, max_drawdown), trades['pnl']
+
+
+def evaluate_config(config: Dict, splits: Sequence[Tuple[int, int, int]],
+                    initial_capital: float = 100, data: Optional[Dict[str, np.ndarray]] = None) -> Dict:
+    """Rodar uma configuração em todos os folds e agregar as métricas."""
+    data = data if data is not None else _shared
+    signal = _signal_for(data, int(config['min_strength']))
+
+    is_returns, oos_returns, oos_drawdowns, oos_pnl = [], [], [], []
+    for train_start, test_start, test_end in splits:
+        train, _ = _run_window(data, signal, config, train_start, test_start, initial_capital)
+        test, pnl = _run_window(data, signal, config, test_start, test_end, initial_capital)
+        is_returns.append(train['total_return'])
+        oos_returns.append(test['total_return'])
+        oos_drawdowns.append(test['max_drawdown'])
+        oos_pnl.append(pnl)
+
+    pnl = np.concatenate(oos_pnl) if oos_pnl else np.empty(0)
+    wins, losses = pnl[pnl > 0], pnl[pnl < 0]
+
+    return {
+        **config,
+        'is_return': float(np.mean(is_returns)) if is_returns else 0.0,
+        'oos_return': float(np.mean(oos_returns)) if oos_returns else 0.0,
+        'oos_worst': float(np.min(oos_returns)) if oos_returns else 0.0,
+        'oos_trades': int(len(pnl)),
+        'oos_win_rate': len(wins) / len(pnl) * 100 if len(pnl) else 0.0,
+        'oos_profit_factor': abs(wins.sum() / losses.sum()) if len(losses) else 0.0,
+        'oos_max_dd': float(np.max(oos_drawdowns)) * 100 if oos_drawdowns else 0.0,
+        'positive_folds': int(sum(r > 0 for r in oos_returns)),
+        'fold_is': is_returns,
+        'fold_oos': oos_returns
+    }
+
+
+def _evaluate_chunk(configs: List[Dict], splits, initial_capital: float) -> List[Dict]:
+    return [evaluate_config(c, splits, initial_capital) for c in configs]
+
+
+# ============================================================================
+# SWEEP
+# ============================================================================
+
+def prepare_data(high, low, close, volume) -> Dict[str, np.ndarray]:
+    """Candles -> colunas usadas pela simulação (indicadores e scores prontos)."""
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    ind = compute_indicators(close, high, low, volume)
+    ind['volume'] = np.ascontiguousarray(volume, dtype=np.float64)
+    bullish, bearish = strength_scores(ind)
+    return {
+        'high': high,
+        'low': low,
+        'close': ind['close'],
+        'hl_range': ind['hl_range'],
+        'bullish': bullish.astype(np.float64),
+        'bearish': bearish.astype(np.float64)
+    }
+
+
+def rank_results(rows: List[Dict], by: str = 'oos_return') -> pd.DataFrame:
+    """Tabela ordenada (drawdown: menor é melhor; demais: maior é melhor)."""
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    ascending = by == 'oos_max_dd'
+    return table.sort_values([by, 'oos_trades'], ascending=[ascending, False]).reset_index(drop=True)
+
+
+def walk_forward_selection(table: pd.DataFrame) -> List[Dict]:
+    """Por fold: melhor configuração no treino e o resultado dela no teste seguinte."""
+    if table.empty:
+        return []
+    fold_is = np.array(table['fold_is'].tolist())
+    fold_oos = np.array(table['fold_oos'].tolist())
+    selection = []
+    for k in range(fold_is.shape[1]):
+        best = int(fold_is[:, k].argmax())
+        selection.append({
+            'fold': k,
+            'config': int(best),
+            'is_return': float(fold_is[best, k]),
+            'oos_return': float(fold_oos[best, k])
+        })
+    return selection
+
+
+def run_sweep(
+    high,
+    low,
+    close,
+    volume,
+    grid: Optional[Dict[str, Sequence]] = None,
+    folds: int = 4,
+    train_ratio: float = 0.7,
+    initial_capital: float = 100,
+    workers: Optional[int] = None,
+    rank_by: str = 'oos_return',
+    chunk_size: int = 16
+) -> pd.DataFrame:
+    """
+    Avaliar todas as combinações do grid com walk-forward.
+
+    workers=1 roda no próprio processo (útil para debug/testes); caso contrário
+    usa um ProcessPoolExecutor com os dados em shared memory.
+    """
+    data = prepare_data(high, low, close, volume)
+    configs = expand_grid(grid or DEFAULT_GRID)
+    splits = walk_forward_splits(len(data['close']), folds, train_ratio)
+    if not splits:
+        raise ValueError(f"Poucos candles ({len(data['close'])}) para {folds} folds")
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return rank_results([evaluate_config(c, splits, initial_capital, data) for c in configs], rank_by)
+
+    shape = (len(SHARED_COLUMNS), len(data['close']))
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    try:
+        matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for i, col in enumerate(SHARED_COLUMNS):
+            matrix[i] = data[col]
+
+        chunks = [configs[i:i + chunk_size] for i in range(0, len(configs), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name, shape)) as pool:
+            futures = [pool.submit(_evaluate_chunk, chunk, splits, initial_capital) for chunk in chunks]
+            rows = [row for future in futures for row in future.result()]
+        del matrix
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return rank_results(rows, rank_by)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _parse_list(value: str, cast=float) -> List:
+    return [cast(v) for v in value.split(',') if v.strip()]
+
+
+def print_table(table: pd.DataFrame, top: int = 20):
+    """Exibir o ranking no terminal."""
+    columns = ['min_strength', 'sl_mult', 'tp_mult', 'leverage', 'risk_per_trade',
+               'is_return', 'oos_return', 'oos_worst', 'oos_trades', 'oos_win_rate',
+               'oos_profit_factor', 'oos_max_dd', 'positive_folds']
+    print(f"\n{Fore.CYAN}🏆 TOP {min(top, len(table))} CONFIGURAÇÕES (fora da amostra)")
+    print(f"{Fore.CYAN}{'='*60}")
+    print(table[columns].head(top).to_string(float_format=lambda v: f"{v:.2f}"))
+
+
+def main():
+    """Executar sweep a partir do store local de candles."""
+    import argparse
+    import dotenv
+    from binance.client import Client
+
+    from candle_store import CandleStore
+
+    parser = argparse.ArgumentParser(description='Grid search de parâmetros com walk-forward')
+    parser.add_argument('symbol', help='Par (ex: BTCUSDT)')
+    parser.add_argument('--interval', default='15m')
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--folds', type=int, default=4)
+    parser.add_argument('--train-ratio', type=float, default=0.7)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--strength', default=None, help='Ex: 20,28,35')
+    parser.add_argument('--sl', default=None, help='Multiplicadores de SL (ex: 1.2,1.5,1.8)')
+    parser.add_argument('--tp', default=None, help='Multiplicadores de TP (ex: 2,3,4)')
+    parser.add_argument('--leverage', default=None, help='Ex: 5,10,20')
+    parser.add_argument('--risk', default=None, help='Ex: 0.05,0.1')
+    parser.add_argument('--rank-by', default='oos_return')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--csv', default=None, help='Salvar tabela completa em CSV')
+    args = parser.parse_args()
+
+    dotenv.load_dotenv()
+    grid = dict(DEFAULT_GRID)
+    if args.strength:
+        grid['min_strength'] = _parse_list(args.strength, int)
+    if args.sl:
+        grid['sl_mult'] = _parse_list(args.sl)
+    if args.tp:
+        grid['tp_mult'] = _parse_list(args.tp)
+    if args.leverage:
+        grid['leverage'] = _parse_list(args.leverage, int)
+    if args.risk:
+        grid['risk_per_trade'] = _parse_list(args.risk)
+
+    store = CandleStore.from_env()
+    client = Client(os.getenv('BINANCE_API_KEY'), os.getenv('BINANCE_API_SECRET'))
+    end_ms = int(time.time() * 1000)
+    start_ms = end_ms - args.days * 86_400_000
+    store.fill_sync(client, args.symbol, args.interval, start_ms, end_ms)
+    arrays = store.read_arrays(args.symbol, args.interval, start_ms, end_ms)
+
+    n_configs = len(expand_grid(grid))
+    print(f"{Fore.CYAN}🧪 {n_configs} configurações × {args.folds} folds | {len(arrays['close'])} candles")
+
+    started = time.perf_counter()
+    table = run_sweep(arrays['high'], arrays['low'], arrays['close'], arrays['volume'],
+                      grid=grid, folds=args.folds, train_ratio=args.train_ratio,
+                      workers=args.workers, rank_by=args.rank_by)
+    elapsed = time.perf_counter() - started
+
+    print_table(table, args.top)
+
+    print(f"\n{Fore.YELLOW}🔁 WALK-FORWARD (melhor do treino → teste seguinte):")
+    for step in walk_forward_selection(table):
+        row = table.iloc[step['config']]
+        color = Fore.GREEN if step['oos_return'] > 0 else Fore.RED
+        print(f"  Fold {step['fold']}: força {row['min_strength']} | SL {row['sl_mult']} | "
+              f"TP {row['tp_mult']} | {row['leverage']}x | treino {step['is_return']:.2f}% | "
+              f"{color}teste {step['oos_return']:.2f}%")
+
+    print(f"\n{Fore.WHITE}⏱️ {n_configs} configurações em {elapsed:.1f}s")
+
+    if args.csv:
+        table.drop(columns=['fold_is', 'fold_oos']).to_csv(args.csv, index=False)
+        print(f"{Fore.GREEN}💾 Tabela salva em {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,8 @@ from binance import AsyncClient, BinanceSocketManager
 import dotenv
 from colorama import Fore, Style, init
 
+from indicators import add_indicators
+
 # Configurar encoding UTF-8 para Windows
 if sys.platform == 'win32':
     import codecs
@@ -116,45 +118,7 @@ class BinanceFuturesAgent:
         if df.empty:
             return df
 
-        df = df.copy()
-
-        # EMA's
-        df['ema_9'] = df['close'].ewm(span=9).mean()
-        df['ema_21'] = df['close'].ewm(span=21).mean()
-        df['ema_50'] = df['close'].ewm(span=50).mean()
-
-        # RSI (14)
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-
-        # MACD
-        df['ema_12'] = df['close'].ewm(span=12).mean()
-        df['ema_26'] = df['close'].ewm(span=26).mean()
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9).mean()
-        df['macd_hist'] = df['macd'] - df['macd_signal']
-
-        # Bollinger Bands
-        df['bb_middle'] = df['close'].rolling(window=20).mean()
-        df['bb_std'] = df['close'].rolling(window=20).std()
-        df['bb_upper'] = df['bb_middle'] + (df['bb_std'] * 2)
-        df['bb_lower'] = df['bb_middle'] - (df['bb_std'] * 2)
-
-        # ATR (Stop Loss dinâmico)
-        high_low = df['high'] - df['low']
-        high_close = abs(df['high'] - df['close'].shift())
-        low_close = abs(df['low'] - df['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        df['atr'] = ranges.max(axis=1).rolling(window=14).mean()
-
-        # Volume analysis
-        df['volume_ma'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_ma']
-
-        return df
+        return add_indicators(df)
 
     async def analyze_market(self, symbol: str, interval: str = '15m') -> Dict:
         """
@@ -15,15 +15,30 @@ import asyncio
 import os
 import sys
 import signal
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
-import pandas as pd
-import numpy as np
 from binance import AsyncClient
 from colorama import Fore, Style, init
 import dotenv
-from openai import OpenAI
+
+from ai_advisor import AIAdvisor
+from candle_store import CandleStore
+from cycle_metrics import CycleProfiler
+from dashboard_state import DashboardPublisher
+from history_sync import HistorySync
+from indicators import IndicatorState, interval_to_ms
+from loop_watchdog import LoopWatchdog, await_location
+from market_data import MarketDataService
+from metrics import MetricsServer, get_metrics
+from protection import HealRequest, ProtectionManager
+from rate_limiter import RateLimitedClient, RateLimiter
+from response_cache import CachedClient
+from user_stream import OrderUpdate, UserDataStream
+from scan_engine import ScanEngine, klines_weight
+from symbol_registry import get_symbol_registry
+from trade_journal import TradeJournal
 
 # Configurar UTF-8
 if sys.platform == 'win32':
@@ -91,14 +106,70 @@ class AutonomousBot:
         self._position_repo = None
 
         # Arquivos de dados
-        self.dashboard_file = "dashboard_data.json"
-        self.history_file = "trade_history.json"
-        self.metrics_file = "daily_metrics.json"
+        self.dashboard = DashboardPublisher.from_env("dashboard_data.json")
+        self.history_file = "trade_history.json"  # Formato antigo (importado pelo journal)
+        self.trade_journal = TradeJournal.from_env(legacy_path=self.history_file)
+        self.history_sync = HistorySync.from_env()  # High-water mark de fills por par
 
         # Cliente OpenAI (opcional)
-        self.ai_client = OpenAI(api_key=self.openai_key) if self.openai_key else None
+        self.ai_client = AIAdvisor.from_env(self.openai_key) if self.openai_key else None
+        self.ai_top_n = int(os.getenv('AI_TOP_N', 3))  # Candidatos avaliados em paralelo
         self.last_ai_analysis: Dict[str, Dict] = {}
 
+        # Varredura concorrente dos pares
+        self.kline_interval = '15m'
+        self.klines_limit = 100
+        self.scan_engine = ScanEngine.from_env(request_weight=klines_weight(self.klines_limit))
+        self.last_scan: List[Dict] = []
+
+        # Indicadores incrementais por par (atualizados candle a candle)
+        self.indicator_states: Dict[str, IndicatorState] = {}
+
+        # Histórico local de candles (warm-start sem baixar 100 candles por par)
+        self.candle_store = CandleStore.from_env()
+
+        # Market data via WebSocket (kline + markPrice) no lugar do polling REST
+        self.use_market_ws = os.getenv('MARKET_DATA_WS', 'true').lower() == 'true'
+        self.market_data: Optional[MarketDataService] = None
+        self._wake = asyncio.Event()
+        self._ws_signals: Dict[str, Optional[str]] = {}
+
+        # User data stream (execuções e posições) no lugar do polling de posições
+        self.use_user_stream = os.getenv('USER_DATA_WS', 'true').lower() == 'true'
+        self.user_stream: Optional[UserDataStream] = None
+
+        # Filtros dos símbolos (exchange info) em cache
+        self.symbol_registry = get_symbol_registry()
+
+        # Auto-Heal de SL/TP (posições desprotegidas corrigidas em paralelo)
+        self.protection = ProtectionManager.from_env(self.symbol_registry)
+
+        # Limites de peso da API (X-MBX-USED-WEIGHT) compartilhados por todas as chamadas REST
+        self.rate_limiter = RateLimiter.from_env()
+
+        # Latência por fase de cada passada do loop (p50/p99)
+        self.cycle_metrics = CycleProfiler.from_env()
+
+        # Métricas Prometheus (/metrics e /health ou arquivo)
+        self.metrics = get_metrics()
+        self.metrics_server = MetricsServer.from_env(self.metrics)
+        self.scan_duration = self.metrics.histogram(
+            'bot_scan_duration_seconds', 'Duração da varredura dos pares',
+            buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+        )
+        # Lag do event loop (pilha de quem bloqueou) e heartbeat do ciclo
+        self.watchdog = LoopWatchdog.from_env(on_stale=self._restart_cycle)
+        self._cycle_task: Optional[asyncio.Task] = None
+
+        self.time_to_protection = self.metrics.histogram(
+            'bot_time_to_protection_seconds', 'Tempo da entrada/detecção até SL (leg=sl) e SL+TP (leg=full)',
+            ('source', 'leg'), buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+        )
+        self.last_backup_time = datetime.now()
+
+        # Espera após a ordem de entrada antes de ler o preço médio da posição
+        self.entry_confirm_delay = float(os.getenv('ENTRY_CONFIRM_DELAY', 2))
+
         self.client = None
         self.running = True
 
@@ -113,7 +184,26 @@ class AutonomousBot:
         print(f"{Fore.WHITE}  Max posições: {self.max_positions}")
         print(f"{Fore.CYAN}{'='*70}\n")
 
-        self.client = await AsyncClient.create(self.api_key, self.api_secret)
+        # REST com cache curto + controle de peso/prioridade (streams usam o cliente original)
+        self.client = CachedClient.from_env(RateLimitedClient(
+            await AsyncClient.create(self.api_key, self.api_secret),
+            self.rate_limiter,
+            self.metrics
+        ))
+
+        self.metrics.collector(self._collect_metrics)
+        await self.watchdog.start()
+        if self.metrics_server.enabled:
+            await self.metrics_server.start()
+            if self.metrics_server.port:
+                print(f"{Fore.CYAN}[{self.now()}] 📈 Métricas em http://{self.metrics_server.host}:{self.metrics_server.port}/metrics")
+
+        # Carregar filtros de todos os símbolos uma única vez
+        try:
+            count = await self.symbol_registry.load(self.client)
+            print(f"{Fore.CYAN}[{self.now()}] 📚 Filtros de {count} símbolos carregados")
+        except Exception as e:
+            print(f"{Fore.YELLOW}[{self.now()}] ⚠️ Exchange info indisponível ({e}), carregando sob demanda")
 
         # Variável para Watchdog
         self.last_heartbeat = datetime.now()
@@ -128,63 +218,292 @@ class AutonomousBot:
             # 0. Reconstruir histórico completo da Binance (Persistência no Render)
             await self.sync_historical_trades(days=30)  # 30 dias em vez de 7
             await self.sync_open_positions()
+
+            # Stream de mercado (candles e mark price em tempo real)
+            if self.use_market_ws:
+                self.market_data = MarketDataService(
+                    self.client.wrapped,
+                    self.symbols,
+                    interval=self.kline_interval,
+                    on_kline=self._on_kline,
+                    on_mark_price=self._on_mark_price
+                )
+                await self.market_data.start()
+                print(f"{Fore.CYAN}[{self.now()}] 📡 Stream de mercado iniciado ({len(self.market_data.streams)} streams)")
+
+            # Stream da conta (fills, PnL realizado e posições em tempo real)
+            if self.use_user_stream:
+                self.user_stream = UserDataStream(
+                    self.client.wrapped,
+                    on_order_update=self._on_order_update,
+                    on_account_update=self._on_account_update,
+                    on_resync=self._on_user_stream_resync
+                )
+                await self.user_stream.start()
+                print(f"{Fore.CYAN}[{self.now()}] 👤 User data stream iniciado")
             
             # Loop principal
             while self.running:
                 # Atualizar batimento cardíaco
                 self.last_heartbeat = datetime.now()
+                self.watchdog.beat()
 
                 try:
-                    # 1. Monitorar posições abertas
-                    await self.monitor_positions()
-
-                    # 2. Salvar estado para o Dashboard
-                    self.save_dashboard_state()
-
-                    # 3. Backup periódico a cada 1 hora (para segurança extra)
-                    if (datetime.now() - self.last_backup_time).total_seconds() > 3600:
-                        print(f"{Fore.CYAN}[{self.now()}] 💾 Backup periódico do histórico...")
-                        await self.sync_historical_trades(days=30)
-                        self.last_backup_time = datetime.now()
-
-                    # 2. Escanear novas oportunidades
-                    open_pos_count = len(self.active_trades)
-
-                    if open_pos_count < self.max_positions:
-                        print(f"{Fore.CYAN}[{self.now()}] Buscando oportunidades... ({open_pos_count}/{self.max_positions} posições)")
-
-                        opportunity = await self.find_best_opportunity()
-
-                        if opportunity:
-                            print(f"{Fore.GREEN}[{self.now()}] ⚡ Oportunidade: {opportunity['symbol']} {opportunity['trend']} (Força: {opportunity['strength']})")
-
-                            # Confirmar e entrar
-                            success = await self.enter_trade(opportunity)
-
-                            if success:
-                                open_pos_count += 1
-                        else:
-                            print(f"{Fore.YELLOW}[{self.now()}] Nenhuma oportunidade de qualidade")
-                    else:
-                        print(f"{Fore.WHITE}[{self.now()}] Máximo de posições atingido")
+                    # Ciclo em tarefa própria: o watchdog pode cancelá-lo se travar
+                    self._cycle_task = asyncio.ensure_future(self.run_cycle())
+                    try:
+                        await asyncio.wait({self._cycle_task})
+                    except asyncio.CancelledError:
+                        self._cycle_task.cancel()
+                        raise
+                    if self._cycle_task.cancelled():
+                        print(f"{Fore.YELLOW}[{self.now()}] 🐕 Ciclo cancelado pelo watchdog, reiniciando o loop")
+                        continue
+                    self._cycle_task.result()
+                    self.metrics_server.beat()
 
-                    # 3. Aguardar próximo ciclo
+                    # Aguardar próximo ciclo
+                    api = self.rate_limiter.metrics()
+                    print(f"{Fore.WHITE}[{self.now()}] Ciclo: {self.cycle_metrics.format_last()}")
+                    print(f"{Fore.WHITE}[{self.now()}] Peso API: {api['used_weight_1m'] or 0}/{api['weight_limit']} (1m) | 429: {api['throttled']}")
                     print(f"{Fore.WHITE}[{self.now()}] Aguardando {self.monitor_interval}s...\n")
-                    await asyncio.sleep(self.monitor_interval)
+                    await self._wait_next_cycle()
 
                 except Exception as e:
                     print(f"{Fore.RED}[{self.now()}] Erro no loop: {e}")
                     await asyncio.sleep(10)
 
         finally:
+            await self.watchdog.stop()
+            await self.metrics_server.stop()
+            if self.user_stream:
+                await self.user_stream.stop()
+            if self.market_data:
+                await self.market_data.stop()
             await self.client.close_connection()
 
+    async def run_cycle(self):
+        """Uma passada do loop: monitorar, publicar estado, escanear e entrar (cada fase medida)."""
+        metrics = self.cycle_metrics
+        with metrics.cycle():
+            # 1. Monitorar posições abertas
+            with metrics.phase('monitor_positions'):
+                await self.monitor_positions()
+
+            # 2. Salvar estado para o Dashboard
+            with metrics.phase('save_dashboard_state'):
+                self.save_dashboard_state()
+
+            # 3. Backup periódico a cada 1 hora (para segurança extra)
+            if (datetime.now() - self.last_backup_time).total_seconds() > 3600:
+                print(f"{Fore.CYAN}[{self.now()}] 💾 Backup periódico do histórico...")
+                with metrics.phase('sync_historical_trades'):
+                    await self.sync_historical_trades(days=30)
+                self.last_backup_time = datetime.now()
+
+            # 4. Escanear novas oportunidades
+            open_pos_count = len(self.active_trades)
+
+            if open_pos_count < self.max_positions:
+                print(f"{Fore.CYAN}[{self.now()}] Buscando oportunidades... ({open_pos_count}/{self.max_positions} posições)")
+
+                with metrics.phase('find_best_opportunity'):
+                    opportunity = await self.find_best_opportunity()
+
+                if opportunity:
+                    print(f"{Fore.GREEN}[{self.now()}] ⚡ Oportunidade: {opportunity['symbol']} {opportunity['trend']} (Força: {opportunity['strength']})")
+
+                    # Confirmar e entrar
+                    with metrics.phase('enter_trade'):
+                        await self.enter_trade(opportunity)
+                else:
+                    print(f"{Fore.YELLOW}[{self.now()}] Nenhuma oportunidade de qualidade")
+            else:
+                print(f"{Fore.WHITE}[{self.now()}] Máximo de posições atingido")
+
+    def _restart_cycle(self):
+        """Watchdog: heartbeat vencido - cancelar o ciclo preso, mostrando onde ele parou."""
+        task = self._cycle_task
+        if task is None or task.done():
+            return
+        print(f"{Fore.RED}[{self.now()}] 🐕 Ciclo parado em {await_location(task)}; cancelando")
+        task.cancel()
+
+    async def _wait_next_cycle(self):
+        """Aguarda o próximo ciclo; o stream de mercado pode acordar o loop antes."""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self.monitor_interval)
+            print(f"{Fore.CYAN}[{self.now()}] 📡 Ciclo antecipado pelo stream de mercado")
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    def _on_kline(self, symbol: str, candle, closed: bool):
+        """Candle novo do WebSocket: atualiza indicadores e acorda o loop se surgir sinal."""
+        state = self.indicator_states.get(symbol)
+        if state is None or state.stale:
+            return  # Próxima varredura recarrega o estado
+
+        if not state.update(candle, closed) and state.stale:
+            print(f"{Fore.YELLOW}[{self.now()}] 📡 {symbol}: buraco nos candles, recarregando na próxima varredura")
+            return
+
+        if symbol in self.active_trades or len(self.active_trades) >= self.max_positions:
+            return
+
+        signal = self._score_symbol(symbol, state)
+        qualified = signal['trend'] if (
+            signal['strength'] >= self.min_signal_strength and signal['trend'] != 'NEUTRAL'
+        ) else None
+
+        # Só acorda na transição (evita um ciclo a cada tick do mesmo sinal)
+        if qualified and qualified != self._ws_signals.get(symbol) and not self._in_ai_cooldown(symbol):
+            self._wake.set()
+        self._ws_signals[symbol] = qualified
+
+    def _on_mark_price(self, symbol: str, price: float):
+        """Mark price do WebSocket: atualiza posição e acorda o loop se SL/TP local for atingido."""
+        trade = self.active_trades.get(symbol)
+        if not trade:
+            return
+
+        trade['current_price'] = price
+
+        # Com SL/TP na exchange não há o que fazer localmente
+        if trade.get('sl_order_id') and trade.get('tp_order_id'):
+            return
+        if not trade.get('sl') or not trade.get('tp'):
+            return
+
+        if trade['side'] == 'LONG':
+            hit = price <= trade['sl'] or price >= trade['tp']
+        else:
+            hit = price >= trade['sl'] or price <= trade['tp']
+        if hit:
+            self._wake.set()
+
+    def _user_stream_live(self) -> bool:
+        return bool(self.user_stream and self.user_stream.connected)
+
+    def _stream_positions(self) -> Dict[str, Dict]:
+        """Posições do user stream com mark price/PnL do stream de mercado."""
+        positions = {}
+        for symbol, pos in self.user_stream.positions.items():
+            pos = dict(pos)
+            mark = self.market_data.mark_prices.get(symbol) if self.market_data else None
+            if mark:
+                amt = float(pos['positionAmt'])
+                pos['markPrice'] = str(mark)
+                pos['unRealizedProfit'] = str((mark - float(pos['entryPrice'])) * amt)
+            positions[symbol] = pos
+        return positions
+
+    async def _on_order_update(self, update: OrderUpdate):
+        """Execução de ordem: acumula fills de saída com preço e PnL exatos."""
+        trade = self.active_trades.get(update.symbol)
+        if not trade or not update.is_fill or not update.is_closing:
+            return
+
+        trade['exit_qty'] = trade.get('exit_qty', 0.0) + update.last_qty
+        trade['exit_value'] = trade.get('exit_value', 0.0) + update.last_qty * update.last_price
+        trade['realized_pnl'] = trade.get('realized_pnl', 0.0) + update.realized_pnl
+        trade['commission'] = trade.get('commission', 0.0) + update.commission
+
+        if update.order_id == trade.get('sl_order_id'):
+            trade['exit_reason'] = 'SL'
+        elif update.order_id == trade.get('tp_order_id'):
+            trade['exit_reason'] = 'TP'
+        else:
+            trade.setdefault('exit_reason', 'CLOSE')
+
+        if update.status == 'FILLED':
+            trade['exit_done'] = True
+            if trade.get('closing'):
+                await self._finalize_trade(update.symbol)
+
+    async def _on_account_update(self, reason: str, positions: List[Dict]):
+        """Mudança de posição: atualiza active_trades e fecha quando zerar."""
+        for pos in positions:
+            symbol = pos['symbol']
+            if isinstance(self.client, CachedClient):
+                # Posição mudou na exchange: snapshot REST em cache ficou velho
+                self.client.invalidate(('futures_position_information', 'futures_get_open_orders'), symbol)
+            trade = self.active_trades.get(symbol)
+            if not trade:
+                continue
+
+            amt = float(pos['positionAmt'])
+            if amt != 0:
+                trade['entry'] = float(pos['entryPrice'])
+                trade['quantity'] = abs(amt)
+                continue
+
+            # Posição zerada: fecha já se o fill de saída chegou, senão aguarda um pouco
+            trade['closing'] = True
+            if trade.get('exit_done'):
+                await self._finalize_trade(symbol)
+            else:
+                asyncio.create_task(self._finalize_after(symbol, delay=3))
+
+    async def _on_user_stream_resync(self, positions: Dict[str, Dict]):
+        """Snapshot REST após (re)conexão: fecha trades encerrados enquanto o stream estava fora."""
+        for symbol, trade in list(self.active_trades.items()):
+            if symbol not in positions and not trade.get('closing'):
+                trade['closing'] = True
+                await self._finalize_trade(symbol)
+
+    async def _finalize_after(self, symbol: str, delay: float):
+        await asyncio.sleep(delay)
+        trade = self.active_trades.get(symbol)
+        if trade and trade.get('closing'):
+            await self._finalize_trade(symbol)
+
+    async def _finalize_trade(self, symbol: str):
+        """Registra o resultado de um trade fechado e limpa ordens pendentes."""
+        trade = self.active_trades.pop(symbol, None)
+        if not trade:
+            return
+
+        exit_qty = trade.get('exit_qty', 0.0)
+        reason = trade.get('exit_reason', 'CLOSE')
+
+        if exit_qty > 0:
+            pnl = trade['realized_pnl']
+            exit_price = trade['exit_value'] / exit_qty
+            self._save_history_record({
+                "symbol": symbol,
+                "side": trade['side'],
+                "entry": trade['entry'],
+                "exit": exit_price,
+                "quantity": exit_qty,
+                "pnl": pnl,
+                "fee": trade.get('commission', 0.0),
+                "reason": reason,
+                "time": self.now()
+            })
+
+            color = Fore.GREEN if pnl > 0 else Fore.RED
+            print(f"{color}[{self.now()}] {symbol} - Posição fechada ({reason}) @ ${exit_price:.4f} | PnL: ${pnl:.4f}")
+        else:
+            # Sem fills do stream (ex.: fechou durante reconexão): buscar via REST
+            print(f"{Fore.YELLOW}[{self.now()}] {symbol} - Posição fechada (SL/TP atingido ou fechamento manual)")
+            await self._record_trade_result(symbol, trade['side'], trade['entry'], trade['quantity'])
+
+        # Cancelar ordens pendentes (SL/TP que sobrou)
+        try:
+            await self.client.futures_cancel_all_open_orders(symbol=symbol)
+        except Exception:
+            pass
+
     async def monitor_positions(self):
         """Monitora posições abertas (com proteção dupla: exchange + local)."""
         try:
-            # Obter posições da Binance
-            positions = await self.client.futures_position_information()
-            open_positions = {p['symbol']: p for p in positions if float(p['positionAmt']) != 0}
+            # Obter posições (user stream em tempo real ou snapshot REST)
+            if self._user_stream_live():
+                open_positions = self._stream_positions()
+            else:
+                positions = await self.client.futures_position_information()
+                open_positions = {p['symbol']: p for p in positions if float(p['positionAmt']) != 0}
 
             # 0. Sincronizar posições externas (Manuais ou Nuvem)
             for symbol, pos in open_positions.items():
@@ -207,9 +526,22 @@ class AutonomousBot:
                         'tp_order_id': None
                     }
 
+            # Auto-Heal de todas as posições sem SL/TP na exchange, em paralelo
+            await self._heal_positions([
+                HealRequest(symbol, trade['side'], trade['entry'], trade['quantity'],
+                            has_sl=bool(trade.get('sl_order_id')), has_tp=bool(trade.get('tp_order_id')))
+                for symbol, trade in self.active_trades.items()
+                if symbol in open_positions and not trade.get('closing')
+                and (not trade.get('sl_order_id') or not trade.get('tp_order_id'))
+            ])
+
             # Verificar cada posição ativa no bot
             for symbol, trade in list(self.active_trades.items()):
                 if symbol not in open_positions:
+                    # Com o user stream o fechamento é tratado pelos eventos
+                    if self._user_stream_live() or trade.get('closing'):
+                        continue
+
                     # Posição foi fechada (por SL/TP ou manualmente)
                     print(f"{Fore.YELLOW}[{self.now()}] {symbol} - Posição fechada (SL/TP atingido ou fechamento manual)")
                     
@@ -239,40 +571,26 @@ class AutonomousBot:
                 sl_status = "✅" if trade.get('sl_order_id') else "❌"
                 tp_status = "✅" if trade.get('tp_order_id') else "❌"
 
-                # Se não tem ordens na exchange, tentar AUTO-HEAL
+                # Auto-Heal falhou (ou ainda não há ordens): monitoramento local
                 if not trade.get('sl_order_id') or not trade.get('tp_order_id'):
-                    # Tentar corrigir orders
-                    sl_oid = trade.get('sl_order_id')
-                    tp_oid = trade.get('tp_order_id')
-                    quantity = trade['quantity']
-                    
-                    # Recuperar objetos de ordem parciais para passar para funçao
-                    sl_ord = {'orderId': sl_oid, 'stopPrice': trade['sl']} if sl_oid else None
-                    tp_ord = {'orderId': tp_oid, 'price': trade['tp']} if tp_oid else None
-                    
-                    await self._auto_heal_position(symbol, trade['side'], trade['entry'], quantity, sl_ord, tp_ord)
-
-                    # Verificar se corrigiu (apenas update visual, o proximo loop atualiza status real)
-                    if not sl_oid or not tp_oid:
-                        # Se ainda assim falhar, fazer monitoramento local
-                        # Verificar Stop Loss (local)
-                        if trade['side'] == 'LONG':
-                            sl_hit = current_price <= trade['sl']
-                            tp_hit = current_price >= trade['tp']
-                        else:  # SHORT
-                            sl_hit = current_price >= trade['sl']
-                            tp_hit = current_price <= trade['tp']
-
-                        # SAIR se hit TP ou SL
-                        if sl_hit:
-                            print(f"{Fore.RED}[{self.now()}] {symbol} - STOP LOSS HIT! Fechando...")
-                            await self.close_position(symbol)
-                            continue
-
-                        if tp_hit:
-                            print(f"{Fore.GREEN}[{self.now()}] {symbol} - TAKE PROFIT HIT! Fechando...")
-                            await self.close_position(symbol)
-                            continue
+                    # Níveis zerados (posição externa sem SL/TP calculado) não disparam
+                    if trade['side'] == 'LONG':
+                        sl_hit = trade['sl'] > 0 and current_price <= trade['sl']
+                        tp_hit = trade['tp'] > 0 and current_price >= trade['tp']
+                    else:  # SHORT
+                        sl_hit = trade['sl'] > 0 and current_price >= trade['sl']
+                        tp_hit = trade['tp'] > 0 and current_price <= trade['tp']
+
+                    # SAIR se hit TP ou SL
+                    if sl_hit:
+                        print(f"{Fore.RED}[{self.now()}] {symbol} - STOP LOSS HIT! Fechando...")
+                        await self.close_position(symbol)
+                        continue
+
+                    if tp_hit:
+                        print(f"{Fore.GREEN}[{self.now()}] {symbol} - TAKE PROFIT HIT! Fechando...")
+                        await self.close_position(symbol)
+                        continue
 
                 # Mostrar status
                 pnl_color = Fore.GREEN if current_pnl > 0 else Fore.RED
@@ -290,246 +608,197 @@ class AutonomousBot:
             print(f"{Fore.RED}Erro ao monitorar: {e}")
 
     async def analyze_market_with_ai(self, symbol: str, signal_data: Dict) -> Dict:
-        """Usa OpenAI para filtrar o sinal técnico."""
+        """Usa OpenAI para filtrar o sinal técnico (assíncrono, com timeout e cache)."""
         if not self.ai_client:
             return {"decision": "GO", "reason": "IA não configurada (faltando chave)"}
 
-        print(f"{Fore.CYAN}[{self.now()}] 🧠 Consultando IA para {symbol}...")
-        
-        try:
-            signals = signal_data.get('signals', {})
-            history = signal_data.get('history', [])
-            
-            history_str = "\n".join([f"- Preço: ${h['price']}, Vol: {h['vol']}" for h in history])
-
-            prompt = f"""
-            Você é um "Scalper Agressivo de Alta Frequência" especialista em capturar pequenos movimentos rápidos (scalping) em criptomoedas.
-            
-            Analise o cenário para {symbol} e decida se entramos para um trade rápido.
-            
-            DADOS TÉCNICOS:
-            - Tendência: {signal_data['trend']}
-            - Preço: ${signal_data.get('entry')}
-            - RSI: {signals.get('rsi'):.2f} (Alvo: Scalping aceita RSI até 75 para LONG ou 25 para SHORT)
-            - MACD: {signals.get('macd'):.6f}
-            - Volume: {signals.get('rel_volume'):.2f}x (0.5x+ já é aceitável se a tendência for forte)
-            
-            REGRAS DE DECISÃO:
-            1. Seja menos rígido: Se a tendência (EMA) for clara, ignore se o volume estiver um pouco baixo.
-            2. Não tenha medo de "comprar o topo" se o momentum for forte.
-            3. Responda APENAS em JSON.
-            
-            JSON FORMAT:
-            {{
-                "decision": "GO" ou "NO-GO",
-                "sentiment": 0-100,
-                "reason": "Explicação curta e agressiva"
-            }}
-            """
-
-            response = self.ai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={ "type": "json_object" }
-            )
-
-            import json
-            result = json.loads(response.choices[0].message.content)
-            
-            # Guardar para o dashboard e cooldown
-            self.last_ai_analysis[symbol] = {
-                "decision": result.get('decision'),
-                "sentiment": result.get('sentiment'),
-                "reason": result.get('reason'),
-                "time": self.now(),
-                "timestamp": datetime.now() # Usado para controle interno de cooldown
-            }
-            
-            return result
-
-        except Exception as e:
-            print(f"{Fore.RED}[{self.now()}] Erro na análise de IA: {e}")
-            return {"decision": "GO", "reason": f"Erro na IA ({e}), seguindo sinal técnico."}
-
-    async def find_best_opportunity(self) -> Optional[Dict]:
-        """Encontra a melhor oportunidade de entrada (OTIMIZADO: IA só para TOP 1)."""
-        best_opportunity = None
-        best_score = 0
-
-        # FASE 1: Encontrar o melhor sinal TÉCNICO (sem IA ainda)
+        result = await self.ai_client.evaluate(symbol, signal_data)
+        self._remember_ai_result(symbol, result)
+        return result
+
+    def _remember_ai_result(self, symbol: str, result: Dict):
+        """Guardar decisão da IA para o dashboard e cooldown."""
+        if result.get('error'):
+            print(f"{Fore.RED}[{self.now()}] Erro na análise de IA: {result.get('reason')}")
+            return
+
+        self.last_ai_analysis[symbol] = {
+            "decision": result.get('decision'),
+            "sentiment": result.get('sentiment'),
+            "reason": result.get('reason'),
+            "time": self.now(),
+            "timestamp": datetime.now() # Usado para controle interno de cooldown
+        }
+
+    async def rank_opportunities(self) -> List[Dict]:
+        """Analisa todos os pares em paralelo e retorna o ranking por força."""
+        candidates = []
         for symbol in self.symbols:
             # Não abrir se já tem posição
             if symbol in self.active_trades:
                 continue
 
             # Pular se a IA deu NO-GO recentemente (cooldown de 30 min)
-            if self.ai_client:
-                last_ai = self.last_ai_analysis.get(symbol)
-                if last_ai and last_ai.get('decision') == 'NO-GO':
-                    time_diff = datetime.now() - last_ai.get('timestamp', datetime.min)
-                    if time_diff.total_seconds() < 1800:  # 30 minutos de cooldown
-                        continue
+            if self._in_ai_cooldown(symbol):
+                continue
 
-            try:
-                analysis = await self.analyze_symbol(symbol)
+            candidates.append(symbol)
 
-                if analysis['strength'] >= self.min_signal_strength and analysis['trend'] != 'NEUTRAL':
-                    if analysis['strength'] > best_score:
-                        best_score = analysis['strength']
-                        best_opportunity = analysis
+        ranked = await self.scan_engine.scan(candidates, self.analyze_symbol)
+        self.last_scan = ranked
 
-            except Exception as e:
-                continue
+        stats = self.scan_engine.last_stats
+        self.scan_duration.observe(stats.duration)
+        print(f"{Fore.CYAN}[{self.now()}] ⚡ Scan: {stats.analyzed}/{stats.symbols_total} pares em {stats.duration:.2f}s "
+              f"(timeouts: {stats.timeouts}, erros: {stats.errors}, peso: {stats.weight_used})")
 
-        # FASE 2: Validar SÓ o melhor sinal com IA (se existir)
-        if best_opportunity and self.ai_client:
-            ai_result = await self.analyze_market_with_ai(best_opportunity['symbol'], best_opportunity)
+        return [
+            a for a in ranked
+            if a['strength'] >= self.min_signal_strength and a['trend'] != 'NEUTRAL'
+        ]
 
-            if ai_result.get('decision') == 'NO-GO':
-                print(f"{Fore.YELLOW}[{self.now()}] 🧠 IA bloqueou {best_opportunity['symbol']}: {ai_result.get('reason')}")
-                return None  # IA rejeitou, retornar sem oportunidade
-            else:
-                print(f"{Fore.GREEN}[{self.now()}] 🧠 IA aprovou {best_opportunity['symbol']}: {ai_result.get('reason')}")
+    def _in_ai_cooldown(self, symbol: str) -> bool:
+        """True se a IA deu NO-GO para o par nos últimos 30 minutos."""
+        if not self.ai_client:
+            return False
+        last_ai = self.last_ai_analysis.get(symbol)
+        if last_ai and last_ai.get('decision') == 'NO-GO':
+            time_diff = datetime.now() - last_ai.get('timestamp', datetime.min)
+            return time_diff.total_seconds() < 1800  # 30 minutos de cooldown
+        return False
 
-        return best_opportunity
+    async def find_best_opportunity(self) -> Optional[Dict]:
+        """Encontra a melhor oportunidade de entrada (IA avalia os TOP-N em paralelo)."""
+        # FASE 1: Ranking TÉCNICO (sem IA ainda)
+        ranked = await self.rank_opportunities()
+        if not ranked or not self.ai_client:
+            return ranked[0] if ranked else None
 
-    async def analyze_symbol(self, symbol: str) -> Dict:
-        """Analisa um par e retorna sinal."""
-        try:
-            klines = await self.client.futures_klines(symbol=symbol, interval='15m', limit=100)
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignore'
-            ])
+        # FASE 2: IA avalia os melhores candidatos de uma vez (cache evita chamadas repetidas)
+        top = ranked[:self.ai_top_n]
+        print(f"{Fore.CYAN}[{self.now()}] 🧠 Consultando IA para {', '.join(c['symbol'] for c in top)}...")
+        results = await self.ai_client.evaluate_many(top)
 
-            df['close'] = df['close'].astype(float)
-            df['high'] = df['high'].astype(float)
-            df['low'] = df['low'].astype(float)
-            df['volume'] = df['volume'].astype(float)
-
-            # Indicadores
-            df['ema_9'] = df['close'].ewm(span=9).mean()
-            df['ema_21'] = df['close'].ewm(span=21).mean()
-            df['ema_50'] = df['close'].ewm(span=50).mean()
-
-            # RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
-
-            # MACD
-            df['ema_12'] = df['close'].ewm(span=12).mean()
-            df['ema_26'] = df['close'].ewm(span=26).mean()
-            df['macd'] = df['ema_12'] - df['ema_26']
-            df['macd_signal'] = df['macd'].ewm(span=9).mean()
-
-            # Bollinger
-            df['bb_middle'] = df['close'].rolling(window=20).mean()
-            df['bb_std'] = df['close'].rolling(window=20).std()
-            df['bb_upper'] = df['bb_middle'] + (df['bb_std'] * 2)
-            df['bb_lower'] = df['bb_middle'] - (df['bb_std'] * 2)
-
-            latest = df.iloc[-1]
-
-            # Calcular score
-            bullish_score = 0
-            bearish_score = 0
-
-            if latest['ema_9'] > latest['ema_21'] > latest['ema_50']:
-                bullish_score += 25
-            elif latest['ema_9'] < latest['ema_21'] < latest['ema_50']:
-                bearish_score += 25
-
-            if latest['rsi'] < 35:
-                bullish_score += 20
-            elif latest['rsi'] > 65:
-                bearish_score += 20
-
-            macd_diff = latest['macd'] - latest['macd_signal']
-            if macd_diff > 0:
-                bullish_score += 15
-            else:
-                bearish_score += 15
+        best_opportunity = None
+        for candidate in top:
+            symbol = candidate['symbol']
+            ai_result = results[symbol]
+            self._remember_ai_result(symbol, ai_result)
 
-            if latest['close'] < latest['bb_lower']:
-                bullish_score += 15
-            elif latest['close'] > latest['bb_upper']:
-                bearish_score += 15
+            if ai_result.get('decision') == 'NO-GO':
+                print(f"{Fore.YELLOW}[{self.now()}] 🧠 IA bloqueou {symbol}: {ai_result.get('reason')}")
+            elif best_opportunity is None:
+                print(f"{Fore.GREEN}[{self.now()}] 🧠 IA aprovou {symbol}: {ai_result.get('reason')}")
+                best_opportunity = candidate
 
-            # Volume
-            vol_ma = df['volume'].rolling(20).mean().iloc[-1]
-            relative_volume = latest['volume'] / vol_ma if vol_ma > 0 else 1.0
-            
-            if relative_volume > 0.8:
-                bullish_score += 10
-                bearish_score += 10
-
-            trend = 'NEUTRAL'
-            strength = max(bullish_score, bearish_score)
-
-            if bullish_score > bearish_score + 7:
-                trend = 'LONG'
-            elif bearish_score > bullish_score + 7:
-                trend = 'SHORT'
-
-            entry_price = latest['close']
-            atr = (df['high'] - df['low']).rolling(14).mean().iloc[-1]
-
-            if trend == 'LONG':
-                sl = entry_price - (atr * 1.8)
-                tp = entry_price + (atr * 3)
-            elif trend == 'SHORT':
-                sl = entry_price + (atr * 1.8)
-                tp = entry_price - (atr * 3)
-            else:
-                sl = tp = entry_price
+        return best_opportunity
 
-            # Histórico recente (últimos 5 candles)
-            recent_history = []
-            for i in range(-5, 0):
-                try:
-                    row = df.iloc[i]
-                    recent_history.append({
-                        "price": round(row['close'], 4),
-                        "vol": round(row['volume'], 2)
-                    })
-                except: pass
-
-            return {
-                'symbol': symbol,
-                'trend': trend,
-                'strength': strength,
-                'entry': entry_price,
-                'sl': sl,
-                'tp': tp,
-                'signals': {
-                    'ema_9': latest['ema_9'],
-                    'ema_21': latest['ema_21'],
-                    'ema_50': latest['ema_50'],
-                    'rsi': latest['rsi'],
-                    'macd': macd_diff,
-                    'bb_upper': latest['bb_upper'],
-                    'bb_lower': latest['bb_lower'],
-                    'rel_volume': relative_volume
-                },
-                'history': recent_history
-            }
+    async def analyze_symbol(self, symbol: str) -> Dict:
+        """Analisa um par e retorna sinal (erros sobem para o ScanEngine contar e descartar o par)."""
+        state = await self._refresh_indicator_state(symbol)
+        return self._score_symbol(symbol, state)
+
+    async def _refresh_indicator_state(self, symbol: str) -> IndicatorState:
+        """Atualiza os indicadores incrementais (carga completa só na primeira vez)."""
+        state = self.indicator_states.get(symbol)
+        interval_ms = interval_to_ms(self.kline_interval)
+
+        # Stream ativo: o estado já é atualizado pelo WebSocket, sem REST
+        if state is not None and not state.stale and self.market_data and self.market_data.is_live(symbol):
+            return state
+
+        if state is not None and not state.stale:
+            # Só o candle anterior (pode ter fechado) e o atual em formação
+            klines = await self.client.futures_klines(symbol=symbol, interval=self.kline_interval, limit=2)
+            state.ingest_klines(klines)
+
+        if state is None or state.stale:
+            # Recarregar do buffer do stream se tiver histórico suficiente
+            klines = self.market_data.klines(symbol, self.klines_limit) if self.market_data else None
+            if klines is None:
+                klines = await self.candle_store.recent_klines(self.client, symbol, self.kline_interval, self.klines_limit)
+                if self.market_data:
+                    self.market_data.seed(symbol, klines)
+            state = IndicatorState.from_klines(klines, interval_ms)
+            self.indicator_states[symbol] = state
+
+        return state
+
+    def _score_symbol(self, symbol: str, state: IndicatorState) -> Dict:
+        """Calcula o score do sinal a partir do estado dos indicadores."""
+        latest = state.latest()
+
+        # Calcular score
+        bullish_score = 0
+        bearish_score = 0
+
+        if latest['ema_9'] > latest['ema_21'] > latest['ema_50']:
+            bullish_score += 25
+        elif latest['ema_9'] < latest['ema_21'] < latest['ema_50']:
+            bearish_score += 25
+
+        if latest['rsi'] < 35:
+            bullish_score += 20
+        elif latest['rsi'] > 65:
+            bearish_score += 20
+
+        macd_diff = latest['macd'] - latest['macd_signal']
+        if macd_diff > 0:
+            bullish_score += 15
+        else:
+            bearish_score += 15
 
-        except Exception as e:
-            return {'symbol': symbol, 'trend': 'NEUTRAL', 'strength': 0}
+        if latest['close'] < latest['bb_lower']:
+            bullish_score += 15
+        elif latest['close'] > latest['bb_upper']:
+            bearish_score += 15
+
+        # Volume
+        vol_ma = latest['volume_ma']
+        relative_volume = latest['volume'] / vol_ma if vol_ma > 0 else 1.0
+        
+        if relative_volume > 0.8:
+            bullish_score += 10
+            bearish_score += 10
+
+        trend = 'NEUTRAL'
+        strength = max(bullish_score, bearish_score)
+
+        if bullish_score > bearish_score + 7:
+            trend = 'LONG'
+        elif bearish_score > bullish_score + 7:
+            trend = 'SHORT'
+
+        entry_price = latest['close']
+        atr = latest['hl_range']
+
+        if trend == 'LONG':
+            sl = entry_price - (atr * 1.8)
+            tp = entry_price + (atr * 3)
+        elif trend == 'SHORT':
+            sl = entry_price + (atr * 1.8)
+            tp = entry_price - (atr * 3)
+        else:
+            sl = tp = entry_price
+
+        return {
+            'symbol': symbol,
+            'trend': trend,
+            'strength': strength,
+            'entry': entry_price,
+            'sl': sl,
+            'tp': tp,
+            'signals': state.signals(),
+            'history': state.recent_history()  # Últimos 5 candles
+        }
 
     async def _check_min_notional(self, symbol: str, quantity: float, price: float) -> bool:
         """Verifica se o valor da ordem atende o mínimo exigido pela Binance."""
         try:
-            info = await self.client.futures_exchange_info()
-            symbol_info = next(s for s in info['symbols'] if s['symbol'] == symbol)
-            min_notional_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'MIN_NOTIONAL'), None)
+            info = await self.symbol_registry.get(self.client, symbol)
             
-            if min_notional_filter:
-                min_notional = float(min_notional_filter['notional'])
+            if info and info.min_notional:
+                min_notional = info.min_notional
                 if quantity * price < min_notional:
                     print(f"{Fore.YELLOW}[{self.now()}] ⚠️ Ordem muito pequena: ${quantity * price:.2f} < Min ${min_notional}")
                     return False
@@ -542,46 +811,38 @@ class AutonomousBot:
         print(f"{Fore.CYAN}[{self.now()}] 🔄 Sincronizando posições existentes...")
         try:
             positions = await self.client.futures_position_information()
-            active_positions = [p for p in positions if float(p['positionAmt']) != 0]
-
-            for pos in active_positions:
+            active_positions = []
+            for pos in positions:
                 symbol = pos['symbol']
-                
                 # Se já está rastreando, ignora
-                if symbol in self.active_trades:
+                if float(pos['positionAmt']) == 0 or symbol in self.active_trades:
                     continue
-
                 if symbol not in self.symbols:
                     print(f"{Fore.YELLOW}[{self.now()}] ⚠️ Encontrado {symbol} aberto, mas não está na lista de monitoramento. Ignorando.")
                     continue
+                active_positions.append(pos)
+
+            # Tentar recuperar SL/TP das ordens abertas (todos os pares de uma vez)
+            all_orders = await asyncio.gather(
+                *(self.client.futures_get_open_orders(symbol=p['symbol']) for p in active_positions)
+            )
 
+            heal_requests = []
+            for pos, orders in zip(active_positions, all_orders):
+                symbol = pos['symbol']
                 entry_price = float(pos['entryPrice'])
                 amt = float(pos['positionAmt'])
                 side = 'LONG' if amt > 0 else 'SHORT'
                 quantity = abs(amt)
-                
-                # Tentar recuperar SL/TP das ordens abertas
-                orders = await self.client.futures_get_open_orders(symbol=symbol)
+
                 sl_order = next((o for o in orders if o['type'] in ['STOP_MARKET', 'STOP']), None)
                 tp_order = next((o for o in orders if o['type'] in ['TAKE_PROFIT_MARKET', 'TAKE_PROFIT', 'LIMIT'] and o.get('reduceOnly')), None)
 
-                # Auto-Heal: Se não tiver SL ou TP, tentar corrigir
-                if not sl_order or not tp_order:
-                    await self._auto_heal_position(symbol, side, entry_price, quantity, sl_order, tp_order)
-                    # Recarregar ordens após tentativa de heal
-                    orders = await self.client.futures_get_open_orders(symbol=symbol)
-                    sl_order = next((o for o in orders if o['type'] in ['STOP_MARKET', 'STOP']), None)
-                    tp_order = next((o for o in orders if o['type'] in ['TAKE_PROFIT_MARKET', 'TAKE_PROFIT', 'LIMIT'] and o.get('reduceOnly')), None)
-
-                # Definir preços finais (existentes ou calculados)
-                current_sl_price = float(sl_order['stopPrice']) if sl_order else 0.0
-                current_tp_price = float(tp_order['price']) if tp_order else 0.0
-
                 self.active_trades[symbol] = {
                     'side': side,
                     'entry': entry_price,
-                    'sl': current_sl_price,
-                    'tp': current_tp_price,
+                    'sl': float(sl_order['stopPrice']) if sl_order else 0.0,
+                    'tp': float(tp_order['price']) if tp_order else 0.0,
                     'quantity': quantity,
                     'order_id': 'SYNCED',
                     'sl_order_id': sl_order['orderId'] if sl_order else None,
@@ -590,127 +851,44 @@ class AutonomousBot:
                 }
                 print(f"{Fore.GREEN}[{self.now()}] ✅ Posição sincronizada: {symbol} {side} | Entry ${entry_price:.4f}")
 
+                # Auto-Heal: Se não tiver SL ou TP, corrigir (todas em paralelo abaixo)
+                if not sl_order or not tp_order:
+                    heal_requests.append(HealRequest(symbol, side, entry_price, quantity,
+                                                     has_sl=bool(sl_order), has_tp=bool(tp_order)))
+
+            await self._heal_positions(heal_requests)
+
         except Exception as e:
             print(f"{Fore.RED}[{self.now()}] ❌ Erro ao sincronizar: {e}")
 
-    async def _auto_heal_position(self, symbol, side, entry_price, quantity, sl_order, tp_order):
-        """Tenta colocar SL/TP em posições desprotegidas."""
-        print(f"{Fore.YELLOW}[{self.now()}] 🚑 Auto-Healing {symbol}: Faltando SL/TP. Calculando...")
-        try:
-            # Calcular ATR para definir níveis
-            klines = await self.client.futures_klines(symbol=symbol, interval='15m', limit=100)
-            df = pd.DataFrame(klines, columns=['time', 'open', 'high', 'low', 'close', 'vol', 'ct', 'qv', 'tr', 'tb', 'tq', 'ig'])
-            df['high'] = df['high'].astype(float)
-            df['low'] = df['low'].astype(float)
-            atr = (df['high'] - df['low']).rolling(14).mean().iloc[-1]
-
-            # Obter precisão de preço
-            info = await self.client.futures_exchange_info()
-            symbol_info = next(s for s in info['symbols'] if s['symbol'] == symbol)
-            price_filter = next(f for f in symbol_info['filters'] if f['filterType'] == 'PRICE_FILTER')
-            tick_size = float(price_filter['tickSize'])
-            price_precision = len(str(tick_size).rstrip('0').split('.')[-1]) if '.' in str(tick_size) else 0
-
-            # Calcular níveis
-            if side == 'LONG':
-                calculated_sl = entry_price - (atr * 1.8)
-                calculated_tp = entry_price + (atr * 3)
+    async def _heal_positions(self, requests: List[HealRequest]):
+        """Auto-Heal em paralelo; grava ordens e preços de SL/TP colocados nos trades."""
+        if not requests:
+            return
+        print(f"{Fore.YELLOW}[{self.now()}] 🚑 Auto-Healing {len(requests)} posição(ões): {', '.join(r.symbol for r in requests)}")
+        results = await self.protection.heal(self.client, requests)
+
+        for symbol, result in results.items():
+            if result.time_to_sl is not None:
+                self.time_to_protection.observe(result.time_to_sl, source='heal', leg='sl')
+            if result.time_to_protected is not None:
+                self.time_to_protection.observe(result.time_to_protected, source='heal', leg='full')
+
+            trade = self.active_trades.get(symbol)
+            if trade is not None:
+                if result.sl_order_id is not None:
+                    trade['sl_order_id'] = result.sl_order_id
+                    trade['sl'] = result.sl_price
+                if result.tp_order_id is not None:
+                    trade['tp_order_id'] = result.tp_order_id
+                    trade['tp'] = result.tp_price
+
+            if result.protected:
+                print(f"{Fore.GREEN}[{self.now()}] 🛡️  {symbol} protegido em {result.time_to_protected:.2f}s | SL ${result.sl_price} TP ${result.tp_price}")
+            elif result.position_closed:
+                print(f"{Fore.YELLOW}[{self.now()}] ⚠️ {symbol} fechou durante o Auto-Heal (SL executado)")
             else:
-                calculated_sl = entry_price + (atr * 1.8)
-                calculated_tp = entry_price - (atr * 3)
-            
-            calculated_sl = round(calculated_sl, price_precision)
-            calculated_tp = round(calculated_tp, price_precision)
-
-            # Colocar SL se faltar com Retry/Fallback
-            if not sl_order:
-                sl_side = 'SELL' if side == 'LONG' else 'BUY'
-                sl_success = False
-                
-                for attempt in range(3):
-                    try:
-                        # Tenta STOP_MARKET
-                        await self.client.futures_create_order(
-                            symbol=symbol,
-                            side=sl_side,
-                            type='STOP_MARKET',
-                            stopPrice=calculated_sl,
-                            closePosition=True,
-                            workingType='MARK_PRICE',
-                            priceProtect=True
-                        )
-                        print(f"{Fore.YELLOW}[{self.now()}] 🛡️  Auto-SL (Market) colocado: ${calculated_sl}")
-                        sl_success = True
-                        break
-                    except Exception as e:
-                        err_str = str(e)
-                        if "code=-4120" in err_str or "Order type not supported" in err_str:
-                            # Fallback para STOP (Limit)
-                            try:
-                                limit_price = calculated_sl * (0.999 if sl_side == 'SELL' else 1.001)
-                                limit_price = round(limit_price, price_precision)
-                                await self.client.futures_create_order(
-                                    symbol=symbol,
-                                    side=sl_side,
-                                    type='STOP',
-                                    quantity=quantity,
-                                    price=limit_price,
-                                    stopPrice=calculated_sl,
-                                    timeInForce='GTC'
-                                )
-                                print(f"{Fore.YELLOW}[{self.now()}] 🛡️  Auto-SL (Limit) colocado: ${calculated_sl}")
-                                sl_success = True
-                                break
-                            except Exception as e2:
-                                print(f"{Fore.RED}[{self.now()}] Falha fallback Auto-SL: {e2}")
-                        elif "code=-4045" in err_str:
-                            print(f"{Fore.RED}[{self.now()}] ⚠️ Limite de STOP atingido na Binance! Cancele ordens antigas.")
-                            break
-                        
-                        await asyncio.sleep(1)
-
-            # Colocar TP se faltar com Retry
-            if not tp_order:
-                tp_side = 'SELL' if side == 'LONG' else 'BUY'
-
-                # Verificar se posição ainda existe (evitar race condition com SL executado)
-                try:
-                    positions = await self.client.futures_position_information(symbol=symbol)
-                    current_pos = next((p for p in positions if p['symbol'] == symbol), None)
-
-                    if not current_pos or float(current_pos['positionAmt']) == 0:
-                        print(f"{Fore.YELLOW}[{self.now()}] ⚠️ Posição {symbol} fechada antes do Auto-TP (SL foi executado)")
-                        return
-                except:
-                    pass  # Continua tentando de qualquer forma
-
-                for attempt in range(3):
-                    try:
-                        await self.client.futures_create_order(
-                            symbol=symbol,
-                            side=tp_side,
-                            type='LIMIT',
-                            quantity=quantity,
-                            price=calculated_tp,
-                            timeInForce='GTC',
-                            reduceOnly=True
-                        )
-                        print(f"{Fore.GREEN}[{self.now()}] 🎯 Auto-TP colocado: ${calculated_tp}")
-                        break
-                    except Exception as e:
-                        err_str = str(e)
-
-                        # Erro -2022: posição não existe mais (SL foi executado)
-                        if "code=-2022" in err_str or "ReduceOnly" in err_str:
-                            print(f"{Fore.YELLOW}[{self.now()}] ⚠️ Auto-TP não necessário: posição fechada (SL executado)")
-                            break
-
-                        if attempt == 2:
-                            print(f"{Fore.RED}[{self.now()}] Falha ao colocar Auto-TP: {e}")
-                        await asyncio.sleep(1)
-                    
-        except Exception as e:
-            print(f"{Fore.RED}[{self.now()}] Erro no cálculo de Auto-Heal: {e}")
+                print(f"{Fore.RED}[{self.now()}] ❌ Auto-Heal incompleto em {symbol} ({result.attempts} tentativas): {result.error}")
 
     async def enter_trade(self, opp: Dict) -> bool:
         """Entra em uma operação com SL/TP reais na exchange (Robusto)."""
@@ -718,27 +896,21 @@ class AutonomousBot:
             symbol = opp['symbol']
             side = 'BUY' if opp['trend'] == 'LONG' else 'SELL'
 
-            # Obter informações do símbolo e filtros
-            info = await self.client.futures_exchange_info()
-            symbol_info = next(s for s in info['symbols'] if s['symbol'] == symbol)
-            
-            # Filtros de quantidade
-            lot_size = next(f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE')
-            step_size = float(lot_size['stepSize'])
-            qty_precision = len(str(step_size).rstrip('0').split('.')[-1]) if '.' in str(step_size) else 0
+            # Filtros do símbolo (cache, sem chamada à API)
+            info = await self.symbol_registry.get(self.client, symbol)
+            if info is None:
+                print(f"{Fore.RED}[{self.now()}] ❌ {symbol} não encontrado no exchange info")
+                return False
 
-            # Filtros de preço
-            price_filter = next(f for f in symbol_info['filters'] if f['filterType'] == 'PRICE_FILTER')
-            tick_size = float(price_filter['tickSize'])
-            price_precision = len(str(tick_size).rstrip('0').split('.')[-1]) if '.' in str(tick_size) else 0
+            qty_precision = info.qty_precision
+            price_precision = info.price_precision
 
             # Obter saldo e calcular quantidade
             account = await self.client.futures_account()
             balance = float(account['totalWalletBalance'])
 
             # Obter MIN_NOTIONAL correto da Binance
-            min_notional_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'MIN_NOTIONAL'), None)
-            min_notional = float(min_notional_filter['notional']) if min_notional_filter else 5.0
+            min_notional = info.min_notional or 5.0
 
             risk_amount = balance * self.risk_per_trade
             entry_price = opp['entry']
@@ -777,9 +949,10 @@ class AutonomousBot:
                 quantity=quantity
             )
             print(f"{Fore.GREEN}[{self.now()}] ✅ Ordem executada: {symbol} {side} | Obj: {quantity} | ID: {order['orderId']}")
+            entry_filled_at = time.monotonic()
 
             # Aguardar confirmação e obter preço real de entrada
-            await asyncio.sleep(2)
+            await asyncio.sleep(self.entry_confirm_delay)
             position = await self.client.futures_position_information(symbol=symbol)
             real_entry = float(position[0]['entryPrice'])
 
@@ -827,7 +1000,9 @@ class AutonomousBot:
                     
                     await asyncio.sleep(1)
 
-            if not sl_order_id:
+            if sl_order_id:
+                self.time_to_protection.observe(time.monotonic() - entry_filled_at, source='entry', leg='sl')
+            else:
                 print(f"{Fore.CYAN}[{self.now()}] 📡 Usando monitoramento local para SL")
 
             # 3. Colocar TAKE PROFIT (LIMIT reduceOnly)
@@ -854,6 +1029,8 @@ class AutonomousBot:
             
             if not tp_order_id:
                 print(f"{Fore.CYAN}[{self.now()}] 📡 Usando monitoramento local para TP")
+            elif sl_order_id:
+                self.time_to_protection.observe(time.monotonic() - entry_filled_at, source='entry', leg='full')
 
             # Guardar informações
             self.active_trades[symbol] = {
@@ -878,118 +1055,33 @@ class AutonomousBot:
         """
         Busca trades passados na Binance e reconstrói o histórico local.
         CRÍTICO: Isso resolve o problema de perder dados ao reiniciar no Render.
+
+        Incremental: cada par continua do último fill já sincronizado (fromId),
+        então o backup periódico só baixa os fills novos.
         """
-        print(f"{Fore.CYAN}[{self.now()}] 🕰️  Sincronizando histórico dos últimos {days} dias...")
+        print(f"{Fore.CYAN}[{self.now()}] 🕰️  Sincronizando histórico (até {days} dias)...")
         try:
-            import json
-            import time
             start_time = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
 
-            all_historical_records = []
-            total_trades_found = 0
-
-            for symbol in self.symbols:
-                try:
-                    # Buscar trades do par com paginação
-                    trades = await self.client.futures_account_trades(symbol=symbol, startTime=start_time, limit=1000)
-                    if not trades:
-                        continue
-
-                    total_trades_found += len(trades)
-
-                    # Agrupar trades por Realized PnL (cada fechamento gera um PnL realizado)
-                    for t in trades:
-                        pnl = float(t.get('realizedPnl', 0))
-                        if pnl != 0:
-                            # Criar um registro de histórico a partir do trade de fechamento
-                            dt_obj = datetime.fromtimestamp(t['time'] / 1000)
-
-                            # Tentar inferir o lado baseado no preço e na posição
-                            # Se profit positivo em LONG, side=LONG. Se profit positivo em SHORT, side=SHORT
-                            # Mas isso é complexo, vamos simplificar
-                            side_inferido = "UNKNOWN"
-
-                            all_historical_records.append({
-                                "symbol": symbol,
-                                "side": side_inferido,  # Será UNKNOWN se não conseguirmos inferir
-                                "entry": 0.0,  # Binance não fornece facilmente
-                                "exit": float(t['price']),
-                                "quantity": abs(float(t['qty'])),
-                                "pnl": pnl,
-                                "time": dt_obj.strftime('%Y-%m-%d %H:%M:%S')
-                            })
+            all_historical_records, stats = await self.history_sync.sync(self.client, self.symbols, start_time)
 
-                except Exception as e:
-                    # Continuar mesmo se falhar um symbol
-                    continue
-
-            if not all_historical_records:
-                print(f"{Fore.YELLOW}[{self.now()}] Nenhum trade encontrado nos últimos {days} dias.")
-                # Criar arquivos vazios para não dar erro no dashboard
-                if not os.path.exists(self.history_file):
-                    with open(self.history_file, 'w') as f:
-                        json.dump([], f)
-                if not os.path.exists(self.metrics_file):
-                    with open(self.metrics_file, 'w') as f:
-                        json.dump([], f)
-                return
+            if stats.incomplete:
+                print(f"{Fore.YELLOW}[{self.now()}] ⚠️ Orçamento de peso atingido; {len(stats.incomplete)} pares continuam na próxima sincronização")
 
-            print(f"{Fore.CYAN}[{self.now()}] Encontrados {total_trades_found} trades totais, {len(all_historical_records)} com PnL realizado")
+            if all_historical_records:
+                print(f"{Fore.CYAN}[{self.now()}] {stats.fills} fills novos ({stats.requests} requests), {len(all_historical_records)} com PnL realizado")
 
-            # Ordenar por tempo
-            all_historical_records.sort(key=lambda x: x['time'])
+                # Journal faz o dedup (symbol + pnl + time) e mantém as métricas diárias
+                new_count = self.trade_journal.extend(all_historical_records)
+                print(f"{Fore.GREEN}[{self.now()}] ✅ Histórico sincronizado: {len(self.trade_journal)} trades no journal ({new_count} novos).")
+            else:
+                print(f"{Fore.WHITE}[{self.now()}] Nenhum fill novo desde a última sincronização.")
 
-            # Carregar histórico existente (se tiver)
-            existing_history = []
-            if os.path.exists(self.history_file):
-                try:
-                    with open(self.history_file, 'r') as f:
-                        existing_history = json.load(f)
-                except:
-                    existing_history = []
-
-            # Unificar sem duplicatas (baseado em symbol + pnl + time)
-            history_keys = {f"{r['symbol']}_{r['pnl']}_{r['time']}" for r in existing_history}
-            new_count = 0
-            for r in all_historical_records:
-                key = f"{r['symbol']}_{r['pnl']}_{r['time']}"
-                if key not in history_keys:
-                    existing_history.append(r)
-                    new_count += 1
-
-            # Ordenar e manter últimos 500 trades (aumentado de 100)
-            existing_history.sort(key=lambda x: x['time'])
-            final_history = existing_history[-500:]
-
-            with open(self.history_file, 'w') as f:
-                json.dump(final_history, f, indent=4)
-
-            # Reconstruir métricas diárias
-            daily_stats = {}
-            for r in final_history:
-                day = r['time'].split(' ')[0]
-                if day not in daily_stats:
-                    daily_stats[day] = {"date": day, "pnl": 0.0, "trades": 0}
-                daily_stats[day]['pnl'] += r['pnl']
-                daily_stats[day]['trades'] += 1
-
-            metrics = sorted(list(daily_stats.values()), key=lambda x: x['date'])
-
-            with open(self.metrics_file, 'w') as f:
-                json.dump(metrics, f, indent=4)
-
-            print(f"{Fore.GREEN}[{self.now()}] ✅ Histórico sincronizado: {len(final_history)} trades no arquivo ({new_count} novos).")
+            # Marks só avançam no disco depois que os registros estão no journal
+            self.history_sync.save()
 
         except Exception as e:
             print(f"{Fore.RED}[{self.now()}] Erro na sincronização retroativa: {e}")
-            # Criar arquivos vazios para não quebrar dashboard
-            import json
-            if not os.path.exists(self.history_file):
-                with open(self.history_file, 'w') as f:
-                    json.dump([], f)
-            if not os.path.exists(self.metrics_file):
-                with open(self.metrics_file, 'w') as f:
-                    json.dump([], f)
 
     async def _record_trade_result(self, symbol, side, entry, quantity):
         """Busca o resultado real do trade na Binance e grava no histórico."""
@@ -1014,15 +1106,7 @@ class AutonomousBot:
                 return
 
             # Gravar no histórico
-            import json
-            history = []
-            if os.path.exists(self.history_file):
-                try:
-                    with open(self.history_file, 'r') as f:
-                        history = json.load(f)
-                except: history = []
-            
-            new_record = {
+            self._save_history_record({
                 "symbol": symbol,
                 "side": side,
                 "entry": entry,
@@ -1030,67 +1114,27 @@ class AutonomousBot:
                 "quantity": quantity,
                 "pnl": realized_pnl,
                 "time": self.now()
-            }
-            history.append(new_record)
-            history = history[-100:] # Manter 100
-            
-            with open(self.history_file, 'w') as f:
-                json.dump(history, f, indent=4)
-                
-            # Atualizar métricas diárias
-            await self._update_daily_metrics(realized_pnl)
-            
+            })
+
         except Exception as e:
             print(f"{Fore.RED}[{self.now()}] Erro ao gravar histórico: {e}")
 
-    async def _update_daily_metrics(self, pnl):
-        """Atualiza métricas diárias de performance."""
+    def _save_history_record(self, new_record: Dict):
+        """Acrescenta um trade fechado ao journal (append de uma linha)."""
         try:
-            import json
-            metrics = []
-            today = datetime.now().strftime('%Y-%m-%d')
-            
-            if os.path.exists(self.metrics_file):
-                try:
-                    with open(self.metrics_file, 'r') as f:
-                        metrics = json.load(f)
-                except: metrics = []
-            
-            found = False
-            for m in metrics:
-                if m['date'] == today:
-                    m['pnl'] = m.get('pnl', 0) + pnl
-                    m['trades'] = m.get('trades', 0) + 1
-                    found = True
-                    break
-            
-            if not found:
-                metrics.append({"date": today, "pnl": pnl, "trades": 1})
-            
-            metrics = metrics[-30:] # Últimos 30 dias
-            with open(self.metrics_file, 'w') as f:
-                json.dump(metrics, f, indent=4)
+            if self.trade_journal.append(new_record):
+                self.save_dashboard_state()  # Trade fechado: publicar sem esperar o próximo ciclo
         except Exception as e:
-            print(f"{Fore.RED}[{self.now()}] Erro nas métricas diárias: {e}")
+            print(f"{Fore.RED}[{self.now()}] Erro ao gravar histórico: {e}")
 
     def save_dashboard_state(self):
-        """Salva o estado atual do bot para o dashboard."""
+        """Publica o estado para o dashboard (só grava o snapshot se algo mudou)."""
         try:
-            import json
-            # Carregar histórico e métricas para enviar ao dashboard
-            history = []
-            if os.path.exists(self.history_file):
-                try:
-                    with open(self.history_file, 'r') as f:
-                        history = json.load(f)
-                except: pass
-            
-            metrics = []
-            if os.path.exists(self.metrics_file):
-                try:
-                    with open(self.metrics_file, 'r') as f:
-                        metrics = json.load(f)
-                except: pass
+            # Histórico e métricas só são materializados quando o journal muda
+            self.dashboard.update('history', lambda: self.trade_journal.recent(50),
+                                  fingerprint=self.trade_journal.version)
+            self.dashboard.update('daily_metrics', lambda: self.trade_journal.daily_metrics(30),
+                                  fingerprint=self.trade_journal.version)
 
             # Converter objetos datetime para string para serialização JSON
             active_trades_serializable = {}
@@ -1099,36 +1143,64 @@ class AutonomousBot:
                 if isinstance(trade_copy.get('entry_time'), datetime):
                     trade_copy['entry_time'] = trade_copy['entry_time'].strftime('%Y-%m-%d %H:%M:%S')
                 active_trades_serializable[symbol] = trade_copy
-
-            # Converter análises de IA para serializável (remover timestamp)
-            ai_analysis_serializable = {}
-            for sym, data_ai in self.last_ai_analysis.items():
-                data_copy = data_ai.copy()
-                if 'timestamp' in data_copy: del data_copy['timestamp']
-                ai_analysis_serializable[sym] = data_copy
-
-            state = {
-                "active_trades": active_trades_serializable,
-                "history": history[-50:], # Últimos 50 para o dashboard
-                "daily_metrics": metrics,
-                "ai_analysis": ai_analysis_serializable,
-                "symbols": self.symbols,
-                "last_update": self.now(),
-                "config": {
-                    "leverage": self.leverage,
-                    "max_positions": self.max_positions,
-                    "risk": self.risk_per_trade,
-                    "min_signal": self.min_signal_strength
-                }
-            }
-            # Salvar de forma atômica (temporário -> final)
-            temp_file = self.dashboard_file + ".tmp"
-            with open(temp_file, 'w') as f:
-                json.dump(state, f, indent=4)
-            os.replace(temp_file, self.dashboard_file)
+            self.dashboard.update('active_trades', active_trades_serializable)
+
+            # Análises de IA sem o timestamp interno
+            self.dashboard.update('ai_analysis', {
+                sym: {k: v for k, v in data_ai.items() if k != 'timestamp'}
+                for sym, data_ai in self.last_ai_analysis.items()
+            })
+
+            self.dashboard.update('symbols', self.symbols)
+            self.dashboard.update('config', {
+                "leverage": self.leverage,
+                "max_positions": self.max_positions,
+                "risk": self.risk_per_trade,
+                "min_signal": self.min_signal_strength
+            })
+
+            self.dashboard.publish()
         except Exception as e:
             print(f"{Fore.RED}[{self.now()}] Erro ao salvar estado do dashboard: {e}")
 
+    def _collect_metrics(self):
+        """Estado dos componentes no momento do scrape (ver metrics.MetricsRegistry.collector)."""
+        api = self.rate_limiter.metrics()
+        yield 'binance_used_weight_1m', 'gauge', 'Peso usado no minuto (X-MBX-USED-WEIGHT-1M)', {}, api['used_weight_1m']
+        yield 'binance_weight_available', 'gauge', 'Tokens de peso disponíveis no bucket local', {}, api['weight_available']
+        yield 'binance_throttled_total', 'counter', 'Respostas 429 recebidas', {}, api['throttled']
+        yield 'binance_banned_total', 'counter', 'Respostas 418 recebidas', {}, api['banned']
+        yield 'binance_rate_limiter_queued', 'gauge', 'Chamadas esperando peso', {}, api['queued']
+        for lane, spent in api['weight_spent'].items():
+            yield 'binance_weight_spent_total', 'counter', 'Peso gasto por faixa de prioridade', {'lane': lane}, spent
+        for lane, waited in api['wait_time'].items():
+            yield 'binance_rate_limit_wait_seconds_total', 'counter', 'Espera no rate limiter por faixa', {'lane': lane}, waited
+
+        if isinstance(self.client, CachedClient):
+            cache = self.client.stats()
+            for kind in ('hits', 'misses', 'coalesced', 'derived'):
+                yield 'bot_rest_cache_requests_total', 'counter', 'Leituras REST por resultado do cache', {'result': kind}, cache[kind]
+
+        for phase, stats in self.cycle_metrics.summary().items():
+            for q in ('50', '99'):
+                yield 'bot_cycle_phase_seconds', 'summary', 'Duração das fases do ciclo (janela recente)', \
+                    {'phase': phase, 'quantile': f'0.{q}'}, stats[f'p{q}']
+            yield 'bot_cycle_phase_seconds_count', 'summary', '', {'phase': phase}, stats['count']
+
+        heal = self.protection.summary()
+        yield 'bot_recent_heals', 'gauge', 'Auto-heals recentes (janela do ProtectionManager) por resultado', {'result': 'protected'}, heal['protected']
+        yield 'bot_recent_heals', 'gauge', '', {'result': 'failed'}, heal['failed']
+
+        sync = self.history_sync.last_stats
+        if sync is not None:
+            yield 'bot_history_sync_duration_seconds', 'gauge', 'Duração da última sincronização de fills', {}, sync.duration
+            yield 'bot_history_sync_fills', 'gauge', 'Fills novos na última sincronização', {}, sync.fills
+
+        yield 'bot_dashboard_writes_total', 'counter', 'Snapshots do dashboard gravados', {}, self.dashboard.writes
+        yield 'bot_dashboard_skipped_total', 'counter', 'Publicações sem mudança (não gravadas)', {}, self.dashboard.skipped
+        yield 'bot_open_positions', 'gauge', 'Posições abertas rastreadas', {}, len(self.active_trades)
+        yield 'bot_user_stream_live', 'gauge', 'User data stream conectado (1/0)', {}, int(self._user_stream_live())
+
     async def close_position(self, symbol: str):
         """Fecha uma posição."""
         try:
@@ -1155,6 +1227,11 @@ class AutonomousBot:
 
             print(f"{Fore.GREEN}[{self.now()}] ✅ {symbol} fechada")
 
+            # Com o user stream, o trade é removido quando os fills chegarem (PnL exato)
+            if self._user_stream_live() and symbol in self.active_trades:
+                self.active_trades[symbol]['exit_reason'] = 'LOCAL'
+                return
+
             # Remover do dicionário
             if symbol in self.active_trades:
                 del self.active_trades[symbol]
@@ -1169,6 +1246,7 @@ class AutonomousBot:
 
 async def main():
     """Função principal com persistência PostgreSQL."""
+    bot = None
     try:
         if HAS_PERSISTENCE:
             print(f"\n{Fore.CYAN}{'='*70}")
@@ -1188,7 +1266,10 @@ async def main():
     finally:
         if HAS_PERSISTENCE:
             try:
-                await close_repos()
+                if isinstance(bot, BotWithPersistence):
+                    await bot.close()  # Flush final da fila write-behind
+                else:
+                    await close_repos()
                 print(f"{Fore.CYAN}🔌 Conexões PostgreSQL fechadas")
             except Exception as e:
                 print(f"{Fore.YELLOW}Aviso: Erro ao fechar conexões: {e}")
@@ -0,0 +1,357 @@
+"""
+🗃️ CANDLE STORE
+===============
+Armazenamento local de candles por símbolo/intervalo.
+
+- Um arquivo NumPy (.npy) por mês: data/candles/<SYMBOL>/<interval>/<YYYY-MM>.npy
+- Candles novos no fim do mês vão para um log binário (<YYYY-MM>.log) só com
+  append; o log é compactado no .npy a cada COMPACT_AFTER candles
+- Leitura por intervalo de tempo via memmap + searchsorted (sem carregar tudo)
+- Só candles fechados; escrita idempotente (fora de ordem/sobreposição faz
+  merge por open_time e reescreve o mês)
+- Escrita nas versões assíncronas roda em thread (sem I/O de disco no event loop)
+- Preenchimento incremental de buracos via REST (paginado)
+- recent_klines(): últimos N candles com o mínimo de REST (warm-start do bot)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from indicators import interval_to_ms
+
+
+CANDLE_DTYPE = np.dtype([
+    ('open_time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8')
+])
+
+MAX_KLINES_PER_REQUEST = 1500
+COMPACT_AFTER = 1000  # Candles no log de append antes de regravar o .npy do mês
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _month_key(open_time_ms: int) -> str:
+    return datetime.fromtimestamp(open_time_ms / 1000, tz=timezone.utc).strftime('%Y-%m')
+
+
+def _month_start_ms(key: str) -> int:
+    return int(datetime.strptime(key, '%Y-%m').replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def klines_to_records(klines: Sequence[Sequence]) -> np.ndarray:
+    """Klines REST -> array estruturado (open_time + OHLCV)."""
+    records = np.empty(len(klines), dtype=CANDLE_DTYPE)
+    for i, k in enumerate(klines):
+        records[i] = (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+    return records
+
+
+def records_to_klines(records: np.ndarray, interval_ms: int) -> List[List]:
+    """Array estruturado -> klines no formato REST [open_time, o, h, l, c, v, close_time]."""
+    return [
+        [int(r['open_time']), float(r['open']), float(r['high']), float(r['low']),
+         float(r['close']), float(r['volume']), int(r['open_time']) + interval_ms - 1]
+        for r in records
+    ]
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class CandleStore:
+    """Candles fechados em partições mensais (.npy) por símbolo/intervalo."""
+
+    def __init__(self, root: str = 'data/candles'):
+        self.root = root
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'CandleStore':
+        return cls(os.getenv('CANDLE_STORE_DIR', 'data/candles'))
+
+    # ------------------------------------------------------------------
+    # Arquivos
+    # ------------------------------------------------------------------
+
+    def _dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def _path(self, symbol: str, interval: str, key: str) -> str:
+        return os.path.join(self._dir(symbol, interval), f"{key}.npy")
+
+    def _log_path(self, symbol: str, interval: str, key: str) -> str:
+        return os.path.join(self._dir(symbol, interval), f"{key}.log")
+
+    def _lock(self, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol.upper(), interval), threading.Lock())
+
+    def months(self, symbol: str, interval: str) -> List[str]:
+        """Partições existentes (YYYY-MM) em ordem cronológica."""
+        directory = self._dir(symbol, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted({f[:-4] for f in os.listdir(directory) if f.endswith(('.npy', '.log'))})
+
+    def _load(self, symbol: str, interval: str, key: str, mmap: bool = True) -> np.ndarray:
+        path = self._path(symbol, interval, key)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def _load_log(self, symbol: str, interval: str, key: str) -> np.ndarray:
+        """Candles do log de append (registro incompleto de um crash é ignorado)."""
+        path = self._log_path(symbol, interval, key)
+        try:
+            count = os.path.getsize(path) // CANDLE_DTYPE.itemsize
+        except OSError:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.fromfile(path, dtype=CANDLE_DTYPE, count=count)
+
+    def _segments(self, symbol: str, interval: str, key: str) -> List[np.ndarray]:
+        """Partes do mês em ordem cronológica: .npy (memmap) e depois o log."""
+        base = self._load(symbol, interval, key)
+        log = self._load_log(symbol, interval, key)
+        if len(base) and len(log):
+            # Crash entre compactar e apagar o log: descartar o que já está no .npy
+            log = log[log['open_time'] > base['open_time'][-1]]
+        return [part for part in (base, log) if len(part)]
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def write(self, symbol: str, interval: str, records) -> int:
+        """
+        Gravar candles fechados (array estruturado ou klines REST).
+
+        Candles depois do último do mês entram por append no log; candles já
+        existentes com o mesmo open_time são substituídos (reescreve o mês).
+        Retorna quantos candles novos entraram.
+        """
+        if not isinstance(records, np.ndarray):
+            records = klines_to_records(records)
+        if len(records) == 0:
+            return 0
+
+        # Ordenar e, para open_time repetido, ficar com a última ocorrência
+        _, last = np.unique(records['open_time'][::-1], return_index=True)
+        records = records[::-1][last]
+
+        os.makedirs(self._dir(symbol, interval), exist_ok=True)
+        keys = np.array([_month_key(t) for t in records['open_time']])
+        added = 0
+
+        with self._lock(symbol, interval):
+            for key in np.unique(keys):
+                incoming = records[keys == key]
+                segments = self._segments(symbol, interval, key)
+                last_time = segments[-1]['open_time'][-1] if segments else None
+
+                if last_time is None or incoming['open_time'][0] > last_time:
+                    logged = self._append_log(symbol, interval, key, incoming)
+                    added += len(incoming)
+                    if logged >= COMPACT_AFTER:
+                        self._rewrite(symbol, interval, key, incoming[:0])
+                else:
+                    added += self._rewrite(symbol, interval, key, incoming)
+
+        return added
+
+    def _append_log(self, symbol: str, interval: str, key: str, records: np.ndarray) -> int:
+        """Append no log do mês; retorna quantos candles o log tem agora."""
+        path = self._log_path(symbol, interval, key)
+        with open(path, 'ab') as f:
+            size = f.tell()
+            torn = size % CANDLE_DTYPE.itemsize
+            if torn:
+                f.truncate(size - torn)  # Registro incompleto de um crash
+                f.seek(0, os.SEEK_END)
+            f.write(records.tobytes())
+            return f.tell() // CANDLE_DTYPE.itemsize
+
+    def _rewrite(self, symbol: str, interval: str, key: str, incoming: np.ndarray) -> int:
+        """Merge (.npy + log + incoming) gravado como o novo .npy do mês; apaga o log."""
+        existing = np.concatenate(self._segments(symbol, interval, key) or [incoming[:0]])
+
+        # Novos por último: np.unique com return_index pega a primeira ocorrência
+        merged = np.concatenate([incoming[::-1], existing[::-1]])
+        _, first = np.unique(merged['open_time'], return_index=True)
+        merged = merged[first]  # já ordenado por open_time
+
+        path = self._path(symbol, interval, key)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, merged)
+        os.replace(tmp, path)
+
+        log_path = self._log_path(symbol, interval, key)
+        if os.path.exists(log_path):
+            os.remove(log_path)
+        return len(merged) - len(existing)
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def read(self, symbol: str, interval: str,
+             start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> np.ndarray:
+        """Candles com start_ms <= open_time < end_ms (array estruturado, ordem cronológica)."""
+        parts = []
+        for key in self.months(symbol, interval):
+            month_start = _month_start_ms(key)
+            if end_ms is not None and month_start >= end_ms:
+                break
+            if start_ms is not None and month_start + 32 * 86_400_000 <= start_ms:
+                continue
+
+            for data in self._segments(symbol, interval, key):
+                times = data['open_time']
+                lo = 0 if start_ms is None else int(np.searchsorted(times, start_ms, side='left'))
+                hi = len(times) if end_ms is None else int(np.searchsorted(times, end_ms, side='left'))
+                if hi > lo:
+                    parts.append(np.array(data[lo:hi]))
+
+        if not parts:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.concatenate(parts)
+
+    def read_arrays(self, symbol: str, interval: str,
+                    start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Mesmo que read(), em colunas contíguas (formato de klines_to_arrays + open_time)."""
+        records = self.read(symbol, interval, start_ms, end_ms)
+        return {name: np.ascontiguousarray(records[name]) for name in CANDLE_DTYPE.names}
+
+    def read_last(self, symbol: str, interval: str, limit: int) -> np.ndarray:
+        """Últimos `limit` candles armazenados."""
+        parts = []
+        remaining = limit
+        for key in reversed(self.months(symbol, interval)):
+            for data in reversed(self._segments(symbol, interval, key)):
+                take = data[-remaining:] if remaining < len(data) else data
+                parts.append(np.array(take))
+                remaining -= len(take)
+                if remaining <= 0:
+                    break
+            if remaining <= 0:
+                break
+
+        if not parts:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.concatenate(parts[::-1])
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        last = self.read_last(symbol, interval, 1)
+        return int(last['open_time'][0]) if len(last) else None
+
+    def missing_ranges(self, symbol: str, interval: str,
+                       start_ms: int, end_ms: int) -> List[Tuple[int, int]]:
+        """Intervalos [início, fim) de open_time sem candles armazenados."""
+        interval_ms = interval_to_ms(interval)
+        start_ms = -(-start_ms // interval_ms) * interval_ms  # alinhar para cima
+        if start_ms >= end_ms:
+            return []
+
+        times = self.read(symbol, interval, start_ms, end_ms)['open_time']
+        if len(times) == 0:
+            return [(start_ms, end_ms)]
+
+        ranges = []
+        if times[0] > start_ms:
+            ranges.append((start_ms, int(times[0])))
+        gaps = np.flatnonzero(np.diff(times) > interval_ms)
+        for i in gaps:
+            ranges.append((int(times[i]) + interval_ms, int(times[i + 1])))
+        if times[-1] + interval_ms < end_ms:
+            ranges.append((int(times[-1]) + interval_ms, end_ms))
+        return ranges
+
+    # ------------------------------------------------------------------
+    # Preenchimento via REST
+    # ------------------------------------------------------------------
+
+    def _closed_end(self, interval_ms: int, end_ms: Optional[int], now_ms: Optional[int]) -> int:
+        """Limite superior de open_time para candles já fechados."""
+        now_ms = now_ms or _now_ms()
+        last_closed_end = now_ms - now_ms % interval_ms  # open_time do candle em formação
+        return min(end_ms, last_closed_end) if end_ms else last_closed_end
+
+    def fill_sync(self, client, symbol: str, interval: str, start_ms: int,
+                  end_ms: Optional[int] = None, now_ms: Optional[int] = None) -> int:
+        """Baixar só os buracos entre start e end (Client síncrono). Retorna candles novos."""
+        interval_ms = interval_to_ms(interval)
+        end_ms = self._closed_end(interval_ms, end_ms, now_ms)
+        added = 0
+        for gap_start, gap_end in self.missing_ranges(symbol, interval, start_ms, end_ms):
+            cursor = gap_start
+            while cursor < gap_end:
+                klines = client.futures_klines(symbol=symbol, interval=interval, startTime=cursor,
+                                               endTime=gap_end - 1, limit=MAX_KLINES_PER_REQUEST)
+                if not klines:
+                    break
+                added += self.write(symbol, interval, klines)
+                cursor = int(klines[-1][0]) + interval_ms
+        return added
+
+    async def fill(self, client, symbol: str, interval: str, start_ms: int,
+                   end_ms: Optional[int] = None, now_ms: Optional[int] = None) -> int:
+        """Versão assíncrona de fill_sync (AsyncClient)."""
+        interval_ms = interval_to_ms(interval)
+        end_ms = self._closed_end(interval_ms, end_ms, now_ms)
+        added = 0
+        for gap_start, gap_end in self.missing_ranges(symbol, interval, start_ms, end_ms):
+            cursor = gap_start
+            while cursor < gap_end:
+                klines = await client.futures_klines(symbol=symbol, interval=interval, startTime=cursor,
+                                                     endTime=gap_end - 1, limit=MAX_KLINES_PER_REQUEST)
+                if not klines:
+                    break
+                added += await asyncio.to_thread(self.write, symbol, interval, klines)
+                cursor = int(klines[-1][0]) + interval_ms
+        return added
+
+    async def recent_klines(self, client, symbol: str, interval: str, limit: int,
+                            now_ms: Optional[int] = None) -> List[List]:
+        """
+        Últimos `limit` klines (incluindo o candle em formação) no formato REST.
+
+        Usa o que estiver no disco e só pede à API os candles que faltam desde
+        o último armazenado; os fechados recebidos são gravados.
+        """
+        now_ms = now_ms or _now_ms()
+        interval_ms = interval_to_ms(interval)
+        live_open = now_ms - now_ms % interval_ms
+
+        stored = self.read_last(symbol, interval, limit)
+        if len(stored):
+            missing = (live_open - int(stored['open_time'][-1])) // interval_ms
+        else:
+            missing = limit
+        fetch = int(min(max(missing, 1), limit, MAX_KLINES_PER_REQUEST))
+
+        fetched = await client.futures_klines(symbol=symbol, interval=interval, limit=fetch)
+        closed = [k for k in fetched if int(k[6]) < now_ms]
+        if closed:
+            await asyncio.to_thread(self.write, symbol, interval, closed)
+
+        # Disco só complementa se encosta nos candles recebidos (sem buraco)
+        older = stored[:0]
+        if fetched and len(stored) and missing <= fetch:
+            older = stored[stored['open_time'] < int(fetched[0][0])]
+        klines = records_to_klines(older, interval_ms) + [list(k) for k in fetched]
+        return klines[-limit:]
@@ -0,0 +1,102 @@
+"""
+⏱️ CYCLE METRICS
+================
+Latência de cada passada do loop principal do bot, por fase.
+
+- phase('monitor_positions') mede uma fase; cycle() mede a passada inteira
+- Janela deslizante das últimas N medições por fase
+- p50/p99/max por fase para logs, dashboard e o benchmark (scripts/benchmark_cycle.py)
+"""
+
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional
+
+import numpy as np
+
+
+CYCLE = 'cycle'
+
+
+class CycleProfiler:
+    """Duração das fases do loop (segundos, relógio monotônico)."""
+
+    def __init__(self, history_size: int = 500):
+        self.history_size = history_size
+        self.samples: Dict[str, Deque[float]] = {}
+        self.counts: Dict[str, int] = {}
+        self.cycles = 0
+        self.last_cycle: Dict[str, float] = {}
+        self._current: Optional[Dict[str, float]] = None
+
+    @classmethod
+    def from_env(cls) -> 'CycleProfiler':
+        return cls(history_size=int(os.getenv('CYCLE_METRICS_HISTORY', 500)))
+
+    # ------------------------------------------------------------------
+    # Medição
+    # ------------------------------------------------------------------
+
+    def record(self, name: str, seconds: float):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.history_size)
+        samples.append(seconds)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        if self._current is not None:
+            # A mesma fase pode rodar mais de uma vez na passada: soma
+            self._current[name] = self._current.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        """Medir uma fase (erros também contam: a fase gastou o tempo)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    @contextmanager
+    def cycle(self):
+        """Medir uma passada completa do loop (sem a espera do próximo ciclo)."""
+        self._current = {}
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._current[CYCLE] = elapsed
+            self.last_cycle, self._current = self._current, None
+            self.record(CYCLE, elapsed)
+            self.cycles += 1
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def percentiles(self, name: str, qs: List[float] = (50, 99)) -> Dict[str, float]:
+        samples = self.samples.get(name)
+        if not samples:
+            return {}
+        values = np.percentile(np.fromiter(samples, dtype=np.float64), qs)
+        return {f'p{q:g}': float(v) for q, v in zip(qs, values)}
+
+    def summary(self) -> Dict[str, Dict]:
+        """{fase: {count, p50, p99, max, last}} das medições na janela."""
+        result = {}
+        for name, samples in self.samples.items():
+            result[name] = {
+                'count': self.counts[name],
+                **self.percentiles(name),
+                'max': max(samples),
+                'last': samples[-1]
+            }
+        return result
+
+    def format_last(self) -> str:
+        """Linha curta da última passada (ms por fase) para o log do ciclo."""
+        parts = [f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.last_cycle.items() if name != CYCLE]
+        total = self.last_cycle.get(CYCLE, 0.0) * 1000
+        return f"{total:.0f}ms" + (f" ({', '.join(parts)})" if parts else '')
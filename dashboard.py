@@ -1,11 +1,11 @@
 
 import streamlit as st
 import pandas as pd
-import json
-import os
 import time
 from datetime import datetime
 
+from dashboard_state import SnapshotReader
+
 # Configuração da página (Sidebar recolhida no mobile por padrão)
 st.set_page_config(
     page_title="Binance Bot Dashboard",
@@ -50,14 +50,15 @@ st.markdown("""
 # Arquivo de dados
 DATA_FILE = "dashboard_data.json"
 
+@st.cache_resource
+def get_reader():
+    """Leitor compartilhado entre reruns (mantém o último snapshot em cache)."""
+    return SnapshotReader(DATA_FILE)
+
 def load_data():
-    """Carrega dados do arquivo JSON gerado pelo bot."""
-    if not os.path.exists(DATA_FILE):
-        return None
-    
+    """Carrega dados do snapshot gerado pelo bot (só relê quando a versão muda)."""
     try:
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
+        return get_reader().load()
     except Exception as e:
         return None
 
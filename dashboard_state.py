@@ -0,0 +1,179 @@
+"""
+📣 DASHBOARD STATE
+==================
+Publicação do estado do bot para os dashboards, só quando algo muda.
+
+- Estado em memória por seção (active_trades, history, daily_metrics, ...)
+- Cada seção tem uma impressão digital; seção igual à anterior não suja o estado
+- Snapshot JSON compacto gravado só quando há seção suja (versão + 1)
+- Arquivo <snapshot>.version minúsculo: dashboards comparam a versão antes de
+  ler/parsear o snapshot inteiro; também serve de heartbeat quando nada muda
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Union
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), sort_keys=True, default=str)
+
+
+def _write_atomic(path: str, content: str):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def version_path(path: str) -> str:
+    return path + '.version'
+
+
+# ============================================================================
+# PUBLICAÇÃO (BOT)
+# ============================================================================
+
+class DashboardPublisher:
+    """
+    Estado do dashboard com dirty flag e número de versão.
+
+    update() registra uma seção; publish() grava o snapshot se alguma seção
+    mudou desde a última gravação. O valor pode ser um callable, avaliado só
+    quando a impressão digital (fingerprint) indica mudança.
+    """
+
+    def __init__(self, path: str = 'dashboard_data.json', heartbeat: float = 60):
+        self.path = path
+        self.heartbeat = heartbeat
+        self.run_id = datetime.now().strftime('%Y%m%d%H%M%S')  # Versões reiniciam a cada execução
+
+        self.version = 0
+        self.sections: Dict[str, Any] = {}
+        self.section_versions: Dict[str, int] = {}
+        self._fingerprints: Dict[str, Any] = {}
+        self.dirty = False
+
+        self.writes = 0
+        self.skipped = 0
+        self._last_write = 0.0
+
+    @classmethod
+    def from_env(cls, path: str = 'dashboard_data.json') -> 'DashboardPublisher':
+        return cls(
+            os.getenv('DASHBOARD_FILE', path),
+            heartbeat=float(os.getenv('DASHBOARD_HEARTBEAT', 60))
+        )
+
+    def update(self, name: str, value: Union[Any, Callable[[], Any]], fingerprint: Any = None) -> bool:
+        """
+        Atualizar uma seção. Retorna True se ela mudou.
+
+        Sem fingerprint, a própria serialização compacta do valor é comparada.
+        """
+        if fingerprint is None:
+            if callable(value):
+                value = value()
+            fingerprint = _compact(value)
+        if name in self._fingerprints and self._fingerprints[name] == fingerprint:
+            return False
+
+        self._fingerprints[name] = fingerprint
+        self.sections[name] = value() if callable(value) else value
+        self.section_versions[name] = self.version + 1
+        self.dirty = True
+        return True
+
+    def snapshot(self) -> Dict:
+        return {
+            **self.sections,
+            'version': self.version,
+            'run_id': self.run_id,
+            'section_versions': dict(self.section_versions),
+            'last_update': self._stamp()
+        }
+
+    def publish(self, force: bool = False) -> bool:
+        """
+        Gravar o snapshot se houver mudança. Retorna True se gravou.
+
+        Sem mudança, só o arquivo de versão é regravado a cada `heartbeat`
+        segundos (para o dashboard/health check saberem que o bot está vivo).
+        """
+        if not (self.dirty or force):
+            if self.heartbeat and time.monotonic() - self._last_write >= self.heartbeat:
+                self._write_version()
+            self.skipped += 1
+            return False
+
+        self.version += 1
+        state = self.snapshot()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _write_atomic(self.path, json.dumps(state, separators=(',', ':'), default=str))
+        self._write_version(state['last_update'])  # Depois do snapshot: versão nunca à frente dos dados
+
+        self.dirty = False
+        self.writes += 1
+        return True
+
+    def _write_version(self, last_update: Optional[str] = None):
+        meta = {'version': self.version, 'run_id': self.run_id, 'last_update': last_update or self._stamp()}
+        _write_atomic(version_path(self.path), json.dumps(meta))
+        self._last_write = time.monotonic()
+
+    @staticmethod
+    def _stamp() -> str:
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+# ============================================================================
+# LEITURA (DASHBOARDS)
+# ============================================================================
+
+def read_version(path: str = 'dashboard_data.json') -> Optional[Dict]:
+    """Versão atual do snapshot ({'version', 'run_id', 'last_update'}) ou None."""
+    try:
+        with open(version_path(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_snapshot(path: str = 'dashboard_data.json') -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class SnapshotReader:
+    """Leitor com cache: só reabre o snapshot quando a versão publicada muda."""
+
+    def __init__(self, path: str = 'dashboard_data.json'):
+        self.path = path
+        self.data: Optional[Dict] = None
+        self._key = None
+        self.loads = 0
+
+    def load(self) -> Optional[Dict]:
+        meta = read_version(self.path)
+        if meta is None:
+            # Bot antigo (sem arquivo de versão): ler o snapshot direto
+            return read_snapshot(self.path)
+
+        key = (meta.get('run_id'), meta.get('version'))
+        if key != self._key or self.data is None:
+            data = read_snapshot(self.path)
+            if data is None:
+                return self.data
+            self.data = data
+            self._key = key
+            self.loads += 1
+
+        # Heartbeat pode ser mais novo que o snapshot
+        return {**self.data, 'last_update': meta.get('last_update', self.data.get('last_update'))}
@@ -8,8 +8,10 @@ from .repositories import (
     DatabaseRepository,
     TradeRepository,
     PositionRepository,
+    SymbolRepository,
     get_trade_repo,
     get_position_repo,
+    get_symbol_repo,
     close_repos
 )
 
@@ -23,8 +25,10 @@ __all__ = [
     'DatabaseRepository',
     'TradeRepository',
     'PositionRepository',
+    'SymbolRepository',
     'get_trade_repo',
     'get_position_repo',
+    'get_symbol_repo',
     'close_repos',
     'BotWithPersistence',
     'main_with_persistence',
@@ -16,9 +16,10 @@ Modo de uso:
 import asyncio
 import os
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
 
-from database.repositories import get_trade_repo, get_position_repo, close_repos
+from database.repositories import get_trade_repo, get_position_repo, get_symbol_repo, close_repos
+from database.write_behind import WriteBehindQueue
 
 
 class BotWithPersistence:
@@ -43,6 +44,12 @@ class BotWithPersistence:
 
         self._trade_repo = None
         self._position_repo = None
+        self._writer: Optional[WriteBehindQueue] = None  # Gravação assíncrona (fora do loop de trading)
+
+        # Último estado gravado por símbolo (evita UPSERT quando nada mudou)
+        self._position_snapshots: Dict[str, Dict] = {}
+        self.position_price_eps = float(os.getenv('DB_POSITION_PRICE_EPS', 0.0005))  # variação relativa
+        self.position_pnl_eps = float(os.getenv('DB_POSITION_PNL_EPS', 0.01))        # USDT
 
     def __getattr__(self, name):
         """Delegar atributos não modificados para o bot original."""
@@ -57,6 +64,13 @@ class BotWithPersistence:
             self._trade_repo = await get_trade_repo()
             self._position_repo = await get_position_repo()
 
+            # Catálogo de símbolos persistido na tabela `symbols`
+            self._bot.symbol_registry.repo = await get_symbol_repo()
+
+            # Fila write-behind (reaplica o journal local antes de sincronizar)
+            self._writer = WriteBehindQueue.from_env(self._trade_repo, self._position_repo)
+            await self._writer.start()
+
             print(f"{Fore.GREEN}✅ Persistência PostgreSQL ativa")
 
             # Migrar dados JSON existentes
@@ -126,8 +140,7 @@ class BotWithPersistence:
 
             trade = self._bot.active_trades[symbol]
 
-            # Salvar trade
-            trade_id = await self._trade_repo.save_trade({
+            trade_data = {
                 'symbol': symbol,
                 'side': opp['trend'],
                 'quantity': trade['quantity'],
@@ -139,21 +152,16 @@ class BotWithPersistence:
                 'entry_order_id': trade.get('order_id'),
                 'sl_order_id': trade.get('sl_order_id'),
                 'tp_order_id': trade.get('tp_order_id')
-            })
+            }
+            row = self._position_row(symbol, trade)
 
-            # Salvar posição
-            await self._position_repo.save_position({
-                'symbol': symbol,
-                'side': trade['side'],
-                'quantity': trade['quantity'],
-                'entry_price': trade['entry'],
-                'current_price': trade.get('current_price', trade['entry']),
-                'sl_price': trade['sl'],
-                'tp_price': trade['tp'],
-                'entry_order_id': trade.get('order_id'),
-                'sl_order_id': trade.get('sl_order_id'),
-                'tp_order_id': trade.get('tp_order_id')
-            })
+            if self._writer:
+                self._writer.save_trade(trade_data)
+                self._writer.save_position(row)
+            else:
+                await self._trade_repo.save_trade(trade_data)
+                await self._position_repo.save_position(row)
+            self._position_snapshots[symbol] = row
 
         except Exception as e:
             print(f"⚠️ Erro ao salvar no banco: {e}")
@@ -176,23 +184,64 @@ class BotWithPersistence:
         if self._position_repo:
             await self._update_positions_in_db()
 
+    @staticmethod
+    def _position_row(symbol: str, trade: Dict) -> Dict:
+        """Posição do bot no formato de PositionRepository.save_position."""
+        return {
+            'symbol': symbol,
+            'side': trade['side'],
+            'quantity': trade['quantity'],
+            'entry_price': trade['entry'],
+            'current_price': trade.get('current_price', trade['entry']),
+            'sl_price': trade['sl'],
+            'tp_price': trade['tp'],
+            'entry_order_id': trade.get('order_id'),
+            'unrealized_pnl': trade.get('current_pnl', 0),
+            'unrealized_percent': trade.get('current_pnl_percent', 0),
+            'sl_order_id': trade.get('sl_order_id'),
+            'tp_order_id': trade.get('tp_order_id')
+        }
+
+    def _position_changed(self, previous: Optional[Dict], row: Dict) -> bool:
+        """True se a posição mudou além do epsilon de preço/PnL (ou em qualquer outro campo)."""
+        if previous is None:
+            return True
+
+        for key in ('side', 'quantity', 'entry_price', 'sl_price', 'tp_price', 'sl_order_id', 'tp_order_id'):
+            if previous.get(key) != row.get(key):
+                return True
+
+        old_price = float(previous.get('current_price') or 0)
+        new_price = float(row.get('current_price') or 0)
+        if old_price == 0 or abs(new_price - old_price) / abs(old_price) > self.position_price_eps:
+            return True
+
+        return abs(float(row.get('unrealized_pnl') or 0) - float(previous.get('unrealized_pnl') or 0)) > self.position_pnl_eps
+
     async def _update_positions_in_db(self):
-        """Atualizar posições ativas no banco."""
+        """Atualizar posições ativas no banco (só as que mudaram, em uma única ida ao banco)."""
         try:
-            for symbol, trade in self._bot.active_trades.items():
-                await self._position_repo.save_position({
-                    'symbol': symbol,
-                    'side': trade['side'],
-                    'quantity': trade['quantity'],
-                    'entry_price': trade['entry'],
-                    'current_price': trade.get('current_price', trade['entry']),
-                    'sl_price': trade['sl'],
-                    'tp_price': trade['tp'],
-                    'unrealized_pnl': trade.get('current_pnl', 0),
-                    'unrealized_percent': trade.get('current_pnl_percent', 0),
-                    'sl_order_id': trade.get('sl_order_id'),
-                    'tp_order_id': trade.get('tp_order_id')
-                })
+            active = self._bot.active_trades
+
+            # Posições que saíram do bot não precisam mais de snapshot
+            for symbol in [s for s in self._position_snapshots if s not in active]:
+                del self._position_snapshots[symbol]
+
+            changed = []
+            for symbol, trade in active.items():
+                row = self._position_row(symbol, trade)
+                if self._position_changed(self._position_snapshots.get(symbol), row):
+                    changed.append(row)
+
+            if not changed:
+                return
+
+            if self._writer:
+                self._writer.save_positions(changed)
+            else:
+                await self._position_repo.save_positions(changed)
+            for row in changed:
+                self._position_snapshots[row['symbol']] = row
 
         except Exception as e:
             print(f"⚠️ Erro ao atualizar posições: {e}")
@@ -228,17 +277,24 @@ class BotWithPersistence:
                 # Buscar trade_id (pelo entry_order_id)
                 entry_order_id = self._bot.active_trades[symbol].get('order_id')
 
-                if entry_order_id:
-                    await self._trade_repo.close_trade(
-                        entry_order_id,  # Usando order_id como identificador
-                        exit_price,
-                        pnl,
-                        pnl_percent,
-                        'TP' if pnl > 0 else 'SL'
-                    )
-
-                # Remover da tabela de posições
-                await self._position_repo.delete_position(symbol)
+                close_args = (
+                    entry_order_id,  # Usando order_id como identificador
+                    exit_price,
+                    pnl,
+                    pnl_percent,
+                    'TP' if pnl > 0 else 'SL'
+                )
+
+                # Registrar fechamento e remover da tabela de posições
+                if self._writer:
+                    if entry_order_id:
+                        self._writer.close_trade(*close_args)
+                    self._writer.delete_position(symbol)
+                else:
+                    if entry_order_id:
+                        await self._trade_repo.close_trade(*close_args)
+                    await self._position_repo.delete_position(symbol)
+                self._position_snapshots.pop(symbol, None)
 
             except Exception as e:
                 print(f"{Fore.YELLOW}⚠️ Erro ao fechar no banco: {e}")
@@ -253,9 +309,16 @@ class BotWithPersistence:
         await self.start()
         return self
 
+    async def close(self):
+        """Gravar o que estiver pendente (ou mandar para o journal) e fechar conexões."""
+        if self._writer:
+            await self._writer.stop()
+            self._writer = None
+        await close_repos()
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        await close_repos()
+        await self.close()
 
 
 # ============================================================================
@@ -270,13 +333,17 @@ async def main_with_persistence():
     """
     from colorama import Fore
 
+    bot = None
     try:
         bot = BotWithPersistence()
         await bot.start()
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}Bot encerrado pelo usuário")
     finally:
-        await close_repos()
+        if bot:
+            await bot.close()
+        else:
+            await close_repos()
         print(f"{Fore.CYAN}🔌 Conexões fechadas")
 
 
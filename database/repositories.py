@@ -8,12 +8,14 @@ import asyncio
 import os
 import json
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Sequence
 from decimal import Decimal
 
 import asyncpg
 from dotenv import load_dotenv
 
+from trade_journal import has_real_date, infer_dates
+
 load_dotenv()
 
 
@@ -22,9 +24,21 @@ load_dotenv()
 # ============================================================================
 
 class DatabaseRepository:
-    """Repository base com conexão PostgreSQL."""
+    """
+    Repository base com conexão PostgreSQL.
+
+    Queries rodam em paralelo até o tamanho do pool; o lock só protege a
+    criação do pool. O asyncpg guarda os prepared statements por conexão
+    (DB_STATEMENT_CACHE), então queries repetidas não são re-parseadas.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        query_timeout: Optional[float] = None,
+        statement_cache_size: Optional[int] = None
+    ):
         self.database_url = os.getenv('DATABASE_URL')
         if not self.database_url:
             raise ValueError("DATABASE_URL nao configurado!")
@@ -33,19 +47,29 @@ class DatabaseRepository:
         if '?' not in self.database_url and 'sslmode=' not in self.database_url:
             self.database_url += '?sslmode=require'
 
+        self.min_size = min_size if min_size is not None else int(os.getenv('DB_POOL_MIN', 2))
+        self.max_size = max_size if max_size is not None else int(os.getenv('DB_POOL_MAX', 10))
+        self.query_timeout = query_timeout if query_timeout is not None else float(os.getenv('DB_QUERY_TIMEOUT', 10))
+        self.statement_cache_size = (statement_cache_size if statement_cache_size is not None
+                                     else int(os.getenv('DB_STATEMENT_CACHE', 100)))
+
         self.pool: Optional[asyncpg.Pool] = None
-        self._lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()
 
     async def connect(self):
-        """Criar pool de conexoes."""
-        if self.pool is None:
-            self.pool = await asyncpg.create_pool(
-                self.database_url,
-                min_size=2,
-                max_size=10,
-                command_timeout=60
-            )
-            print(f"Conectado ao PostgreSQL")
+        """Criar pool de conexoes (uma vez, mesmo com chamadas concorrentes)."""
+        if self.pool is not None:
+            return
+        async with self._connect_lock:
+            if self.pool is None:
+                self.pool = await asyncpg.create_pool(
+                    self.database_url,
+                    min_size=min(self.min_size, self.max_size),
+                    max_size=self.max_size,
+                    command_timeout=60,
+                    statement_cache_size=self.statement_cache_size
+                )
+                print(f"Conectado ao PostgreSQL (pool {self.min_size}-{self.max_size})")
 
     async def close(self):
         """Fechar pool de conexões."""
@@ -54,22 +78,116 @@ class DatabaseRepository:
             self.pool = None
             print("🔌 Conexões PostgreSQL fechadas")
 
-    async def execute(self, query: str, *args, fetch: str = None) -> Optional[List]:
-        """Executar query com tratamento de erro."""
-        async with self._lock:
-            if not self.pool:
-                await self.connect()
+    async def execute(self, query: str, *args, fetch: str = None,
+                      timeout: Optional[float] = None) -> Optional[List]:
+        """Executar query com tratamento de erro (timeout por chamada, em segundos)."""
+        if self.pool is None:
+            await self.connect()
+
+        timeout = timeout or self.query_timeout
+        async with self.pool.acquire(timeout=timeout) as conn:
+            if fetch == 'one':
+                return await conn.fetchrow(query, *args, timeout=timeout)
+            elif fetch == 'all':
+                return await conn.fetch(query, *args, timeout=timeout)
+            elif fetch == 'val':
+                return await conn.fetchval(query, *args, timeout=timeout)
+            else:
+                await conn.execute(query, *args, timeout=timeout)
+                return None
+
+    async def execute_many(self, query: str, records: List, timeout: Optional[float] = None) -> None:
+        """Executar a mesma query para vários registros numa única transação."""
+        if not records:
+            return
+        if self.pool is None:
+            await self.connect()
+
+        timeout = timeout or self.query_timeout
+        async with self.pool.acquire(timeout=timeout) as conn:
+            async with conn.transaction():
+                await conn.executemany(query, records, timeout=timeout)
+
+
+# ============================================================================
+# IMPORTAÇÃO EM MASSA (COPY)
+# ============================================================================
+
+# Colunas comuns aos dois schemas (schema.sql e scripts/init_database.py)
+TRADE_IMPORT_COLUMNS = (
+    'symbol', 'side', 'quantity', 'entry_price', 'exit_price',
+    'sl_price', 'tp_price', 'entry_time', 'exit_time',
+    'pnl', 'pnl_percent', 'status', 'entry_order_id'
+)
+
+
+async def bulk_import_trades(
+    conn,
+    trades: List[Dict],
+    extra_columns: Sequence[str] = (),
+    batch_size: int = 5000,
+    progress: Optional[Callable[[int, int], None]] = None,
+    dedup_by_time: bool = True
+) -> Dict[str, int]:
+    """
+    Importar trades via COPY para uma tabela temporária + um único INSERT ... SELECT.
+
+    Dedup: pelo entry_order_id quando existe; sem ele, por (symbol, side,
+    entry_time) - exceto nas linhas com entry_time estimado ('time_estimated'
+    no dicionário, ou todas com dedup_by_time=False), que entram todas.
+    Duplicados dentro do próprio lote também são descartados. Roda numa
+    transação: ou entra tudo, ou nada.
+    """
+    columns = tuple(TRADE_IMPORT_COLUMNS) + tuple(extra_columns)
+    records = [
+        tuple(t.get(c) for c in columns) + (bool(t.get('time_estimated', not dedup_by_time)),)
+        for t in trades
+    ]
+    if not records:
+        return {'staged': 0, 'inserted': 0, 'skipped': 0}
+
+    column_list = ', '.join(columns)
+    dedup_key = "COALESCE(entry_order_id::text, symbol || '|' || side || '|' || entry_time::text)"
+
+    async with conn.transaction():
+        await conn.execute(f"""
+            CREATE TEMP TABLE trades_import ON COMMIT DROP AS
+            SELECT {column_list}, FALSE AS time_estimated FROM trades WITH NO DATA
+        """)
+
+        for start in range(0, len(records), batch_size):
+            chunk = records[start:start + batch_size]
+            await conn.copy_records_to_table('trades_import', records=chunk,
+                                             columns=columns + ('time_estimated',))
+            if progress:
+                progress(start + len(chunk), len(records))
+
+        merge = f"""
+            SELECT {column_list} FROM (
+                SELECT DISTINCT ON ({dedup_key}) {column_list}
+                FROM trades_import
+                WHERE entry_order_id IS NOT NULL OR NOT time_estimated
+                ORDER BY {dedup_key}
+            ) s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM trades t
+                WHERE (s.entry_order_id IS NOT NULL AND t.entry_order_id = s.entry_order_id)
+                   OR (s.entry_order_id IS NULL AND t.entry_order_id IS NULL
+                       AND t.symbol = s.symbol AND t.side = s.side AND t.entry_time = s.entry_time)
+            )
+            UNION ALL
+            SELECT {column_list} FROM trades_import WHERE entry_order_id IS NULL AND time_estimated
+        """
+
+        status = await conn.execute(f"INSERT INTO trades ({column_list}) {merge}")
+
+    inserted = int(status.split()[-1]) if status else 0
+    return {'staged': len(records), 'inserted': inserted, 'skipped': len(records) - inserted}
 
-            async with self.pool.acquire() as conn:
-                if fetch == 'one':
-                    return await conn.fetchrow(query, *args)
-                elif fetch == 'all':
-                    return await conn.fetch(query, *args)
-                elif fetch == 'val':
-                    return await conn.fetchval(query, *args)
-                else:
-                    await conn.execute(query, *args)
-                    return None
+
+def print_import_progress(done: int, total: int) -> None:
+    """Progresso padrão da importação em massa."""
+    print(f"   📥 {done}/{total} trades enviados ({done / total * 100:.0f}%)")
 
 
 # ============================================================================
@@ -118,6 +236,21 @@ class TradeRepository(DatabaseRepository):
 
         return result
 
+    async def bulk_import(
+        self,
+        trades: List[Dict],
+        extra_columns: Sequence[str] = (),
+        progress: Optional[Callable[[int, int], None]] = print_import_progress,
+        dedup_by_time: bool = True
+    ) -> Dict[str, int]:
+        """Importar muitos trades de uma vez (COPY + merge com dedup)."""
+        if self.pool is None:
+            await self.connect()
+
+        async with self.pool.acquire() as conn:
+            return await bulk_import_trades(conn, trades, extra_columns, progress=progress,
+                                            dedup_by_time=dedup_by_time)
+
     async def close_trade(
         self,
         trade_id: int,
@@ -196,27 +329,30 @@ class TradeRepository(DatabaseRepository):
 class PositionRepository(DatabaseRepository):
     """Repository para posições ativas."""
 
-    async def save_position(self, pos_data: Dict) -> None:
-        """Salvar ou atualizar posição."""
-        query = """
-        INSERT INTO positions (
-            symbol, side, quantity, entry_price, current_price,
-            sl_price, tp_price, entry_order_id, sl_order_id, tp_order_id,
-            unrealized_pnl, unrealized_percent
-        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
-        ON CONFLICT (symbol) DO UPDATE SET
-            current_price = EXCLUDED.current_price,
-            unrealized_pnl = EXCLUDED.unrealized_pnl,
-            unrealized_percent = EXCLUDED.unrealized_percent,
-            sl_price = EXCLUDED.sl_price,
-            tp_price = EXCLUDED.tp_price,
-            sl_order_id = EXCLUDED.sl_order_id,
-            tp_order_id = EXCLUDED.tp_order_id,
-            updated_at = NOW()
-        """
-
-        await self.execute(
-            query,
+    UPSERT_QUERY = """
+    INSERT INTO positions (
+        symbol, side, quantity, entry_price, current_price,
+        sl_price, tp_price, entry_order_id, sl_order_id, tp_order_id,
+        unrealized_pnl, unrealized_percent
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+    ON CONFLICT (symbol) DO UPDATE SET
+        side = EXCLUDED.side,
+        quantity = EXCLUDED.quantity,
+        entry_price = EXCLUDED.entry_price,
+        entry_order_id = EXCLUDED.entry_order_id,
+        current_price = EXCLUDED.current_price,
+        unrealized_pnl = EXCLUDED.unrealized_pnl,
+        unrealized_percent = EXCLUDED.unrealized_percent,
+        sl_price = EXCLUDED.sl_price,
+        tp_price = EXCLUDED.tp_price,
+        sl_order_id = EXCLUDED.sl_order_id,
+        tp_order_id = EXCLUDED.tp_order_id,
+        updated_at = NOW()
+    """
+
+    @staticmethod
+    def _position_args(pos_data: Dict) -> tuple:
+        return (
             pos_data['symbol'],
             pos_data['side'],
             pos_data['quantity'],
@@ -231,6 +367,14 @@ class PositionRepository(DatabaseRepository):
             pos_data.get('unrealized_percent', 0)
         )
 
+    async def save_position(self, pos_data: Dict) -> None:
+        """Salvar ou atualizar posição."""
+        await self.execute(self.UPSERT_QUERY, *self._position_args(pos_data))
+
+    async def save_positions(self, positions: List[Dict]) -> None:
+        """Salvar/atualizar várias posições numa única transação (executemany)."""
+        await self.execute_many(self.UPSERT_QUERY, [self._position_args(p) for p in positions])
+
     async def get_all_positions(self) -> Dict[str, Dict]:
         """Buscar todas as posições ativas."""
         query = """
@@ -252,12 +396,64 @@ class PositionRepository(DatabaseRepository):
         await self.execute(query, symbol)
 
 
+# ============================================================================
+# SYMBOL REPOSITORY
+# ============================================================================
+
+class SymbolRepository(DatabaseRepository):
+    """Repository para o catálogo de símbolos (filtros da exchange)."""
+
+    async def upsert_symbols(self, symbols: List) -> None:
+        """Salvar/atualizar filtros de vários símbolos (SymbolInfo) de uma vez."""
+        query = """
+        INSERT INTO symbols (
+            symbol, name, base_asset, quote_asset,
+            tick_size, lot_size, min_notional
+        ) VALUES ($1, $2, $3, $4, $5, $6, $7)
+        ON CONFLICT (symbol) DO UPDATE SET
+            tick_size = EXCLUDED.tick_size,
+            lot_size = EXCLUDED.lot_size,
+            min_notional = EXCLUDED.min_notional,
+            is_active = TRUE,
+            updated_at = NOW()
+        """
+
+        records = [
+            (
+                s.symbol, s.symbol, s.base_asset, s.quote_asset,
+                Decimal(str(s.tick_size)), Decimal(str(s.step_size)), Decimal(str(s.min_notional))
+            )
+            for s in symbols
+        ]
+        await self.execute_many(query, records)
+
+    async def get_all_symbols(self) -> List[Dict]:
+        """Buscar símbolos ativos."""
+        query = """
+        SELECT symbol, base_asset, quote_asset, tick_size, lot_size, min_notional
+        FROM symbols
+        WHERE is_active = TRUE
+        """
+
+        rows = await self.execute(query, fetch='all')
+        return [dict(row) for row in rows] if rows else []
+
+
 # ============================================================================
 # MIGRATION HELPER
 # ============================================================================
 
+def _parse_history_time(value: str, default_date: datetime) -> datetime:
+    """Hora do histórico local: ISO completo ou só HH:MM:SS (no dia `default_date`)."""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        hour, minute, second = (int(p) for p in str(value).split(':'))
+        return default_date.replace(hour=hour, minute=minute, second=second, microsecond=0)
+
+
 async def migrate_json_to_db(trade_repo: TradeRepository, json_file: str = "trade_history.json"):
-    """Migrar dados existentes de JSON para PostgreSQL."""
+    """Migrar dados existentes de JSON para PostgreSQL (importação em massa)."""
 
     if not os.path.exists(json_file):
         print(f"⚠️ Arquivo {json_file} não encontrado - pulando migração")
@@ -269,29 +465,44 @@ async def migrate_json_to_db(trade_repo: TradeRepository, json_file: str = "trad
         with open(json_file, 'r') as f:
             history = json.load(f)
 
-        migrated = 0
-        for trade in history:
+        # Registros só com HH:MM:SS: dia estimado a partir da data do arquivo
+        # (virada de dia = hora que volta); sem order_id eles não têm chave
+        # confiável, então entram sem o dedup por (symbol, side, entry_time).
+        # Tudo num único bulk_import (uma transação): ou entra tudo, ou nada
+        last_day = datetime.fromtimestamp(os.path.getmtime(json_file)).date()
+        days = infer_dates(history, last_day)
+        rows = []
+        for trade, day in zip(history, days):
             try:
-                await trade_repo.save_trade({
+                row = {
                     'symbol': trade['symbol'],
                     'side': trade['side'],
                     'quantity': trade['quantity'],
                     'entry_price': trade['entry'],
                     'exit_price': trade.get('exit'),
                     'pnl': trade.get('pnl', 0),
-                    'entry_time': datetime.fromisoformat(trade['time']),
+                    'entry_time': _parse_history_time(trade['time'], datetime.fromisoformat(day)),
                     'status': 'CLOSED',
-                    'close_reason': 'MIGRATED'
-                })
-                migrated += 1
+                    'entry_order_id': trade.get('order_id'),
+                    'time_estimated': not has_real_date(trade)
+                }
             except Exception as e:
-                print(f"⚠️ Erro ao migrar trade {trade.get('symbol')}: {e}")
+                print(f"⚠️ Trade ignorado {trade.get('symbol')}: {e}")
+                continue
+            rows.append(row)
 
-        print(f"✅ Migração concluída: {migrated} trades migrados")
-
-        # Backup do arquivo JSON
+        # Marcar como migrado antes de importar: linhas com data estimada não
+        # têm dedup, então o JSON não pode ser importado de novo após o commit
         backup_file = f"{json_file}.backup"
         os.rename(json_file, backup_file)
+        try:
+            result = await trade_repo.bulk_import(rows)
+        except Exception:
+            os.rename(backup_file, json_file)  # Transação desfeita: tentar de novo no próximo start
+            raise
+        estimated = sum(row['time_estimated'] for row in rows)
+        print(f"✅ Migração concluída: {result['inserted']} trades migrados, {result['skipped']} já existiam"
+              + (f" ({estimated} com data estimada)" if estimated else ''))
         print(f"📦 JSON original salvo como {backup_file}")
 
     except Exception as e:
@@ -304,6 +515,7 @@ async def migrate_json_to_db(trade_repo: TradeRepository, json_file: str = "trad
 
 _trade_repo: Optional[TradeRepository] = None
 _position_repo: Optional[PositionRepository] = None
+_symbol_repo: Optional[SymbolRepository] = None
 
 
 async def get_trade_repo() -> TradeRepository:
@@ -324,12 +536,24 @@ async def get_position_repo() -> PositionRepository:
     return _position_repo
 
 
+async def get_symbol_repo() -> SymbolRepository:
+    """Get singleton SymbolRepository."""
+    global _symbol_repo
+    if _symbol_repo is None:
+        _symbol_repo = SymbolRepository()
+        await _symbol_repo.connect()
+    return _symbol_repo
+
+
 async def close_repos():
     """Fechar todos os repositories."""
-    global _trade_repo, _position_repo
+    global _trade_repo, _position_repo, _symbol_repo
     if _trade_repo:
         await _trade_repo.close()
         _trade_repo = None
     if _position_repo:
         await _position_repo.close()
         _position_repo = None
+    if _symbol_repo:
+        await _symbol_repo.close()
+        _symbol_repo = None
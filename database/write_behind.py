@@ -0,0 +1,374 @@
+"""
+📮 WRITE-BEHIND DE PERSISTÊNCIA
+================================
+Fila assíncrona entre o bot e o PostgreSQL.
+
+- O loop de trading só enfileira (nunca espera o banco)
+- Posições coalescidas por símbolo: só o último estado vai para o banco
+- Flush periódico (ou quando o buffer enche) em lote
+- Banco fora do ar: operações pendentes vão para um journal JSONL local,
+  reaplicado no próximo flush / próxima inicialização; ao regravar o journal
+  as posições são coalescidas por símbolo e o total é limitado (max_journal)
+- Flush com backoff exponencial enquanto o banco falha
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from metrics import MetricsRegistry, get_metrics
+
+
+# ============================================================================
+# JOURNAL
+# ============================================================================
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _decode(obj: Dict):
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+
+class OperationJournal:
+    """Operações pendentes em JSONL (uma operação por linha, em ordem)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __len__(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return sum(1 for line in f if line.strip())
+
+    def append(self, ops: List[Dict]) -> None:
+        if not ops:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for op in ops:
+                f.write(json.dumps(op, default=_encode) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load(self) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        ops = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    ops.append(json.loads(line, object_hook=_decode))
+                except json.JSONDecodeError:
+                    continue  # Linha truncada por queda no meio da escrita
+        return ops
+
+    def replace(self, ops: List[Dict]) -> None:
+        """Regravar o journal só com `ops` (atômico)."""
+        if not ops:
+            self.clear()
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for op in ops:
+                f.write(json.dumps(op, default=_encode) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _merge_position(positions: Dict[str, Dict], symbol: str, row: Optional[Dict]) -> None:
+    """Último estado por símbolo; row=None é DELETE (DELETE + UPSERT vira replace)."""
+    if row is None:
+        positions[symbol] = {'delete': True, 'row': None}
+    else:
+        entry = positions.get(symbol)
+        positions[symbol] = {'delete': bool(entry and entry['delete']), 'row': row}
+
+
+def _position_ops(positions: Dict[str, Dict]) -> List[Dict]:
+    """Deletes e depois um único upsert em lote com as linhas mais recentes."""
+    ops = [{'op': 'delete_position', 'data': {'symbol': s}}
+           for s, entry in positions.items() if entry['delete']]
+    rows = [entry['row'] for entry in positions.values() if entry['row'] is not None]
+    if rows:
+        ops.append({'op': 'save_positions', 'data': {'rows': rows}})
+    return ops
+
+
+def coalesce_ops(ops: List[Dict]) -> List[Dict]:
+    """Trades na ordem original; snapshots de posição reduzidos ao último por símbolo."""
+    trades: List[Dict] = []
+    positions: Dict[str, Dict] = {}
+    for op in ops:
+        if op['op'] == 'delete_position':
+            _merge_position(positions, op['data']['symbol'], None)
+        elif op['op'] == 'save_positions':
+            for row in op['data']['rows']:
+                _merge_position(positions, row['symbol'], row)
+        else:
+            trades.append(op)
+    return trades + _position_ops(positions)
+
+
+# ============================================================================
+# FILA
+# ============================================================================
+
+class WriteBehindQueue:
+    """
+    Persistência assíncrona de trades e posições.
+
+    Métodos de enfileiramento são síncronos e O(1). Operações de trade mantêm
+    a ordem; posições guardam só o último estado por símbolo (um DELETE seguido
+    de um novo UPSERT vira "replace": apaga e insere de novo no flush).
+    """
+
+    def __init__(
+        self,
+        trade_repo,
+        position_repo,
+        flush_interval: float = 2.0,
+        max_pending: int = 1000,
+        journal_path: str = 'data/db_journal.jsonl',
+        max_journal: int = 10000,
+        max_backoff: float = 60.0,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        self.trade_repo = trade_repo
+        self.position_repo = position_repo
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.journal = OperationJournal(journal_path)
+        self.max_journal = max_journal
+        self.max_backoff = max_backoff
+
+        self._trade_ops: List[Dict] = []
+        self._positions: Dict[str, Dict] = {}  # symbol -> {'delete': bool, 'row': dict|None}
+
+        self.flushed = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.dropped = 0
+        self._failure_streak = 0
+        self.dropped_count = (metrics or get_metrics()).counter(
+            'bot_db_journal_dropped_total', 'Operações descartadas por journal cheio (banco fora do ar)'
+        )
+
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, trade_repo, position_repo) -> 'WriteBehindQueue':
+        """Criar fila a partir das variáveis de ambiente."""
+        return cls(
+            trade_repo,
+            position_repo,
+            flush_interval=float(os.getenv('DB_FLUSH_INTERVAL', 2)),
+            max_pending=int(os.getenv('DB_MAX_PENDING', 1000)),
+            journal_path=os.getenv('DB_JOURNAL_PATH', 'data/db_journal.jsonl'),
+            max_journal=int(os.getenv('DB_MAX_JOURNAL', 10000))
+        )
+
+    @property
+    def pending(self) -> int:
+        return len(self._trade_ops) + len(self._positions)
+
+    # ------------------------------------------------------------------
+    # Enfileiramento (hot path)
+    # ------------------------------------------------------------------
+
+    def save_trade(self, trade_data: Dict) -> None:
+        self._push_trade({'op': 'save_trade', 'data': trade_data})
+
+    def close_trade(self, trade_id, exit_price: float, pnl: float,
+                    pnl_percent: float, close_reason: str = 'MANUAL') -> None:
+        self._push_trade({'op': 'close_trade', 'data': {
+            'trade_id': trade_id, 'exit_price': exit_price, 'pnl': pnl,
+            'pnl_percent': pnl_percent, 'close_reason': close_reason
+        }})
+
+    def save_position(self, row: Dict) -> None:
+        _merge_position(self._positions, row['symbol'], row)
+        self._check_capacity()
+
+    def save_positions(self, rows: List[Dict]) -> None:
+        for row in rows:
+            self.save_position(row)
+
+    def delete_position(self, symbol: str) -> None:
+        _merge_position(self._positions, symbol, None)
+        self._check_capacity()
+
+    def _push_trade(self, op: Dict) -> None:
+        self._trade_ops.append(op)
+        self._check_capacity()
+
+    def _check_capacity(self):
+        if self.pending >= self.max_pending:
+            # Buffer cheio: não bloquear o bot nem perder dados -> journal
+            self.spill()
+            self._wake.set()
+        elif self.pending >= self.max_pending // 2:
+            self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Flush
+    # ------------------------------------------------------------------
+
+    def _take_pending(self) -> List[Dict]:
+        """Esvaziar o buffer em operações ordenadas (trades, deletes, upserts em lote)."""
+        ops = self._trade_ops + _position_ops(self._positions)
+        self._trade_ops = []
+        self._positions = {}
+        return ops
+
+    def spill(self) -> int:
+        """Mover tudo o que está em memória para o journal local."""
+        ops = self._take_pending()
+        self.journal.append(ops)
+        return len(ops)
+
+    async def _apply(self, op: Dict) -> None:
+        data = op['data']
+        if op['op'] == 'save_trade':
+            await self.trade_repo.save_trade(data)
+        elif op['op'] == 'close_trade':
+            await self.trade_repo.close_trade(**data)
+        elif op['op'] == 'delete_position':
+            await self.position_repo.delete_position(data['symbol'])
+        elif op['op'] == 'save_positions':
+            await self.position_repo.save_positions(data['rows'])
+
+    def _settle_journal(self, unapplied: List[Dict], journaled: int) -> None:
+        """
+        Regravar o journal: `unapplied` + o que foi anexado durante o flush.
+
+        spill() pode anexar linhas enquanto o flush espera o banco; as
+        `journaled` primeiras linhas são as que o flush leu no início.
+        Posições são coalescidas por símbolo; acima de max_journal as
+        operações mais antigas são descartadas (e contadas).
+        """
+        appended = self.journal.load()[journaled:]
+        ops = coalesce_ops(unapplied + appended)
+        excess = len(ops) - self.max_journal
+        if excess > 0:
+            ops = ops[excess:]
+            self.dropped += excess
+            self.dropped_count.inc(excess)
+            print(f"⚠️ [write-behind] Journal cheio ({self.max_journal}); {excess} operações antigas descartadas")
+        self.journal.replace(ops)
+
+    async def flush(self) -> int:
+        """
+        Gravar journal + buffer no banco, em ordem.
+
+        Em caso de erro, o que não foi aplicado volta para o journal.
+        Retorna o número de operações aplicadas.
+        """
+        async with self._flush_lock:
+            journaled = self.journal.load()
+            ops = journaled + self._take_pending()
+            if not ops:
+                return 0
+
+            applied = 0
+            try:
+                for op in ops:
+                    await self._apply(op)
+                    applied += 1
+            except Exception as e:
+                self.failures += 1
+                self._failure_streak += 1
+                self.last_error = str(e)
+                self._settle_journal(ops[applied:], len(journaled))
+                print(f"⚠️ [write-behind] Banco indisponível ({e}); {len(ops) - applied} operações no journal")
+            except asyncio.CancelledError:
+                self._settle_journal(ops[applied:], len(journaled))
+                raise
+            else:
+                self._settle_journal([], len(journaled))
+                self._failure_streak = 0
+                if journaled:
+                    print(f"✅ [write-behind] {len(journaled)} operações do journal reaplicadas")
+                self.last_error = None
+            finally:
+                self.flushed += applied
+
+            return applied
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Reaplicar o journal e iniciar o flush periódico."""
+        if self._task:
+            return
+        self._running = True
+        await self.flush()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Parar o loop e fazer o flush final (o que falhar fica no journal)."""
+        self._running = False
+        if self._task:
+            # Sem cancel(): deixar um flush em andamento terminar
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def _flush_delay(self) -> float:
+        """Intervalo até o próximo flush (dobra a cada falha seguida, até max_backoff)."""
+        if not self._failure_streak:
+            return self.flush_interval
+        return min(self.flush_interval * 2 ** self._failure_streak, self.max_backoff)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            deadline = loop.time() + self._flush_delay()
+            while self._running:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                self._wake.clear()
+                if not self._failure_streak:
+                    break  # Buffer enchendo com o banco ok: flush já
+                # Banco fora: o spill já protege o buffer, esperar o backoff
+            self._wake.clear()
+            await self.flush()
+
+    def status(self) -> Dict:
+        return {
+            'pending': self.pending,
+            'journaled': len(self.journal),
+            'flushed': self.flushed,
+            'failures': self.failures,
+            'dropped': self.dropped,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,185 @@
+"""
+🕰️ HISTORY SYNC
+===============
+Sincronização incremental dos fills (futures_account_trades) por símbolo.
+
+- High-water mark por símbolo (último trade id/time) persistido em JSON
+- Paginação com fromId até alcançar o último fill (sem corte em 1000)
+- Primeira sincronização: janelas de 7 dias desde o início pedido
+  (limite da Binance para startTime/endTime), depois fromId
+- Símbolos em paralelo, com semáforo e orçamento de peso por execução;
+  o que não couber continua de onde parou na próxima
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+USER_TRADES_WEIGHT = 5          # Peso de GET /fapi/v1/userTrades
+USER_TRADES_LIMIT = 1000        # Máximo por página
+WINDOW_MS = 7 * 86_400_000      # Janela máxima entre startTime e endTime
+
+
+def fill_to_record(symbol: str, fill: Dict) -> Dict:
+    """Fill de fechamento (realizedPnl != 0) -> registro do histórico."""
+    return {
+        "symbol": symbol,
+        "side": "UNKNOWN",  # Binance não informa o lado da posição no fill
+        "entry": 0.0,  # Binance não fornece facilmente
+        "exit": float(fill['price']),
+        "quantity": abs(float(fill['qty'])),
+        "pnl": float(fill['realizedPnl']),
+        "time": datetime.fromtimestamp(fill['time'] / 1000).strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+@dataclass
+class SyncStats:
+    """Estatísticas de uma sincronização."""
+    requests: int = 0
+    weight_used: int = 0
+    fills: int = 0
+    records: int = 0
+    errors: int = 0
+    incomplete: List[str] = field(default_factory=list)  # Pararam no orçamento
+    duration: float = 0.0
+
+
+class HistorySync:
+    """Sincroniza fills novos desde o high-water mark de cada símbolo."""
+
+    def __init__(
+        self,
+        state_path: str = 'data/history_sync.json',
+        max_concurrency: int = 4,
+        weight_budget: int = 600
+    ):
+        self.state_path = state_path
+        self.max_concurrency = max(1, max_concurrency)
+        self.weight_budget = weight_budget
+        self.marks: Dict[str, Dict] = self._load()  # symbol -> {'last_id', 'last_time'}
+        self.last_stats: Optional[SyncStats] = None
+
+    @classmethod
+    def from_env(cls) -> 'HistorySync':
+        return cls(
+            os.getenv('HISTORY_SYNC_STATE', 'data/history_sync.json'),
+            max_concurrency=int(os.getenv('HISTORY_SYNC_CONCURRENCY', 4)),
+            weight_budget=int(os.getenv('HISTORY_SYNC_WEIGHT_BUDGET', 600))
+        )
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Persistir os high-water marks (chamar depois de gravar os registros)."""
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.marks, f)
+        os.replace(tmp, self.state_path)
+
+    # ------------------------------------------------------------------
+    # Sincronização
+    # ------------------------------------------------------------------
+
+    async def sync(self, client, symbols: List[str], start_ms: int,
+                   now_ms: Optional[int] = None) -> Tuple[List[Dict], SyncStats]:
+        """
+        Buscar os fills novos de todos os símbolos.
+
+        Retorna (registros com PnL realizado em ordem cronológica, estatísticas).
+        Os marks em memória avançam; save() os torna permanentes.
+        """
+        now_ms = now_ms or int(time.time() * 1000)
+        stats = SyncStats()
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        def take_budget() -> bool:
+            if stats.weight_used + USER_TRADES_WEIGHT > self.weight_budget:
+                return False
+            stats.weight_used += USER_TRADES_WEIGHT
+            stats.requests += 1
+            return True
+
+        async def run_one(symbol: str) -> List[Dict]:
+            records: List[Dict] = []
+            async with semaphore:
+                try:
+                    await self._sync_symbol(client, symbol, start_ms, now_ms, take_budget, stats, records)
+                except Exception:
+                    # Páginas já lidas ficam (o mark avançou junto); o resto vem na próxima
+                    stats.errors += 1
+            return records
+
+        results = await asyncio.gather(*(run_one(s) for s in symbols))
+
+        records = [r for symbol_records in results for r in symbol_records]
+        records.sort(key=lambda r: r['time'])
+        stats.records = len(records)
+        stats.duration = time.perf_counter() - started
+        self.last_stats = stats
+        return records, stats
+
+    async def _sync_symbol(self, client, symbol: str, start_ms: int, now_ms: int,
+                           take_budget, stats: SyncStats, records: List[Dict]):
+        mark = self.marks.get(symbol)
+
+        def consume(fills: List[Dict]):
+            for fill in fills:
+                if float(fill.get('realizedPnl', 0)) != 0:
+                    records.append(fill_to_record(symbol, fill))
+            last = fills[-1]
+            self.marks[symbol] = {'last_id': int(last['id']), 'last_time': int(last['time'])}
+            stats.fills += len(fills)
+
+        # Sem trade id: procurar o primeiro fill em janelas de 7 dias
+        if mark is None or mark.get('last_id') is None:
+            window_start = max(start_ms, mark['last_time'] + 1) if mark else start_ms
+            while window_start < now_ms:
+                if not take_budget():
+                    stats.incomplete.append(symbol)
+                    return
+                window_end = min(window_start + WINDOW_MS, now_ms) - 1
+                fills = await client.futures_account_trades(
+                    symbol=symbol, startTime=window_start, endTime=window_end, limit=USER_TRADES_LIMIT
+                )
+                if fills:
+                    consume(fills)
+                    break  # Achou o primeiro fill: o resto vem por fromId
+                # Janela vazia também avança o mark (não repetir na próxima execução)
+                self.marks[symbol] = {'last_id': None, 'last_time': window_end}
+                window_start = window_end + 1
+
+            if self.marks.get(symbol, {}).get('last_id') is None:
+                return  # Nenhum fill no período
+
+        # Com mark: páginas por fromId até alcançar o último fill
+        while True:
+            if not take_budget():
+                stats.incomplete.append(symbol)
+                return
+            fills = await client.futures_account_trades(
+                symbol=symbol, fromId=self.marks[symbol]['last_id'] + 1, limit=USER_TRADES_LIMIT
+            )
+            if not fills:
+                return
+            consume(fills)
+            if len(fills) < USER_TRADES_LIMIT:
+                return
@@ -0,0 +1,556 @@
+"""
+📐 INDICADORES TÉCNICOS
+========================
+Motor único de indicadores (EMA, RSI, MACD, Bollinger, ATR, Volume)
+calculado com NumPy sobre arrays float64 contíguos.
+
+Aceita arrays 1D (um símbolo) ou 2D (símbolos × candles). Os resultados
+reproduzem as fórmulas pandas usadas antes no bot:
+
+- EMA:       close.ewm(span=n).mean()            (adjust=True)
+- RSI:       média simples (rolling 14) de ganhos/perdas
+- MACD:      EMA12 - EMA26, sinal = EMA9 do MACD
+- Bollinger: média 20 ± 2 desvios (ddof=1)
+- ATR:       true range rolling 14  |  hl_range: (high - low) rolling 14
+"""
+
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Expoente máximo (base 10) usado na EMA em blocos - mantém w**-k longe de overflow
+_MAX_DECAY_EXP = 150
+
+# Tamanho de bloco (em candles) para janelas móveis - limita memória temporária
+_ROLLING_CHUNK = 65536
+
+EMA_SPANS = (9, 12, 21, 26, 50)
+
+
+# ============================================================================
+# CONVERSÃO DE DADOS
+# ============================================================================
+
+def klines_to_arrays(klines: Sequence[Sequence]) -> Dict[str, np.ndarray]:
+    """Converter klines brutos da Binance em arrays float64 contíguos."""
+    if len(klines) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return {'open': empty, 'high': empty, 'low': empty, 'close': empty, 'volume': empty}
+
+    ohlcv = np.array([k[1:6] for k in klines], dtype=np.float64).T.copy()
+    return {
+        'open': ohlcv[0],
+        'high': ohlcv[1],
+        'low': ohlcv[2],
+        'close': ohlcv[3],
+        'volume': ohlcv[4]
+    }
+
+
+def _as_float_array(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+# ============================================================================
+# PRIMITIVAS
+# ============================================================================
+
+def _decay_filter(b: np.ndarray, w: float, init) -> np.ndarray:
+    """
+    Resolver y[t] = w * y[t-1] + b[t] (com y[-1] = init) no último eixo.
+
+    Vetorizado em blocos: dentro de cada bloco y[k] = w^k * (w*carry + cumsum(b / w^k)).
+    O bloco é limitado para que w^-k nunca estoure o float64.
+    """
+    n = b.shape[-1]
+    out = np.empty_like(b)
+    if n == 0:
+        return out
+
+    block = n if w == 0 else max(1, int(_MAX_DECAY_EXP * np.log(10) / -np.log(w)))
+    carry = np.broadcast_to(np.asarray(init, dtype=np.float64), b.shape[:-1]).copy()
+
+    for start in range(0, n, block):
+        chunk = b[..., start:start + block]
+        powers = w ** np.arange(chunk.shape[-1], dtype=np.float64)
+        y = powers * (w * carry[..., None] + np.cumsum(chunk / powers, axis=-1))
+        out[..., start:start + chunk.shape[-1]] = y
+        carry = y[..., -1]
+
+    return out
+
+
+def ema(values, span: int, adjust: bool = True) -> np.ndarray:
+    """Média móvel exponencial (equivalente a Series.ewm(span=span, adjust=adjust).mean())."""
+    x = _as_float_array(values)
+    if x.shape[-1] == 0:
+        return x.copy()
+
+    alpha = 2.0 / (span + 1.0)
+    w = 1.0 - alpha
+
+    if adjust:
+        numerator = _decay_filter(x, w, 0.0)
+        n = np.arange(1, x.shape[-1] + 1, dtype=np.float64)
+        denominator = (1.0 - w ** n) / alpha
+        return numerator / denominator
+
+    b = alpha * x
+    b[..., 0] = x[..., 0]
+    return _decay_filter(b, w, 0.0)
+
+
+def _rolling(x: np.ndarray, window: int, reducer) -> np.ndarray:
+    """Aplicar reducer em janelas móveis no último eixo (NaN antes da janela completa)."""
+    out = np.full(x.shape, np.nan, dtype=np.float64)
+    n = x.shape[-1]
+    if n < window:
+        return out
+
+    for start in range(window - 1, n, _ROLLING_CHUNK):
+        stop = min(n, start + _ROLLING_CHUNK)
+        segment = x[..., start - window + 1:stop]
+        windows = np.lib.stride_tricks.sliding_window_view(segment, window, axis=-1)
+        out[..., start:stop] = reducer(windows)
+
+    return out
+
+
+def sma(values, window: int) -> np.ndarray:
+    """Média móvel simples (Series.rolling(window).mean())."""
+    return _rolling(_as_float_array(values), window, lambda w: w.mean(axis=-1))
+
+
+def rolling_std(values, window: int) -> np.ndarray:
+    """Desvio padrão móvel amostral (Series.rolling(window).std())."""
+    return _rolling(_as_float_array(values), window, lambda w: w.std(axis=-1, ddof=1))
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """RSI com médias simples de ganhos/perdas (primeiro delta conta como 0)."""
+    x = _as_float_array(close)
+    delta = np.zeros_like(x)
+    delta[..., 1:] = np.diff(x, axis=-1)
+
+    gain = sma(np.where(delta > 0, delta, 0.0), period)
+    loss = sma(np.where(delta < 0, -delta, 0.0), period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range (no primeiro candle vale high - low)."""
+    h = _as_float_array(high)
+    l = _as_float_array(low)
+    c = _as_float_array(close)
+
+    tr = h - l
+    prev_close = c[..., :-1]
+    tr[..., 1:] = np.maximum.reduce([
+        tr[..., 1:],
+        np.abs(h[..., 1:] - prev_close),
+        np.abs(l[..., 1:] - prev_close)
+    ])
+    return tr
+
+
+def vwap(close, volume) -> np.ndarray:
+    """VWAP acumulado desde o primeiro candle."""
+    c = _as_float_array(close)
+    v = _as_float_array(volume)
+    return np.cumsum(c * v, axis=-1) / np.cumsum(v, axis=-1)
+
+
+# ============================================================================
+# CÁLCULO COMPLETO
+# ============================================================================
+
+def compute_indicators(
+    close,
+    high=None,
+    low=None,
+    volume=None,
+    rsi_period: int = 14,
+    bb_window: int = 20,
+    bb_mult: float = 2.0,
+    atr_period: int = 14,
+    volume_window: int = 20
+) -> Dict[str, np.ndarray]:
+    """
+    Calcular todos os indicadores de uma vez.
+
+    Arrays 1D → um símbolo; arrays 2D (símbolos × candles) → lote.
+    Indicadores que dependem de high/low/volume só aparecem se eles forem passados.
+    """
+    close = _as_float_array(close)
+    result: Dict[str, np.ndarray] = {'close': close}
+
+    for span in EMA_SPANS:
+        result[f'ema_{span}'] = ema(close, span)
+
+    result['rsi'] = rsi(close, rsi_period)
+
+    result['macd'] = result['ema_12'] - result['ema_26']
+    result['macd_signal'] = ema(result['macd'], 9)
+    result['macd_hist'] = result['macd'] - result['macd_signal']
+
+    result['bb_middle'] = sma(close, bb_window)
+    result['bb_std'] = rolling_std(close, bb_window)
+    result['bb_upper'] = result['bb_middle'] + result['bb_std'] * bb_mult
+    result['bb_lower'] = result['bb_middle'] - result['bb_std'] * bb_mult
+
+    if high is not None and low is not None:
+        high = _as_float_array(high)
+        low = _as_float_array(low)
+        result['atr'] = sma(true_range(high, low, close), atr_period)
+        result['hl_range'] = sma(high - low, atr_period)
+
+    if volume is not None:
+        volume = _as_float_array(volume)
+        result['volume_ma'] = sma(volume, volume_window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result['volume_ratio'] = volume / result['volume_ma']
+
+    return result
+
+
+def compute_from_klines(klines: Sequence[Sequence]) -> Dict[str, np.ndarray]:
+    """Atalho: klines brutos → indicadores (inclui open/high/low/volume)."""
+    arrays = klines_to_arrays(klines)
+    result = compute_indicators(arrays['close'], arrays['high'], arrays['low'], arrays['volume'])
+    result.update(arrays)
+    return result
+
+
+def compute_many(series: List[Dict[str, np.ndarray]]) -> List[Dict[str, np.ndarray]]:
+    """
+    Calcular indicadores de vários símbolos em lote.
+
+    Agrupa as séries pelo número de candles, empilha cada grupo numa matriz
+    (símbolos × candles) e faz um único cálculo 2D por grupo. Retorna um dict
+    1D por série, na mesma ordem da entrada.
+    """
+    results: List[Optional[Dict[str, np.ndarray]]] = [None] * len(series)
+
+    groups: Dict[int, List[int]] = {}
+    for idx, s in enumerate(series):
+        groups.setdefault(len(s['close']), []).append(idx)
+
+    for indexes in groups.values():
+        stacked = {
+            key: np.stack([series[i][key] for i in indexes])
+            for key in ('close', 'high', 'low', 'volume')
+            if all(key in series[i] for i in indexes)
+        }
+        batch = compute_indicators(
+            stacked['close'], stacked.get('high'), stacked.get('low'), stacked.get('volume')
+        )
+        for row, idx in enumerate(indexes):
+            results[idx] = {key: values[row] for key, values in batch.items()}
+            for key in ('open', 'high', 'low', 'volume'):
+                if key in series[idx]:
+                    results[idx][key] = series[idx][key]
+
+    return results
+
+
+def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Retornar cópia do DataFrame OHLCV com as colunas de indicadores."""
+    df = df.copy()
+    if df.empty:
+        return df
+
+    has_hl = 'high' in df and 'low' in df
+    computed = compute_indicators(
+        df['close'].to_numpy(dtype=np.float64),
+        df['high'].to_numpy(dtype=np.float64) if has_hl else None,
+        df['low'].to_numpy(dtype=np.float64) if has_hl else None,
+        df['volume'].to_numpy(dtype=np.float64) if 'volume' in df else None
+    )
+    for key, values in computed.items():
+        if key != 'close':
+            df[key] = values
+
+    return df
+
+
+# ============================================================================
+# ESTADO INCREMENTAL (STREAMING)
+# ============================================================================
+
+_INTERVAL_UNITS_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def interval_to_ms(interval: str) -> int:
+    """Converter intervalo Binance ('15m', '1h', ...) em milissegundos."""
+    return int(interval[:-1]) * _INTERVAL_UNITS_MS[interval[-1]]
+
+
+class _RollingWindow:
+    """
+    Janela móvel com soma e soma dos quadrados acumuladas: média e desvio em O(1).
+
+    Os valores entram deslocados por `shift` (o primeiro valor, se centered)
+    para o desvio não perder precisão em preços altos; a cada RESYNC_EVERY
+    entradas as somas são refeitas do zero para não acumular erro.
+    """
+
+    RESYNC_EVERY = 1000
+
+    def __init__(self, size: int, centered: bool = False):
+        self.values: deque = deque(maxlen=size)
+        self.size = size
+        self.centered = centered
+        self.shift: Optional[float] = None if centered else 0.0
+        self.total = 0.0
+        self.squares = 0.0
+        self.nonzero = 0
+        self._pushes = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _with(self, value: float) -> Tuple[int, float, float, int]:
+        """(n, soma, soma dos quadrados, não nulos) se `value` entrar na janela."""
+        if self.shift is None:
+            self.shift = value
+        x = value - self.shift
+        n, total, squares = len(self.values) + 1, self.total + x, self.squares + x * x
+        nonzero = self.nonzero + (value != 0)
+        if len(self.values) == self.size:
+            old = self.values[0]
+            y = old - self.shift
+            n, total, squares, nonzero = n - 1, total - y, squares - y * y, nonzero - (old != 0)
+        return n, total, squares, nonzero
+
+    def stats(self, value: float, commit: bool) -> Tuple[float, float]:
+        """(média, desvio amostral) da janela com `value`; commit=True incorpora o valor."""
+        n, total, squares, nonzero = self._with(value)
+        if commit:
+            self.values.append(value)
+            self.total, self.squares, self.nonzero = total, squares, nonzero
+            self._pushes += 1
+            if self._pushes % self.RESYNC_EVERY == 0:
+                self._resync()
+
+        if n < self.size:
+            return float('nan'), float('nan')
+        if nonzero == 0:
+            return 0.0, 0.0  # Exato (RSI sem perdas/ganhos)
+        mean = self.shift + total / n
+        var = (squares - total * total / n) / (n - 1) if n > 1 else 0.0
+        return mean, max(var, 0.0) ** 0.5
+
+    def _resync(self):
+        if self.centered:
+            self.shift = sum(self.values) / len(self.values)
+        xs = [v - self.shift for v in self.values]
+        self.total = sum(xs)
+        self.squares = sum(x * x for x in xs)
+
+
+class IndicatorState:
+    """
+    Indicadores de um símbolo atualizados candle a candle em O(1).
+
+    Mantém o estado das EMAs (numerador/denominador do ajuste pandas), janelas
+    móveis de RSI/Bollinger/ATR/volume e os últimos candles. Candles fechados
+    são incorporados ao estado; o candle em formação é calculado por cima do
+    estado sem alterá-lo, então pode ser atualizado quantas vezes for preciso.
+
+    Logo após o load(), latest() reproduz o último valor de
+    compute_indicators() sobre os mesmos candles. Daí em diante as janelas
+    móveis (RSI, Bollinger, ATR, volume) continuam idênticas, mas as EMAs
+    (9/12/21/26/50 e o sinal do MACD) acumulam todos os candles fechados
+    desde o load, de propósito: o cálculo antigo recomputava só os últimos
+    `limit` candles a cada ciclo. Com o histórico mais longo, ema_50 e o
+    sinal do MACD se afastam um pouco dos valores antigos (a janela de 100
+    candles ainda dava ~2% de peso ao "início" artificial da série), e
+    tendência/força podem mudar perto dos limiares. Um reload (stale) volta
+    à janela de `limit` candles.
+    """
+
+    def __init__(
+        self,
+        interval_ms: int = 900_000,
+        rsi_period: int = 14,
+        bb_window: int = 20,
+        bb_mult: float = 2.0,
+        atr_period: int = 14,
+        volume_window: int = 20,
+        history_size: int = 5
+    ):
+        self.interval_ms = interval_ms
+        self.bb_mult = bb_mult
+
+        self._weights = {span: 1.0 - 2.0 / (span + 1.0) for span in EMA_SPANS}
+        self._ema = {span: (0.0, 0.0) for span in EMA_SPANS}  # (numerador, denominador)
+        self._signal_weight = 1.0 - 2.0 / 10.0
+        self._signal = (0.0, 0.0)
+        self._prev_close: Optional[float] = None
+
+        self._gains = _RollingWindow(rsi_period)
+        self._losses = _RollingWindow(rsi_period)
+        self._closes = _RollingWindow(bb_window, centered=True)
+        self._true_ranges = _RollingWindow(atr_period)
+        self._hl_ranges = _RollingWindow(atr_period)
+        self._volumes = _RollingWindow(volume_window)
+        self._recent: deque = deque(maxlen=history_size)
+
+        self.bars = 0
+        self.last_closed_time: Optional[int] = None
+        self.live: Optional[Tuple] = None
+        self.stale = False
+
+        self._committed: Dict[str, float] = {}
+        self._live_values: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_klines(cls, klines: Sequence[Sequence], interval_ms: int = 900_000,
+                    now_ms: Optional[int] = None, **kwargs) -> 'IndicatorState':
+        """Criar estado a partir de klines REST (o último pode estar em formação)."""
+        state = cls(interval_ms=interval_ms, **kwargs)
+        state.ingest_klines(klines, now_ms)
+        return state
+
+    def ingest_klines(self, klines: Sequence[Sequence], now_ms: Optional[int] = None) -> None:
+        """Incorporar klines REST; candles com close_time no passado contam como fechados."""
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+
+        for k in klines:
+            candle = (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+            self.update(candle, closed=int(k[6]) < now_ms)
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+
+    def update(self, candle: Tuple, closed: bool) -> bool:
+        """
+        Aplicar um candle (open_time, open, high, low, close, volume).
+
+        Retorna False se o candle foi ignorado (antigo) ou se há um buraco na
+        sequência - nesse caso stale=True e o estado deve ser recarregado.
+        """
+        open_time = candle[0]
+
+        if self.last_closed_time is not None:
+            if open_time <= self.last_closed_time:
+                return False
+
+            expected = self.last_closed_time + self.interval_ms
+            # Perdemos o fechamento (o último snapshot em formação pode não ter os
+            # ticks finais) ou um candle inteiro: recarregar pela série REST
+            if open_time > expected:
+                self.stale = True
+                return False
+
+        if closed:
+            self._apply(candle, commit=True)
+            self.live = None
+            self._live_values = {}
+        else:
+            self.live = candle
+            self._live_values = self._apply(candle, commit=False)
+
+        return True
+
+    def _apply(self, candle: Tuple, commit: bool) -> Dict[str, float]:
+        open_time, _, high, low, close, volume = candle
+        values: Dict[str, float] = {'close': close, 'volume': volume}
+
+        # EMAs (forma ajustada: numerador / denominador)
+        emas = {}
+        for span, w in self._weights.items():
+            num, den = self._ema[span]
+            emas[span] = (close + w * num, 1.0 + w * den)
+            values[f'ema_{span}'] = emas[span][0] / emas[span][1]
+
+        macd = values['ema_12'] - values['ema_26']
+        num, den = self._signal
+        signal = (macd + self._signal_weight * num, 1.0 + self._signal_weight * den)
+        values['macd'] = macd
+        values['macd_signal'] = signal[0] / signal[1]
+        values['macd_hist'] = macd - values['macd_signal']
+
+        # RSI
+        delta = close - self._prev_close if self._prev_close is not None else 0.0
+        gain, _ = self._gains.stats(delta if delta > 0 else 0.0, commit)
+        loss, _ = self._losses.stats(-delta if delta < 0 else 0.0, commit)
+        if loss == 0:
+            values['rsi'] = float('nan') if gain == 0 else 100.0
+        else:
+            values['rsi'] = 100 - (100 / (1 + gain / loss))
+
+        # Bollinger
+        middle, std = self._closes.stats(close, commit)
+        values['bb_middle'] = middle
+        values['bb_std'] = std
+        values['bb_upper'] = middle + std * self.bb_mult
+        values['bb_lower'] = middle - std * self.bb_mult
+
+        # ATR / range
+        tr = high - low
+        if self._prev_close is not None:
+            tr = max(tr, abs(high - self._prev_close), abs(low - self._prev_close))
+        values['atr'], _ = self._true_ranges.stats(tr, commit)
+        values['hl_range'], _ = self._hl_ranges.stats(high - low, commit)
+
+        # Volume
+        volume_ma, _ = self._volumes.stats(volume, commit)
+        values['volume_ma'] = volume_ma
+        values['volume_ratio'] = volume / volume_ma if volume_ma else float('nan')
+
+        if commit:
+            self._ema = emas
+            self._signal = signal
+            self._prev_close = close
+            self._recent.append((close, volume))
+            self.bars += 1
+            self.last_closed_time = open_time
+            self._committed = values
+
+        return values
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def latest(self) -> Dict[str, float]:
+        """Valores mais recentes (candle em formação, se houver)."""
+        return self._live_values or self._committed
+
+    def recent_history(self) -> List[Dict]:
+        """Últimos candles (fechados + em formação) no formato usado pela IA."""
+        recent = list(self._recent)
+        if self.live:
+            recent.append((self.live[4], self.live[5]))
+        return [
+            {"price": round(price, 4), "vol": round(vol, 2)}
+            for price, vol in recent[-self._recent.maxlen:]
+        ]
+
+    def signals(self) -> Dict[str, float]:
+        """Dicionário 'signals' no mesmo formato de AutonomousBot.analyze_symbol."""
+        latest = self.latest()
+        vol_ma = latest['volume_ma']
+        return {
+            'ema_9': latest['ema_9'],
+            'ema_21': latest['ema_21'],
+            'ema_50': latest['ema_50'],
+            'rsi': latest['rsi'],
+            'macd': latest['macd'] - latest['macd_signal'],
+            'bb_upper': latest['bb_upper'],
+            'bb_lower': latest['bb_lower'],
+            'rel_volume': latest['volume'] / vol_ma if vol_ma > 0 else 1.0
+        }
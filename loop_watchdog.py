@@ -0,0 +1,231 @@
+"""
+🐕 LOOP WATCHDOG
+================
+Detecta travamentos do event loop e ciclos do bot parados.
+
+- Tarefa no loop mede o atraso entre o acordar agendado e o real (lag)
+- Thread auxiliar percebe o loop bloqueado *enquanto* ele está bloqueado e
+  captura a pilha da thread do loop (a chamada síncrona culpada: requests,
+  cliente OpenAI síncrono, escrita de arquivo...) e a tarefa asyncio atual
+- Distribuição do lag exportada em bot_event_loop_lag_seconds (metrics.py)
+- Heartbeat: se o ciclo não bate por `stale_after` segundos, chama on_stale
+  (o bot cancela o ciclo travado e recomeça o loop, se WATCHDOG_RESTART=true)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Optional
+
+from metrics import MetricsRegistry, get_metrics
+
+
+def await_location(task: asyncio.Task) -> str:
+    """Onde uma tarefa suspensa está esperando (await mais interno fora do próprio asyncio)."""
+    frames = []
+    coro = task.get_coro()
+    while coro is not None and getattr(coro, 'cr_frame', None) is not None:
+        frames.append(coro.cr_frame)
+        coro = getattr(coro, 'cr_await', None)
+    own = [f for f in frames if f'{os.sep}asyncio{os.sep}' not in f.f_code.co_filename]
+    if not (own or frames):
+        return '?'
+    frame = (own or frames)[-1]
+    return f"{frame.f_code.co_filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+@dataclass
+class Stall:
+    """Um travamento do loop acima do limite."""
+    lag: float                      # Segundos além do agendado
+    at: float                       # time.time() da detecção
+    task: Optional[str] = None      # Tarefa asyncio rodando durante o bloqueio
+    stack: Optional[str] = None     # Pilha da thread do loop capturada no bloqueio
+
+    def culprit(self) -> str:
+        """Frame mais interno da pilha (onde o loop estava preso) com a linha de código."""
+        if not self.stack:
+            return 'pilha não capturada'
+        lines = self.stack.rstrip().splitlines()
+        for i in range(len(lines) - 1, -1, -1):
+            line = lines[i].strip()
+            if line.startswith('File ') and f'{os.sep}loop_watchdog.py"' not in line:
+                code = lines[i + 1].strip() if i + 1 < len(lines) else ''
+                if code.startswith('File '):
+                    code = ''  # Fonte indisponível
+                return f"{line}: {code}" if code else line
+        return 'desconhecido'
+
+
+class LoopWatchdog:
+    """Mede o lag do event loop e vigia o heartbeat do ciclo."""
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        interval: float = 0.25,
+        stale_after: float = 300.0,
+        on_stale: Optional[Callable] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        history_size: int = 20
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        self.stale_after = stale_after
+        self.on_stale = on_stale
+        self.stalls: Deque[Stall] = deque(maxlen=history_size)
+
+        metrics = metrics or get_metrics()
+        self.lag = metrics.histogram(
+            'bot_event_loop_lag_seconds', 'Atraso do event loop em acordar uma tarefa agendada',
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+        )
+        self.stall_count = metrics.counter('bot_event_loop_stalls_total', 'Bloqueios do loop acima do limite')
+        self.stale_count = metrics.counter('bot_heartbeat_stale_total', 'Heartbeats do ciclo vencidos')
+        self.heartbeat_age = metrics.gauge('bot_heartbeat_age_seconds', 'Segundos desde o último ciclo iniciado')
+
+        self.last_beat: Optional[float] = None
+        self.stall_total = 0
+        self.stale_total = 0
+        self._last_tick = time.monotonic()
+        self._captured: Optional[Stall] = None
+        self._captured_tick: Optional[float] = None
+        self._stale_fired = False
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_env(cls, on_stale: Optional[Callable] = None) -> 'LoopWatchdog':
+        restart = os.getenv('WATCHDOG_RESTART', 'false').lower() == 'true'
+        return cls(
+            threshold=float(os.getenv('WATCHDOG_LAG_THRESHOLD', 0.5)),
+            interval=float(os.getenv('WATCHDOG_INTERVAL', 0.25)),
+            stale_after=float(os.getenv('WATCHDOG_STALE_AFTER', 300)),
+            on_stale=on_stale if restart else None
+        )
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def beat(self):
+        """Início de um ciclo do bot."""
+        self.last_beat = time.monotonic()
+        self._stale_fired = False
+
+    # ------------------------------------------------------------------
+    # Medição (no loop)
+    # ------------------------------------------------------------------
+
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._last_tick = time.monotonic()
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._last_tick = time.monotonic()
+
+            self.lag.observe(lag)
+            if lag > self.threshold:
+                self._report(lag)
+            await self._check_heartbeat()
+
+    def _report(self, lag: float):
+        captured, self._captured = self._captured, None
+        stall = captured or Stall(lag=lag, at=time.time())
+        stall.lag = lag
+        self.stalls.append(stall)
+        self.stall_total += 1
+        self.stall_count.inc()
+        print(f"⚠️ [watchdog] Event loop bloqueado {lag * 1000:.0f}ms "
+              f"(tarefa: {stall.task or '?'}) em {stall.culprit()}")
+
+    async def _check_heartbeat(self):
+        if self.last_beat is None:
+            return
+        age = time.monotonic() - self.last_beat
+        self.heartbeat_age.set(age)
+        if age <= self.stale_after or self._stale_fired:
+            return
+
+        self._stale_fired = True  # Uma vez por heartbeat vencido
+        self.stale_total += 1
+        self.stale_count.inc()
+        print(f"⚠️ [watchdog] Nenhum ciclo há {age:.0f}s (limite {self.stale_after:.0f}s)")
+        if self.on_stale:
+            try:
+                result = self.on_stale()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                print(f"⚠️ [watchdog] Falha ao reiniciar o ciclo: {e}")
+
+    # ------------------------------------------------------------------
+    # Detecção do bloqueio (thread auxiliar)
+    # ------------------------------------------------------------------
+
+    def _watch(self):
+        """Enquanto o loop está preso, capturar a pilha dele (uma vez por bloqueio)."""
+        check_every = max(0.01, min(self.interval, self.threshold) / 2)
+        while not self._stop.wait(check_every):
+            tick = self._last_tick
+            blocked = time.monotonic() - tick - self.interval
+            if blocked <= self.threshold or self._captured_tick == tick:
+                continue
+            self._captured_tick = tick
+
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else None
+            task = None
+            try:
+                current = asyncio.current_task(self._loop)
+                if current is not None:
+                    task = f"{current.get_name()} {current.get_coro().__qualname__}"
+            except Exception:
+                pass
+            self._captured = Stall(lag=blocked, at=time.time(), task=task, stack=stack)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def summary(self) -> dict:
+        last = self.stalls[-1] if self.stalls else None
+        return {
+            'stalls': self.stall_total,
+            'stale': self.stale_total,
+            'heartbeat_age': round(time.monotonic() - self.last_beat, 1) if self.last_beat else None,
+            'last_stall': {'lag': round(last.lag, 3), 'task': last.task, 'where': last.culprit()} if last else None
+        }
@@ -0,0 +1,303 @@
+"""
+📡 MARKET DATA (WEBSOCKET)
+==========================
+Feed de mercado em tempo real via stream combinado da Binance Futures.
+
+- Um único WebSocket multiplexado: <symbol>@kline_<interval> + <symbol>@markPrice@1s
+- Buffer circular de candles por símbolo (NumPy, tamanho fixo)
+- Callbacks para o bot a cada candle/mark price (latência < 1s)
+- Reconexão automática com backoff exponencial
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from binance import BinanceSocketManager
+
+from indicators import interval_to_ms
+
+
+Candle = Tuple[int, float, float, float, float, float]
+
+
+# ============================================================================
+# BUFFER DE CANDLES
+# ============================================================================
+
+class CandleBuffer:
+    """
+    Buffer circular de candles de um símbolo.
+
+    O último candle pode estar em formação e é sobrescrito a cada update.
+    O buffer é sempre contíguo: se chegar um candle depois de um buraco na
+    sequência, o conteúdo anterior é descartado.
+    """
+
+    def __init__(self, capacity: int = 500, interval_ms: int = 900_000):
+        self.capacity = capacity
+        self.interval_ms = interval_ms
+        self._open_time = np.zeros(capacity, dtype=np.int64)
+        self._ohlcv = np.zeros((capacity, 5), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+        self.last_closed = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+        self.last_closed = False
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        if not self._size:
+            return None
+        return int(self._open_time[(self._start + self._size - 1) % self.capacity])
+
+    def upsert(self, candle: Candle, closed: bool) -> bool:
+        """
+        Inserir/atualizar um candle (open_time, open, high, low, close, volume).
+
+        Retorna False se o candle é mais antigo que o último do buffer.
+        """
+        open_time = int(candle[0])
+        last = self.last_open_time
+
+        if last is not None:
+            if open_time < last:
+                return False
+            if open_time > last + self.interval_ms:
+                self.clear()
+
+        if last is not None and open_time == last and self._size:
+            idx = (self._start + self._size - 1) % self.capacity
+        elif self._size < self.capacity:
+            idx = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            idx = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._open_time[idx] = open_time
+        self._ohlcv[idx] = candle[1:6]
+        self.last_closed = closed
+        return True
+
+    def seed(self, klines: Sequence[Sequence], now_ms: Optional[int] = None):
+        """Substituir o conteúdo por klines REST (o último pode estar em formação)."""
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+
+        self.clear()
+        for k in klines[-self.capacity:]:
+            candle = (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+            self.upsert(candle, closed=int(k[6]) < now_ms)
+
+    def _order(self) -> np.ndarray:
+        return (self._start + np.arange(self._size)) % self.capacity
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Arrays contíguos em ordem cronológica (mesmo formato de klines_to_arrays)."""
+        order = self._order()
+        ohlcv = self._ohlcv[order]
+        return {
+            'open_time': self._open_time[order],
+            'open': np.ascontiguousarray(ohlcv[:, 0]),
+            'high': np.ascontiguousarray(ohlcv[:, 1]),
+            'low': np.ascontiguousarray(ohlcv[:, 2]),
+            'close': np.ascontiguousarray(ohlcv[:, 3]),
+            'volume': np.ascontiguousarray(ohlcv[:, 4])
+        }
+
+    def as_klines(self, limit: Optional[int] = None) -> List[List]:
+        """Candles no formato REST [open_time, o, h, l, c, v, close_time]."""
+        order = self._order()
+        if limit:
+            order = order[-limit:]
+
+        klines = []
+        for pos, idx in enumerate(order):
+            open_time = int(self._open_time[idx])
+            is_last = pos == len(order) - 1
+            # Candle em formação: close_time no futuro para continuar "aberto"
+            if is_last and not self.last_closed:
+                close_time = int(time.time() * 1000) + self.interval_ms
+            else:
+                close_time = open_time + self.interval_ms - 1
+            klines.append([open_time, *self._ohlcv[idx].tolist(), close_time])
+        return klines
+
+
+# ============================================================================
+# SERVIÇO DE STREAM
+# ============================================================================
+
+class MarketDataService:
+    """
+    Mantém um WebSocket combinado com kline + markPrice de todos os símbolos.
+
+    Callbacks (síncronos, chamados no event loop):
+        on_kline(symbol, candle, closed)
+        on_mark_price(symbol, price)
+    """
+
+    def __init__(
+        self,
+        client,
+        symbols: List[str],
+        interval: str = '15m',
+        buffer_size: int = 500,
+        on_kline: Optional[Callable[[str, Candle, bool], None]] = None,
+        on_mark_price: Optional[Callable[[str, float], None]] = None,
+        live_timeout: float = 10.0,
+        max_backoff: float = 60.0
+    ):
+        self.client = client
+        self.symbols = [s.upper() for s in symbols]
+        self.interval = interval
+        self.interval_ms = interval_to_ms(interval)
+        self.on_kline = on_kline
+        self.on_mark_price = on_mark_price
+        self.live_timeout = live_timeout
+        self.max_backoff = max_backoff
+
+        self.buffers: Dict[str, CandleBuffer] = {
+            s: CandleBuffer(buffer_size, self.interval_ms) for s in self.symbols
+        }
+        self.mark_prices: Dict[str, float] = {}
+        self.last_update: Dict[str, float] = {}
+
+        self.messages = 0
+        self.reconnects = 0
+        self.connected = False
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def streams(self) -> List[str]:
+        streams = []
+        for symbol in self.symbols:
+            name = symbol.lower()
+            streams.append(f"{name}@kline_{self.interval}")
+            streams.append(f"{name}@markPrice@1s")
+        return streams
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Iniciar o stream em background."""
+        if self._task:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Parar o stream e aguardar a task terminar."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    async def _run(self):
+        backoff = 1.0
+        while self._running:
+            try:
+                bsm = BinanceSocketManager(self.client)
+                socket = bsm.futures_multiplex_socket(self.streams)
+                async with socket as stream:
+                    self.connected = True
+                    backoff = 1.0
+                    while self._running:
+                        msg = await stream.recv()
+                        self.handle_message(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.connected = False
+                if not self._running:
+                    break
+                self.reconnects += 1
+                print(f"[market_data] Stream caiu ({e}). Reconectando em {backoff:.0f}s...")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    # ------------------------------------------------------------------
+    # Mensagens
+    # ------------------------------------------------------------------
+
+    def handle_message(self, msg: Dict):
+        """Processar uma mensagem do stream combinado ({'stream', 'data'})."""
+        data = msg.get('data', msg)
+        event = data.get('e')
+
+        if event == 'error':
+            raise ConnectionError(data.get('m', 'erro no websocket'))
+
+        self.messages += 1
+
+        if event == 'kline':
+            symbol = data['s']
+            k = data['k']
+            candle = (int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v']))
+            closed = bool(k['x'])
+
+            buffer = self.buffers.get(symbol)
+            if buffer is not None:
+                buffer.upsert(candle, closed)
+            self.last_update[symbol] = time.monotonic()
+
+            if self.on_kline:
+                self.on_kline(symbol, candle, closed)
+
+        elif event == 'markPriceUpdate':
+            symbol = data['s']
+            price = float(data['p'])
+            self.mark_prices[symbol] = price
+            self.last_update[symbol] = time.monotonic()
+
+            if self.on_mark_price:
+                self.on_mark_price(symbol, price)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def seed(self, symbol: str, klines: Sequence[Sequence]):
+        """Preencher o buffer com klines REST (carga inicial ou após buraco)."""
+        buffer = self.buffers.get(symbol)
+        if buffer is not None:
+            buffer.seed(klines)
+
+    def is_live(self, symbol: str) -> bool:
+        """True se o stream está conectado e o símbolo recebeu dados recentemente."""
+        if not self.connected:
+            return False
+        last = self.last_update.get(symbol)
+        return last is not None and time.monotonic() - last < self.live_timeout
+
+    def klines(self, symbol: str, limit: int) -> Optional[List[List]]:
+        """Últimos `limit` candles do buffer, ou None se não houver histórico suficiente."""
+        buffer = self.buffers.get(symbol)
+        if buffer is None or len(buffer) < limit:
+            return None
+        return buffer.as_klines(limit)
+
+    def status(self) -> Dict:
+        return {
+            'connected': self.connected,
+            'streams': len(self.streams),
+            'messages': self.messages,
+            'reconnects': self.reconnects,
+            'live_symbols': sum(1 for s in self.symbols if self.is_live(s))
+        }
@@ -0,0 +1,347 @@
+"""
+📈 METRICS
+==========
+Métricas do bot no formato texto do Prometheus (sem dependência extra).
+
+- Counter / Gauge / Histogram com labels, criados sob demanda no registry
+- Coletores: funções chamadas na hora do scrape que leem o estado de outros
+  componentes (rate limiter, cache REST, auto-heal, ciclo...)
+- MetricsServer: /metrics (Prometheus/Grafana) e /health (health check do
+  Render) via aiohttp, e/ou o mesmo texto gravado em arquivo a cada ciclo
+- Lag do event loop: medido pelo LoopWatchdog (loop_watchdog.py)
+"""
+
+import json
+import math
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (nome, tipo, ajuda, labels, valor) devolvido pelos coletores
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def error_code(error: Exception) -> str:
+    """Código da Binance (-2022...), status HTTP ou nome da exceção."""
+    code = getattr(error, 'code', None)
+    if code is None:
+        match = re.search(r'code=(-?\d+)', str(error))
+        code = match.group(1) if match else None
+    if code is None:
+        code = getattr(error, 'status_code', None)
+    return str(code) if code is not None else type(error).__name__
+
+
+# ============================================================================
+# TIPOS DE MÉTRICA
+# ============================================================================
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels {sorted(labels)} != {sorted(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_dict(self, key: Tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    """Contador monotônico."""
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Tuple[str, Dict, float]]:
+        for key, value in self.values.items():
+            yield self.name, self._label_dict(key), value
+
+
+class Gauge(_Metric):
+    """Valor instantâneo."""
+    kind = 'gauge'
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = float(value)
+
+    def get(self, **labels) -> Optional[float]:
+        return self.values.get(self._key(labels))
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, self._label_dict(key), value
+
+
+class Histogram(_Metric):
+    """Histograma com buckets cumulativos (le) + _sum e _count."""
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: Dict[Tuple, List[int]] = {}
+        self.sums: Dict[Tuple, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+            self.sums[key] = 0.0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self.sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self.counts.get(self._key(labels), ()))
+
+    def samples(self):
+        for key, counts in self.counts.items():
+            labels = self._label_dict(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f'{self.name}_bucket', {**labels, 'le': _number(bound)}, cumulative
+            yield f'{self.name}_sum', labels, self.sums[key]
+            yield f'{self.name}_count', labels, cumulative
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class MetricsRegistry:
+    """Métricas do processo + coletores chamados na exportação."""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def _get(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, help, labelnames, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"{name} já registrada como {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help: str = '', labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str = '', labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str = '', labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def collector(self, fn: Callable[[], Iterable[Sample]]):
+        """Registrar um coletor (função sem argumentos que devolve amostras)."""
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus (0.0.4)."""
+        lines: List[str] = []
+
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+        families: Dict[str, Tuple[str, str, List[str]]] = {}
+        for collect in self.collectors:
+            try:
+                samples = list(collect())
+            except Exception as e:
+                # Coletor com erro não derruba o scrape
+                samples = [('bot_metrics_collector_errors', 'gauge', 'Coletores que falharam no scrape',
+                            {'collector': getattr(collect, '__name__', '?'), 'error': type(e).__name__}, 1)]
+            for name, kind, help, labels, value in samples:
+                if value is None:
+                    continue
+                family = re.sub(r'_(count|sum)$', '', name) if kind == 'summary' else name
+                entry = families.setdefault(family, (kind, help, []))
+                entry[2].append(f'{name}{_labels(labels)} {_number(value)}')
+
+        for family, (kind, help, sample_lines) in families.items():
+            lines.append(f'# HELP {family} {help}')
+            lines.append(f'# TYPE {family} {kind}')
+            lines.extend(sample_lines)
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """Gravar o texto (escrita atômica: tmp + replace)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Obter instância singleton do registry."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+# ============================================================================
+# SERVIDOR HTTP
+# ============================================================================
+
+class MetricsServer:
+    """
+    Exporta o registry por HTTP e/ou arquivo.
+
+    /health responde 503 quando o heartbeat (último ciclo completo) passa de
+    `stale_after` segundos - o health check reinicia o serviço travado.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        port: int = 0,
+        host: str = '0.0.0.0',
+        path: Optional[str] = None,
+        stale_after: float = 300.0
+    ):
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self.path = path
+        self.stale_after = stale_after
+        self.heartbeat: Optional[float] = None
+        self.started_at = time.monotonic()
+
+        self._runner: Optional[web.AppRunner] = None
+
+    @classmethod
+    def from_env(cls, registry: MetricsRegistry) -> 'MetricsServer':
+        return cls(
+            registry,
+            port=int(os.getenv('METRICS_PORT', 0)),
+            host=os.getenv('METRICS_HOST', '0.0.0.0'),
+            path=os.getenv('METRICS_FILE') or None,
+            stale_after=float(os.getenv('METRICS_STALE_AFTER', 300))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.port or self.path)
+
+    def beat(self):
+        """Ciclo concluído: atualizar heartbeat e, no modo arquivo, gravar o texto."""
+        self.heartbeat = time.monotonic()
+        if self.path:
+            try:
+                self.registry.write(self.path)
+            except OSError as e:
+                print(f"⚠️ [metrics] Falha ao gravar {self.path}: {e}")
+
+    def health(self) -> Dict:
+        now = time.monotonic()
+        age = now - self.heartbeat if self.heartbeat is not None else None
+        # Antes do primeiro ciclo: saudável enquanto o startup não passar do limite
+        stale = (age if age is not None else now - self.started_at) > self.stale_after
+        return {
+            'status': 'stale' if stale else 'ok',
+            'heartbeat_age': round(age, 1) if age is not None else None,
+            'uptime': round(now - self.started_at, 1)
+        }
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        if self.port:
+            app = web.Application()
+            app.router.add_get('/metrics', self._handle_metrics)
+            app.router.add_get('/health', self._handle_health)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_metrics(self, request):
+        return web.Response(body=self.registry.render().encode('utf-8'),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    async def _handle_health(self, request):
+        health = self.health()
+        return web.Response(text=json.dumps(health), content_type='application/json',
+                            status=200 if health['status'] == 'ok' else 503)
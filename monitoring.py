@@ -10,11 +10,12 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from collections import defaultdict
 
+from alert_dispatcher import AlertDispatcher
 from logging_config import get_logger, TradingLogger
 
 
 # ============================================================================
-= DATA CLASSES
+# DATA CLASSES
 # ============================================================================
 
 @dataclass
@@ -74,7 +75,7 @@ class AlertConfig:
 
 
 # ============================================================================
-= MONITOR CLASS
+# MONITOR CLASS
 # ============================================================================
 
 class TradingMonitor:
@@ -88,10 +89,15 @@ class TradingMonitor:
     - Performance
     """
 
-    def __init__(self, alert_config: AlertConfig = None):
+    def __init__(self, alert_config: AlertConfig = None, dispatcher: AlertDispatcher = None):
         self.logger = get_logger('monitor')
         self.trading_logger = TradingLogger()
         self.alert_config = alert_config or AlertConfig()
+        # Telegram em fila assíncrona: alertas nunca atrasam o fechamento do trade
+        self.dispatcher = dispatcher or AlertDispatcher.from_env(
+            token=self.alert_config.telegram_token,
+            chat_id=self.alert_config.telegram_chat_id
+        )
 
         # Estado interno
         self._trades: List[TradeMetrics] = []
@@ -273,13 +279,12 @@ class TradingMonitor:
             threshold=self.alert_config.large_loss_threshold
         )
 
-        # TODO: Enviar Telegram se configurado
-        if self.alert_config.telegram_enabled:
-            self._send_telegram_alert(
-                f"⚠️ ALERTA: Perda grande em {trade.symbol}\n"
-                f"PnL: ${trade.pnl:.2f} ({trade.pnl_percent:.2f}%)\n"
-                f"Threshold: ${self.alert_config.large_loss_threshold}"
-            )
+        self._send_telegram_alert(
+            f"⚠️ ALERTA: Perda grande em {trade.symbol}\n"
+            f"PnL: ${trade.pnl:.2f} ({trade.pnl_percent:.2f}%)\n"
+            f"Threshold: ${self.alert_config.large_loss_threshold}",
+            key='PERDA GRANDE'
+        )
 
     def _alert_large_profit(self, trade: TradeMetrics):
         """Alertar sobre lucro grande."""
@@ -300,26 +305,37 @@ class TradingMonitor:
             message=f"Posição {symbol} aberta há {hours:.1f} horas"
         )
 
-    def _send_telegram_alert(self, message: str):
-        """Enviar alerta via Telegram."""
+    def _send_telegram_alert(self, message: str, key: str = None, dedup: str = None):
+        """
+        Enfileirar alerta para o Telegram (não bloqueia).
+
+        O AlertDispatcher agrupa rajadas com a mesma `key`, ignora duplicatas
+        e faz o envio/retry em background.
+        """
         if not self.alert_config.telegram_enabled:
             return
 
-        try:
-            import requests
+        if not self.dispatcher.send(message, key=key, dedup=dedup):
+            self.logger.debug("telegram_alert_skipped", key=key)
+
+    # ========================================================================
+    # CICLO DE VIDA
+    # ========================================================================
 
-            url = f"https://api.telegram.org/bot{self.alert_config.telegram_token}/sendMessage"
-            data = {
-                'chat_id': self.alert_config.telegram_chat_id,
-                'text': message,
-                'parse_mode': 'HTML'
-            }
+    async def start(self):
+        """Rodar o envio de alertas no event loop do dono do monitor."""
+        await self.dispatcher.start()
 
-            response = requests.post(url, json=data, timeout=5)
-            response.raise_for_status()
+    async def stop(self, timeout: float = 5.0):
+        """Enviar alertas pendentes e encerrar o dispatcher."""
+        await self.dispatcher.stop(timeout)
 
-        except Exception as e:
-            self.logger.error("telegram_send_failed", error=str(e))
+    def close(self, timeout: float = 5.0):
+        """
+        Encerrar a partir de código síncrono. Sem start(), o dispatcher
+        sobe sua própria thread no primeiro alerta; close() a esvazia.
+        """
+        self.dispatcher.close(timeout)
 
     # ========================================================================
     # REPORTS
@@ -355,7 +371,7 @@ class TradingMonitor:
 
 
 # ============================================================================
-= SINGLETON
+# SINGLETON
 # ============================================================================
 
 _monitor: Optional[TradingMonitor] = None
@@ -0,0 +1,246 @@
+"""
+🛡️ PROTECTION MANAGER
+=====================
+Auto-heal de posições sem SL/TP, em paralelo.
+
+- Todas as posições desprotegidas são corrigidas ao mesmo tempo
+  (semáforo limita quantas em paralelo)
+- Klines (ATR) e filtros do símbolo buscados juntos
+- Retentativas limitadas com backoff exponencial
+- SL primeiro; TP só se a posição ainda existir
+- Métrica de tempo até proteção (detecção -> SL/TP na exchange) por posição
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from indicators import klines_to_arrays, sma
+
+
+@dataclass
+class HealRequest:
+    """Posição a proteger (ordens existentes ficam como estão)."""
+    symbol: str
+    side: str                       # 'LONG' / 'SHORT'
+    entry_price: float
+    quantity: float
+    has_sl: bool = False
+    has_tp: bool = False
+    detected_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class HealResult:
+    """Resultado do auto-heal de uma posição."""
+    symbol: str
+    sl_price: Optional[float] = None
+    tp_price: Optional[float] = None
+    sl_order_id: Optional[int] = None
+    tp_order_id: Optional[int] = None
+    protected: bool = False          # SL e TP presentes ao final
+    position_closed: bool = False    # Posição fechou durante o heal
+    attempts: int = 0
+    time_to_sl: Optional[float] = None
+    time_to_protected: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ProtectionManager:
+    """Coloca SL/TP (baseados em ATR) nas posições desprotegidas."""
+
+    def __init__(
+        self,
+        symbol_registry,
+        max_concurrency: int = 8,
+        max_attempts: int = 3,
+        base_backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        sl_atr_mult: float = 1.8,
+        tp_atr_mult: float = 3.0,
+        history_size: int = 100
+    ):
+        self.symbol_registry = symbol_registry
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.sl_atr_mult = sl_atr_mult
+        self.tp_atr_mult = tp_atr_mult
+        self.history: Deque[HealResult] = deque(maxlen=history_size)
+        self._healing: Dict[str, asyncio.Future] = {}
+
+    @classmethod
+    def from_env(cls, symbol_registry) -> 'ProtectionManager':
+        return cls(
+            symbol_registry,
+            max_concurrency=int(os.getenv('HEAL_CONCURRENCY', 8)),
+            max_attempts=int(os.getenv('HEAL_MAX_ATTEMPTS', 3)),
+            base_backoff=float(os.getenv('HEAL_BACKOFF', 0.5))
+        )
+
+    # ------------------------------------------------------------------
+    # Heal
+    # ------------------------------------------------------------------
+
+    async def heal(self, client, requests: List[HealRequest]) -> Dict[str, HealResult]:
+        """Proteger todas as posições em paralelo. Retorna resultado por símbolo."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def guarded(request: HealRequest) -> HealResult:
+            async with semaphore:
+                return await self.heal_one(client, request)
+
+        def forget(symbol: str, task: asyncio.Future):
+            if self._healing.get(symbol) is task:
+                del self._healing[symbol]
+
+        async def run_one(request: HealRequest) -> HealResult:
+            # Mesmo símbolo já em heal (outro caminho do bot): reaproveitar.
+            # Registro antes de qualquer await: dois heals do mesmo símbolo
+            # nunca colocam SL em dobro
+            task = self._healing.get(request.symbol)
+            if task is None:
+                task = asyncio.ensure_future(guarded(request))
+                self._healing[request.symbol] = task
+                # Limpa ao terminar, mesmo se quem chamou foi cancelado (watchdog)
+                task.add_done_callback(lambda t, symbol=request.symbol: forget(symbol, t))
+            return await asyncio.shield(task)
+
+        results = await asyncio.gather(*(run_one(r) for r in requests))
+        return {r.symbol: r for r in results}
+
+    async def heal_one(self, client, request: HealRequest) -> HealResult:
+        result = HealResult(symbol=request.symbol)
+        symbol = request.symbol
+        try:
+            # ATR e filtros em paralelo
+            klines, info = await asyncio.gather(
+                client.futures_klines(symbol=symbol, interval='15m', limit=100),
+                self.symbol_registry.get(client, symbol)
+            )
+            arrays = klines_to_arrays(klines)
+            atr = sma(arrays['high'] - arrays['low'], 14)[-1]
+            precision = info.price_precision
+
+            sign = 1 if request.side == 'LONG' else -1
+            result.sl_price = round(request.entry_price - sign * atr * self.sl_atr_mult, precision)
+            result.tp_price = round(request.entry_price + sign * atr * self.tp_atr_mult, precision)
+            exit_side = 'SELL' if request.side == 'LONG' else 'BUY'
+
+            has_sl = request.has_sl
+            if not has_sl:
+                order = await self._place_sl(client, request, result, exit_side, precision)
+                if order is not None:
+                    has_sl = True
+                    result.sl_order_id = order.get('orderId')
+                    result.time_to_sl = time.monotonic() - request.detected_at
+
+            has_tp = request.has_tp
+            if not has_tp and not result.position_closed:
+                if await self._position_closed(client, symbol):
+                    result.position_closed = True
+                else:
+                    order = await self._place_tp(client, request, result, exit_side)
+                    if order is not None:
+                        has_tp = True
+                        result.tp_order_id = order.get('orderId')
+
+            result.protected = has_sl and has_tp
+            if result.protected:
+                result.time_to_protected = time.monotonic() - request.detected_at
+        except Exception as e:
+            result.error = str(e)
+
+        self.history.append(result)
+        return result
+
+    async def _retry(self, result: HealResult, place):
+        """Executar `place` com backoff; retorna a ordem ou None."""
+        for attempt in range(self.max_attempts):
+            result.attempts += 1
+            try:
+                return await place()
+            except Exception as e:
+                err_str = str(e)
+                result.error = err_str
+                if "code=-2022" in err_str or "ReduceOnly" in err_str:
+                    result.position_closed = True  # SL executado: não há o que proteger
+                    return None
+                if "code=-4045" in err_str:
+                    return None  # Limite de ordens STOP: repetir não resolve
+                if attempt < self.max_attempts - 1:
+                    await asyncio.sleep(min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        return None
+
+    async def _place_sl(self, client, request: HealRequest, result: HealResult,
+                        exit_side: str, precision: int):
+        async def place():
+            try:
+                return await client.futures_create_order(
+                    symbol=request.symbol,
+                    side=exit_side,
+                    type='STOP_MARKET',
+                    stopPrice=result.sl_price,
+                    closePosition=True,
+                    workingType='MARK_PRICE',
+                    priceProtect=True
+                )
+            except Exception as e:
+                if "code=-4120" not in str(e) and "Order type not supported" not in str(e):
+                    raise
+                # Fallback para STOP (Limit)
+                limit_price = round(result.sl_price * (0.999 if exit_side == 'SELL' else 1.001), precision)
+                return await client.futures_create_order(
+                    symbol=request.symbol,
+                    side=exit_side,
+                    type='STOP',
+                    quantity=request.quantity,
+                    price=limit_price,
+                    stopPrice=result.sl_price,
+                    timeInForce='GTC'
+                )
+
+        return await self._retry(result, place)
+
+    async def _place_tp(self, client, request: HealRequest, result: HealResult, exit_side: str):
+        async def place():
+            return await client.futures_create_order(
+                symbol=request.symbol,
+                side=exit_side,
+                type='LIMIT',
+                quantity=request.quantity,
+                price=result.tp_price,
+                timeInForce='GTC',
+                reduceOnly=True
+            )
+
+        return await self._retry(result, place)
+
+    async def _position_closed(self, client, symbol: str) -> bool:
+        """Posição zerou (SL executado antes do TP)? Em caso de erro, assume aberta."""
+        try:
+            positions = await client.futures_position_information(symbol=symbol)
+        except Exception:
+            return False
+        current = next((p for p in positions if p['symbol'] == symbol), None)
+        return not current or float(current['positionAmt']) == 0
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict:
+        """Tempo até proteção dos últimos heals."""
+        times = sorted(r.time_to_protected for r in self.history if r.time_to_protected is not None)
+        return {
+            'heals': len(self.history),
+            'protected': len(times),
+            'failed': sum(1 for r in self.history if not r.protected and not r.position_closed),
+            'avg_time_to_protected': sum(times) / len(times) if times else None,
+            'max_time_to_protected': times[-1] if times else None,
+            'last': {r.symbol: r.time_to_protected for r in self.history}
+        }
@@ -0,0 +1,369 @@
+"""
+🚦 RATE LIMITER
+===============
+Cliente REST da Binance com controle de peso (X-MBX-USED-WEIGHT).
+
+- Token bucket por classe de limite: peso (REQUEST_WEIGHT/min) e ordens (ORDERS/min)
+- Faixas de prioridade: ordens > monitoramento > varredura > histórico
+  (faixas de menor prioridade deixam uma reserva do bucket para as maiores)
+- Bucket sincronizado com os headers X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-1M
+- 429/-1003: pausa global (Retry-After ou backoff exponencial) e nova tentativa
+- 418 (IP banido): pausa global até o fim do ban e erro para quem chamou
+- Métricas ao vivo (peso usado, espera por faixa, throttles)
+- Latência por endpoint, latência de ordens e erros por código no registry de métricas
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from enum import IntEnum
+from typing import Callable, Dict, Optional, Tuple
+
+from metrics import MetricsRegistry, error_code, get_metrics
+from scan_engine import klines_weight
+
+
+class Lane(IntEnum):
+    """Faixas de prioridade (menor valor = mais prioritária)."""
+    ORDER = 0
+    MONITOR = 1
+    SCAN = 2
+    HISTORY = 3
+
+
+# Fração do bucket que cada faixa não pode consumir (fica para as mais prioritárias)
+LANE_RESERVE = {
+    Lane.ORDER: 0.0,
+    Lane.MONITOR: 0.10,
+    Lane.SCAN: 0.25,
+    Lane.HISTORY: 0.50
+}
+
+
+# ============================================================================
+# PESOS DOS ENDPOINTS (Binance USDⓈ-M Futures)
+# ============================================================================
+
+def _by_symbol(with_symbol: int, without_symbol: int) -> Callable[[Dict], int]:
+    return lambda kwargs: with_symbol if kwargs.get('symbol') else without_symbol
+
+
+# método -> (peso, conta como ordem, faixa padrão)
+ENDPOINTS: Dict[str, Tuple] = {
+    'futures_create_order': (1, True, Lane.ORDER),
+    'futures_cancel_order': (1, False, Lane.ORDER),
+    'futures_cancel_all_open_orders': (1, False, Lane.ORDER),
+    'futures_change_leverage': (1, False, Lane.ORDER),
+    'futures_position_information': (5, False, Lane.MONITOR),
+    'futures_account': (5, False, Lane.MONITOR),
+    'futures_account_balance': (5, False, Lane.MONITOR),
+    'futures_get_open_orders': (_by_symbol(1, 40), False, Lane.MONITOR),
+    'futures_get_order': (1, False, Lane.MONITOR),
+    'futures_klines': (lambda kwargs: klines_weight(int(kwargs.get('limit', 500))), False, Lane.SCAN),
+    'futures_mark_price': (_by_symbol(1, 10), False, Lane.SCAN),
+    'futures_symbol_ticker': (_by_symbol(1, 2), False, Lane.SCAN),
+    'futures_exchange_info': (1, False, Lane.SCAN),
+    'futures_account_trades': (5, False, Lane.HISTORY),
+    'futures_income_history': (30, False, Lane.HISTORY)
+}
+
+
+def endpoint_cost(method: str, kwargs: Dict) -> Tuple[int, int, Lane]:
+    """(peso, ordens, faixa padrão) de uma chamada."""
+    weight, is_order, lane = ENDPOINTS.get(method, (1, False, Lane.MONITOR))
+    if callable(weight):
+        weight = weight(kwargs)
+    return weight, int(is_order), lane
+
+
+def _error_status(error: Exception) -> Optional[int]:
+    """429 (rate limit) / 418 (ban) de uma exceção da Binance (ou do mock)."""
+    status = getattr(error, 'status_code', None)
+    if status in (418, 429):
+        return status
+    if getattr(error, 'code', None) in (-1003, 1003):
+        return 429
+    return None
+
+
+# ============================================================================
+# TOKEN BUCKET
+# ============================================================================
+
+class TokenBucket:
+    """Bucket com reposição contínua (capacity por janela de `period` segundos)."""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self, reserve: float = 0.0) -> float:
+        """Tokens utilizáveis por uma faixa que deixa `reserve` do bucket livre."""
+        return self.tokens - reserve * self.capacity
+
+    def wait_time(self, cost: float, reserve: float = 0.0) -> float:
+        missing = cost - self.available(reserve)
+        return max(0.0, missing / self.rate) if self.rate else float('inf')
+
+    def sync_used(self, used: float):
+        """Ajustar pelo uso informado pelo servidor (nunca acima do estimado)."""
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+# ============================================================================
+# LIMITADOR
+# ============================================================================
+
+class RateLimiter:
+    """
+    Agenda as chamadas REST por prioridade dentro dos limites da API.
+
+    Só a chamada mais prioritária da fila pode consumir o bucket; as demais
+    esperam a reposição (ou a vez delas).
+    """
+
+    def __init__(
+        self,
+        weight_limit: int = 2400,
+        order_limit: int = 1200,
+        max_retries: int = 2,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0
+    ):
+        self.weight = TokenBucket(weight_limit)
+        self.orders = TokenBucket(order_limit)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._waiters = []   # heap de (faixa, sequência)
+        self._seq = itertools.count()
+        self._cond: Optional[asyncio.Condition] = None
+        self.blocked_until = 0.0
+        self._consecutive_throttles = 0
+
+        # Métricas
+        self.used_weight_1m: Optional[int] = None   # Último header do servidor
+        self.order_count_1m: Optional[int] = None
+        self.requests = {lane.name: 0 for lane in Lane}
+        self.weight_spent = {lane.name: 0 for lane in Lane}
+        self.wait_time = {lane.name: 0.0 for lane in Lane}
+        self.throttled = 0
+        self.banned = 0
+
+    @classmethod
+    def from_env(cls) -> 'RateLimiter':
+        return cls(
+            weight_limit=int(os.getenv('BINANCE_WEIGHT_LIMIT', 2400)),
+            order_limit=int(os.getenv('BINANCE_ORDER_LIMIT', 1200)),
+            max_retries=int(os.getenv('BINANCE_MAX_RETRIES', 2))
+        )
+
+    def _condition(self) -> asyncio.Condition:
+        # Criada no loop em uso (o limitador pode nascer fora dele)
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    # ------------------------------------------------------------------
+    # Aquisição
+    # ------------------------------------------------------------------
+
+    async def acquire(self, weight: int, orders: int = 0, lane: Lane = Lane.MONITOR):
+        """Esperar até a chamada caber no bucket (respeitando prioridade e pausas)."""
+        cond = self._condition()
+        ticket = (int(lane), next(self._seq))
+        reserve = LANE_RESERVE[Lane(lane)]
+        started = time.monotonic()
+
+        async with cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    self.weight.refill()
+                    self.orders.refill()
+                    now = time.monotonic()
+
+                    if now < self.blocked_until:
+                        delay = self.blocked_until - now
+                    elif self._waiters[0] != ticket:
+                        delay = None  # Esperar a vez (quem está na frente notifica)
+                    else:
+                        delay = max(self.weight.wait_time(weight, reserve),
+                                    self.orders.wait_time(orders, reserve) if orders else 0.0)
+                        if delay <= 0:
+                            self.weight.tokens -= weight
+                            self.orders.tokens -= orders
+                            break
+
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                cond.notify_all()
+
+        name = Lane(lane).name
+        self.requests[name] += 1
+        self.weight_spent[name] += weight
+        self.wait_time[name] += time.monotonic() - started
+
+    # ------------------------------------------------------------------
+    # Respostas
+    # ------------------------------------------------------------------
+
+    def observe_headers(self, headers):
+        """Sincronizar os buckets com X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-1M."""
+        if not headers:
+            return
+        used = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('x-mbx-used-weight-1m')
+        if used is not None:
+            self.used_weight_1m = int(used)
+            self.weight.refill()
+            self.weight.sync_used(self.used_weight_1m)
+        orders = headers.get('X-MBX-ORDER-COUNT-1M') or headers.get('x-mbx-order-count-1m')
+        if orders is not None:
+            self.order_count_1m = int(orders)
+            self.orders.refill()
+            self.orders.sync_used(self.order_count_1m)
+
+    def on_success(self):
+        self._consecutive_throttles = 0
+
+    def on_throttle(self, status: int, retry_after: Optional[float] = None) -> float:
+        """Pausar todas as faixas após 429/418. Retorna a pausa em segundos."""
+        self._consecutive_throttles += 1
+        if status == 418:
+            self.banned += 1
+            pause = retry_after or self.max_backoff * 2
+        else:
+            self.throttled += 1
+            pause = retry_after or min(self.max_backoff, self.base_backoff * 2 ** (self._consecutive_throttles - 1))
+
+        self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+        self.weight.tokens = min(self.weight.tokens, 0)  # Servidor diz que acabou
+        return pause
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def metrics(self) -> Dict:
+        """Estado atual dos limites (para logs/dashboard/métricas)."""
+        self.weight.refill()
+        self.orders.refill()
+        return {
+            'weight_limit': self.weight.capacity,
+            'weight_available': round(self.weight.tokens, 1),
+            'used_weight_1m': self.used_weight_1m,
+            'order_count_1m': self.order_count_1m,
+            'orders_available': round(self.orders.tokens, 1),
+            'queued': len(self._waiters),
+            'blocked_for': round(max(0.0, self.blocked_until - time.monotonic()), 2),
+            'throttled': self.throttled,
+            'banned': self.banned,
+            'requests': dict(self.requests),
+            'weight_spent': dict(self.weight_spent),
+            'wait_time': {k: round(v, 3) for k, v in self.wait_time.items()}
+        }
+
+
+# ============================================================================
+# CLIENTE
+# ============================================================================
+
+class RateLimitedClient:
+    """
+    Envolve o AsyncClient: métodos futures_* passam pelo RateLimiter.
+
+    A faixa vem da tabela ENDPOINTS e pode ser trocada por chamada com
+    `lane=Lane.X`. Demais atributos vão direto para o cliente original.
+    """
+
+    def __init__(self, client, limiter: Optional[RateLimiter] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.wrapped = client
+        self.limiter = limiter or RateLimiter()
+
+        metrics = metrics or get_metrics()
+        self.rest_latency = metrics.histogram(
+            'binance_rest_latency_seconds', 'Latência das chamadas REST (sem a espera do rate limiter)',
+            ('endpoint',)
+        )
+        self.order_latency = metrics.histogram(
+            'binance_order_latency_seconds', 'Latência de criação de ordens por tipo', ('type',)
+        )
+        self.api_errors = metrics.counter(
+            'binance_api_errors_total', 'Erros da API por endpoint e código', ('endpoint', 'code')
+        )
+
+    def __getattr__(self, name):
+        attr = getattr(self.wrapped, name)
+        if not name.startswith('futures_') or name.startswith('futures_stream') or not callable(attr):
+            return attr
+
+        async def call(*args, lane: Optional[Lane] = None, **kwargs):
+            return await self._call(name, attr, lane, args, kwargs)
+
+        return call
+
+    async def _call(self, name: str, method, lane: Optional[Lane], args, kwargs):
+        weight, orders, default_lane = endpoint_cost(name, kwargs)
+        lane = default_lane if lane is None else lane
+        attempt = 0
+
+        while True:
+            await self.limiter.acquire(weight, orders, lane)
+            started = time.perf_counter()
+            try:
+                result = await method(*args, **kwargs)
+            except Exception as e:
+                self._observe(name, kwargs, started, e)
+                status = _error_status(e)
+                if status is None:
+                    self.limiter.observe_headers(self._headers())
+                    raise
+                pause = self.limiter.on_throttle(status, self._retry_after())
+                print(f"⚠️ [rate-limit] {name}: HTTP {status}, pausando {pause:.1f}s")
+                if status == 418 or attempt >= self.limiter.max_retries:
+                    raise
+                attempt += 1
+                continue
+
+            self._observe(name, kwargs, started)
+            self.limiter.observe_headers(self._headers())
+            self.limiter.on_success()
+            return result
+
+    def _observe(self, name: str, kwargs: Dict, started: float, error: Optional[Exception] = None):
+        elapsed = time.perf_counter() - started
+        self.rest_latency.observe(elapsed, endpoint=name)
+        if name == 'futures_create_order':
+            self.order_latency.observe(elapsed, type=kwargs.get('type', 'UNKNOWN'))
+        if error is not None:
+            self.api_errors.inc(endpoint=name, code=error_code(error))
+
+    def _headers(self):
+        response = getattr(self.wrapped, 'response', None)
+        return getattr(response, 'headers', None)
+
+    def _retry_after(self) -> Optional[float]:
+        headers = self._headers()
+        if not headers:
+            return None
+        value = headers.get('Retry-After') or headers.get('retry-after')
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
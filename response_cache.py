@@ -0,0 +1,195 @@
+"""
+🧊 RESPONSE CACHE
+=================
+Cache read-through de curta duração para os endpoints REST de leitura.
+
+- TTL por endpoint (posições/ordens ~1s, klines ~2s, exchange info minutos)
+- Single-flight: chamadas idênticas simultâneas compartilham um request
+- Respostas derivadas: posição de um símbolo sai do snapshot de todas as
+  posições; klines com limit menor saem da cauda de um limit maior
+- Escritas (ordens, cancelamentos, alavancagem) invalidam posições e ordens
+  do símbolo, para ninguém ler estado anterior à própria ordem
+- As respostas são compartilhadas entre os chamadores: tratar como somente leitura
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+
+# Endpoint -> TTL em segundos
+DEFAULT_TTLS: Dict[str, float] = {
+    'futures_position_information': 1.0,
+    'futures_get_open_orders': 1.0,
+    'futures_account': 2.0,
+    'futures_account_balance': 2.0,
+    'futures_klines': 2.0,
+    'futures_mark_price': 1.0,
+    'futures_symbol_ticker': 1.0,
+    'futures_exchange_info': 300.0
+}
+
+# Escritas -> endpoints cujo cache fica inválido (do símbolo da escrita)
+INVALIDATES: Dict[str, Tuple[str, ...]] = {
+    'futures_create_order': ('futures_position_information', 'futures_get_open_orders',
+                             'futures_account', 'futures_account_balance'),
+    'futures_cancel_order': ('futures_get_open_orders',),
+    'futures_cancel_all_open_orders': ('futures_get_open_orders',),
+    'futures_change_leverage': ('futures_position_information',)
+}
+
+# Parâmetros que não mudam a resposta (não entram na chave)
+IGNORED_PARAMS = ('lane', 'recvWindow')
+
+
+def cache_key(method: str, kwargs: Dict) -> Tuple:
+    return (method,) + tuple(sorted((k, v) for k, v in kwargs.items() if k not in IGNORED_PARAMS))
+
+
+class CachedClient:
+    """
+    Envolve um cliente REST (AsyncClient ou RateLimitedClient) com cache.
+
+    Endpoints fora de DEFAULT_TTLS passam direto; endpoints de INVALIDATES
+    passam direto e limpam o cache relacionado.
+    """
+
+    def __init__(self, client, ttls: Optional[Dict[str, float]] = None, enabled: bool = True):
+        self.inner = client
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.enabled = enabled
+
+        self._cache: Dict[Tuple, Tuple[float, object]] = {}   # chave -> (expira_em, resposta)
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.derived = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls, client) -> 'CachedClient':
+        scale = float(os.getenv('REST_CACHE_TTL_SCALE', 1.0))
+        return cls(
+            client,
+            ttls={name: ttl * scale for name, ttl in DEFAULT_TTLS.items()},
+            enabled=os.getenv('REST_CACHE', 'true').lower() == 'true'
+        )
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if not self.enabled or not callable(attr):
+            return attr
+        if name in self.ttls:
+            async def read(*args, **kwargs):
+                if args:
+                    return await attr(*args, **kwargs)  # Chamadas posicionais: sem cache
+                return await self._read(name, attr, kwargs)
+            return read
+        if name in INVALIDATES:
+            async def write(*args, **kwargs):
+                try:
+                    return await attr(*args, **kwargs)
+                finally:
+                    self.invalidate(INVALIDATES[name], kwargs.get('symbol'))
+            return write
+        return attr
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def _fresh(self, key: Tuple):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._cache[key]
+            return None
+        return entry
+
+    def _derive(self, method: str, kwargs: Dict):
+        """Resposta a partir de outra entrada em cache (ou None)."""
+        symbol = kwargs.get('symbol')
+
+        if method == 'futures_position_information' and symbol and set(kwargs) - {'lane'} == {'symbol'}:
+            entry = self._fresh(cache_key(method, {}))
+            if entry:
+                return [p for p in entry[1] if p.get('symbol') == symbol]
+
+        if method == 'futures_klines' and set(kwargs) <= {'symbol', 'interval', 'limit', 'lane'}:
+            limit = int(kwargs.get('limit', 500))
+            for key, (expires, klines) in list(self._cache.items()):
+                if key[0] != method or expires <= time.monotonic():
+                    continue
+                params = dict(key[1:])
+                if (set(params) == {'symbol', 'interval', 'limit'} and params['symbol'] == symbol
+                        and params['interval'] == kwargs.get('interval') and int(params['limit']) >= limit):
+                    return klines[-limit:]
+        return None
+
+    async def _read(self, method: str, call, kwargs: Dict):
+        key = cache_key(method, kwargs)
+
+        entry = self._fresh(key)
+        if entry:
+            self.hits += 1
+            return entry[1]
+
+        derived = self._derive(method, kwargs)
+        if derived is not None:
+            self.derived += 1
+            return derived
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(flight)
+
+        self.misses += 1
+        flight = asyncio.ensure_future(call(**kwargs))
+        self._inflight[key] = flight
+        flight.add_done_callback(lambda f: self._settle(key, method, f))
+        # shield: cancelar um chamador não cancela o request dos outros
+        return await asyncio.shield(flight)
+
+    def _settle(self, key: Tuple, method: str, flight: asyncio.Future):
+        """Guardar a resposta (se o request não foi invalidado no meio do caminho)."""
+        if self._inflight.get(key) is not flight:
+            return
+        del self._inflight[key]
+        if not flight.cancelled() and flight.exception() is None:
+            self._cache[key] = (time.monotonic() + self.ttls[method], flight.result())
+
+    # ------------------------------------------------------------------
+    # Invalidação
+    # ------------------------------------------------------------------
+
+    def invalidate(self, methods=None, symbol: Optional[str] = None):
+        """
+        Descartar respostas (e requests em andamento) dos `methods`.
+
+        Com `symbol`, só as do símbolo e as sem símbolo (snapshot de todos).
+        """
+        self.invalidations += 1
+        for store in (self._cache, self._inflight):
+            for key in list(store):
+                if methods is not None and key[0] not in methods:
+                    continue
+                key_symbol = dict(key[1:]).get('symbol')
+                if symbol is None or key_symbol in (None, symbol):
+                    del store[key]
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses + self.coalesced + self.derived
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'derived': self.derived,
+            'invalidations': self.invalidations,
+            'hit_rate': (total - self.misses) / total if total else 0.0,
+            'entries': len(self._cache)
+        }
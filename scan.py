@@ -13,11 +13,13 @@ if sys.platform == 'win32':
         sys.stdout = codecs.getwriter('utf-8')(sys.stdout.detach())
         sys.stderr = codecs.getwriter('utf-8')(sys.stderr.detach())
 
-import pandas as pd
 from binance import AsyncClient
 import dotenv
 from colorama import Fore, Style, init
 
+from candle_store import CandleStore
+from indicators import compute_many, klines_to_arrays
+
 init(autoreset=True)
 dotenv.load_dotenv()
 
@@ -41,48 +43,26 @@ async def scan():
         'MATICUSDT', 'DOTUSDT', 'LINKUSDT', 'ATOMUSDT'
     ]
 
+    # Obter candles de todos os pares (cache local + só os candles novos)
+    store = CandleStore.from_env()
+    fetched_symbols = []
+    series = []
+    for symbol in symbols:
+        try:
+            klines = await store.recent_klines(client, symbol, '15m', 100)
+            series.append(klines_to_arrays(klines))
+            fetched_symbols.append(symbol)
+        except Exception as e:
+            print(Fore.RED + f"Erro em {symbol}: {e}")
+
+    # Indicadores de todos os pares em lote (símbolos × candles)
+    batch = compute_many(series)
+
     opportunities = []
 
-    for symbol in symbols:
+    for symbol, ind in zip(fetched_symbols, batch):
         try:
-            # Obter candles
-            klines = await client.futures_klines(symbol=symbol, interval='15m', limit=100)
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignore'
-            ])
-
-            df['close'] = df['close'].astype(float)
-            df['high'] = df['high'].astype(float)
-            df['low'] = df['low'].astype(float)
-            df['volume'] = df['volume'].astype(float)
-
-            # Indicadores
-            df['ema_9'] = df['close'].ewm(span=9).mean()
-            df['ema_21'] = df['close'].ewm(span=21).mean()
-            df['ema_50'] = df['close'].ewm(span=50).mean()
-
-            # RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
-
-            # MACD
-            df['ema_12'] = df['close'].ewm(span=12).mean()
-            df['ema_26'] = df['close'].ewm(span=26).mean()
-            df['macd'] = df['ema_12'] - df['ema_26']
-            df['macd_signal'] = df['macd'].ewm(span=9).mean()
-
-            # Bollinger
-            df['bb_middle'] = df['close'].rolling(window=20).mean()
-            df['bb_std'] = df['close'].rolling(window=20).std()
-            df['bb_upper'] = df['bb_middle'] + (df['bb_std'] * 2)
-            df['bb_lower'] = df['bb_middle'] - (df['bb_std'] * 2)
-
-            latest = df.iloc[-1]
+            latest = {key: values[-1] for key, values in ind.items()}
 
             # Score
             bullish_score = 0
@@ -109,7 +89,7 @@ async def scan():
                 bearish_score += 15
 
             # Volume
-            vol_ma = df['volume'].rolling(20).mean().iloc[-1]
+            vol_ma = latest['volume_ma']
             if latest['volume'] > vol_ma * 1.5:
                 bullish_score += 10
                 bearish_score += 10
@@ -125,7 +105,7 @@ async def scan():
             if strength >= 40:  # Reduzi de 50 para 40 (mais oportunidades)
                 # Calcular TP e SL
                 entry = latest['close']
-                atr = (df['high'] - df['low']).rolling(14).mean().iloc[-1]
+                atr = latest['hl_range']
 
                 if trend == 'LONG':
                     sl = entry - (atr * 1.5)
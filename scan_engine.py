@@ -0,0 +1,178 @@
+"""
+⚡ SCAN ENGINE
+==============
+Varredura concorrente de múltiplos símbolos.
+
+- Fan-out limitado por semáforo (não dispara 20 requests de uma vez)
+- Timeout por símbolo (um par lento não atrasa o ciclo inteiro)
+- Orçamento de peso da API por ciclo (evita 429/418 da Binance)
+- Estatísticas de tempo por ciclo
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+
+def klines_weight(limit: int) -> int:
+    """Peso de GET /fapi/v1/klines em função do limit (regras da Binance Futures)."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+# ============================================================================
+# ESTATÍSTICAS
+# ============================================================================
+
+@dataclass
+class ScanStats:
+    """Estatísticas de um ciclo de varredura."""
+    started_at: datetime
+    duration: float = 0.0
+    symbols_total: int = 0
+    analyzed: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    skipped_budget: int = 0
+    weight_used: int = 0
+    per_symbol: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def slowest(self) -> Optional[str]:
+        """Símbolo mais lento do ciclo."""
+        if not self.per_symbol:
+            return None
+        return max(self.per_symbol, key=self.per_symbol.get)
+
+    def to_dict(self) -> Dict:
+        """Versão serializável (dashboard/logs)."""
+        return {
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'duration': round(self.duration, 4),
+            'symbols_total': self.symbols_total,
+            'analyzed': self.analyzed,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'skipped_budget': self.skipped_budget,
+            'weight_used': self.weight_used,
+            'slowest': self.slowest
+        }
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+class ScanEngine:
+    """
+    Executa uma função de análise para vários símbolos em paralelo.
+
+    A função de análise recebe o símbolo e retorna um dict com pelo menos
+    'symbol' e 'strength'. O resultado da varredura é a lista ordenada por
+    força (maior primeiro).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        symbol_timeout: float = 5.0,
+        weight_budget: int = 120,
+        request_weight: int = 2,
+        history_size: int = 50
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.symbol_timeout = symbol_timeout
+        self.weight_budget = weight_budget
+        self.request_weight = request_weight
+        self.history: Deque[ScanStats] = deque(maxlen=history_size)
+        self._offset = 0  # Rotação: onde o próximo ciclo começa quando o orçamento corta a lista
+
+    @classmethod
+    def from_env(cls, request_weight: int = 2) -> 'ScanEngine':
+        """Criar engine a partir das variáveis de ambiente."""
+        return cls(
+            max_concurrency=int(os.getenv('SCAN_CONCURRENCY', 8)),
+            symbol_timeout=float(os.getenv('SCAN_SYMBOL_TIMEOUT', 5)),
+            weight_budget=int(os.getenv('SCAN_WEIGHT_BUDGET', 120)),
+            request_weight=request_weight
+        )
+
+    @property
+    def last_stats(self) -> Optional[ScanStats]:
+        return self.history[-1] if self.history else None
+
+    async def scan(
+        self,
+        symbols: List[str],
+        analyze: Callable[[str], Awaitable[Dict]]
+    ) -> List[Dict]:
+        """Analisar todos os símbolos (dentro do orçamento) e retornar ranking."""
+        stats = ScanStats(started_at=datetime.now(), symbols_total=len(symbols))
+        started = time.perf_counter()
+
+        # Orçamento de peso: símbolos que não cabem ficam para o próximo ciclo
+        if self.request_weight > 0:
+            max_symbols = self.weight_budget // self.request_weight
+        else:
+            max_symbols = len(symbols)
+        if max_symbols < len(symbols):
+            # Rodar a janela a cada ciclo para todos os pares serem analisados
+            start = self._offset % len(symbols)
+            rotated = symbols[start:] + symbols[:start]
+            allowed = rotated[:max_symbols]
+            self._offset = start + max_symbols
+        else:
+            allowed = symbols
+        stats.skipped_budget = len(symbols) - len(allowed)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(symbol: str) -> Optional[Dict]:
+            async with semaphore:
+                stats.weight_used += self.request_weight
+                t0 = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(analyze(symbol), timeout=self.symbol_timeout)
+                except asyncio.TimeoutError:
+                    stats.timeouts += 1
+                    return None
+                except Exception:
+                    stats.errors += 1
+                    return None
+                finally:
+                    stats.per_symbol[symbol] = time.perf_counter() - t0
+
+                stats.analyzed += 1
+                return result
+
+        results = await asyncio.gather(*(run_one(s) for s in allowed))
+
+        ranked = [r for r in results if r]
+        ranked.sort(key=lambda r: r.get('strength', 0), reverse=True)
+
+        stats.duration = time.perf_counter() - started
+        self.history.append(stats)
+        return ranked
+
+    def summary(self) -> Dict:
+        """Resumo dos últimos ciclos (latência média/máxima)."""
+        if not self.history:
+            return {'cycles': 0}
+
+        durations = sorted(s.duration for s in self.history)
+        return {
+            'cycles': len(durations),
+            'avg': sum(durations) / len(durations),
+            'p50': durations[len(durations) // 2],
+            'max': durations[-1],
+            'last': self.history[-1].to_dict()
+        }
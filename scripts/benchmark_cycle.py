@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latência do ciclo do AutonomousBot.
+
+Roda N passadas do loop principal (monitor_positions, save_dashboard_state,
+find_best_opportunity, enter_trade) contra o simulador de exchange
+(tests/mocks/exchange_simulator.py) com latência de rede configurável, e mostra
+p50/p99 por fase. Cada execução é acrescentada a um arquivo JSONL (com o commit
+atual) e comparada com a última execução de mesmos parâmetros: uma chamada
+REST sequencial nova aparece como regressão.
+
+Uso:
+    python scripts/benchmark_cycle.py --cycles 50 --latency 0.05 --jitter 0.02
+    python scripts/benchmark_cycle.py --cycles 50 --fail-on-regression
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from bot_master import AutonomousBot
+from rate_limiter import RateLimitedClient
+from response_cache import CachedClient
+from tests.mocks.exchange_simulator import ExchangeSimulator, LatencyClient
+
+DEFAULT_OUTPUT = ROOT_DIR / 'data' / 'benchmarks' / 'cycle_latency.jsonl'
+
+
+async def run_benchmark(cycles: int = 50, latency: float = 0.05, jitter: float = 0.0, seed: int = 42,
+                        symbols: Optional[List[str]] = None, verbose: bool = False) -> Dict:
+    """
+    Executar `cycles` passadas do bot contra o simulador; retorna o relatório.
+
+    Cada passada avança um candle (15m) no simulador e limpa o cache REST,
+    como se o intervalo real entre ciclos tivesse passado.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # Journal, dashboard e candles ficam no diretório temporário
+        try:
+            output = None if verbose else io.StringIO()
+            with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+                bot = AutonomousBot()
+                if symbols:
+                    bot.symbols = list(symbols)
+                bot.use_market_ws = False
+                bot.use_user_stream = False
+                bot.ai_client = None
+                bot.entry_confirm_delay = 0.0
+
+                warmup = bot.klines_limit
+                sim = ExchangeSimulator.synthetic(bot.symbols, n=warmup + cycles + 1, seed=seed,
+                                                  interval=bot.kline_interval, start_index=warmup)
+                network = LatencyClient(sim, latency=latency, jitter=jitter, seed=seed)
+                bot.client = CachedClient.from_env(RateLimitedClient(network, bot.rate_limiter))
+
+                await bot.symbol_registry.load(bot.client)
+                await bot.sync_open_positions()
+
+                for _ in range(cycles):
+                    await bot.run_cycle()
+                    await sim.advance()
+                    bot.client.invalidate()
+        finally:
+            os.chdir(cwd)
+
+    return {
+        'params': {'cycles': cycles, 'latency': latency, 'jitter': jitter, 'seed': seed,
+                   'symbols': len(bot.symbols)},
+        'phases': bot.cycle_metrics.summary(),
+        'requests': network.calls,
+        'fills': len(sim.fills),
+        'weight': bot.rate_limiter.metrics()['weight_spent'],
+        'cache': bot.client.stats()
+    }
+
+
+# ============================================================================
+# HISTÓRICO ENTRE COMMITS
+# ============================================================================
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def load_previous(path: Path, params: Dict) -> Optional[Dict]:
+    """Última execução gravada com os mesmos parâmetros."""
+    if not path.exists():
+        return None
+    previous = None
+    for line in path.read_text(encoding='utf-8').splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get('params') == params:
+            previous = record
+    return previous
+
+
+def append_record(path: Path, report: Dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    record = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'commit': current_commit(),
+        'params': report['params'],
+        'requests': report['requests'],
+        'phases': {name: {k: v for k, v in stats.items() if k != 'last'}
+                   for name, stats in report['phases'].items()}
+    }
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def regressions(previous: Dict, report: Dict, tolerance: float, min_delta: float) -> List[str]:
+    """Fases cujo p50 piorou mais que `tolerance` (relativo) e `min_delta` (segundos)."""
+    found = []
+    for name, stats in report['phases'].items():
+        old = previous.get('phases', {}).get(name)
+        if not old or 'p50' not in old:
+            continue
+        delta = stats['p50'] - old['p50']
+        if delta > min_delta and delta > old['p50'] * tolerance:
+            found.append(f"{name}: p50 {old['p50'] * 1000:.1f}ms -> {stats['p50'] * 1000:.1f}ms")
+    return found
+
+
+def print_report(report: Dict, previous: Optional[Dict]):
+    params = report['params']
+    print(f"[INFO] {params['cycles']} ciclos, {params['symbols']} pares, "
+          f"latência {params['latency'] * 1000:.0f}ms (+{params['jitter'] * 1000:.0f}ms jitter)")
+    print(f"{'fase':<24} {'n':>5} {'p50':>10} {'p99':>10} {'max':>10} {'p50 ant.':>10}")
+    for name, stats in report['phases'].items():
+        old = (previous or {}).get('phases', {}).get(name, {}).get('p50')
+        old_txt = f"{old * 1000:>8.1f}ms" if old is not None else f"{'-':>10}"
+        print(f"{name:<24} {stats['count']:>5} {stats['p50'] * 1000:>8.1f}ms {stats['p99'] * 1000:>8.1f}ms "
+              f"{stats['max'] * 1000:>8.1f}ms {old_txt}")
+    cache = report['cache']
+    print(f"[INFO] {report['requests']} requests REST, cache hit rate {cache['hit_rate']:.0%}, "
+          f"{report['fills']} fills, peso {report['weight']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Benchmark de latência do ciclo do bot')
+    parser.add_argument('--cycles', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05, help='Latência por chamada REST (segundos)')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Jitter uniforme adicional (segundos)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help='Histórico JSONL das execuções')
+    parser.add_argument('--no-save', action='store_true', help='Não gravar no histórico')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Piora relativa do p50 tolerada')
+    parser.add_argument('--min-delta', type=float, default=0.005, help='Piora absoluta mínima (segundos)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Sair com código 1 se houver regressão')
+    parser.add_argument('--verbose', action='store_true', help='Mostrar o log do bot')
+    args = parser.parse_args()
+
+    report = await run_benchmark(args.cycles, args.latency, args.jitter, args.seed, verbose=args.verbose)
+    output = Path(args.output)
+    previous = load_previous(output, report['params'])
+    print_report(report, previous)
+
+    found = regressions(previous, report, args.tolerance, args.min_delta) if previous else []
+    if previous:
+        print(f"[INFO] Comparado com {previous.get('commit') or '?'} ({previous.get('time')})")
+    for line in found:
+        print(f"[REGRESSÃO] {line}")
+
+    if not args.no_save:
+        append_record(output, report)
+
+    return 1 if found and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pool PostgreSQL.
+
+Dispara N queries concorrentes pelo DatabaseRepository para vários tamanhos
+de pool e mostra a vazão (queries/s). Com --serial, repete o teste com um
+lock global em volta de cada query (comportamento antigo do repository).
+
+Uso:
+    python scripts/benchmark_db_pool.py --queries 200 --sizes 1,2,5,10 --sleep 0.02
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from database.repositories import DatabaseRepository
+
+
+async def run(pool_size: int, queries: int, sleep: float, serial: bool) -> float:
+    """Executar `queries` consultas concorrentes e retornar queries/s."""
+    repo = DatabaseRepository(min_size=pool_size, max_size=pool_size)
+    await repo.connect()
+    lock = asyncio.Lock()
+
+    async def one():
+        if serial:
+            async with lock:
+                return await repo.execute("SELECT pg_sleep($1)", sleep, fetch='val')
+        return await repo.execute("SELECT pg_sleep($1)", sleep, fetch='val')
+
+    try:
+        await one()  # aquecer (prepara o statement)
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(queries)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await repo.close()
+
+    return queries / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pool PostgreSQL')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--sizes', default='1,2,5,10')
+    parser.add_argument('--sleep', type=float, default=0.02, help='Duração de cada query (pg_sleep)')
+    parser.add_argument('--serial', action='store_true', help='Comparar com lock global')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    print(f"[INFO] {args.queries} queries de {args.sleep * 1000:.0f}ms por rodada")
+    print(f"{'pool':>6} {'concorrente':>14} {'serial':>10}")
+
+    for size in sizes:
+        concurrent = await run(size, args.queries, args.sleep, serial=False)
+        serial = await run(size, args.queries, args.sleep, serial=True) if args.serial else None
+        serial_txt = f"{serial:>8.1f}/s" if serial else f"{'-':>10}"
+        print(f"{size:>6} {concurrent:>12.1f}/s {serial_txt}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -151,6 +151,12 @@ class HealthChecker:
                     data = json.load(f)
 
                 last_update = data.get('last_update', 'N/A')
+
+                # Heartbeat do publisher (mais novo que o snapshot quando nada mudou)
+                from dashboard_state import read_version
+                meta = read_version(str(dashboard_file))
+                if meta:
+                    last_update = meta.get('last_update', last_update)
                 active_trades = len(data.get('active_trades', {}))
 
                 self.log(f'Dashboard: {active_trades} posições ativas', 'info')
@@ -180,6 +186,37 @@ class HealthChecker:
             self.results['dashboard'] = {'status': 'warning', 'message': 'Sem dados ainda'}
             return True
 
+    async def check_metrics(self) -> bool:
+        """Verificar o /health do servidor de métricas do bot (se METRICS_PORT configurado)."""
+        port = int(os.getenv('METRICS_PORT', 0))
+        if not port:
+            self.results['metrics'] = {'status': 'ok', 'message': 'METRICS_PORT não configurado'}
+            return True
+
+        try:
+            import aiohttp
+
+            url = f'http://127.0.0.1:{port}/health'
+            timeout = aiohttp.ClientTimeout(total=5)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(url) as response:
+                    health = await response.json(content_type=None)
+
+            if response.status != 200:
+                self.log(f'Loop do bot parado (heartbeat {health.get("heartbeat_age")}s)', 'error')
+                self.results['metrics'] = {'status': 'error', **health}
+                self.status = 'ERROR'
+                return False
+
+            self.log(f'Métricas OK (heartbeat {health.get("heartbeat_age")}s)', 'ok')
+            self.results['metrics'] = {'status': 'ok', **health}
+            return True
+
+        except Exception as e:
+            self.log(f'Servidor de métricas indisponível: {e}', 'warning')
+            self.results['metrics'] = {'status': 'warning', 'message': str(e)}
+            return True
+
     def check_disk_space(self) -> bool:
         """Verificar espaço em disco."""
         try:
@@ -217,6 +254,7 @@ class HealthChecker:
             ('Database', self.check_database()),
             ('Binance API', self.check_binance_api()),
             ('Dashboard Data', self.check_dashboard_data()),
+            ('Metrics', self.check_metrics()),
             ('Disk Space', self.check_disk_space()),
         ]
 
@@ -8,10 +8,17 @@ Script para importar trades históricos do CSV para o banco.
 import asyncio
 import sys
 import codecs
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
+from pathlib import Path
 import asyncpg
 
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from database.repositories import bulk_import_trades, print_import_progress
+
 # Configurar UTF-8 no Windows
 if sys.platform == 'win32':
     if hasattr(sys.stdout, 'detach'):
@@ -163,7 +170,10 @@ def generate_timestamps(trades: list) -> list:
             'exit_reason': exit_reason,
             'status': 'CLOSED',
             # Quantidade estimada (assumir 1 trade = $10 notional aprox)
-            'quantity': round(10.0 / trade['entry_price'], 4)
+            'quantity': round(10.0 / trade['entry_price'], 4),
+            # SL/TP estimados (assumir 1.5x ATR)
+            'sl_price': trade['entry_price'] * 0.985 if trade['side'] == 'LONG' else trade['entry_price'] * 1.015,
+            'tp_price': trade['entry_price'] * 1.03 if trade['side'] == 'LONG' else trade['entry_price'] * 0.97
         })
 
     return result
@@ -191,25 +201,14 @@ async def migrate_trades():
         print("🕐 Gerando timestamps...")
         trades_to_insert = generate_timestamps(parsed_trades)
 
-        # Inserir símbolos primeiro
+        # Inserir símbolos primeiro (um único comando em lote)
         print("📝 Inserindo símbolos...")
-        symbols = set(t['symbol'] for t in trades_to_insert)
-        symbols_inserted = 0
-
-        for symbol in symbols:
-            exists = await conn.fetchval(
-                "SELECT COUNT(*) FROM symbols WHERE symbol = $1",
-                symbol
-            )
-
-            if exists == 0:
-                await conn.execute(
-                    "INSERT INTO symbols (symbol, is_active) VALUES ($1, true)",
-                    symbol
-                )
-                symbols_inserted += 1
-
-        print(f"   {symbols_inserted} símbolos inseridos")
+        symbols = sorted(set(t['symbol'] for t in trades_to_insert))
+        await conn.executemany(
+            "INSERT INTO symbols (symbol, is_active) VALUES ($1, true) ON CONFLICT (symbol) DO NOTHING",
+            [(symbol,) for symbol in symbols]
+        )
+        print(f"   {len(symbols)} símbolos garantidos")
 
         # Verificar quantos trades já existem
         existing = await conn.fetchval(
@@ -217,66 +216,20 @@ async def migrate_trades():
         )
         print(f"📊 Trades existentes no banco: {existing}")
 
-        # Inserir trades
+        # Importar trades: COPY para tabela temporária + merge com dedup
         print("💾 Inserindo trades no banco...")
+        started = time.perf_counter()
+        result = await bulk_import_trades(
+            conn,
+            trades_to_insert,
+            extra_columns=('exit_reason',),
+            progress=print_import_progress
+        )
+        elapsed = time.perf_counter() - started
 
-        inserted = 0
-        skipped = 0
-
-        for trade in trades_to_insert:
-            # Verificar se já existe (symbol + entry_time)
-            exists = await conn.fetchval(
-                """
-                SELECT COUNT(*) FROM trades
-                WHERE symbol = $1
-                  AND entry_time = $2
-                  AND status = 'CLOSED'
-                """,
-                trade['symbol'],
-                trade['entry_time']
-            )
-
-            if exists > 0:
-                skipped += 1
-                continue
-
-            # Inserir
-            await conn.execute(
-                """
-                INSERT INTO trades (
-                    symbol, side, entry_price, exit_price,
-                    sl_price, tp_price, quantity, pnl, pnl_percent,
-                    entry_time, exit_time, status, exit_reason
-                ) VALUES (
-                    $1, $2, $3, $4,
-                    $5, $6, $7, $8, $9,
-                    $10, $11, $12, $13
-                )
-                """,
-                trade['symbol'],
-                trade['side'],
-                trade['entry_price'],
-                trade['exit_price'],
-                # SL/TP estimados (assumir 1.5x ATR)
-                trade['entry_price'] * 0.985 if trade['side'] == 'LONG' else trade['entry_price'] * 1.015,  # SL
-                trade['entry_price'] * 1.03 if trade['side'] == 'LONG' else trade['entry_price'] * 0.97,   # TP
-                trade['quantity'],
-                trade['pnl'],
-                trade['pnl_percent'],
-                trade['entry_time'],
-                trade['exit_time'],
-                trade['status'],
-                trade['exit_reason']
-            )
-
-            inserted += 1
-
-            if inserted % 5 == 0:
-                print(f"   {inserted}/{len(trades_to_insert)} trades inseridos...")
-
-        print(f"\n✅ Migração concluída!")
-        print(f"   📥 Inseridos: {inserted}")
-        print(f"   ⏭️  Pulados (já existiam): {skipped}")
+        print(f"\n✅ Migração concluída em {elapsed:.2f}s!")
+        print(f"   📥 Inseridos: {result['inserted']}")
+        print(f"   ⏭️  Pulados (já existiam): {result['skipped']}")
 
         # Estatísticas
         stats = await conn.fetchrow("""
@@ -16,22 +16,17 @@ from binance import AsyncClient
 from colorama import Fore, Style, init
 import dotenv
 
+from symbol_registry import get_symbol_registry
+
 init(autoreset=True)
 dotenv.load_dotenv()
 
 
 async def get_precision(client, symbol):
-    """Obter precisão de preço do símbolo."""
+    """Obter precisão de preço do símbolo (registry em cache)."""
     try:
-        info = await client.futures_exchange_info()
-        symbol_info = next(s for s in info['symbols'] if s['symbol'] == symbol)
-        price_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'PRICE_FILTER'), None)
-
-        if price_filter:
-            tick_size = float(price_filter['tickSize'])
-            precision = len(str(tick_size).rstrip('0').split('.')[-1]) if '.' in str(tick_size) else 0
-            return precision
-        return 2
+        info = await get_symbol_registry().get(client, symbol)
+        return info.price_precision if info else 2
     except:
         return 2
 
@@ -11,6 +11,8 @@ from typing import Dict, List
 import pandas as pd
 import numpy as np
 
+import indicators
+
 
 class StrategyType(Enum):
     SCALPING = "scalping"
@@ -45,9 +47,9 @@ class AdvancedStrategies:
         latest = df.iloc[-1]
 
         # VWAP
-        df['vwap'] = (df['close'] * df['volume']).cumsum() / df['volume'].cumsum()
+        df['vwap'] = indicators.vwap(df['close'], df['volume'])
         vwap = df['vwap'].iloc[-1]
-        volume_ma = df['volume'].rolling(20).mean().iloc[-1]
+        volume_ma = indicators.sma(df['volume'], 20)[-1]
 
         signal = 0
         reasons = []
@@ -120,19 +122,20 @@ class AdvancedStrategies:
         latest = df.iloc[-1]
         bb_std = df['bb_std'].iloc[-1]
         atr = latest.get('atr', latest['close'] * 0.01)
-        atr_ma = df['atr'].rolling(20).mean().iloc[-1]
+        atr_ma = indicators.sma(df['atr'], 20)[-1]
+        volume_ma = indicators.sma(df['volume'], 20)[-1]
 
         signal = 0
         reasons = []
 
         # Detectar squeeze (bandas apertadas)
-        is_squeeze = bb_std < df['bb_std'].rolling(20).mean().iloc[-1] * 0.7
+        is_squeeze = bb_std < indicators.sma(df['bb_std'], 20)[-1] * 0.7
         is_low_vol = atr < atr_ma * 0.8
 
         # Breakout bullish
         if (is_squeeze and
             latest['close'] > latest['bb_upper'] and
-            latest['volume'] > df['volume'].rolling(20).mean().iloc[-1] * 1.5):
+            latest['volume'] > volume_ma * 1.5):
             signal = 1
             reasons = [
                 "BB Squeeze detectado",
@@ -143,7 +146,7 @@ class AdvancedStrategies:
         # Breakout bearish
         elif (is_squeeze and
               latest['close'] < latest['bb_lower'] and
-              latest['volume'] > df['volume'].rolling(20).mean().iloc[-1] * 1.5):
+              latest['volume'] > volume_ma * 1.5):
             signal = -1
             reasons = [
                 "BB Squeeze detectado",
@@ -264,7 +267,7 @@ class AdvancedStrategies:
         ema_50 = df['ema_50'].iloc[-1]
 
         # EMA 200
-        ema_200 = df['close'].ewm(span=200).mean().iloc[-1]
+        ema_200 = indicators.ema(df['close'], 200)[-1]
 
         signal = 0
         reasons = []
@@ -0,0 +1,192 @@
+"""
+📚 SYMBOL REGISTRY
+==================
+Cache dos filtros de negociação (exchange info) por símbolo.
+
+- Uma chamada a futures_exchange_info() na inicialização
+- Índice symbol -> SymbolInfo (tick/step, notional mínimo, precisões prontas)
+- Refresh por TTL em background (a colocação de ordens nunca espera)
+- Persistência opcional na tabela `symbols` (fallback se a API falhar)
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+
+def decimals_from_step(step) -> int:
+    """Casas decimais de um tickSize/stepSize ('0.00010000' -> 4, '1' -> 0)."""
+    exponent = Decimal(str(step)).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+# ============================================================================
+# REGISTRO POR SÍMBOLO
+# ============================================================================
+
+@dataclass(frozen=True)
+class SymbolInfo:
+    """Filtros de um símbolo com as precisões já calculadas."""
+    symbol: str
+    base_asset: str
+    quote_asset: str
+    tick_size: float
+    step_size: float
+    min_qty: float
+    min_notional: float
+    price_precision: int
+    qty_precision: int
+
+    @classmethod
+    def from_exchange(cls, s: Dict) -> 'SymbolInfo':
+        """Criar a partir de um item de futures_exchange_info()['symbols']."""
+        filters = {f['filterType']: f for f in s.get('filters', [])}
+        price_filter = filters.get('PRICE_FILTER', {})
+        lot_size = filters.get('LOT_SIZE', {})
+        min_notional = filters.get('MIN_NOTIONAL', {})
+
+        tick = price_filter.get('tickSize', '0.01')
+        step = lot_size.get('stepSize', '0.001')
+
+        return cls(
+            symbol=s['symbol'],
+            base_asset=s.get('baseAsset', ''),
+            quote_asset=s.get('quoteAsset', 'USDT'),
+            tick_size=float(tick),
+            step_size=float(step),
+            min_qty=float(lot_size.get('minQty', 0)),
+            min_notional=float(min_notional.get('notional', 0)),
+            price_precision=decimals_from_step(tick),
+            qty_precision=decimals_from_step(step)
+        )
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'SymbolInfo':
+        """Criar a partir de uma linha da tabela `symbols`."""
+        return cls(
+            symbol=row['symbol'],
+            base_asset=row['base_asset'],
+            quote_asset=row['quote_asset'],
+            tick_size=float(row['tick_size']),
+            step_size=float(row['lot_size']),
+            min_qty=0.0,
+            min_notional=float(row['min_notional']),
+            price_precision=decimals_from_step(row['tick_size']),
+            qty_precision=decimals_from_step(row['lot_size'])
+        )
+
+    def round_price(self, price: float) -> float:
+        return round(price, self.price_precision)
+
+    def round_qty(self, quantity: float) -> float:
+        return round(quantity, self.qty_precision)
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class SymbolRegistry:
+    """
+    Índice em memória dos filtros de todos os símbolos de Futures.
+
+    get() devolve o registro do cache na hora; se o TTL venceu, dispara um
+    refresh em background. Só espera a API quando o cache está vazio.
+    """
+
+    def __init__(self, ttl: float = 3600, repo=None):
+        self.ttl = ttl
+        self.repo = repo  # SymbolRepository opcional
+        self._index: Dict[str, SymbolInfo] = {}
+        self.loaded_at: Optional[float] = None
+        self.refreshes = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    @property
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl
+
+    async def load(self, client) -> int:
+        """Carregar exchange info (uma requisição) e reconstruir o índice."""
+        async with self._lock:
+            try:
+                info = await client.futures_exchange_info()
+            except Exception:
+                # API indisponível: usar o catálogo salvo no banco, se houver
+                if not self._index and self.repo:
+                    rows = await self.repo.get_all_symbols()
+                    self._index = {r['symbol']: SymbolInfo.from_row(r) for r in rows}
+                    if self._index:
+                        self.loaded_at = time.monotonic()
+                        return len(self._index)
+                raise
+
+            index = {}
+            for s in info.get('symbols', []):
+                if s.get('status', 'TRADING') != 'TRADING':
+                    continue
+                index[s['symbol']] = SymbolInfo.from_exchange(s)
+
+            self._index = index
+            self.loaded_at = time.monotonic()
+            self.refreshes += 1
+
+        if self.repo:
+            try:
+                await self.repo.upsert_symbols(list(index.values()))
+            except Exception as e:
+                print(f"[symbol_registry] Falha ao salvar símbolos no banco: {e}")
+
+        return len(index)
+
+    async def get(self, client, symbol: str) -> Optional[SymbolInfo]:
+        """Registro do símbolo (carrega na primeira vez; refresh em background se vencido)."""
+        if not self._index:
+            await self.load(client)
+        elif self.is_stale:
+            self._schedule_refresh(client)
+        return self._index.get(symbol)
+
+    def get_cached(self, symbol: str) -> Optional[SymbolInfo]:
+        """Registro do cache, sem nenhuma chamada de rede."""
+        return self._index.get(symbol)
+
+    def symbols(self) -> List[str]:
+        return list(self._index)
+
+    def _schedule_refresh(self, client):
+        if self._refresh_task and not self._refresh_task.done():
+            return
+
+        async def refresh():
+            try:
+                await self.load(client)
+            except Exception as e:
+                print(f"[symbol_registry] Refresh falhou, mantendo cache: {e}")
+
+        self._refresh_task = asyncio.create_task(refresh())
+
+
+# ============================================================================
+# SINGLETON
+# ============================================================================
+
+_registry: Optional[SymbolRegistry] = None
+
+
+def get_symbol_registry() -> SymbolRegistry:
+    """Obter instância singleton do registry."""
+    global _registry
+    if _registry is None:
+        _registry = SymbolRegistry(ttl=float(os.getenv('SYMBOL_INFO_TTL', 3600)))
+    return _registry
@@ -9,6 +9,10 @@ from typing import Dict, List, Optional
 from unittest.mock import AsyncMock
 import asyncio
 
+import numpy as np
+import pandas as pd
+import pytest
+
 
 class MockBinanceAPIException(Exception):
     """Exception simulando BinanceAPIException."""
@@ -389,7 +393,7 @@ class MockBinanceClient:
 
 
 # ============================================================================
-= PYTEST FIXTURES
+# PYTEST FIXTURES
 # ============================================================================
 
 @pytest.fixture
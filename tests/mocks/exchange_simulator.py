@@ -0,0 +1,586 @@
+"""
+🏟️ EXCHANGE SIMULATOR
+=====================
+Simulador determinístico da Binance Futures (sobre o MockBinanceClient).
+
+- Relógio virtual: o mercado só anda com advance() (horas em segundos)
+- Candles gravados (CandleStore / klines REST), trades agregados ou sintéticos
+  com seed (mesma seed = mesmo caminho de preços)
+- Caminho de preço dentro do candle: O -> L -> H -> C (alta) ou O -> H -> L -> C (baixa)
+- Ordens MARKET, LIMIT, STOP, STOP_MARKET, TAKE_PROFIT(_MARKET), reduceOnly e
+  closePosition casadas contra esse caminho (gaps executam no preço do gap)
+- Eventos no formato do user data stream (ORDER_TRADE_UPDATE / ACCOUNT_UPDATE)
+- Peso da API por minuto (virtual) com headers X-MBX-USED-WEIGHT-1M e HTTP 429
+- LatencyClient: latência de rede configurável por chamada (benchmarks)
+"""
+
+import asyncio
+import inspect
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from candle_store import CANDLE_DTYPE, klines_to_records
+from indicators import interval_to_ms
+from rate_limiter import endpoint_cost
+from tests.mocks.binance_mock import MockBinanceAPIException, MockBinanceClient
+
+
+class SimulatedAPIError(MockBinanceAPIException):
+    """Erro com a mesma representação do BinanceAPIException (code=-XXXX)."""
+
+    def __init__(self, code: int, message: str, status_code: int = 400):
+        super().__init__(code, message)
+        self.status_code = status_code
+
+    def __str__(self):
+        return f"APIError(code={self.code}): {self.message}"
+
+
+STOP_TYPES = ('STOP', 'STOP_MARKET')
+TAKE_PROFIT_TYPES = ('TAKE_PROFIT', 'TAKE_PROFIT_MARKET')
+
+
+# ============================================================================
+# DADOS DE MERCADO
+# ============================================================================
+
+def synthetic_candles(start_price: float, n: int, interval_ms: int, seed: int,
+                      start_ms: int = 1_700_006_400_000, volatility: float = 0.004) -> np.ndarray:
+    """Candles sintéticos (passeio aleatório log-normal) determinísticos pela seed."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, volatility, n)
+    closes = start_price * np.exp(np.cumsum(returns))
+    opens = np.concatenate([[start_price], closes[:-1]])
+    wick = np.abs(rng.normal(0, volatility / 2, (2, n)))
+
+    candles = np.empty(n, dtype=CANDLE_DTYPE)
+    candles['open_time'] = start_ms + np.arange(n, dtype=np.int64) * interval_ms
+    candles['open'] = opens
+    candles['close'] = closes
+    candles['high'] = np.maximum(opens, closes) * (1 + wick[0])
+    candles['low'] = np.minimum(opens, closes) * (1 - wick[1])
+    candles['volume'] = rng.uniform(100, 1000, n)
+    return candles
+
+
+def candles_from_trades(trades: Sequence[Tuple[int, float, float]], interval_ms: int) -> np.ndarray:
+    """Agregar trades (time_ms, preço, quantidade) em candles OHLCV."""
+    trades = sorted(trades)
+    buckets: Dict[int, List] = {}
+    for time_ms, price, qty in trades:
+        buckets.setdefault(time_ms - time_ms % interval_ms, []).append((price, qty))
+
+    candles = np.empty(len(buckets), dtype=CANDLE_DTYPE)
+    for i, open_time in enumerate(sorted(buckets)):
+        prices = [p for p, _ in buckets[open_time]]
+        candles[i] = (open_time, prices[0], max(prices), min(prices), prices[-1],
+                      sum(q for _, q in buckets[open_time]))
+    return candles
+
+
+def price_path(candle) -> List[float]:
+    """Caminho de preço assumido dentro do candle."""
+    o, h, l, c = float(candle['open']), float(candle['high']), float(candle['low']), float(candle['close'])
+    return [o, l, h, c] if c >= o else [o, h, l, c]
+
+
+# ============================================================================
+# SIMULADOR
+# ============================================================================
+
+class ExchangeSimulator(MockBinanceClient):
+    """
+    Exchange determinística para replay e testes de carga.
+
+    O candle em formação expõe só o preço de abertura; advance() percorre o
+    caminho dele, executa as ordens tocadas e o fecha.
+    """
+
+    def __init__(
+        self,
+        candles: Dict[str, object],
+        interval: str = '15m',
+        start_index: int = 100,
+        balance: float = 1000.0,
+        taker_fee: float = 0.0004,
+        maker_fee: float = 0.0002,
+        weight_limit: Optional[int] = 2400
+    ):
+        super().__init__()
+        self.interval = interval
+        self.interval_ms = interval_to_ms(interval)
+        self.candles: Dict[str, np.ndarray] = {
+            symbol: data if isinstance(data, np.ndarray) else klines_to_records(data)
+            for symbol, data in candles.items()
+        }
+        first = next(iter(self.candles.values()))
+        self.now_ms = int(first['open_time'][min(start_index, len(first) - 1)])
+
+        self.balance = balance
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.weight_limit = weight_limit
+
+        self.fills: List[Dict] = []
+        self.events: List[Dict] = []
+        self.listeners: List[Callable] = []
+        self.used_weight: Dict[int, int] = {}   # minuto virtual -> peso
+        self.response = None
+        self._fill_id = 0
+
+    @classmethod
+    def synthetic(cls, symbols: Sequence[str], n: int = 500, seed: int = 42,
+                  interval: str = '15m', **kwargs) -> 'ExchangeSimulator':
+        """Simulador com candles sintéticos (um seed derivado por símbolo)."""
+        interval_ms = interval_to_ms(interval)
+        prices = MockBinanceClient()._prices
+        candles = {
+            symbol: synthetic_candles(prices.get(symbol, 100.0), n, interval_ms, seed + i)
+            for i, symbol in enumerate(symbols)
+        }
+        return cls(candles, interval=interval, **kwargs)
+
+    @classmethod
+    def from_store(cls, store, symbols: Sequence[str], interval: str = '15m',
+                   start_ms: Optional[int] = None, end_ms: Optional[int] = None, **kwargs) -> 'ExchangeSimulator':
+        """Replay de candles gravados no CandleStore."""
+        candles = {s: store.read(s, interval, start_ms, end_ms) for s in symbols}
+        return cls(candles, interval=interval, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Relógio e mercado
+    # ------------------------------------------------------------------
+
+    def _index(self, symbol: str) -> int:
+        """Índice do candle em formação de `symbol` no instante atual."""
+        times = self.candles[symbol]['open_time']
+        return int(np.searchsorted(times, self.now_ms, side='right')) - 1
+
+    def _get_price(self, symbol: str) -> float:
+        if symbol not in self.candles:
+            return super()._get_price(symbol)
+        i = self._index(symbol)
+        data = self.candles[symbol]
+        if i < 0:
+            return float(data['open'][0])
+        if self.now_ms >= int(data['open_time'][-1]) + self.interval_ms:
+            return float(data['close'][-1])  # Replay acabou: último fechamento
+        return float(data['open'][i])
+
+    @property
+    def finished(self) -> bool:
+        return all(self.now_ms >= int(c['open_time'][-1]) + self.interval_ms for c in self.candles.values())
+
+    async def advance(self, candles: int = 1) -> int:
+        """Andar `candles` candles no tempo virtual. Retorna quantos foram processados."""
+        processed = 0
+        for _ in range(candles):
+            if self.finished:
+                break
+            for symbol, data in self.candles.items():
+                i = self._index(symbol)
+                if i >= 0 and self.now_ms < int(data['open_time'][-1]) + self.interval_ms:
+                    await self._walk(symbol, data[i])
+            self.now_ms += self.interval_ms
+            processed += 1
+        await self._flush_events()
+        return processed
+
+    async def run_until(self, end_ms: int, step: int = 1):
+        while self.now_ms < end_ms and not self.finished:
+            await self.advance(step)
+
+    async def _walk(self, symbol: str, candle):
+        """Percorrer o caminho do candle executando as ordens tocadas, em ordem."""
+        path = price_path(candle)
+        steps = len(path) - 1
+        for k in range(steps):
+            p0, p1 = path[k], path[k + 1]
+            t = self.now_ms + int(self.interval_ms * k / steps)
+            while True:
+                hit = self._first_trigger(symbol, p0, p1)
+                if hit is None:
+                    break
+                order, price = hit
+                self._execute(order, price, t)
+                p0 = price  # Continuar do ponto da execução
+
+    def _first_trigger(self, symbol: str, p0: float, p1: float) -> Optional[Tuple[Dict, float]]:
+        best = None
+        for order in self.orders.values():
+            if order['symbol'] != symbol or order['status'] != 'NEW':
+                continue
+            trigger = self._trigger_price(order, p0, p1)
+            if trigger is None:
+                continue
+            distance = abs(trigger - p0)
+            if best is None or distance < best[0]:
+                best = (distance, order, trigger)
+        return (best[1], best[2]) if best else None
+
+    @staticmethod
+    def _trigger_price(order: Dict, p0: float, p1: float) -> Optional[float]:
+        """Preço de execução se o segmento p0 -> p1 toca a ordem (gap: executa em p0)."""
+        lo, hi = min(p0, p1), max(p0, p1)
+        side, otype = order['side'], order['type']
+
+        if otype == 'LIMIT':
+            level = float(order['price'])
+            if side == 'BUY' and lo <= level:
+                return min(p0, level)
+            if side == 'SELL' and hi >= level:
+                return max(p0, level)
+            return None
+
+        level = float(order['stopPrice'])
+        falling = (side == 'SELL') == (otype in STOP_TYPES)   # SL de LONG / TP de SHORT
+        if falling and lo <= level:
+            price = min(p0, level)
+        elif not falling and hi >= level:
+            price = max(p0, level)
+        else:
+            return None
+        if otype in ('STOP', 'TAKE_PROFIT'):
+            return float(order['price'])  # Stop-limit: executa no preço limite
+        return price
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def _position(self, symbol: str) -> Dict:
+        return self.positions.setdefault(symbol, {'amount': 0.0, 'entry_price': 0.0, 'pnl': 0.0})
+
+    def _execute(self, order: Dict, price: float, time_ms: int):
+        position = self._position(order['symbol'])
+        amount = position['amount']
+        sign = 1 if order['side'] == 'BUY' else -1
+
+        if order.get('closePosition') or order.get('reduceOnly'):
+            # Só reduz: sem posição (ou do mesmo lado) a ordem expira
+            if amount == 0 or (amount > 0) == (sign > 0):
+                order['status'] = 'EXPIRED'
+                self._emit_order(order, 'EXPIRED', 0.0, 0.0, 0.0, 0.0, time_ms)
+                return
+            qty = abs(amount) if order.get('closePosition') else min(float(order['origQty']), abs(amount))
+        else:
+            qty = float(order['origQty'])
+
+        maker = order['type'] == 'LIMIT'
+        self._fill(order, qty, price, time_ms, maker)
+
+    def _fill(self, order: Dict, qty: float, price: float, time_ms: int, maker: bool = False):
+        symbol = order['symbol']
+        position = self._position(symbol)
+        amount = position['amount']
+        delta = qty if order['side'] == 'BUY' else -qty
+
+        realized = 0.0
+        if amount != 0 and (amount > 0) != (delta > 0):
+            closed = min(abs(amount), abs(delta))
+            realized = (price - position['entry_price']) * closed * (1 if amount > 0 else -1)
+
+        new_amount = round(amount + delta, 12)
+        if new_amount == 0:
+            position['entry_price'] = 0.0
+        elif amount == 0 or (amount > 0) != (new_amount > 0):
+            position['entry_price'] = price  # Abriu ou virou de lado
+        elif abs(new_amount) > abs(amount):
+            position['entry_price'] = (position['entry_price'] * abs(amount) + price * abs(delta)) / abs(new_amount)
+        position['amount'] = new_amount
+
+        commission = qty * price * (self.maker_fee if maker else self.taker_fee)
+        self.balance += realized - commission
+
+        order['status'] = 'FILLED'
+        order['executedQty'] = str(qty)
+        order['avgPrice'] = str(price)
+
+        self._fill_id += 1
+        self.fills.append({
+            'id': self._fill_id, 'symbol': symbol, 'orderId': order['orderId'], 'side': order['side'],
+            'price': str(price), 'qty': str(qty), 'realizedPnl': str(realized),
+            'commission': str(commission), 'commissionAsset': 'USDT', 'time': time_ms,
+            'maker': maker, 'buyer': order['side'] == 'BUY'
+        })
+
+        self._emit_order(order, 'FILLED', qty, price, realized, commission, time_ms)
+        self._emit_account(symbol, time_ms)
+
+    # ------------------------------------------------------------------
+    # Eventos (formato do user data stream)
+    # ------------------------------------------------------------------
+
+    def _emit_order(self, order: Dict, status: str, qty: float, price: float,
+                    realized: float, commission: float, time_ms: int):
+        self.events.append({
+            'e': 'ORDER_TRADE_UPDATE', 'E': time_ms, 'T': time_ms,
+            'o': {
+                's': order['symbol'], 'c': order.get('clientOrderId', ''), 'S': order['side'],
+                'o': 'MARKET' if status == 'FILLED' and 'MARKET' in order['type'] else order['type'],
+                'ot': order['type'], 'x': 'TRADE' if status == 'FILLED' else status, 'X': status,
+                'i': order['orderId'], 'l': str(qty), 'z': str(qty), 'L': str(price), 'ap': str(price),
+                'n': str(commission), 'N': 'USDT', 'T': time_ms, 'R': bool(order.get('reduceOnly')),
+                'cp': bool(order.get('closePosition')), 'rp': str(realized)
+            }
+        })
+
+    def _emit_account(self, symbol: str, time_ms: int):
+        position = self._position(symbol)
+        mark = self._get_price(symbol)
+        self.events.append({
+            'e': 'ACCOUNT_UPDATE', 'E': time_ms, 'T': time_ms,
+            'a': {
+                'm': 'ORDER',
+                'B': [{'a': 'USDT', 'wb': str(self.balance), 'cw': str(self.balance)}],
+                'P': [{
+                    's': symbol, 'pa': str(position['amount']), 'ep': str(position['entry_price']),
+                    'up': str((mark - position['entry_price']) * position['amount']), 'ps': 'BOTH'
+                }]
+            }
+        })
+
+    async def _flush_events(self):
+        """Entregar eventos pendentes aos listeners (ex.: UserDataStream.handle_message)."""
+        if not self.listeners:
+            return
+        while self.events:
+            event = self.events.pop(0)
+            for listener in self.listeners:
+                result = listener(event)
+                if inspect.isawaitable(result):
+                    await result
+
+    def drain_events(self) -> List[Dict]:
+        events, self.events = self.events, []
+        return events
+
+    # ------------------------------------------------------------------
+    # Peso da API
+    # ------------------------------------------------------------------
+
+    def _charge(self, method: str, kwargs: Dict):
+        self.request_count += 1
+        weight = endpoint_cost(method, kwargs)[0]
+        minute = self.now_ms // 60_000
+        used = self.used_weight.get(minute, 0) + weight
+        self.used_weight = {minute: used}  # Só a janela atual importa
+
+        headers = {'X-MBX-USED-WEIGHT-1M': str(used)}
+        self.response = SimpleNamespace(headers=headers)
+        if self.weight_limit is not None and used > self.weight_limit:
+            self.rate_limit_triggered = True
+            headers['Retry-After'] = str(60 - (self.now_ms // 1000) % 60)
+            raise SimulatedAPIError(-1003, 'Too many requests; current limit is exceeded.', status_code=429)
+
+    # ------------------------------------------------------------------
+    # API REST
+    # ------------------------------------------------------------------
+
+    async def futures_account(self, **kwargs) -> Dict:
+        self._charge('futures_account', kwargs)
+        unrealized = sum((self._get_price(s) - p['entry_price']) * p['amount'] for s, p in self.positions.items())
+        return {
+            'totalWalletBalance': str(self.balance),
+            'totalUnrealizedProfit': str(unrealized),
+            'availableBalance': str(self.balance + min(0.0, unrealized)),
+            'maxWithdrawAmount': str(self.balance)
+        }
+
+    async def futures_position_information(self, symbol: Optional[str] = None, **kwargs) -> List[Dict]:
+        self._charge('futures_position_information', {'symbol': symbol, **kwargs})
+        symbols = [symbol] if symbol else list(self.candles)
+        result = []
+        for s in symbols:
+            position = self.positions.get(s, {'amount': 0.0, 'entry_price': 0.0})
+            mark = self._get_price(s)
+            result.append({
+                'symbol': s,
+                'positionAmt': str(position['amount']),
+                'entryPrice': str(position['entry_price']),
+                'markPrice': str(mark),
+                'unRealizedProfit': str((mark - position['entry_price']) * position['amount']),
+                'leverage': str(self.leverage),
+                'positionSide': 'BOTH'
+            })
+        return result
+
+    async def futures_change_leverage(self, symbol: str, leverage: int, **kwargs) -> Dict:
+        self._charge('futures_change_leverage', kwargs)
+        return await super().futures_change_leverage(symbol, leverage)
+
+    async def futures_create_order(self, symbol: str, side: str, type: str, quantity: Optional[float] = None,
+                                   price: Optional[float] = None, stopPrice: Optional[float] = None,
+                                   **kwargs) -> Dict:
+        self._charge('futures_create_order', kwargs)
+        reduce_only = str(kwargs.get('reduceOnly', False)).lower() == 'true'
+        close_position = str(kwargs.get('closePosition', False)).lower() == 'true'
+        mark = self._get_price(symbol)
+        amount = self._position(symbol)['amount']
+
+        if reduce_only and (amount == 0 or (amount > 0) == (side == 'BUY')):
+            raise SimulatedAPIError(-2022, 'ReduceOnly Order is rejected.')
+        if stopPrice is not None:
+            falling = (side == 'SELL') == (type in STOP_TYPES)
+            if (falling and mark <= float(stopPrice)) or (not falling and mark >= float(stopPrice)):
+                raise SimulatedAPIError(-2021, 'Order would immediately trigger.')
+        if type == 'MARKET' and quantity and quantity * mark < self._get_min_notional(symbol) and not reduce_only:
+            raise SimulatedAPIError(-4164, "Order's notional must be no smaller than 5.0")
+
+        order_id = self._order_id_counter
+        self._order_id_counter += 1
+        order = {
+            'orderId': order_id, 'symbol': symbol, 'side': side, 'type': type, 'status': 'NEW',
+            'origQty': str(quantity or 0), 'executedQty': '0', 'reduceOnly': reduce_only,
+            'closePosition': close_position, 'updateTime': self.now_ms,
+            'clientOrderId': kwargs.get('newClientOrderId', f'sim-{order_id}')
+        }
+        if price is not None:
+            order['price'] = str(price)
+        if stopPrice is not None:
+            order['stopPrice'] = str(stopPrice)
+        self.orders[order_id] = order
+
+        if type == 'MARKET':
+            self._execute(order, mark, self.now_ms)
+        elif type == 'LIMIT':
+            # LIMIT que já cruza o preço executa na hora (taker)
+            if (side == 'BUY' and mark <= float(price)) or (side == 'SELL' and mark >= float(price)):
+                self._execute(order, mark, self.now_ms)
+        await self._flush_events()
+        return dict(order)
+
+    async def futures_cancel_order(self, symbol: str, orderId: int, **kwargs) -> Dict:
+        self._charge('futures_cancel_order', kwargs)
+        order = self.orders.get(orderId)
+        if order is None or order['status'] != 'NEW':
+            raise SimulatedAPIError(-2011, 'Unknown order sent.')
+        order['status'] = 'CANCELED'
+        self._emit_order(order, 'CANCELED', 0.0, 0.0, 0.0, 0.0, self.now_ms)
+        await self._flush_events()
+        return dict(order)
+
+    async def futures_cancel_all_open_orders(self, symbol: str, **kwargs) -> Dict:
+        self._charge('futures_cancel_all_open_orders', kwargs)
+        for order in self.orders.values():
+            if order['symbol'] == symbol and order['status'] == 'NEW':
+                order['status'] = 'CANCELED'
+        return {'code': 200, 'msg': 'The operation of cancel all open order is done.'}
+
+    async def futures_get_open_orders(self, symbol: Optional[str] = None, **kwargs) -> List[Dict]:
+        self._charge('futures_get_open_orders', {'symbol': symbol, **kwargs})
+        return [dict(o) for o in self.orders.values()
+                if o['status'] == 'NEW' and (symbol is None or o['symbol'] == symbol)]
+
+    async def futures_klines(self, symbol: str, interval: str, limit: int = 500,
+                             startTime: Optional[int] = None, endTime: Optional[int] = None, **kwargs) -> List[List]:
+        self._charge('futures_klines', {'limit': limit})
+        if interval != self.interval:
+            raise SimulatedAPIError(-1120, f'Simulador só tem candles {self.interval}.')
+        data = self.candles[symbol]
+        current = self._index(symbol)
+
+        closed = len(data) if self.finished else max(current, 0)
+        visible = data[:closed]  # Fechados
+        if startTime is not None:
+            visible = visible[visible['open_time'] >= startTime]
+        if endTime is not None:
+            visible = visible[visible['open_time'] <= endTime]
+
+        klines = [
+            [int(c['open_time']), str(c['open']), str(c['high']), str(c['low']), str(c['close']),
+             str(c['volume']), int(c['open_time']) + self.interval_ms - 1]
+            for c in visible
+        ]
+        if endTime is None and current >= 0 and not self.finished:
+            # Candle em formação: só a abertura é conhecida
+            c = data[current]
+            o = str(c['open'])
+            klines.append([int(c['open_time']), o, o, o, o, '0', int(c['open_time']) + self.interval_ms - 1])
+        return klines[:limit] if startTime is not None else klines[-limit:]
+
+    async def futures_mark_price(self, symbol: Optional[str] = None, **kwargs):
+        self._charge('futures_mark_price', {'symbol': symbol})
+        items = [{'symbol': s, 'markPrice': str(self._get_price(s)), 'time': self.now_ms}
+                 for s in ([symbol] if symbol else self.candles)]
+        return items[0] if symbol else items
+
+    async def futures_symbol_ticker(self, symbol: Optional[str] = None, **kwargs):
+        self._charge('futures_symbol_ticker', {'symbol': symbol})
+        items = [{'symbol': s, 'price': str(self._get_price(s)), 'time': self.now_ms}
+                 for s in ([symbol] if symbol else self.candles)]
+        return items[0] if symbol else items
+
+    async def futures_exchange_info(self, **kwargs) -> Dict:
+        self._charge('futures_exchange_info', kwargs)
+        symbols = []
+        for symbol in self.candles:
+            f = self._symbol_filters.get(symbol) or self._default_filters(float(self.candles[symbol]['open'][0]))
+            symbols.append({
+                'symbol': symbol, 'baseAsset': symbol[:-4], 'quoteAsset': 'USDT', 'status': 'TRADING',
+                'filters': [
+                    {'filterType': 'PRICE_FILTER', 'tickSize': str(f['tick_size'])},
+                    {'filterType': 'LOT_SIZE', 'stepSize': str(f['lot_size']), 'minQty': str(f['lot_size'])},
+                    {'filterType': 'MIN_NOTIONAL', 'notional': str(f['min_notional'])}
+                ]
+            })
+        return {'symbols': symbols}
+
+    @staticmethod
+    def _default_filters(price: float) -> Dict:
+        """Filtros para símbolos sem cadastro no mock: tick com ~5 dígitos significativos."""
+        tick = 10.0 ** (int(np.floor(np.log10(price))) - 4)
+        step = 10.0 ** max(-3, int(np.floor(np.log10(5.0 / price))))
+        return {'tick_size': float(f'{tick:.0e}'), 'lot_size': float(f'{step:.0e}'), 'min_notional': 5.0}
+
+    async def futures_account_trades(self, symbol: str, limit: int = 500, fromId: Optional[int] = None,
+                                     startTime: Optional[int] = None, endTime: Optional[int] = None,
+                                     **kwargs) -> List[Dict]:
+        self._charge('futures_account_trades', kwargs)
+        fills = [f for f in self.fills if f['symbol'] == symbol]
+        if fromId is not None:
+            fills = [f for f in fills if f['id'] >= fromId]
+        if startTime is not None:
+            fills = [f for f in fills if f['time'] >= startTime]
+        if endTime is not None:
+            fills = [f for f in fills if f['time'] <= endTime]
+        if fromId is None and startTime is None:
+            return [dict(f) for f in fills[-limit:]]  # Sem cursor: os mais recentes
+        return [dict(f) for f in fills[:limit]]
+
+    async def close_connection(self):
+        return None
+
+
+# ============================================================================
+# LATÊNCIA DE REDE
+# ============================================================================
+
+class LatencyClient:
+    """
+    Envolve o simulador com latência de rede em cada chamada REST.
+
+    Atraso = latency + jitter uniforme (seedado), em segundos de relógio real.
+    """
+
+    def __init__(self, client, latency: float = 0.05, jitter: float = 0.0, seed: int = 0):
+        self.inner = client
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = np.random.default_rng(seed)
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if not name.startswith('futures_') or not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            self.calls += 1
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return await attr(*args, **kwargs)
+        return call
@@ -0,0 +1,154 @@
+"""
+🧠 TESTS DO AI ADVISOR
+=======================
+Cache, deduplicação, timeout e avaliação concorrente.
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from ai_advisor import AIAdvisor, build_prompt, signal_key
+
+
+def make_signal(symbol='BTCUSDT', rsi=55.0, macd=0.5, rel_volume=1.1, trend='LONG'):
+    return {
+        'symbol': symbol, 'trend': trend, 'entry': 100.0, 'strength': 60,
+        'signals': {'rsi': rsi, 'macd': macd, 'rel_volume': rel_volume}
+    }
+
+
+class FakeCompletions:
+    """Imita client.chat.completions com atraso e resposta configuráveis."""
+
+    def __init__(self, delay=0.05, decision='GO'):
+        self.delay = delay
+        self.decision = decision
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        content = json.dumps({'decision': self.decision, 'sentiment': 70, 'reason': 'ok'})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def make_advisor(completions, **kwargs):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return AIAdvisor(client=client, **kwargs)
+
+
+class TestSignalKey:
+    """Testes para a chave de cache quantizada."""
+
+    def test_small_changes_share_key(self):
+        """Variações pequenas de RSI/volume caem na mesma chave."""
+        a = signal_key('BTCUSDT', make_signal(rsi=56.1, rel_volume=1.1))
+        b = signal_key('BTCUSDT', make_signal(rsi=58.9, rel_volume=1.05))
+        assert a == b
+
+    def test_relevant_changes_change_key(self):
+        """Mudança de faixa de RSI, sinal do MACD ou tendência muda a chave."""
+        base = signal_key('BTCUSDT', make_signal())
+        assert signal_key('BTCUSDT', make_signal(rsi=72)) != base
+        assert signal_key('BTCUSDT', make_signal(macd=-0.1)) != base
+        assert signal_key('BTCUSDT', make_signal(trend='SHORT')) != base
+        assert signal_key('ETHUSDT', make_signal()) != base
+
+    def test_non_finite_signals_use_defaults(self):
+        """RSI NaN (janela sem variação), inf ou volume NaN não quebram a chave."""
+        nan, inf = float('nan'), float('inf')
+        base = signal_key('BTCUSDT', make_signal(rsi=50.0, rel_volume=1.0))
+        assert signal_key('BTCUSDT', make_signal(rsi=nan, rel_volume=nan)) == base
+        assert signal_key('BTCUSDT', make_signal(rsi=inf, rel_volume=1.0)) == base
+        assert signal_key('BTCUSDT', make_signal(rsi=None, macd=nan))[3] is False
+
+    def test_prompt_contains_signals(self):
+        """Prompt inclui símbolo e indicadores formatados."""
+        prompt = build_prompt('BTCUSDT', make_signal(rsi=55.0))
+        assert 'BTCUSDT' in prompt and 'RSI: 55.00' in prompt
+
+
+class TestAIAdvisor:
+    """Testes para AIAdvisor."""
+
+    def test_cache_avoids_duplicate_calls(self):
+        """Mesmo sinal dentro do TTL não gera nova chamada paga."""
+        completions = FakeCompletions(delay=0)
+        advisor = make_advisor(completions)
+
+        async def run():
+            first = await advisor.evaluate('BTCUSDT', make_signal())
+            second = await advisor.evaluate('BTCUSDT', make_signal(rsi=56))
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert completions.calls == 1
+        assert second['cached'] and second['decision'] == first['decision']
+
+    def test_concurrent_same_signal_is_coalesced(self):
+        """Pedidos simultâneos iguais compartilham uma única chamada."""
+        completions = FakeCompletions(delay=0.05)
+        advisor = make_advisor(completions)
+
+        async def run():
+            return await asyncio.gather(*(advisor.evaluate('BTCUSDT', make_signal()) for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert completions.calls == 1
+        assert all(r['decision'] == 'GO' for r in results)
+
+    def test_timeout_fails_open_and_is_not_cached(self):
+        """Timeout segue o sinal técnico e não fica no cache."""
+        completions = FakeCompletions(delay=1.0)
+        advisor = make_advisor(completions, timeout=0.05)
+
+        result = asyncio.run(advisor.evaluate('BTCUSDT', make_signal()))
+
+        assert result['decision'] == 'GO'
+        assert result['error'] == 'timeout'
+        assert advisor.timeouts == 1
+        assert advisor.stats()['cached'] == 0
+
+    def test_nan_signal_is_evaluated(self):
+        """Sinal com RSI NaN ainda é avaliado; evaluate_many não aborta."""
+        completions = FakeCompletions(delay=0)
+        advisor = make_advisor(completions)
+        candidates = [make_signal('BTCUSDT', rsi=float('nan')), make_signal('ETHUSDT')]
+
+        results = asyncio.run(advisor.evaluate_many(candidates))
+        assert results['BTCUSDT']['decision'] == 'GO'
+        assert completions.calls == 2
+
+    def test_evaluate_many_runs_concurrently(self):
+        """TOP-N avaliados em paralelo levam o tempo de uma chamada."""
+        completions = FakeCompletions(delay=0.1, decision='NO-GO')
+        advisor = make_advisor(completions, max_concurrency=3)
+        candidates = [make_signal(symbol=s) for s in ('AUSDT', 'BUSDT', 'CUSDT')]
+
+        started = time.perf_counter()
+        results = asyncio.run(advisor.evaluate_many(candidates))
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.25
+        assert set(results) == {'AUSDT', 'BUSDT', 'CUSDT'}
+        assert all(r['decision'] == 'NO-GO' for r in results.values())
+
+    def test_does_not_block_event_loop(self):
+        """Outras tarefas continuam rodando durante a consulta."""
+        completions = FakeCompletions(delay=0.2)
+        advisor = make_advisor(completions)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        async def run():
+            await asyncio.gather(advisor.evaluate('BTCUSDT', make_signal()), ticker())
+
+        asyncio.run(run())
+        assert ticks == 10
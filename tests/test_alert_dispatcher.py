@@ -0,0 +1,233 @@
+"""
+📣 TESTS DO ALERT DISPATCHER
+=============================
+Fila não bloqueante, agrupamento de rajadas, deduplicação, rate limit e retry
+contra um servidor aiohttp local no lugar da API do Telegram.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+
+from aiohttp import web
+
+from alert_dispatcher import AlertDispatcher
+from metrics import MetricsRegistry
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class FakeTelegram:
+    """sendMessage local: responde os status roteirizados e depois 200."""
+
+    def __init__(self, statuses=(), retry_after=0.05):
+        self.port = free_port()
+        self.statuses = list(statuses)
+        self.retry_after = retry_after
+        self.received = []
+        self.times = []
+        self._runner = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/bot{token}/sendMessage', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', self.port).start()
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    async def _handle(self, request):
+        self.times.append(time.monotonic())
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 429:
+            return web.json_response({'ok': False, 'parameters': {'retry_after': self.retry_after}}, status=429)
+        if status != 200:
+            return web.json_response({'ok': False, 'description': 'erro'}, status=status)
+        self.received.append(await request.json())
+        return web.json_response({'ok': True})
+
+
+def dispatcher(server: FakeTelegram, **kwargs) -> AlertDispatcher:
+    kwargs.setdefault('window', 0.05)
+    kwargs.setdefault('min_interval', 0)
+    kwargs.setdefault('backoff', 0.01)
+    return AlertDispatcher('token', '42', api_url=server.url, metrics=MetricsRegistry(), **kwargs)
+
+
+def run(server: FakeTelegram, scenario):
+    async def main():
+        await server.start()
+        try:
+            return await scenario()
+        finally:
+            await server.stop()
+    return asyncio.run(main())
+
+
+class TestAlertDispatcher:
+    """Testes para AlertDispatcher."""
+
+    def test_send_does_not_wait_for_http(self):
+        server = FakeTelegram()
+        alerts = dispatcher(server)
+
+        async def scenario():
+            started = time.perf_counter()
+            assert alerts.send('⚠️ Perda grande em BTCUSDT')
+            elapsed = time.perf_counter() - started
+            await alerts.stop()
+            return elapsed
+
+        elapsed = run(server, scenario)
+        assert elapsed < 0.01
+        assert server.received[0]['chat_id'] == '42'
+        assert server.received[0]['text'] == '⚠️ Perda grande em BTCUSDT'
+        assert alerts.alerts.get(result='sent') == 1
+
+    def test_burst_grouped_by_key(self):
+        server = FakeTelegram()
+        alerts = dispatcher(server)
+
+        async def scenario():
+            for symbol in ('BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'XRPUSDT'):
+                alerts.send(f'🛑 SL atingido em {symbol}', key='STOP LOSS')
+            alerts.send('🎯 TP atingido em ADAUSDT', key='TAKE PROFIT')
+            await alerts.stop()
+
+        run(server, scenario)
+        texts = [m['text'] for m in server.received]
+        assert len(texts) == 2
+        assert texts[0].startswith('🔁 5x STOP LOSS')
+        assert 'XRPUSDT' in texts[0]
+        assert texts[1] == '🎯 TP atingido em ADAUSDT'
+        assert alerts.alerts.get(result='grouped') == 4
+
+    def test_duplicates_ignored(self):
+        server = FakeTelegram()
+        alerts = dispatcher(server)
+
+        async def scenario():
+            assert alerts.send('Posição BTCUSDT parada', dedup='stuck:BTCUSDT')
+            assert not alerts.send('Posição BTCUSDT parada há mais tempo', dedup='stuck:BTCUSDT')
+            await alerts.stop()
+
+        run(server, scenario)
+        assert len(server.received) == 1
+        assert alerts.alerts.get(result='duplicate') == 1
+
+    def test_full_queue_drops(self):
+        alerts = AlertDispatcher('token', '42', max_queue=2, metrics=MetricsRegistry())
+
+        async def scenario():
+            # Sem await: o worker ainda não rodou, a fila enche
+            assert alerts.send('a') and alerts.send('b')
+            assert not alerts.send('c')
+
+        asyncio.run(scenario())
+        assert alerts.alerts.get(result='dropped') == 1
+
+    def test_retry_after_429_and_5xx(self):
+        server = FakeTelegram(statuses=[429, 500])
+        alerts = dispatcher(server)
+
+        async def scenario():
+            alerts.send('alerta')
+            await alerts.stop()
+
+        run(server, scenario)
+        assert len(server.times) == 3
+        assert server.times[1] - server.times[0] >= 0.05  # retry_after do 429
+        assert [m['text'] for m in server.received] == ['alerta']
+
+    def test_client_error_not_retried(self):
+        server = FakeTelegram(statuses=[400])
+        alerts = dispatcher(server)
+
+        async def scenario():
+            alerts.send('<b>html inválido')
+            await alerts.stop()
+
+        run(server, scenario)
+        assert len(server.times) == 1
+        assert alerts.alerts.get(result='failed') == 1
+
+    def test_min_interval_between_messages(self):
+        server = FakeTelegram()
+        alerts = dispatcher(server, min_interval=0.1)
+
+        async def scenario():
+            alerts.send('primeiro')
+            alerts.send('segundo')
+            await alerts.stop()
+
+        run(server, scenario)
+        assert len(server.times) == 2
+        assert server.times[1] - server.times[0] >= 0.09
+
+    def test_send_from_other_thread(self):
+        server = FakeTelegram()
+        alerts = dispatcher(server)
+
+        async def scenario():
+            await alerts.start()
+            thread = threading.Thread(target=alerts.send, args=('de outra thread',))
+            thread.start()
+            thread.join()
+            await asyncio.sleep(0.01)
+            await alerts.stop()
+
+        run(server, scenario)
+        assert [m['text'] for m in server.received] == ['de outra thread']
+
+    def test_restart_on_new_loop(self):
+        """Depois de stop(), o mesmo dispatcher volta a enviar num loop novo."""
+        server = FakeTelegram()
+        alerts = dispatcher(server)
+
+        async def scenario(text):
+            await alerts.start()
+            alerts.send(text)
+            await alerts.stop()
+
+        run(server, lambda: scenario('primeiro loop'))
+        run(server, lambda: scenario('segundo loop'))
+        assert [m['text'] for m in server.received] == ['primeiro loop', 'segundo loop']
+
+    def test_disabled_without_token(self):
+        alerts = AlertDispatcher(None, None, metrics=MetricsRegistry())
+        assert not alerts.enabled
+        assert not alerts.send('nada')
+
+    def test_send_without_running_loop(self):
+        """Código síncrono (sem event loop) também entrega, por uma thread própria."""
+        server = FakeTelegram()
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result(5)
+        try:
+            alerts = dispatcher(server)
+            started = time.perf_counter()
+            assert alerts.send('sem loop')
+            assert time.perf_counter() - started < 0.5
+            alerts.send('depois do primeiro')
+            alerts.close()
+        finally:
+            asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+        assert [m['text'] for m in server.received] == ['sem loop', 'depois do primeiro']
+        assert alerts._thread is None
@@ -0,0 +1,173 @@
+"""
+🏎️ TESTS DO BACKTEST ENGINE
+============================
+Paridade com o loop original do Backtester e desempenho.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest_engine import run_vectorized, signals_from_indicators, simulate, summarize
+from indicators import add_indicators, compute_indicators
+
+
+def random_walk(n, seed=7, vol=0.004):
+    """Candles sintéticos com tendência e ruído."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    spread = np.abs(rng.normal(0, vol, n)) * close
+    high = close + spread
+    low = close - spread
+    volume = rng.uniform(10, 1000, n)
+    return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close, 'volume': volume})
+
+
+def legacy_backtest(df, initial_capital=100, leverage=10, risk_per_trade=0.05):
+    """Loop por candle do Backtester.run_backtest original (referência)."""
+    df = add_indicators(df)
+    long_conditions = ((df['ema_9'] > df['ema_21']) & (df['ema_21'] > df['ema_50']) &
+                       (df['rsi'] > 30) & (df['rsi'] < 70) & (df['macd_hist'] > 0))
+    short_conditions = ((df['ema_9'] < df['ema_21']) & (df['ema_21'] < df['ema_50']) &
+                        (df['rsi'] > 30) & (df['rsi'] < 70) & (df['macd_hist'] < 0))
+    df['signal'] = 0
+    df.loc[long_conditions, 'signal'] = 1
+    df.loc[short_conditions, 'signal'] = -1
+
+    capital = initial_capital
+    position = None
+    trades = []
+    max_drawdown = 0
+    peak_capital = initial_capital
+
+    for i in range(50, len(df)):
+        row = df.iloc[i]
+        if capital > peak_capital:
+            peak_capital = capital
+        max_drawdown = max(max_drawdown, (peak_capital - capital) / peak_capital)
+
+        if position:
+            entry_price, sl, tp, side = position
+            exit_price = None
+            if side == 'LONG':
+                if row['low'] <= sl:
+                    exit_price = sl
+                elif row['high'] >= tp:
+                    exit_price = tp
+                if exit_price is not None:
+                    pnl = (exit_price - entry_price) / entry_price * leverage
+            else:
+                if row['high'] >= sl:
+                    exit_price = sl
+                elif row['low'] <= tp:
+                    exit_price = tp
+                if exit_price is not None:
+                    pnl = (entry_price - exit_price) / entry_price * leverage
+            if exit_price is not None:
+                capital *= (1 + pnl * risk_per_trade)
+                trades.append(pnl * 100)
+                position = None
+
+        if not position and row['signal'] != 0:
+            entry, atr = row['close'], row['atr']
+            if row['signal'] == 1:
+                position = (entry, entry - atr * 1.5, entry + atr * 3, 'LONG')
+            else:
+                position = (entry, entry + atr * 1.5, entry - atr * 3, 'SHORT')
+
+    wins = [t for t in trades if t > 0]
+    losses = [t for t in trades if t < 0]
+    return {
+        'total_return': (capital - initial_capital) / initial_capital * 100,
+        'total_trades': len(trades),
+        'win_rate': len(wins) / len(trades) * 100 if trades else 0,
+        'profit_factor': abs(sum(wins) / sum(losses)) if losses else 0,
+        'max_drawdown': max_drawdown,
+        'final_capital': capital
+    }
+
+
+def run_frame(df, **kwargs):
+    return run_vectorized(
+        df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), df['volume'].to_numpy(), **kwargs
+    )
+
+
+class TestBacktestEngine:
+    """Testes para o engine vetorizado."""
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_matches_legacy_loop(self, seed):
+        """Mesmas estatísticas do loop original em dados aleatórios."""
+        df = random_walk(3000, seed=seed)
+
+        expected = legacy_backtest(df)
+        stats, trades = run_frame(df)
+
+        assert set(stats) == set(expected)
+        assert stats['total_trades'] == expected['total_trades'] > 0
+        for key in expected:
+            assert stats[key] == pytest.approx(expected[key], rel=1e-9, abs=1e-12), key
+
+    def test_custom_parameters(self):
+        """Alavancagem e risco diferentes também batem com o loop original."""
+        df = random_walk(2000, seed=9)
+        expected = legacy_backtest(df, initial_capital=500, leverage=20, risk_per_trade=0.02)
+        stats, _ = run_frame(df, initial_capital=500, leverage=20, risk_per_trade=0.02)
+        assert stats['final_capital'] == pytest.approx(expected['final_capital'], rel=1e-9)
+
+    def test_sl_has_priority_and_reentry_on_exit_bar(self):
+        """SL vence quando SL e TP são tocados no mesmo candle; novo sinal no candle de saída entra."""
+        close = np.full(60, 100.0)
+        high = np.full(60, 100.5)
+        low = np.full(60, 99.5)
+        atr = np.full(60, 1.0)
+        signal = np.zeros(60, dtype=np.int8)
+        signal[50] = 1
+        signal[52] = -1
+        high[52], low[52] = 104.0, 98.0  # toca SL (98.5) e TP (103) do LONG
+        high[55] = 102.0                   # SL (101.5) do SHORT aberto no candle 52
+
+        trades, capital, _ = simulate(high, low, close, atr, signal)
+
+        assert list(trades['entry_idx']) == [50, 52]
+        assert trades['is_sl'][0]
+        assert trades['exit'][0] == pytest.approx(98.5)
+        assert trades['exit_idx'][1] == 55 and trades['side'][1] == -1
+        assert capital < 100
+
+    def test_no_trades(self):
+        """Sem sinais: estatísticas zeradas como no original."""
+        trades, capital, max_dd = simulate(
+            np.ones(100), np.ones(100), np.ones(100), np.ones(100), np.zeros(100, dtype=np.int8)
+        )
+        stats = summarize(trades, 100, capital, max_dd)
+        assert stats['total_trades'] == 0
+        assert stats['win_rate'] == 0 and stats['profit_factor'] == 0
+        assert stats['final_capital'] == 100
+
+    def test_signals_match_generate_signals(self):
+        """Backtester.generate_signals delega para o cálculo vetorizado."""
+        df = random_walk(500, seed=4)
+        ind = compute_indicators(df['close'], df['high'], df['low'], df['volume'])
+        signal = signals_from_indicators(ind)
+        assert set(np.unique(signal)) <= {-1, 0, 1}
+        assert (signal != 0).any()
+
+        from backtest import Backtester
+        frame = pd.DataFrame(ind)
+        signals = Backtester.__new__(Backtester).generate_signals(frame)['signal'].to_numpy()
+        np.testing.assert_array_equal(signals, signal)
+
+    def test_million_bars_in_seconds(self):
+        """1M candles (indicadores + simulação) em poucos segundos."""
+        df = random_walk(1_000_000, seed=5)
+
+        started = time.perf_counter()
+        stats, _ = run_frame(df)
+        elapsed = time.perf_counter() - started
+
+        assert stats['total_trades'] > 1000
+        assert elapsed < 10
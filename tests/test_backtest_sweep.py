@@ -0,0 +1,113 @@
+"""
+🧪 TESTS DO BACKTEST SWEEP
+===========================
+Splits walk-forward, paridade do score com o bot e execução em paralelo.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backtest_engine import signals_from_strength, strength_scores
+from backtest_sweep import (
+    evaluate_config, expand_grid, prepare_data, run_sweep,
+    walk_forward_selection, walk_forward_splits
+)
+from bot_master import AutonomousBot
+from indicators import compute_indicators
+
+
+def random_walk(n, seed=11, vol=0.004):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    spread = np.abs(rng.normal(0, vol, n)) * close
+    return close + spread, close - spread, close, rng.uniform(10, 1000, n)
+
+
+SMALL_GRID = {
+    'min_strength': [28, 45],
+    'sl_mult': [1.5, 1.8],
+    'tp_mult': [3.0],
+    'leverage': [5, 10],
+    'risk_per_trade': [0.05]
+}
+
+
+class TestWalkForwardSplits:
+    """Testes para walk_forward_splits."""
+
+    def test_splits_are_contiguous(self):
+        """Testes consecutivos, sem sobreposição e dentro dos dados."""
+        splits = walk_forward_splits(10_050, folds=4, train_ratio=0.7)
+        assert len(splits) == 4
+        for (a, b, c), nxt in zip(splits, splits[1:] + [None]):
+            assert 50 <= a < b < c <= 10_050
+            assert (b - a) > (c - b)  # treino maior que teste
+            if nxt:
+                assert nxt[1] == c  # próximo teste começa onde este terminou
+
+    def test_too_few_candles(self):
+        assert walk_forward_splits(40, folds=4) == []
+
+
+class TestStrengthScores:
+    """Paridade de strength_scores com AutonomousBot._score_symbol."""
+
+    def test_matches_bot_scoring(self):
+        high, low, close, volume = random_walk(400)
+        ind = compute_indicators(close, high, low, volume)
+        ind['volume'] = volume
+        bullish, bearish = strength_scores(ind)
+        signal = signals_from_strength(bullish, bearish, 28)
+
+        for i in range(60, 400, 7):
+            latest = {key: values[i] for key, values in ind.items()}
+            state = SimpleNamespace(latest=lambda l=latest: l, signals=lambda: {}, recent_history=lambda: [])
+            result = AutonomousBot._score_symbol(None, 'TEST', state)
+
+            assert result['strength'] == max(bullish[i], bearish[i])
+            expected = {'LONG': 1, 'SHORT': -1, 'NEUTRAL': 0}[result['trend']]
+            if result['strength'] < 28:
+                expected = 0
+            assert signal[i] == expected
+
+
+class TestSweep:
+    """Testes para run_sweep."""
+
+    def test_grid_expansion(self):
+        assert len(expand_grid(SMALL_GRID)) == 8
+
+    def test_parallel_matches_serial(self):
+        """Workers com shared memory produzem a mesma tabela que o modo serial."""
+        high, low, close, volume = random_walk(6000)
+        serial = run_sweep(high, low, close, volume, grid=SMALL_GRID, folds=3, workers=1)
+        parallel = run_sweep(high, low, close, volume, grid=SMALL_GRID, folds=3, workers=2, chunk_size=3)
+
+        assert len(serial) == 8
+        cols = ['min_strength', 'sl_mult', 'leverage', 'oos_return', 'is_return', 'oos_trades']
+        assert serial[cols].equals(parallel[cols])
+        assert serial['oos_return'].is_monotonic_decreasing
+
+    def test_leverage_scales_returns(self):
+        """Mesmos trades com alavancagem diferente: só o retorno muda."""
+        high, low, close, volume = random_walk(3000)
+        data = prepare_data(high, low, close, volume)
+        splits = walk_forward_splits(3000, folds=2)
+        base = {'min_strength': 28, 'sl_mult': 1.5, 'tp_mult': 3.0, 'risk_per_trade': 0.05}
+
+        low_lev = evaluate_config(dict(base, leverage=5), splits, data=data)
+        high_lev = evaluate_config(dict(base, leverage=10), splits, data=data)
+
+        assert low_lev['oos_trades'] == high_lev['oos_trades'] > 0
+        assert low_lev['oos_win_rate'] == pytest.approx(high_lev['oos_win_rate'])
+
+    def test_walk_forward_selection(self):
+        high, low, close, volume = random_walk(4000)
+        table = run_sweep(high, low, close, volume, grid=SMALL_GRID, folds=3, workers=1)
+        selection = walk_forward_selection(table)
+
+        assert [s['fold'] for s in selection] == [0, 1, 2]
+        for s in selection:
+            assert s['is_return'] == max(row[s['fold']] for row in table['fold_is'])
@@ -53,7 +53,8 @@ class TestPositionSizeCalculation:
         risk_per_unit = abs(entry - sl)
         quantity = (risk_amount * leverage) / entry
 
-        assert quantity == pytest.approx(50.0, rel=0.01)  # 50 unidades com 10x
+        # Mesma fórmula do bot: US$ 50 de risco x 10 = US$ 500 de exposição
+        assert quantity == pytest.approx(5.0, rel=0.01)  # 5 unidades a 100
 
     def test_position_size_small_balance(self, calc_params):
         """Teste com saldo pequeno."""
@@ -87,7 +88,7 @@ class TestPositionSizeCalculation:
         quantity = Decimal('12.3456')
 
         # Arredondar para step_size
-        precision = abs(int(Decimal(str(step_size)).as_tuple().exponent)
+        precision = abs(int(Decimal(str(step_size)).as_tuple().exponent))
         rounded = float(round(quantity, precision))
 
         assert rounded == 12.35
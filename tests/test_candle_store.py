@@ -0,0 +1,185 @@
+"""
+🗃️ TESTS DO CANDLE STORE
+=========================
+Partições mensais, leitura por intervalo e preenchimento de buracos.
+"""
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+import candle_store
+from candle_store import CANDLE_DTYPE, CandleStore, klines_to_records
+
+
+INTERVAL = '15m'
+INTERVAL_MS = 900_000
+T0 = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+
+
+def make_kline(open_time):
+    price = 100 + (open_time - T0) / INTERVAL_MS * 0.01
+    return [open_time, str(price), str(price + 1), str(price - 1), str(price + 0.5), '10',
+            open_time + INTERVAL_MS - 1]
+
+
+class FakeClient:
+    """Gera klines determinísticos e conta as requisições (sync e async)."""
+
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+        self.requests = []
+
+    def _klines(self, startTime=None, endTime=None, limit=500, **kwargs):
+        self.requests.append((startTime, endTime, limit))
+        live_open = self.now_ms - self.now_ms % INTERVAL_MS
+        if startTime is None:
+            first = live_open - (limit - 1) * INTERVAL_MS
+        else:
+            first = startTime
+        last = live_open if endTime is None else min(live_open, endTime)
+        times = range(first, last + 1, INTERVAL_MS)
+        return [make_kline(t) for t in list(times)[:limit]]
+
+    def futures_klines(self, **kwargs):
+        return self._klines(**kwargs)
+
+
+class AsyncFakeClient(FakeClient):
+    async def futures_klines(self, **kwargs):
+        return self._klines(**kwargs)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path / 'candles'))
+
+
+class TestCandleStore:
+    """Testes para CandleStore."""
+
+    def test_write_partitions_by_month(self, store):
+        """Candles que cruzam o mês vão para arquivos separados."""
+        start = T0 - 4 * INTERVAL_MS  # 31/12 23:00
+        klines = [make_kline(start + i * INTERVAL_MS) for i in range(8)]
+
+        assert store.write('BTCUSDT', INTERVAL, klines) == 8
+        assert store.months('BTCUSDT', INTERVAL) == ['2023-12', '2024-01']
+        assert len(store.read('BTCUSDT', INTERVAL)) == 8
+
+    def test_write_is_idempotent(self, store):
+        """Regravar os mesmos candles não duplica e atualiza valores."""
+        klines = [make_kline(T0 + i * INTERVAL_MS) for i in range(10)]
+        store.write('BTCUSDT', INTERVAL, klines)
+
+        updated = klines[-1][:]
+        updated[4] = '999'
+        assert store.write('BTCUSDT', INTERVAL, klines[5:] + [updated]) == 0
+
+        data = store.read('BTCUSDT', INTERVAL)
+        assert len(data) == 10
+        assert data['close'][-1] == 999
+        assert np.all(np.diff(data['open_time']) == INTERVAL_MS)
+
+    def test_tail_writes_append_to_log(self, store, monkeypatch):
+        """Candles novos no fim do mês vão para o log sem regravar o .npy."""
+        monkeypatch.setattr(candle_store, 'COMPACT_AFTER', 25)
+        store.write('BTCUSDT', INTERVAL, [make_kline(T0 + i * INTERVAL_MS) for i in range(10)])
+        npy = store._path('BTCUSDT', INTERVAL, '2024-01')
+        log = store._log_path('BTCUSDT', INTERVAL, '2024-01')
+        assert not os.path.exists(npy) and os.path.getsize(log) == 10 * CANDLE_DTYPE.itemsize
+
+        for i in range(10, 20):
+            assert store.write('BTCUSDT', INTERVAL, [make_kline(T0 + i * INTERVAL_MS)]) == 1
+        assert not os.path.exists(npy)
+        assert len(store.read('BTCUSDT', INTERVAL)) == 20
+
+        # Passou de COMPACT_AFTER: log vira .npy
+        store.write('BTCUSDT', INTERVAL, [make_kline(T0 + i * INTERVAL_MS) for i in range(20, 30)])
+        assert os.path.exists(npy) and not os.path.exists(log)
+
+        store.write('BTCUSDT', INTERVAL, [make_kline(T0 + 30 * INTERVAL_MS)])
+        data = store.read('BTCUSDT', INTERVAL)
+        assert len(data) == 31 and np.all(np.diff(data['open_time']) == INTERVAL_MS)
+        assert list(store.read_last('BTCUSDT', INTERVAL, 3)['open_time']) == \
+            [T0 + i * INTERVAL_MS for i in (28, 29, 30)]
+
+    def test_torn_log_record_ignored(self, store):
+        """Registro incompleto no fim do log (crash no meio do append) é ignorado."""
+        store.write('BTCUSDT', INTERVAL, [make_kline(T0 + i * INTERVAL_MS) for i in range(5)])
+        with open(store._log_path('BTCUSDT', INTERVAL, '2024-01'), 'ab') as f:
+            f.write(b'\x00' * 7)
+
+        assert len(store.read('BTCUSDT', INTERVAL)) == 5
+        store.write('BTCUSDT', INTERVAL, [make_kline(T0 + 5 * INTERVAL_MS)])
+        assert list(store.read('BTCUSDT', INTERVAL)['open_time']) == [T0 + i * INTERVAL_MS for i in range(6)]
+
+    def test_range_reads(self, store):
+        """Leitura [start, end) e últimos N candles."""
+        store.write('BTCUSDT', INTERVAL, [make_kline(T0 + i * INTERVAL_MS) for i in range(100)])
+
+        part = store.read_arrays('BTCUSDT', INTERVAL, T0 + 10 * INTERVAL_MS, T0 + 20 * INTERVAL_MS)
+        assert len(part['close']) == 10
+        assert part['open_time'][0] == T0 + 10 * INTERVAL_MS
+        assert part['close'].flags['C_CONTIGUOUS']
+
+        last = store.read_last('BTCUSDT', INTERVAL, 5)
+        assert list(last['open_time']) == [T0 + i * INTERVAL_MS for i in range(95, 100)]
+
+    def test_missing_ranges(self, store):
+        """Buracos no início, no meio e no fim."""
+        times = [T0 + i * INTERVAL_MS for i in list(range(5, 10)) + list(range(15, 20))]
+        store.write('BTCUSDT', INTERVAL, [make_kline(t) for t in times])
+
+        ranges = store.missing_ranges('BTCUSDT', INTERVAL, T0, T0 + 25 * INTERVAL_MS)
+        assert ranges == [
+            (T0, T0 + 5 * INTERVAL_MS),
+            (T0 + 10 * INTERVAL_MS, T0 + 15 * INTERVAL_MS),
+            (T0 + 20 * INTERVAL_MS, T0 + 25 * INTERVAL_MS)
+        ]
+
+    def test_fill_only_downloads_gaps(self, store):
+        """Segundo preenchimento não faz nenhuma requisição."""
+        now = T0 + 3000 * INTERVAL_MS + 60_000
+        client = FakeClient(now)
+
+        added = store.fill_sync(client, 'BTCUSDT', INTERVAL, T0, now_ms=now)
+        assert added == 3000  # só candles fechados
+        assert len(client.requests) == 2  # paginado (1500 por requisição)
+
+        client.requests.clear()
+        assert store.fill_sync(client, 'BTCUSDT', INTERVAL, T0, now_ms=now) == 0
+        assert client.requests == []
+
+    def test_async_fill(self, store):
+        """fill() assíncrono grava o mesmo que fill_sync()."""
+        now = T0 + 200 * INTERVAL_MS + 1
+        added = asyncio.run(store.fill(AsyncFakeClient(now), 'BTCUSDT', INTERVAL, T0, now_ms=now))
+        assert added == 200
+
+    def test_recent_klines_warm_start(self, store):
+        """Com histórico no disco, só os candles novos vêm da API."""
+        now = T0 + 500 * INTERVAL_MS + 60_000
+        client = AsyncFakeClient(now)
+
+        cold = asyncio.run(store.recent_klines(client, 'BTCUSDT', INTERVAL, 100, now_ms=now))
+        assert client.requests[-1][2] == 100
+        assert len(cold) == 100
+
+        later = now + 3 * INTERVAL_MS
+        client.now_ms = later
+        warm = asyncio.run(store.recent_klines(client, 'BTCUSDT', INTERVAL, 100, now_ms=later))
+
+        assert client.requests[-1][2] == 4  # 3 fechados novos + o em formação
+        assert len(warm) == 100
+        times = [k[0] for k in warm]
+        assert np.all(np.diff(times) == INTERVAL_MS)
+        assert times[-1] == later - later % INTERVAL_MS
+
+    def test_records_roundtrip(self):
+        """Conversão klines -> registros preserva valores."""
+        records = klines_to_records([make_kline(T0)])
+        assert records['open_time'][0] == T0
+        assert records['close'][0] == pytest.approx(100.5)
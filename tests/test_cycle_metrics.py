@@ -0,0 +1,82 @@
+"""
+⏱️ TESTS DO CYCLE METRICS
+==========================
+Medição por fase, percentis e o benchmark do ciclo contra o simulador.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from cycle_metrics import CYCLE, CycleProfiler
+from scripts.benchmark_cycle import regressions, run_benchmark
+
+
+class TestCycleProfiler:
+    """Testes para CycleProfiler."""
+
+    def test_phases_inside_cycle(self):
+        profiler = CycleProfiler()
+
+        with profiler.cycle():
+            with profiler.phase('monitor_positions'):
+                time.sleep(0.01)
+            with profiler.phase('save_dashboard_state'):
+                pass
+
+        assert profiler.cycles == 1
+        assert set(profiler.last_cycle) == {'monitor_positions', 'save_dashboard_state', CYCLE}
+        assert profiler.last_cycle[CYCLE] >= profiler.last_cycle['monitor_positions'] >= 0.01
+
+    def test_percentiles(self):
+        profiler = CycleProfiler()
+        for ms in range(1, 101):
+            profiler.record('scan', ms / 1000)
+
+        summary = profiler.summary()['scan']
+        assert summary['count'] == 100
+        assert summary['p50'] == pytest.approx(0.0505)
+        assert summary['p99'] == pytest.approx(0.09901)
+        assert summary['max'] == 0.1
+
+    def test_window_keeps_total_count(self):
+        profiler = CycleProfiler(history_size=10)
+        for i in range(25):
+            profiler.record('scan', float(i))
+
+        assert len(profiler.samples['scan']) == 10
+        assert profiler.summary()['scan']['count'] == 25
+        assert profiler.summary()['scan']['p50'] == pytest.approx(19.5)
+
+    def test_phase_measured_on_error(self):
+        profiler = CycleProfiler()
+        with pytest.raises(RuntimeError):
+            with profiler.phase('enter_trade'):
+                raise RuntimeError('falhou')
+        assert profiler.counts['enter_trade'] == 1
+
+
+class TestCycleBenchmark:
+    """Benchmark de ponta a ponta contra o simulador."""
+
+    def test_runs_bot_cycles(self):
+        report = asyncio.run(run_benchmark(cycles=5, latency=0.0, seed=1))
+
+        assert report['phases'][CYCLE]['count'] == 5
+        assert {'monitor_positions', 'save_dashboard_state', 'find_best_opportunity'} <= set(report['phases'])
+        assert report['requests'] > 0
+
+    def test_latency_shows_up_per_phase(self):
+        report = asyncio.run(run_benchmark(cycles=2, latency=0.02, seed=1, symbols=['BTCUSDT', 'ETHUSDT']))
+
+        # Sem user stream: monitor_positions faz uma chamada REST (a 1ª sai do cache do sync inicial)
+        assert report['phases']['monitor_positions']['max'] >= 0.02
+
+    def test_regression_detection(self):
+        previous = {'phases': {'monitor_positions': {'p50': 0.050}, 'find_best_opportunity': {'p50': 0.100}}}
+        report = {'phases': {'monitor_positions': {'p50': 0.101}, 'find_best_opportunity': {'p50': 0.104}}}
+
+        found = regressions(previous, report, tolerance=0.25, min_delta=0.005)
+        assert len(found) == 1
+        assert found[0].startswith('monitor_positions')
@@ -0,0 +1,104 @@
+"""
+📣 TESTS DO DASHBOARD STATE
+============================
+Dirty flag, versão, heartbeat e leitura com cache pela versão.
+"""
+
+import json
+
+from dashboard_state import DashboardPublisher, SnapshotReader, read_version
+
+
+class TestDashboardPublisher:
+    """Testes para DashboardPublisher."""
+
+    def test_writes_only_on_change(self, tmp_path):
+        path = str(tmp_path / 'dashboard.json')
+        publisher = DashboardPublisher(path, heartbeat=0)
+
+        publisher.update('active_trades', {'BTCUSDT': {'current_pnl': 1.0}})
+        assert publisher.publish()
+        assert publisher.version == 1
+
+        # Mesmo conteúdo: não suja, não grava
+        assert not publisher.update('active_trades', {'BTCUSDT': {'current_pnl': 1.0}})
+        assert not publisher.publish()
+        assert publisher.version == 1
+
+        publisher.update('active_trades', {'BTCUSDT': {'current_pnl': 2.0}})
+        assert publisher.publish()
+
+        with open(path) as f:
+            data = json.load(f)
+        assert data['version'] == 2
+        assert data['active_trades']['BTCUSDT']['current_pnl'] == 2.0
+        assert publisher.writes == 2
+
+    def test_callable_evaluated_only_when_fingerprint_changes(self, tmp_path):
+        publisher = DashboardPublisher(str(tmp_path / 'dashboard.json'))
+        calls = []
+
+        def history():
+            calls.append(1)
+            return [{'pnl': 1.0}]
+
+        publisher.update('history', history, fingerprint=1)
+        publisher.update('history', history, fingerprint=1)
+        assert len(calls) == 1
+
+        publisher.update('history', history, fingerprint=2)
+        assert len(calls) == 2
+
+    def test_section_versions(self, tmp_path):
+        path = str(tmp_path / 'dashboard.json')
+        publisher = DashboardPublisher(path)
+        publisher.update('config', {'leverage': 10})
+        publisher.update('history', [])
+        publisher.publish()
+        publisher.update('history', [{'pnl': 1.0}])
+        publisher.publish()
+
+        with open(path) as f:
+            data = json.load(f)
+        assert data['section_versions'] == {'config': 1, 'history': 2}
+
+    def test_heartbeat_touches_version_file_only(self, tmp_path):
+        path = tmp_path / 'dashboard.json'
+        publisher = DashboardPublisher(str(path), heartbeat=0.001)
+        publisher.update('config', {'leverage': 10})
+        publisher.publish()
+        snapshot_mtime = path.stat().st_mtime_ns
+
+        publisher._last_write -= 1
+        assert not publisher.publish()
+        assert path.stat().st_mtime_ns == snapshot_mtime
+        assert read_version(str(path))['version'] == 1
+
+
+class TestSnapshotReader:
+    """Testes para SnapshotReader."""
+
+    def test_rereads_only_when_version_changes(self, tmp_path):
+        path = str(tmp_path / 'dashboard.json')
+        publisher = DashboardPublisher(path)
+        reader = SnapshotReader(path)
+
+        publisher.update('history', [{'pnl': 1.0}])
+        publisher.publish()
+        assert reader.load()['history'] == [{'pnl': 1.0}]
+        reader.load()
+        assert reader.loads == 1
+
+        publisher.update('history', [{'pnl': 1.0}, {'pnl': 2.0}])
+        publisher.publish()
+        assert len(reader.load()['history']) == 2
+        assert reader.loads == 2
+
+    def test_legacy_snapshot_without_version_file(self, tmp_path):
+        path = tmp_path / 'dashboard.json'
+        path.write_text(json.dumps({'active_trades': {}, 'last_update': '10:00:00'}))
+
+        assert SnapshotReader(str(path)).load()['last_update'] == '10:00:00'
+
+    def test_missing_snapshot(self, tmp_path):
+        assert SnapshotReader(str(tmp_path / 'nada.json')).load() is None
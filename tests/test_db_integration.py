@@ -0,0 +1,97 @@
+"""
+🔌 TESTS DA INTEGRAÇÃO COM O BANCO
+===================================
+Gravação em lote das posições ativas pelo BotWithPersistence.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from database.db_integration import BotWithPersistence
+from database.write_behind import WriteBehindQueue
+
+
+class FakePositionRepo:
+    def __init__(self):
+        self.batches = []
+
+    async def save_positions(self, positions):
+        self.batches.append([p['symbol'] for p in positions])
+
+
+def make_trade(price=100.0, pnl=0.0):
+    return {
+        'side': 'LONG', 'quantity': 1.0, 'entry': 100.0, 'sl': 95.0, 'tp': 110.0,
+        'current_price': price, 'current_pnl': pnl, 'current_pnl_percent': 0.0,
+        'order_id': 1, 'sl_order_id': 2, 'tp_order_id': 3
+    }
+
+
+def make_wrapper(trades):
+    wrapper = BotWithPersistence(bot_instance=SimpleNamespace(active_trades=trades))
+    wrapper._position_repo = FakePositionRepo()
+    return wrapper
+
+
+class TestBatchedPositionUpdates:
+    """Testes para BotWithPersistence._update_positions_in_db."""
+
+    def test_single_batch_for_all_positions(self):
+        trades = {'BTCUSDT': make_trade(), 'ETHUSDT': make_trade()}
+        wrapper = make_wrapper(trades)
+
+        asyncio.run(wrapper._update_positions_in_db())
+
+        assert wrapper._position_repo.batches == [['BTCUSDT', 'ETHUSDT']]
+
+    def test_unchanged_positions_are_skipped(self):
+        """Variações abaixo do epsilon não geram ida ao banco."""
+        trades = {'BTCUSDT': make_trade(), 'ETHUSDT': make_trade()}
+        wrapper = make_wrapper(trades)
+        asyncio.run(wrapper._update_positions_in_db())
+
+        trades['BTCUSDT']['current_price'] = 100.01     # 0.01% < 0.05%
+        trades['BTCUSDT']['current_pnl'] = 0.005        # < 0.01 USDT
+        asyncio.run(wrapper._update_positions_in_db())
+        assert len(wrapper._position_repo.batches) == 1
+
+        trades['ETHUSDT']['current_price'] = 100.2      # 0.2% > 0.05%
+        asyncio.run(wrapper._update_positions_in_db())
+        assert wrapper._position_repo.batches[-1] == ['ETHUSDT']
+
+    def test_non_price_changes_always_written(self):
+        trades = {'BTCUSDT': make_trade()}
+        wrapper = make_wrapper(trades)
+        asyncio.run(wrapper._update_positions_in_db())
+
+        trades['BTCUSDT']['sl'] = 99.0  # Trailing stop
+        asyncio.run(wrapper._update_positions_in_db())
+
+        assert wrapper._position_repo.batches == [['BTCUSDT'], ['BTCUSDT']]
+
+    def test_reopened_symbol_is_written_again(self):
+        """Posição que saiu e voltou perde o snapshot e é regravada."""
+        trades = {'BTCUSDT': make_trade()}
+        wrapper = make_wrapper(trades)
+        asyncio.run(wrapper._update_positions_in_db())
+
+        trades.clear()
+        asyncio.run(wrapper._update_positions_in_db())
+        trades['BTCUSDT'] = make_trade()
+        asyncio.run(wrapper._update_positions_in_db())
+
+        assert wrapper._position_repo.batches == [['BTCUSDT'], ['BTCUSDT']]
+
+    def test_writer_enqueues_without_waiting(self, tmp_path):
+        """Com a fila write-behind ativa, o ciclo só enfileira (banco fica para o flush)."""
+        trades = {'BTCUSDT': make_trade(), 'ETHUSDT': make_trade()}
+        wrapper = make_wrapper(trades)
+        repo = wrapper._position_repo
+        wrapper._writer = WriteBehindQueue(None, repo, journal_path=str(tmp_path / 'journal.jsonl'))
+
+        asyncio.run(wrapper._update_positions_in_db())
+        assert repo.batches == []
+        assert wrapper._writer.pending == 2
+
+        asyncio.run(wrapper._writer.flush())
+        assert repo.batches == [['BTCUSDT', 'ETHUSDT']]
@@ -0,0 +1,257 @@
+"""
+🏟️ TESTS DO EXCHANGE SIMULATOR
+===============================
+Replay determinístico, casamento de ordens no caminho de preço,
+eventos do user data stream e peso da API.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from candle_store import CANDLE_DTYPE
+from history_sync import HistorySync
+from protection import HealRequest, ProtectionManager
+from rate_limiter import RateLimitedClient, RateLimiter
+from user_stream import UserDataStream
+from tests.mocks.exchange_simulator import (
+    ExchangeSimulator, SimulatedAPIError, candles_from_trades, price_path
+)
+
+MINUTE = 60_000
+START = 1_700_006_400_000
+
+
+def candles(rows):
+    """Candles de 1m a partir de (open, high, low, close)."""
+    data = np.empty(len(rows), dtype=CANDLE_DTYPE)
+    for i, (o, h, l, c) in enumerate(rows):
+        data[i] = (START + i * MINUTE, o, h, l, c, 10.0)
+    return data
+
+
+def simulator(rows, **kwargs):
+    kwargs.setdefault('start_index', 0)
+    return ExchangeSimulator({'BTCUSDT': candles(rows)}, interval='1m', **kwargs)
+
+
+class FakeRegistry:
+    async def get(self, client, symbol):
+        return SimpleNamespace(price_precision=2)
+
+
+class TestReplay:
+    """Dados de mercado e relógio virtual."""
+
+    def test_same_seed_same_path(self):
+        a = ExchangeSimulator.synthetic(['BTCUSDT', 'ETHUSDT'], n=200, seed=7)
+        b = ExchangeSimulator.synthetic(['BTCUSDT', 'ETHUSDT'], n=200, seed=7)
+        c = ExchangeSimulator.synthetic(['BTCUSDT', 'ETHUSDT'], n=200, seed=8)
+
+        assert np.array_equal(a.candles['BTCUSDT'], b.candles['BTCUSDT'])
+        assert not np.array_equal(a.candles['BTCUSDT'], c.candles['BTCUSDT'])
+
+    def test_forming_candle_only_shows_open(self):
+        sim = simulator([(100, 105, 95, 102), (102, 104, 101, 103), (103, 103, 100, 101)])
+
+        async def run():
+            await sim.advance()
+            return await sim.futures_klines(symbol='BTCUSDT', interval='1m', limit=10)
+
+        klines = asyncio.run(run())
+        assert len(klines) == 2
+        assert klines[0][4] == '102.0'               # Fechado
+        assert klines[1][1:5] == ['102.0'] * 4       # Em formação
+
+    def test_advance_stops_at_end(self):
+        sim = simulator([(100, 101, 99, 100)] * 3)
+        processed = asyncio.run(sim.advance(10))
+
+        assert processed == 3
+        assert sim.finished
+
+    def test_intrabar_path(self):
+        bullish, bearish = candles([(100, 110, 90, 105), (100, 110, 90, 95)])
+        assert price_path(bullish) == [100, 90, 110, 105]
+        assert price_path(bearish) == [100, 110, 90, 95]
+
+    def test_candles_from_trades(self):
+        trades = [(START + 1_000, 100, 1), (START + 2_000, 103, 2), (START + 3_000, 99, 1),
+                  (START + MINUTE, 101, 5)]
+        data = candles_from_trades(trades, MINUTE)
+
+        assert len(data) == 2
+        assert tuple(data[0])[1:] == (100, 103, 99, 99, 4)
+
+
+class TestOrderMatching:
+    """Ordens casadas contra o caminho de preço."""
+
+    def test_stop_market_triggers_on_wick(self):
+        # Candle de alta: desce até 94 antes de subir -> SL em 95 executa
+        sim = simulator([(100, 100, 100, 100), (100, 108, 94, 106), (106, 107, 105, 106)])
+
+        async def run():
+            await sim.advance()
+            await sim.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=1)
+            await sim.futures_create_order(symbol='BTCUSDT', side='SELL', type='STOP_MARKET',
+                                           stopPrice=95, closePosition=True)
+            await sim.futures_create_order(symbol='BTCUSDT', side='SELL', type='LIMIT', quantity=1,
+                                           price=107, reduceOnly=True, timeInForce='GTC')
+            await sim.advance()
+
+        asyncio.run(run())
+        assert sim.positions['BTCUSDT']['amount'] == 0
+        assert float(sim.fills[-1]['price']) == 95
+        assert float(sim.fills[-1]['realizedPnl']) == -5
+        # Depois do SL o preço sobe a 108: TP reduceOnly expira em vez de abrir SHORT
+        tp = [o for o in sim.orders.values() if o['type'] == 'LIMIT'][0]
+        assert tp['status'] == 'EXPIRED'
+
+    def test_gap_fills_at_open(self):
+        sim = simulator([(100, 100, 100, 100), (90, 92, 88, 91)])
+
+        async def run():
+            await sim.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=1)
+            await sim.futures_create_order(symbol='BTCUSDT', side='SELL', type='STOP_MARKET',
+                                           stopPrice=95, closePosition=True)
+            await sim.advance(2)
+
+        asyncio.run(run())
+        assert sim.positions['BTCUSDT']['amount'] == 0
+        assert float(sim.fills[-1]['price']) == 90  # Gap: executa na abertura, não no stop
+
+    def test_stop_that_would_trigger_is_rejected(self):
+        sim = simulator([(100, 100, 100, 100)])
+
+        async def run():
+            await sim.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=1)
+            await sim.futures_create_order(symbol='BTCUSDT', side='SELL', type='STOP_MARKET',
+                                           stopPrice=101, closePosition=True)
+
+        with pytest.raises(SimulatedAPIError) as exc:
+            asyncio.run(run())
+        assert 'code=-2021' in str(exc.value)
+
+    def test_take_profit_limit_is_maker(self):
+        sim = simulator([(100, 100, 100, 100), (100, 112, 99, 111)])
+
+        async def run():
+            await sim.advance()
+            await sim.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=2)
+            await sim.futures_create_order(symbol='BTCUSDT', side='SELL', type='LIMIT', quantity=2,
+                                           price=110, reduceOnly=True, timeInForce='GTC')
+            await sim.advance()
+
+        asyncio.run(run())
+        tp = sim.fills[-1]
+        assert tp['maker'] and float(tp['price']) == 110
+        assert float(tp['realizedPnl']) == 20
+        assert sim.balance == pytest.approx(1000 + 20 - 200 * 0.0004 - 220 * 0.0002)
+
+    def test_reduce_only_rejected_without_position(self):
+        sim = simulator([(100, 100, 100, 100)])
+
+        with pytest.raises(SimulatedAPIError) as exc:
+            asyncio.run(sim.futures_create_order(symbol='BTCUSDT', side='SELL', type='LIMIT', quantity=1,
+                                                 price=110, reduceOnly=True))
+        assert 'code=-2022' in str(exc.value)
+
+    def test_close_position_expires_when_flat(self):
+        sim = simulator([(100, 100, 100, 100), (100, 100, 90, 91)])
+
+        async def run():
+            await sim.advance()
+            return await sim.futures_create_order(symbol='BTCUSDT', side='SELL', type='STOP_MARKET',
+                                                  stopPrice=95, closePosition=True)
+
+        order = asyncio.run(run())
+        asyncio.run(sim.advance())
+        assert sim.orders[order['orderId']]['status'] == 'EXPIRED'
+        assert sim.positions['BTCUSDT']['amount'] == 0
+
+
+class TestEventsAndLimits:
+    """Eventos do user data stream e peso da API."""
+
+    def test_events_feed_user_data_stream(self):
+        sim = simulator([(100, 100, 100, 100), (100, 101, 94, 96)])
+        updates = []
+        stream = UserDataStream(sim, on_order_update=updates.append)
+        sim.listeners.append(stream.handle_message)
+
+        async def run():
+            await sim.advance()
+            await sim.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=1)
+            await sim.futures_create_order(symbol='BTCUSDT', side='SELL', type='STOP_MARKET',
+                                           stopPrice=95, closePosition=True)
+            await sim.advance()
+
+        asyncio.run(run())
+        assert [(u.orig_type, u.status) for u in updates] == [('MARKET', 'FILLED'), ('STOP_MARKET', 'FILLED')]
+        assert updates[-1].realized_pnl == -5
+        assert 'BTCUSDT' not in stream.positions
+        assert stream.balances['USDT'] == pytest.approx(sim.balance)
+
+    def test_weight_limit_returns_429(self):
+        sim = simulator([(100, 100, 100, 100)] * 3, weight_limit=20)
+
+        async def run():
+            for _ in range(15):
+                await sim.futures_klines(symbol='BTCUSDT', interval='1m', limit=100)
+
+        with pytest.raises(SimulatedAPIError) as exc:
+            asyncio.run(run())
+        assert exc.value.status_code == 429
+        assert sim.response.headers['X-MBX-USED-WEIGHT-1M'] == '22'
+
+        # Minuto virtual seguinte: peso zerado
+        asyncio.run(sim.advance())
+        asyncio.run(sim.futures_klines(symbol='BTCUSDT', interval='1m', limit=100))
+
+    def test_rate_limited_client_reads_weight_header(self):
+        sim = simulator([(100, 100, 100, 100)] * 3)
+        limiter = RateLimiter()
+        client = RateLimitedClient(sim, limiter)
+
+        asyncio.run(client.futures_klines(symbol='BTCUSDT', interval='1m', limit=100))
+        assert limiter.metrics()['used_weight_1m'] == 2
+
+
+class TestAgainstBotComponents:
+    """Componentes do bot rodando contra o simulador."""
+
+    def test_protection_then_stop_out(self):
+        sim = ExchangeSimulator.synthetic(['BTCUSDT'], n=400, seed=3, start_index=150)
+        manager = ProtectionManager(FakeRegistry(), base_backoff=0.01)
+
+        async def run():
+            await sim.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=0.01)
+            entry = sim.positions['BTCUSDT']['entry_price']
+            result = await manager.heal_one(sim, HealRequest('BTCUSDT', 'LONG', entry, 0.01))
+            while sim.positions['BTCUSDT']['amount'] != 0 and not sim.finished:
+                await sim.advance()
+            return result
+
+        result = asyncio.run(run())
+        assert result.protected
+        assert sim.positions['BTCUSDT']['amount'] == 0
+        assert float(sim.fills[-1]['price']) in (result.sl_price, result.tp_price)
+
+    def test_history_sync_reads_simulated_fills(self, tmp_path):
+        sim = simulator([(100, 100, 100, 100), (100, 111, 99, 110), (110, 110, 110, 110)])
+        sync = HistorySync(state_path=str(tmp_path / 'marks.json'))
+
+        async def run():
+            await sim.advance()
+            await sim.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=1)
+            await sim.futures_create_order(symbol='BTCUSDT', side='SELL', type='LIMIT', quantity=1,
+                                           price=110, reduceOnly=True)
+            await sim.advance()
+            return await sync.sync(sim, ['BTCUSDT'], START, sim.now_ms)
+
+        records, stats = asyncio.run(run())
+        assert stats.fills == 2
+        assert len(records) == 1  # Só o fechamento tem PnL realizado
@@ -0,0 +1,121 @@
+"""
+🕰️ TESTS DO HISTORY SYNC
+=========================
+High-water mark, paginação por fromId, janelas de 7 dias e orçamento de peso.
+"""
+
+import asyncio
+
+from history_sync import USER_TRADES_WEIGHT, WINDOW_MS, HistorySync
+
+DAY = 86_400_000
+START = 1_700_000_000_000
+
+
+class FakeClient:
+    """futures_account_trades com as regras de startTime/endTime/fromId da Binance."""
+
+    def __init__(self, fills_by_symbol):
+        self.fills = fills_by_symbol
+        self.calls = []
+
+    async def futures_account_trades(self, symbol, limit=500, fromId=None, startTime=None, endTime=None):
+        self.calls.append({'symbol': symbol, 'fromId': fromId, 'startTime': startTime, 'endTime': endTime})
+        await asyncio.sleep(0)
+        fills = self.fills.get(symbol, [])
+        if fromId is not None:
+            selected = [f for f in fills if f['id'] >= fromId]
+        else:
+            assert endTime - startTime < WINDOW_MS
+            selected = [f for f in fills if startTime <= f['time'] <= endTime]
+        return selected[:limit]
+
+
+def make_fills(count, start_time=START, step=60_000, first_id=1):
+    return [
+        {'id': first_id + i, 'time': start_time + i * step, 'price': '100', 'qty': '0.1',
+         'realizedPnl': '1.5' if i % 2 else '0'}
+        for i in range(count)
+    ]
+
+
+class TestHistorySync:
+    """Testes para HistorySync."""
+
+    def test_pages_beyond_1000_fills(self, tmp_path):
+        client = FakeClient({'BTCUSDT': make_fills(2500)})
+        sync = HistorySync(str(tmp_path / 'state.json'))
+
+        records, stats = asyncio.run(sync.sync(client, ['BTCUSDT'], START, now_ms=START + DAY))
+
+        assert stats.fills == 2500
+        assert len(records) == 1250  # só fills com PnL realizado
+        assert sync.marks['BTCUSDT']['last_id'] == 2500
+        assert [c['fromId'] for c in client.calls[1:]] == [1001, 2001]
+
+    def test_incremental_after_save(self, tmp_path):
+        path = str(tmp_path / 'state.json')
+        fills = make_fills(10)
+        client = FakeClient({'BTCUSDT': fills})
+        sync = HistorySync(path)
+        asyncio.run(sync.sync(client, ['BTCUSDT'], START, now_ms=START + DAY))
+        sync.save()
+
+        fills.extend(make_fills(4, start_time=START + 3_600_000, first_id=11))
+        client.calls.clear()
+        records, stats = asyncio.run(HistorySync(path).sync(client, ['BTCUSDT'], START, now_ms=START + DAY))
+
+        assert stats.fills == 4
+        assert client.calls == [{'symbol': 'BTCUSDT', 'fromId': 11, 'startTime': None, 'endTime': None}]
+
+    def test_first_sync_walks_7_day_windows(self, tmp_path):
+        client = FakeClient({'ETHUSDT': make_fills(3, start_time=START + 20 * DAY)})
+        sync = HistorySync(str(tmp_path / 'state.json'))
+
+        _, stats = asyncio.run(sync.sync(client, ['ETHUSDT'], START, now_ms=START + 30 * DAY))
+
+        assert stats.fills == 3
+        windows = [c for c in client.calls if c['startTime'] is not None]
+        assert len(windows) == 3  # dias 0-7, 7-14, 14-21 (achou)
+
+    def test_empty_symbol_remembers_scanned_time(self, tmp_path):
+        client = FakeClient({})
+        sync = HistorySync(str(tmp_path / 'state.json'))
+        now = START + 30 * DAY
+        asyncio.run(sync.sync(client, ['SOLUSDT'], START, now_ms=now))
+        first_calls = len(client.calls)
+
+        asyncio.run(sync.sync(client, ['SOLUSDT'], START, now_ms=now + DAY))
+        assert len(client.calls) == first_calls + 1  # só a janela nova
+
+    def test_weight_budget_leaves_rest_for_next_run(self, tmp_path):
+        client = FakeClient({s: make_fills(5) for s in ('AUSDT', 'BUSDT', 'CUSDT')})
+        sync = HistorySync(str(tmp_path / 'state.json'), weight_budget=4 * USER_TRADES_WEIGHT)
+
+        _, stats = asyncio.run(sync.sync(client, ['AUSDT', 'BUSDT', 'CUSDT'], START, now_ms=START + DAY))
+        assert stats.weight_used <= 4 * USER_TRADES_WEIGHT
+        assert stats.incomplete
+
+        sync.weight_budget = 100
+        _, stats = asyncio.run(sync.sync(client, ['AUSDT', 'BUSDT', 'CUSDT'], START, now_ms=START + DAY))
+        assert all(sync.marks[s]['last_id'] == 5 for s in ('AUSDT', 'BUSDT', 'CUSDT'))
+
+    def test_symbols_fetched_concurrently(self, tmp_path):
+        in_flight = 0
+        peak = 0
+
+        class SlowClient(FakeClient):
+            async def futures_account_trades(self, **kwargs):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return await super().futures_account_trades(**kwargs)
+
+        symbols = [f'S{i}USDT' for i in range(8)]
+        client = SlowClient({s: make_fills(2) for s in symbols})
+        sync = HistorySync(str(tmp_path / 'state.json'), max_concurrency=4)
+        asyncio.run(sync.sync(client, symbols, START, now_ms=START + DAY))
+
+        assert peak == 4
@@ -11,19 +11,20 @@ from decimal import Decimal
 
 
 # ============================================================================
-= FIXTURES - DADOS DE TESTE
+# FIXTURES - DADOS DE TESTE
 # ============================================================================
 
 @pytest.fixture
 def sample_ohlcv_data():
     """Dados OHLCV de exemplo para testes."""
+    rng = np.random.default_rng(7)  # Semente fixa: asserts não dependem do sorteio
     return pd.DataFrame({
         'timestamp': pd.date_range('2024-01-01', periods=100, freq='15T'),
-        'open': np.linspace(100, 110, 100) + np.random.randn(100) * 0.5,
-        'high': np.linspace(100, 110, 100) + np.random.randn(100) * 0.5 + 0.5,
-        'low': np.linspace(100, 110, 100) + np.random.randn(100) * 0.5 - 0.5,
-        'close': np.linspace(100, 110, 100) + np.random.randn(100) * 0.3,
-        'volume': np.random.randint(1000, 5000, 100)
+        'open': np.linspace(100, 110, 100) + rng.standard_normal(100) * 0.5,
+        'high': np.linspace(100, 110, 100) + rng.standard_normal(100) * 0.5 + 0.5,
+        'low': np.linspace(100, 110, 100) + rng.standard_normal(100) * 0.5 - 0.5,
+        'close': np.linspace(100, 110, 100) + rng.standard_normal(100) * 0.3,
+        'volume': rng.integers(1000, 5000, 100)
     })
 
 
@@ -49,14 +50,14 @@ def downtrend_data():
 def sideways_data():
     """Dados em lateralização (consolidação)."""
     base = 100
-    noise = np.random.randn(100) * 2
+    noise = np.random.default_rng(11).standard_normal(100) * 2
     return pd.DataFrame({
         'close': base + noise
     })
 
 
 # ============================================================================
-= CÁLCULO DE INDICADORES
+# CÁLCULO DE INDICADORES
 # ============================================================================
 
 class TestEMA:
@@ -156,16 +157,17 @@ class TestRSI:
 
     def test_rsi_extremes(self):
         """Testar limites extremos do RSI."""
-        # Criar dados que geram RSI extremo
-        close = pd.Series([100] * 10 + [110] * 10)
+        # Alta quase contínua com um único recuo pequeno: RSI extremo, mas < 100
+        close = pd.Series([100.0 + i for i in range(20)])
+        close[15] = 113.5
         delta = close.diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
         loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
 
-        # RSI não deve ser exatamente 0 ou 100 (rolling suavisa)
-        assert rsi.iloc[-1] > 0
+        # Extremo (> 70), mas não exatamente 100 enquanto houver alguma perda na janela
+        assert rsi.iloc[-1] > 70
         assert rsi.iloc[-1] < 100
 
 
@@ -291,9 +293,10 @@ class TestBollingerBands:
         # BB width deve ser menor em dados estáveis
         assert bb_width.iloc[-1] < 10
 
-    def test_bb_expansion(self, uptrend_data):
+    def test_bb_expansion(self):
         """Testar BB expansion (expansão de bandas)."""
-        close = uptrend_data['close']
+        # Lateral por 20 períodos e depois tendência forte
+        close = pd.Series([100.0, 101.0] * 10 + [102.0 + 2 * i for i in range(20)])
         bb_middle = close.rolling(window=20).mean()
         bb_std = close.rolling(window=20).std()
         bb_upper = bb_middle + (bb_std * 2)
@@ -301,7 +304,7 @@ class TestBollingerBands:
 
         # Bandas devem expandir em tendência forte
         # (bb_std deve aumentar)
-        assert bb_std.iloc[-1] > bb_std.iloc[20]
+        assert bb_std.iloc[-1] > bb_std.iloc[19]
 
     def test_bb_touch_upper(self, uptrend_data):
         """Testar preço tocando banda superior."""
@@ -315,7 +318,7 @@ class TestBollingerBands:
 
 
 # ============================================================================
-= SINAIS DE TRADING
+# SINAIS DE TRADING
 # ============================================================================
 
 class TestTradingSignals:
@@ -376,5 +379,258 @@ class TestTradingSignals:
         assert score < 40
 
 
+
+# ============================================================================
+# MOTOR DE INDICADORES (indicators.py) - PARIDADE COM O CÁLCULO PANDAS
+# ============================================================================
+
+def legacy_indicators(df):
+    """Cálculo pandas antigo (copiado de bot_master/backtest/agent)."""
+    df = df.copy()
+    df['ema_9'] = df['close'].ewm(span=9).mean()
+    df['ema_21'] = df['close'].ewm(span=21).mean()
+    df['ema_50'] = df['close'].ewm(span=50).mean()
+
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    df['rsi'] = 100 - (100 / (1 + rs))
+
+    df['ema_12'] = df['close'].ewm(span=12).mean()
+    df['ema_26'] = df['close'].ewm(span=26).mean()
+    df['macd'] = df['ema_12'] - df['ema_26']
+    df['macd_signal'] = df['macd'].ewm(span=9).mean()
+    df['macd_hist'] = df['macd'] - df['macd_signal']
+
+    df['bb_middle'] = df['close'].rolling(window=20).mean()
+    df['bb_std'] = df['close'].rolling(window=20).std()
+    df['bb_upper'] = df['bb_middle'] + (df['bb_std'] * 2)
+    df['bb_lower'] = df['bb_middle'] - (df['bb_std'] * 2)
+
+    high_low = df['high'] - df['low']
+    high_close = abs(df['high'] - df['close'].shift())
+    low_close = abs(df['low'] - df['close'].shift())
+    ranges = pd.concat([high_low, high_close, low_close], axis=1)
+    df['atr'] = ranges.max(axis=1).rolling(window=14).mean()
+    df['hl_range'] = high_low.rolling(14).mean()
+
+    df['volume_ma'] = df['volume'].rolling(window=20).mean()
+    df['volume_ratio'] = df['volume'] / df['volume_ma']
+    return df
+
+
+LEGACY_COLUMNS = [
+    'ema_9', 'ema_12', 'ema_21', 'ema_26', 'ema_50', 'rsi', 'macd', 'macd_signal',
+    'macd_hist', 'bb_middle', 'bb_std', 'bb_upper', 'bb_lower', 'atr', 'hl_range',
+    'volume_ma', 'volume_ratio'
+]
+
+
+def random_ohlcv(n, seed=42):
+    """Série OHLCV determinística (random walk)."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.2, n),
+        'high': close + rng.random(n),
+        'low': close - rng.random(n),
+        'close': close,
+        'volume': rng.integers(1000, 5000, n).astype(float)
+    })
+
+
+class TestIndicatorEngine:
+    """Paridade do motor NumPy com as fórmulas pandas antigas."""
+
+    @pytest.mark.parametrize("n", [100, 5000])
+    def test_parity_with_pandas(self, n):
+        """Todos os indicadores devem bater com o cálculo pandas."""
+        from indicators import add_indicators
+
+        df = random_ohlcv(n)
+        expected = legacy_indicators(df)
+        result = add_indicators(df)
+
+        for column in LEGACY_COLUMNS:
+            np.testing.assert_allclose(
+                result[column].to_numpy(), expected[column].to_numpy(),
+                rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=column
+            )
+
+    def test_ema_adjust_false(self):
+        """EMA sem ajuste deve bater com ewm(adjust=False)."""
+        from indicators import ema
+
+        close = random_ohlcv(3000)['close']
+        np.testing.assert_allclose(
+            ema(close, 21, adjust=False),
+            close.ewm(span=21, adjust=False).mean().to_numpy(),
+            rtol=1e-12
+        )
+
+    def test_rsi_extremes_match(self):
+        """RSI com perdas zero (100) e sem movimento (NaN) igual ao pandas."""
+        from indicators import rsi
+
+        close = pd.Series([100.0] * 20 + [100.0 + i for i in range(20)])
+        delta = close.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        expected = 100 - (100 / (1 + gain / loss))
+
+        np.testing.assert_allclose(rsi(close), expected.to_numpy(), equal_nan=True)
+
+    def test_batch_matches_single(self):
+        """API 2D (símbolos × candles) igual ao cálculo por símbolo."""
+        from indicators import compute_indicators
+
+        frames = [random_ohlcv(200, seed=s) for s in range(5)]
+        stacked = {
+            col: np.stack([f[col].to_numpy() for f in frames])
+            for col in ('close', 'high', 'low', 'volume')
+        }
+        batch = compute_indicators(stacked['close'], stacked['high'], stacked['low'], stacked['volume'])
+
+        for row, frame in enumerate(frames):
+            single = compute_indicators(frame['close'], frame['high'], frame['low'], frame['volume'])
+            for key, values in single.items():
+                np.testing.assert_allclose(batch[key][row], values, equal_nan=True, err_msg=key)
+
+    def test_compute_many_groups_by_length(self):
+        """Séries de tamanhos diferentes voltam na ordem original."""
+        from indicators import compute_indicators, compute_many
+
+        frames = [random_ohlcv(100, seed=1), random_ohlcv(60, seed=2), random_ohlcv(100, seed=3)]
+        series = [{col: f[col].to_numpy() for col in ('close', 'high', 'low', 'volume')} for f in frames]
+
+        results = compute_many(series)
+
+        for frame, result in zip(frames, results):
+            single = compute_indicators(frame['close'], frame['high'], frame['low'], frame['volume'])
+            assert len(result['close']) == len(frame)
+            np.testing.assert_allclose(result['rsi'], single['rsi'], equal_nan=True)
+
+    def test_klines_to_arrays(self):
+        """Klines brutos (strings) viram arrays float64 contíguos."""
+        from indicators import klines_to_arrays
+
+        klines = [
+            [1700000000000, '1.0', '2.0', '0.5', '1.5', '100', 0, '0', 0, '0', '0', '0'],
+            [1700000900000, '1.5', '2.5', '1.0', '2.0', '200', 0, '0', 0, '0', '0', '0'],
+        ]
+        arrays = klines_to_arrays(klines)
+
+        assert arrays['close'].dtype == np.float64
+        assert arrays['close'].flags['C_CONTIGUOUS']
+        assert arrays['close'].tolist() == [1.5, 2.0]
+        assert arrays['volume'].tolist() == [100.0, 200.0]
+
+
+# ============================================================================
+# ESTADO INCREMENTAL (IndicatorState)
+# ============================================================================
+
+INTERVAL_MS = 900_000
+
+
+def frame_to_klines(df, start_ms=1_700_000_000_000):
+    """Converter DataFrame OHLCV em klines no formato REST da Binance."""
+    return [
+        [start_ms + i * INTERVAL_MS, str(r.open), str(r.high), str(r.low), str(r.close),
+         str(r.volume), start_ms + (i + 1) * INTERVAL_MS - 1, '0', 0, '0', '0', '0']
+        for i, r in enumerate(df.itertuples())
+    ]
+
+
+def assert_latest_matches(state, klines):
+    """Comparar latest() com o último valor do cálculo em lote."""
+    from indicators import compute_from_klines
+
+    batch = compute_from_klines(klines)
+    latest = state.latest()
+    for key in LEGACY_COLUMNS:
+        np.testing.assert_allclose(latest[key], batch[key][-1], rtol=1e-9, equal_nan=True, err_msg=key)
+
+
+class TestIndicatorState:
+    """Testes para o estado incremental de indicadores."""
+
+    def test_seed_matches_batch(self):
+        """Carga inicial (último candle em formação) bate com o lote."""
+        from indicators import IndicatorState
+
+        klines = frame_to_klines(random_ohlcv(100))
+        now_ms = klines[-1][0] + 1000  # último candle ainda aberto
+        state = IndicatorState.from_klines(klines, INTERVAL_MS, now_ms=now_ms)
+
+        assert state.live is not None
+        assert state.bars == 99
+        assert_latest_matches(state, klines)
+
+    def test_streaming_updates_match_batch(self):
+        """Atualizações do candle em formação + fechamento seguem o lote."""
+        from indicators import IndicatorState
+
+        klines = frame_to_klines(random_ohlcv(150))
+        state = IndicatorState.from_klines(klines[:100], INTERVAL_MS, now_ms=klines[100][0])
+
+        for i in range(100, 150):
+            k = klines[i]
+            candle = (k[0], *(float(x) for x in k[1:6]))
+
+            # Candle em formação: preço intermediário, depois o valor final
+            partial = (candle[0], candle[1], candle[2], candle[3], candle[1], candle[5] / 2)
+            state.update(partial, closed=False)
+            state.update(candle, closed=False)
+            assert_latest_matches(state, klines[:i + 1])
+
+            state.update(candle, closed=True)
+            assert_latest_matches(state, klines[:i + 1])
+
+    def test_signals_format(self):
+        """signals() tem as mesmas chaves de analyze_symbol."""
+        from indicators import IndicatorState
+
+        state = IndicatorState.from_klines(frame_to_klines(random_ohlcv(100)), INTERVAL_MS)
+        assert set(state.signals()) == {
+            'ema_9', 'ema_21', 'ema_50', 'rsi', 'macd', 'bb_upper', 'bb_lower', 'rel_volume'
+        }
+        assert len(state.recent_history()) == 5
+
+    def test_gap_marks_stale(self):
+        """Buraco na sequência de candles marca o estado para recarga."""
+        from indicators import IndicatorState
+
+        klines = frame_to_klines(random_ohlcv(100))
+        state = IndicatorState.from_klines(klines[:50], INTERVAL_MS, now_ms=klines[60][0])
+
+        k = klines[55]
+        assert not state.update((k[0], *(float(x) for x in k[1:6])), closed=True)
+        assert state.stale
+
+    def test_missed_close_marks_stale(self):
+        """Próximo candle sem o fechamento do anterior: o snapshot em formação não vale como fechado."""
+        from indicators import IndicatorState
+
+        klines = frame_to_klines(random_ohlcv(60))
+        state = IndicatorState.from_klines(klines[:51], INTERVAL_MS, now_ms=klines[50][0])
+        assert state.live is not None
+
+        k = klines[51]
+        assert not state.update((k[0], *(float(x) for x in k[1:6])), closed=False)
+        assert state.stale
+        assert state.bars == 50
+
+    def test_running_sums_stay_exact(self):
+        """Somas acumuladas (com ressincronização periódica) seguem o lote em séries longas."""
+        from indicators import IndicatorState, _RollingWindow
+
+        klines = frame_to_klines(random_ohlcv(2600))
+        state = IndicatorState.from_klines(klines, INTERVAL_MS, now_ms=klines[-1][6] + 1)
+
+        assert state._closes._pushes > 2 * _RollingWindow.RESYNC_EVERY
+        assert_latest_matches(state, klines)
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
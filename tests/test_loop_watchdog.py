@@ -0,0 +1,119 @@
+"""
+🐕 TESTS DO LOOP WATCHDOG
+==========================
+Lag do event loop, captura da pilha do bloqueio e heartbeat vencido.
+"""
+
+import asyncio
+import time
+
+from loop_watchdog import LoopWatchdog, await_location
+from metrics import MetricsRegistry
+
+
+def watchdog(**kwargs):
+    kwargs.setdefault('interval', 0.02)
+    kwargs.setdefault('threshold', 0.1)
+    return LoopWatchdog(metrics=MetricsRegistry(), **kwargs)
+
+
+def blocking_json_write():
+    time.sleep(0.3)  # Simula uma chamada síncrona no loop
+
+
+class TestLoopWatchdog:
+    """Testes para LoopWatchdog."""
+
+    def test_measures_lag_without_stalls(self):
+        dog = watchdog()
+
+        async def run():
+            await dog.start()
+            await asyncio.sleep(0.15)
+            await dog.stop()
+
+        asyncio.run(run())
+        assert dog.lag.count() >= 3
+        assert dog.stall_total == 0
+
+    def test_captures_stack_of_blocking_call(self):
+        dog = watchdog()
+
+        async def offender():
+            blocking_json_write()
+
+        async def run():
+            await dog.start()
+            await asyncio.sleep(0.05)
+            await asyncio.create_task(offender(), name='salvar-estado')
+            await asyncio.sleep(0.05)
+            await dog.stop()
+
+        asyncio.run(run())
+        assert dog.stall_total == 1
+        stall = dog.stalls[-1]
+        assert stall.lag >= 0.2
+        assert 'salvar-estado' in stall.task and 'offender' in stall.task
+        assert 'blocking_json_write' in stall.stack
+        assert 'time.sleep' in stall.culprit()
+        assert dog.summary()['last_stall']['task'] == stall.task
+
+    def test_stale_heartbeat_calls_on_stale_once(self):
+        calls = []
+        dog = watchdog(stale_after=0.05, on_stale=lambda: calls.append(time.monotonic()))
+
+        async def run():
+            await dog.start()
+            dog.beat()
+            await asyncio.sleep(0.2)
+            await dog.stop()
+
+        asyncio.run(run())
+        assert len(calls) == 1
+        assert dog.stale_total == 1
+        assert dog.heartbeat_age.get() >= 0.05
+
+    def test_beat_rearms_stale_check(self):
+        calls = []
+        dog = watchdog(stale_after=0.05, on_stale=lambda: calls.append(1))
+
+        async def run():
+            await dog.start()
+            dog.beat()
+            await asyncio.sleep(0.12)
+            dog.beat()
+            await asyncio.sleep(0.12)
+            await dog.stop()
+
+        asyncio.run(run())
+        assert len(calls) == 2
+
+    def test_restart_cancels_stuck_cycle(self):
+        async def stuck_cycle():
+            await asyncio.Event().wait()  # Nunca termina (ex.: request sem timeout)
+
+        async def run():
+            cycle = asyncio.create_task(stuck_cycle())
+            dog = watchdog(stale_after=0.05, on_stale=cycle.cancel)
+            await dog.start()
+            dog.beat()
+            await asyncio.wait({cycle}, timeout=1)
+            await asyncio.sleep(0)
+            await dog.stop()
+            return cycle
+
+        cycle = asyncio.run(run())
+        assert cycle.cancelled()
+
+    def test_await_location(self):
+        async def stuck_cycle():
+            await asyncio.Event().wait()
+
+        async def run():
+            task = asyncio.create_task(stuck_cycle())
+            await asyncio.sleep(0)
+            where = await_location(task)
+            task.cancel()
+            return where
+
+        assert 'stuck_cycle' in asyncio.run(run())
@@ -0,0 +1,134 @@
+"""
+📡 TESTS DO MARKET DATA
+========================
+Buffer circular de candles e processamento do stream combinado.
+"""
+
+import time
+
+import pytest
+
+from indicators import IndicatorState
+from market_data import CandleBuffer, MarketDataService
+
+
+INTERVAL_MS = 900_000
+
+
+def make_candle(i, close=100.0):
+    return (i * INTERVAL_MS, close, close + 1, close - 1, close, 10.0)
+
+
+def kline_message(symbol, candle, closed):
+    open_time, o, h, l, c, v = candle
+    return {
+        'stream': f"{symbol.lower()}@kline_15m",
+        'data': {
+            'e': 'kline', 's': symbol,
+            'k': {'t': open_time, 'o': str(o), 'h': str(h), 'l': str(l), 'c': str(c), 'v': str(v), 'x': closed}
+        }
+    }
+
+
+class TestCandleBuffer:
+    """Testes para CandleBuffer."""
+
+    def test_ring_keeps_last_candles(self):
+        """Buffer cheio descarta os mais antigos e mantém a ordem."""
+        buffer = CandleBuffer(capacity=5, interval_ms=INTERVAL_MS)
+        for i in range(8):
+            buffer.upsert(make_candle(i, 100 + i), closed=True)
+
+        arrays = buffer.to_arrays()
+        assert len(buffer) == 5
+        assert list(arrays['close']) == [103, 104, 105, 106, 107]
+        assert arrays['close'].flags['C_CONTIGUOUS']
+
+    def test_live_candle_is_overwritten(self):
+        """Updates do candle em formação substituem o último registro."""
+        buffer = CandleBuffer(capacity=5, interval_ms=INTERVAL_MS)
+        buffer.upsert(make_candle(0, 100), closed=True)
+        buffer.upsert(make_candle(1, 101), closed=False)
+        buffer.upsert(make_candle(1, 102), closed=False)
+
+        assert len(buffer) == 2
+        assert buffer.to_arrays()['close'][-1] == 102
+        assert not buffer.upsert(make_candle(0, 99), closed=True)
+
+    def test_gap_resets_buffer(self):
+        """Buraco na sequência descarta o histórico (buffer sempre contíguo)."""
+        buffer = CandleBuffer(capacity=10, interval_ms=INTERVAL_MS)
+        for i in range(3):
+            buffer.upsert(make_candle(i), closed=True)
+        buffer.upsert(make_candle(5), closed=False)
+
+        assert len(buffer) == 1
+        assert buffer.last_open_time == 5 * INTERVAL_MS
+
+    def test_as_klines_feeds_indicator_state(self):
+        """Klines do buffer reproduzem o estado criado a partir do REST."""
+        buffer = CandleBuffer(capacity=100, interval_ms=INTERVAL_MS)
+        for i in range(60):
+            buffer.upsert(make_candle(i, 100 + (i % 7)), closed=i < 59)
+
+        klines = buffer.as_klines()
+        state = IndicatorState.from_klines(klines, INTERVAL_MS)
+
+        assert state.bars == 59
+        assert state.live[0] == 59 * INTERVAL_MS
+        assert len(buffer.as_klines(limit=20)) == 20
+
+
+class TestMarketDataService:
+    """Testes para MarketDataService (sem rede)."""
+
+    def test_streams(self):
+        """Um stream de kline e um de markPrice por símbolo."""
+        service = MarketDataService(None, ['BTCUSDT', 'ETHUSDT'])
+        assert service.streams == [
+            'btcusdt@kline_15m', 'btcusdt@markPrice@1s',
+            'ethusdt@kline_15m', 'ethusdt@markPrice@1s'
+        ]
+
+    def test_kline_and_mark_price_callbacks(self):
+        """Mensagens atualizam buffer, mark price e chamam os callbacks."""
+        klines, prices = [], []
+        service = MarketDataService(
+            None, ['BTCUSDT'],
+            on_kline=lambda s, c, x: klines.append((s, c, x)),
+            on_mark_price=lambda s, p: prices.append((s, p))
+        )
+        service.connected = True
+
+        service.handle_message(kline_message('BTCUSDT', make_candle(3, 50000), closed=True))
+        service.handle_message({'stream': 'btcusdt@markPrice@1s',
+                                'data': {'e': 'markPriceUpdate', 's': 'BTCUSDT', 'p': '50010.5'}})
+
+        assert klines == [('BTCUSDT', make_candle(3, 50000), True)]
+        assert prices == [('BTCUSDT', 50010.5)]
+        assert len(service.buffers['BTCUSDT']) == 1
+        assert service.mark_prices['BTCUSDT'] == 50010.5
+        assert service.is_live('BTCUSDT')
+        assert not service.is_live('ETHUSDT')
+
+    def test_is_live_expires(self):
+        """Símbolo sem mensagens recentes não conta como ao vivo."""
+        service = MarketDataService(None, ['BTCUSDT'], live_timeout=10)
+        service.connected = True
+        service.last_update['BTCUSDT'] = time.monotonic() - 30
+        assert not service.is_live('BTCUSDT')
+
+    def test_error_event_forces_reconnect(self):
+        """Evento de erro da biblioteca vira exceção (o loop reconecta)."""
+        service = MarketDataService(None, ['BTCUSDT'])
+        with pytest.raises(ConnectionError):
+            service.handle_message({'e': 'error', 'm': 'Max reconnect retries reached'})
+
+    def test_klines_requires_enough_history(self):
+        """klines() só retorna quando o buffer tem candles suficientes."""
+        service = MarketDataService(None, ['BTCUSDT'])
+        rest = [[i * INTERVAL_MS, '1', '2', '0.5', '1.5', '10', (i + 1) * INTERVAL_MS - 1] for i in range(30)]
+        service.seed('BTCUSDT', rest)
+
+        assert service.klines('BTCUSDT', 50) is None
+        assert len(service.klines('BTCUSDT', 30)) == 30
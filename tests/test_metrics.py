@@ -0,0 +1,148 @@
+"""
+📈 TESTS DO METRICS
+====================
+Formato de exposição, coletores, servidor HTTP e instrumentação do cliente REST.
+"""
+
+import asyncio
+import socket
+
+import aiohttp
+import pytest
+
+from metrics import MetricsRegistry, MetricsServer, error_code
+from rate_limiter import RateLimitedClient
+from tests.mocks.exchange_simulator import ExchangeSimulator, SimulatedAPIError
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestRegistry:
+    """Testes para MetricsRegistry."""
+
+    def test_counter_and_gauge(self):
+        registry = MetricsRegistry()
+        registry.counter('errors_total', 'Erros', ('code',)).inc(code='-2022')
+        registry.counter('errors_total', 'Erros', ('code',)).inc(2, code='-2022')
+        registry.gauge('positions', 'Posições').set(3)
+
+        text = registry.render()
+        assert '# TYPE errors_total counter' in text
+        assert 'errors_total{code="-2022"} 3' in text
+        assert 'positions 3' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram('latency_seconds', 'Latência', ('endpoint',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            latency.observe(value, endpoint='futures_klines')
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{endpoint="futures_klines",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{endpoint="futures_klines",le="1"} 3' in text
+        assert 'latency_seconds_bucket{endpoint="futures_klines",le="+Inf"} 4' in text
+        assert 'latency_seconds_count{endpoint="futures_klines"} 4' in text
+        assert 'latency_seconds_sum{endpoint="futures_klines"} 4.25' in text
+
+    def test_wrong_labels_rejected(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('errors_total', 'Erros', ('code',))
+        with pytest.raises(ValueError):
+            counter.inc(endpoint='x')
+        with pytest.raises(ValueError):
+            registry.gauge('errors_total')
+
+    def test_collectors_grouped_by_family(self):
+        registry = MetricsRegistry()
+
+        @registry.collector
+        def phases():
+            yield 'cycle_seconds', 'summary', 'Ciclo', {'phase': 'scan', 'quantile': '0.5'}, 0.2
+            yield 'cycle_seconds_count', 'summary', '', {'phase': 'scan'}, 10
+            yield 'skipped', 'gauge', 'Sem valor', {}, None
+
+        @registry.collector
+        def broken():
+            raise RuntimeError('falhou')
+
+        text = registry.render()
+        assert text.count('# TYPE cycle_seconds summary') == 1
+        assert 'cycle_seconds_count{phase="scan"} 10' in text
+        assert 'skipped' not in text
+        assert 'bot_metrics_collector_errors{collector="broken",error="RuntimeError"} 1' in text
+
+    def test_label_values_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter('errors_total', 'Erros', ('message',)).inc(message='a "b"\nc')
+        assert 'errors_total{message="a \\"b\\"\\nc"} 1' in registry.render()
+
+    def test_write_file(self, tmp_path):
+        registry = MetricsRegistry()
+        registry.gauge('positions', 'Posições').set(1)
+        path = tmp_path / 'metrics' / 'bot.prom'
+        registry.write(str(path))
+        assert 'positions 1' in path.read_text()
+
+    def test_error_code(self):
+        assert error_code(SimulatedAPIError(-2022, 'ReduceOnly Order is rejected.')) == '-2022'
+        assert error_code(RuntimeError('APIError(code=-1001): Internal error')) == '-1001'
+        assert error_code(asyncio.TimeoutError()) == 'TimeoutError'
+
+
+class TestServer:
+    """Testes para MetricsServer."""
+
+    def test_metrics_and_health_endpoints(self):
+        port = free_port()
+        registry = MetricsRegistry()
+        registry.gauge('positions', 'Posições').set(2)
+        server = MetricsServer(registry, port=port, host='127.0.0.1', stale_after=0.2)
+
+        async def run():
+            await server.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    base = f'http://127.0.0.1:{port}'
+                    async with session.get(f'{base}/metrics') as r:
+                        text = await r.text()
+                        content_type = r.headers['Content-Type']
+                    server.beat()
+                    async with session.get(f'{base}/health') as r:
+                        healthy = r.status
+                    await asyncio.sleep(0.3)
+                    async with session.get(f'{base}/health') as r:
+                        stale = r.status
+            finally:
+                await server.stop()
+            return text, content_type, healthy, stale
+
+        text, content_type, healthy, stale = asyncio.run(run())
+        assert 'positions 2' in text
+        assert content_type.startswith('text/plain; version=0.0.4')
+        assert (healthy, stale) == (200, 503)
+
+
+class TestRestInstrumentation:
+    """Latência e erros registrados pelo RateLimitedClient."""
+
+    def test_latency_and_errors(self):
+        registry = MetricsRegistry()
+        sim = ExchangeSimulator.synthetic(['BTCUSDT'], n=150, seed=1)
+        client = RateLimitedClient(sim, metrics=registry)
+
+        async def run():
+            await client.futures_klines(symbol='BTCUSDT', interval='15m', limit=50)
+            await client.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=0.01)
+            with pytest.raises(SimulatedAPIError):
+                await client.futures_create_order(symbol='BTCUSDT', side='BUY', type='LIMIT', quantity=0.01,
+                                                  price=1, reduceOnly=True)
+
+        asyncio.run(run())
+        assert client.rest_latency.count(endpoint='futures_klines') == 1
+        assert client.rest_latency.count(endpoint='futures_create_order') == 2
+        assert client.order_latency.count(type='MARKET') == 1
+        assert client.api_errors.get(endpoint='futures_create_order', code='-2022') == 1
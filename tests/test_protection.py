@@ -0,0 +1,147 @@
+"""
+🛡️ TESTS DO PROTECTION MANAGER
+===============================
+Auto-heal paralelo, retentativas com backoff e tempo até proteção.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from protection import HealRequest, ProtectionManager
+
+
+class FakeRegistry:
+    async def get(self, client, symbol):
+        return SimpleNamespace(price_precision=2)
+
+
+class FakeClient:
+    """Cliente fake: cada chamada leva `delay`; falhas configuráveis por tipo de ordem."""
+
+    def __init__(self, delay=0.05, failures=None, closed=()):
+        self.delay = delay
+        self.failures = dict(failures or {})   # (symbol, type) -> nº de falhas
+        self.closed = set(closed)
+        self.orders = []
+        self._next_id = 1
+
+    async def futures_klines(self, symbol, interval, limit):
+        await asyncio.sleep(self.delay)
+        return [[i, 100, 101, 99, 100, 10, i + 1] for i in range(limit)]
+
+    async def futures_create_order(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        key = (kwargs['symbol'], kwargs['type'])
+        if self.failures.get(key):
+            self.failures[key] -= 1
+            raise RuntimeError("APIError(code=-1001): Internal error")
+        self.orders.append(kwargs)
+        self._next_id += 1
+        return {'orderId': self._next_id}
+
+    async def futures_position_information(self, symbol):
+        await asyncio.sleep(self.delay)
+        amt = '0' if symbol in self.closed else '1'
+        return [{'symbol': symbol, 'positionAmt': amt}]
+
+
+def manager(**kwargs):
+    kwargs.setdefault('base_backoff', 0.01)
+    return ProtectionManager(FakeRegistry(), **kwargs)
+
+
+class TestProtectionManager:
+    """Testes para ProtectionManager."""
+
+    def test_heals_positions_concurrently(self):
+        client = FakeClient(delay=0.05)
+        requests = [HealRequest(f'S{i}USDT', 'LONG', 100.0, 1.0) for i in range(6)]
+
+        started = time.perf_counter()
+        results = asyncio.run(manager().heal(client, requests))
+        elapsed = time.perf_counter() - started
+
+        # Sequencial: 6 x (klines + SL + posição + TP) = 1.2s
+        assert elapsed < 0.6
+        assert all(r.protected for r in results.values())
+        assert len(client.orders) == 12
+
+    def test_cancelled_heal_does_not_block_later_heals(self):
+        """Heal cancelado no meio (watchdog) termina em background e libera o símbolo."""
+        client = FakeClient(delay=0.02)
+        protection = manager()
+        request = HealRequest('BTCUSDT', 'LONG', 100.0, 1.0)
+
+        async def scenario():
+            first = asyncio.create_task(protection.heal(client, [request]))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            await asyncio.sleep(0.2)  # O heal em andamento termina protegido
+            assert protection._healing == {}
+            await protection.heal(client, [request])
+            await protection.heal(client, [request])
+
+        asyncio.run(scenario())
+        assert len(client.orders) == 6  # SL + TP em cada um dos três heals
+        assert protection._healing == {}
+
+    def test_duplicate_symbol_waiting_for_slot_heals_once(self):
+        """Símbolo repetido esperando vaga no semáforo: um SL só."""
+        client = FakeClient(delay=0.02)
+        requests = [HealRequest(s, 'LONG', 100.0, 1.0) for s in ('ETHUSDT', 'BTCUSDT', 'BTCUSDT')]
+
+        asyncio.run(manager(max_concurrency=1).heal(client, requests))
+        assert sum(o['symbol'] == 'BTCUSDT' for o in client.orders) == 2  # SL + TP
+
+    def test_levels_from_atr(self):
+        client = FakeClient(delay=0)
+        result = asyncio.run(manager().heal_one(client, HealRequest('BTCUSDT', 'SHORT', 100.0, 1.0)))
+
+        # ATR = média de (high - low) = 2
+        assert result.sl_price == 103.6
+        assert result.tp_price == 94.0
+        assert [o['type'] for o in client.orders] == ['STOP_MARKET', 'LIMIT']
+
+    def test_retries_with_backoff(self):
+        client = FakeClient(delay=0, failures={('BTCUSDT', 'STOP_MARKET'): 2})
+        result = asyncio.run(manager(max_attempts=3).heal_one(client, HealRequest('BTCUSDT', 'LONG', 100.0, 1.0)))
+
+        assert result.protected
+        assert result.attempts == 4  # 3 para o SL + 1 para o TP
+        assert result.time_to_protected >= 0.01 + 0.02
+
+    def test_gives_up_after_max_attempts(self):
+        client = FakeClient(delay=0, failures={('BTCUSDT', 'STOP_MARKET'): 10})
+        result = asyncio.run(manager(max_attempts=2).heal_one(client, HealRequest('BTCUSDT', 'LONG', 100.0, 1.0)))
+
+        assert not result.protected
+        assert result.sl_order_id is None
+        assert result.tp_order_id is not None  # TP ainda é colocado
+        assert 'code=-1001' in result.error
+
+    def test_only_missing_leg_is_placed(self):
+        client = FakeClient(delay=0)
+        result = asyncio.run(manager().heal_one(client, HealRequest('BTCUSDT', 'LONG', 100.0, 1.0, has_sl=True)))
+
+        assert result.protected
+        assert [o['type'] for o in client.orders] == ['LIMIT']
+
+    def test_skips_tp_when_position_closed(self):
+        client = FakeClient(delay=0, closed={'BTCUSDT'})
+        result = asyncio.run(manager().heal_one(client, HealRequest('BTCUSDT', 'LONG', 100.0, 1.0)))
+
+        assert result.position_closed
+        assert [o['type'] for o in client.orders] == ['STOP_MARKET']
+
+    def test_summary_reports_time_to_protected(self):
+        client = FakeClient(delay=0)
+        protection = manager()
+        asyncio.run(protection.heal(client, [HealRequest('AUSDT', 'LONG', 100.0, 1.0),
+                                             HealRequest('BUSDT', 'SHORT', 100.0, 1.0)]))
+
+        summary = protection.summary()
+        assert summary['heals'] == 2
+        assert summary['protected'] == 2
+        assert set(summary['last']) == {'AUSDT', 'BUSDT'}
+        assert summary['max_time_to_protected'] >= summary['avg_time_to_protected']
@@ -0,0 +1,175 @@
+"""
+🚦 TESTS DO RATE LIMITER
+=========================
+Pesos por endpoint, prioridade das faixas, headers e backoff após 429.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from rate_limiter import Lane, RateLimitedClient, RateLimiter, TokenBucket, endpoint_cost
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code, code=-1003):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.code = code
+
+
+class FakeClient:
+    """AsyncClient fake: grava chamadas e devolve headers de peso."""
+
+    def __init__(self, used_weight=10, fail_times=0, fail_status=429):
+        self.calls = []
+        self.used_weight = used_weight
+        self.fail_times = fail_times
+        self.fail_status = fail_status
+        self.response = None
+        self.tld = 'com'
+
+    async def futures_klines(self, **kwargs):
+        return await self._request('futures_klines', kwargs)
+
+    async def futures_create_order(self, **kwargs):
+        return await self._request('futures_create_order', kwargs)
+
+    async def futures_account_trades(self, **kwargs):
+        return await self._request('futures_account_trades', kwargs)
+
+    async def _request(self, name, kwargs):
+        self.calls.append(name)
+        if self.fail_times:
+            self.fail_times -= 1
+            self.response = FakeResponse({'Retry-After': '0.05'})
+            raise FakeAPIError(self.fail_status)
+        self.response = FakeResponse({'X-MBX-USED-WEIGHT-1M': str(self.used_weight)})
+        return {'ok': name}
+
+
+class TestEndpointCost:
+    """Pesos e faixas padrão."""
+
+    def test_klines_weight_by_limit(self):
+        assert endpoint_cost('futures_klines', {'limit': 100})[0] == 2
+        assert endpoint_cost('futures_klines', {'limit': 1500})[0] == 10
+
+    def test_open_orders_without_symbol_is_heavy(self):
+        assert endpoint_cost('futures_get_open_orders', {'symbol': 'BTCUSDT'})[0] == 1
+        assert endpoint_cost('futures_get_open_orders', {})[0] == 40
+
+    def test_default_lanes(self):
+        assert endpoint_cost('futures_create_order', {})[1:] == (1, Lane.ORDER)
+        assert endpoint_cost('futures_account_trades', {})[2] == Lane.HISTORY
+
+
+class TestRateLimiter:
+    """Testes para RateLimiter."""
+
+    def test_waits_for_refill(self):
+        limiter = RateLimiter(weight_limit=60)  # 1 token/s
+        limiter.weight.tokens = 0.05 * limiter.weight.rate
+
+        async def run():
+            started = time.monotonic()
+            await limiter.acquire(0.1 * limiter.weight.rate, lane=Lane.ORDER)
+            return time.monotonic() - started
+
+        elapsed = asyncio.run(run())
+        assert 0.03 < elapsed < 0.5
+
+    def test_lower_lanes_keep_reserve(self):
+        limiter = RateLimiter(weight_limit=100)
+        limiter.weight.tokens = 40
+
+        async def run():
+            # HISTORY precisa deixar 50% livre: não cabe; ORDER cabe na hora
+            history = asyncio.create_task(limiter.acquire(5, lane=Lane.HISTORY))
+            await asyncio.sleep(0.02)
+            assert not history.done()
+            await asyncio.wait_for(limiter.acquire(5, lane=Lane.ORDER), timeout=0.1)
+            history.cancel()
+
+        asyncio.run(run())
+        assert limiter.requests['ORDER'] == 1
+        assert limiter.requests['HISTORY'] == 0
+
+    def test_priority_order_when_waiting(self):
+        limiter = RateLimiter(weight_limit=6000)  # 100 tokens/s
+        limiter.weight.tokens = 1500  # Exatamente a reserva da faixa SCAN
+        order = []
+
+        async def take(lane, tag):
+            await limiter.acquire(2, lane=lane)
+            order.append(tag)
+
+        async def run():
+            tasks = [asyncio.create_task(take(Lane.SCAN, 'scan'))]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(take(Lane.ORDER, 'order')))
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        assert order == ['order', 'scan']
+
+    def test_headers_sync_bucket(self):
+        limiter = RateLimiter(weight_limit=2400)
+        limiter.observe_headers({'X-MBX-USED-WEIGHT-1M': '2000'})
+        assert limiter.used_weight_1m == 2000
+        assert limiter.weight.tokens <= 401
+
+    def test_bucket_never_raised_by_headers(self):
+        bucket = TokenBucket(100)
+        bucket.tokens = 10
+        bucket.sync_used(0)
+        assert bucket.tokens == 10
+
+
+class TestRateLimitedClient:
+    """Testes para RateLimitedClient."""
+
+    def test_passes_through_and_records_metrics(self):
+        client = RateLimitedClient(FakeClient(used_weight=42))
+
+        result = asyncio.run(client.futures_klines(symbol='BTCUSDT', interval='15m', limit=100))
+
+        assert result == {'ok': 'futures_klines'}
+        metrics = client.limiter.metrics()
+        assert metrics['used_weight_1m'] == 42
+        assert metrics['requests']['SCAN'] == 1
+        assert metrics['weight_spent']['SCAN'] == 2
+        assert client.tld == 'com'  # Atributos comuns passam direto
+
+    def test_lane_override(self):
+        client = RateLimitedClient(FakeClient())
+        asyncio.run(client.futures_account_trades(symbol='BTCUSDT', lane=Lane.MONITOR))
+        assert client.limiter.requests['MONITOR'] == 1
+
+    def test_retries_after_429(self):
+        fake = FakeClient(fail_times=1)
+        client = RateLimitedClient(fake)
+
+        started = time.monotonic()
+        result = asyncio.run(client.futures_create_order(symbol='BTCUSDT'))
+
+        assert result == {'ok': 'futures_create_order'}
+        assert fake.calls == ['futures_create_order', 'futures_create_order']
+        assert time.monotonic() - started >= 0.05  # Respeitou o Retry-After
+        assert client.limiter.throttled == 1
+
+    def test_ban_is_not_retried(self):
+        fake = FakeClient(fail_times=5, fail_status=418)
+        client = RateLimitedClient(fake)
+
+        with pytest.raises(FakeAPIError):
+            asyncio.run(client.futures_klines(symbol='BTCUSDT', limit=100))
+        assert len(fake.calls) == 1
+        assert client.limiter.banned == 1
+        assert client.limiter.metrics()['blocked_for'] > 0
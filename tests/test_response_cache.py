@@ -0,0 +1,150 @@
+"""
+🧊 TESTS DO RESPONSE CACHE
+===========================
+TTL, single-flight, respostas derivadas e invalidação por escrita.
+"""
+
+import asyncio
+
+import pytest
+
+from response_cache import CachedClient
+from rate_limiter import RateLimitedClient
+
+
+class FakeClient:
+    """Cliente REST fake que conta chamadas por endpoint."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.calls = []
+        self.positions = [
+            {'symbol': 'BTCUSDT', 'positionAmt': '0.1'},
+            {'symbol': 'ETHUSDT', 'positionAmt': '0'}
+        ]
+        self.fail = False
+
+    async def futures_position_information(self, **kwargs):
+        self.calls.append(('positions', kwargs))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("timeout")
+        symbol = kwargs.get('symbol')
+        return [dict(p) for p in self.positions if not symbol or p['symbol'] == symbol]
+
+    async def futures_klines(self, **kwargs):
+        self.calls.append(('klines', kwargs))
+        await asyncio.sleep(self.delay)
+        return [[i, 1, 1, 1, 1, 1, i + 1] for i in range(kwargs.get('limit', 500))]
+
+    async def futures_create_order(self, **kwargs):
+        self.calls.append(('order', kwargs))
+        self.positions[0]['positionAmt'] = '0'
+        return {'orderId': 1}
+
+
+class TestCachedClient:
+    """Testes para CachedClient."""
+
+    def test_ttl_hit_and_expiry(self):
+        fake = FakeClient()
+        client = CachedClient(fake, ttls={'futures_position_information': 0.05})
+
+        async def run():
+            await client.futures_position_information()
+            await client.futures_position_information()
+            await asyncio.sleep(0.06)
+            await client.futures_position_information()
+
+        asyncio.run(run())
+        assert len(fake.calls) == 2
+        assert client.hits == 1
+
+    def test_single_flight(self):
+        fake = FakeClient(delay=0.05)
+        client = CachedClient(fake)
+
+        async def run():
+            return await asyncio.gather(*(client.futures_klines(symbol='BTCUSDT', interval='15m', limit=100)
+                                          for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert len(fake.calls) == 1
+        assert client.coalesced == 4
+        assert all(r is results[0] for r in results)
+
+    def test_symbol_position_derived_from_snapshot(self):
+        fake = FakeClient()
+        client = CachedClient(fake)
+
+        async def run():
+            await client.futures_position_information()
+            return await client.futures_position_information(symbol='BTCUSDT')
+
+        positions = asyncio.run(run())
+        assert positions == [{'symbol': 'BTCUSDT', 'positionAmt': '0.1'}]
+        assert len(fake.calls) == 1
+        assert client.derived == 1
+
+    def test_smaller_klines_limit_from_cache(self):
+        fake = FakeClient()
+        client = CachedClient(fake)
+
+        async def run():
+            await client.futures_klines(symbol='BTCUSDT', interval='15m', limit=100)
+            return await client.futures_klines(symbol='BTCUSDT', interval='15m', limit=2)
+
+        klines = asyncio.run(run())
+        assert [k[0] for k in klines] == [98, 99]
+        assert len(fake.calls) == 1
+
+    def test_write_invalidates_positions(self):
+        fake = FakeClient()
+        client = CachedClient(fake)
+
+        async def run():
+            await client.futures_position_information(symbol='BTCUSDT')
+            await client.futures_create_order(symbol='BTCUSDT', side='SELL', type='MARKET', quantity=0.1)
+            return await client.futures_position_information(symbol='BTCUSDT')
+
+        positions = asyncio.run(run())
+        assert positions[0]['positionAmt'] == '0'  # Leu o estado depois da ordem
+        assert [c[0] for c in fake.calls] == ['positions', 'order', 'positions']
+
+    def test_invalidation_during_flight_is_not_cached(self):
+        fake = FakeClient(delay=0.05)
+        client = CachedClient(fake)
+
+        async def run():
+            task = asyncio.create_task(client.futures_position_information())
+            await asyncio.sleep(0.01)
+            client.invalidate(('futures_position_information',), 'BTCUSDT')
+            await task
+            await client.futures_position_information()
+
+        asyncio.run(run())
+        assert len(fake.calls) == 2
+
+    def test_errors_are_not_cached(self):
+        fake = FakeClient()
+        fake.fail = True
+        client = CachedClient(fake)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(client.futures_position_information())
+        fake.fail = False
+        asyncio.run(client.futures_position_information())
+        assert len(fake.calls) == 2
+
+    def test_layers_over_rate_limited_client(self):
+        fake = FakeClient()
+        limited = RateLimitedClient(fake)
+        client = CachedClient(limited)
+
+        async def run():
+            await client.futures_position_information()
+            await client.futures_position_information()
+
+        asyncio.run(run())
+        assert limited.limiter.requests['MONITOR'] == 1
+        assert client.wrapped is fake  # Streams continuam usando o cliente original
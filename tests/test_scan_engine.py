@@ -0,0 +1,126 @@
+"""
+⚡ TESTS DO SCAN ENGINE
+========================
+Varredura concorrente, timeouts e orçamento de peso.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from scan_engine import ScanEngine, klines_weight
+
+
+def make_analyzer(strengths, delays=None, failing=()):
+    """Criar função de análise fake com atraso configurável."""
+    delays = delays or {}
+
+    async def analyze(symbol):
+        await asyncio.sleep(delays.get(symbol, 0.01))
+        if symbol in failing:
+            raise RuntimeError("falha simulada")
+        return {'symbol': symbol, 'trend': 'LONG', 'strength': strengths[symbol]}
+
+    return analyze
+
+
+class TestScanEngine:
+    """Testes para ScanEngine."""
+
+    def test_ranking_by_strength(self):
+        """Resultado deve vir ordenado por força."""
+        strengths = {'AUSDT': 30, 'BUSDT': 70, 'CUSDT': 50}
+        engine = ScanEngine(max_concurrency=4)
+
+        ranked = asyncio.run(engine.scan(list(strengths), make_analyzer(strengths)))
+
+        assert [r['symbol'] for r in ranked] == ['BUSDT', 'CUSDT', 'AUSDT']
+        assert engine.last_stats.analyzed == 3
+
+    def test_runs_in_parallel(self):
+        """20 símbolos de 50ms devem levar bem menos que 1s."""
+        symbols = [f"S{i}USDT" for i in range(20)]
+        strengths = {s: i for i, s in enumerate(symbols)}
+        delays = {s: 0.05 for s in symbols}
+        engine = ScanEngine(max_concurrency=20, weight_budget=1000)
+
+        started = time.perf_counter()
+        asyncio.run(engine.scan(symbols, make_analyzer(strengths, delays)))
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.5
+
+    def test_concurrency_is_bounded(self):
+        """Nunca mais que max_concurrency análises simultâneas."""
+        in_flight = 0
+        peak = 0
+
+        async def analyze(symbol):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {'symbol': symbol, 'strength': 1}
+
+        engine = ScanEngine(max_concurrency=3, weight_budget=1000)
+        asyncio.run(engine.scan([f"S{i}" for i in range(12)], analyze))
+
+        assert peak == 3
+
+    def test_timeout_and_errors_are_skipped(self):
+        """Símbolos lentos ou com erro não entram no ranking."""
+        strengths = {'AUSDT': 30, 'BUSDT': 70, 'CUSDT': 50}
+        analyzer = make_analyzer(strengths, delays={'BUSDT': 1.0}, failing={'CUSDT'})
+        engine = ScanEngine(symbol_timeout=0.1)
+
+        ranked = asyncio.run(engine.scan(list(strengths), analyzer))
+
+        assert [r['symbol'] for r in ranked] == ['AUSDT']
+        assert engine.last_stats.timeouts == 1
+        assert engine.last_stats.errors == 1
+
+    def test_weight_budget(self):
+        """Símbolos além do orçamento de peso são pulados."""
+        symbols = [f"S{i}USDT" for i in range(10)]
+        strengths = {s: 10 for s in symbols}
+        engine = ScanEngine(weight_budget=8, request_weight=2)
+
+        ranked = asyncio.run(engine.scan(symbols, make_analyzer(strengths)))
+
+        assert len(ranked) == 4
+        assert engine.last_stats.skipped_budget == 6
+        assert engine.last_stats.weight_used == 8
+
+    def test_weight_budget_rotates_across_cycles(self):
+        """Com orçamento curto, ciclos seguidos cobrem a lista inteira."""
+        symbols = [f"S{i}USDT" for i in range(10)]
+        strengths = {s: 10 for s in symbols}
+        engine = ScanEngine(weight_budget=8, request_weight=2)
+
+        seen = []
+        for _ in range(3):
+            ranked = asyncio.run(engine.scan(symbols, make_analyzer(strengths)))
+            seen.append({r['symbol'] for r in ranked})
+
+        assert seen[0] == set(symbols[:4])
+        assert seen[1] == set(symbols[4:8])
+        assert seen[2] == set(symbols[8:] + symbols[:2])
+
+    def test_summary(self):
+        """Resumo deve refletir os ciclos executados."""
+        strengths = {'AUSDT': 10}
+        engine = ScanEngine()
+        for _ in range(3):
+            asyncio.run(engine.scan(['AUSDT'], make_analyzer(strengths)))
+
+        summary = engine.summary()
+        assert summary['cycles'] == 3
+        assert summary['max'] >= summary['p50'] > 0
+
+
+@pytest.mark.parametrize("limit,weight", [(50, 1), (100, 2), (500, 5), (1500, 10)])
+def test_klines_weight(limit, weight):
+    """Peso de klines segue a tabela da Binance."""
+    assert klines_weight(limit) == weight
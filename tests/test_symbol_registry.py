@@ -0,0 +1,124 @@
+"""
+📚 TESTS DO SYMBOL REGISTRY
+============================
+Cache de exchange info, precisões e refresh por TTL.
+"""
+
+import asyncio
+
+import pytest
+
+from symbol_registry import SymbolInfo, SymbolRegistry, decimals_from_step
+
+
+def exchange_symbol(symbol, tick='0.10', step='0.001', notional='100'):
+    return {
+        'symbol': symbol, 'status': 'TRADING', 'baseAsset': symbol[:-4], 'quoteAsset': 'USDT',
+        'filters': [
+            {'filterType': 'PRICE_FILTER', 'tickSize': tick},
+            {'filterType': 'LOT_SIZE', 'stepSize': step, 'minQty': step},
+            {'filterType': 'MIN_NOTIONAL', 'notional': notional}
+        ]
+    }
+
+
+class FakeClient:
+    """Cliente que conta chamadas a futures_exchange_info."""
+
+    def __init__(self, symbols, fail=False):
+        self.symbols = symbols
+        self.fail = fail
+        self.calls = 0
+
+    async def futures_exchange_info(self):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("API fora")
+        return {'symbols': self.symbols}
+
+
+class FakeRepo:
+    """Repositório em memória para a tabela symbols."""
+
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.saved = []
+
+    async def upsert_symbols(self, symbols):
+        self.saved = symbols
+
+    async def get_all_symbols(self):
+        return self.rows
+
+
+@pytest.mark.parametrize("step,decimals", [
+    ('0.10', 1), ('0.00010000', 4), ('1', 0), ('0.00001', 5), (1e-05, 5), ('10', 0)
+])
+def test_decimals_from_step(step, decimals):
+    """Casas decimais a partir do tick/step (inclusive notação científica)."""
+    assert decimals_from_step(step) == decimals
+
+
+class TestSymbolRegistry:
+    """Testes para SymbolRegistry."""
+
+    def test_from_exchange(self):
+        """Filtros viram registro compacto com precisões calculadas."""
+        info = SymbolInfo.from_exchange(exchange_symbol('BTCUSDT', tick='0.10', step='0.001', notional='100'))
+
+        assert info.tick_size == 0.1
+        assert info.step_size == 0.001
+        assert info.min_notional == 100
+        assert info.price_precision == 1
+        assert info.qty_precision == 3
+        assert info.round_qty(0.12345) == 0.123
+
+    def test_single_load_for_many_lookups(self):
+        """Várias consultas usam uma única chamada à API."""
+        client = FakeClient([exchange_symbol('BTCUSDT'), exchange_symbol('ETHUSDT', tick='0.01')])
+        registry = SymbolRegistry(ttl=3600)
+
+        async def lookups():
+            for _ in range(50):
+                await registry.get(client, 'BTCUSDT')
+            return await registry.get(client, 'ETHUSDT')
+
+        eth = asyncio.run(lookups())
+
+        assert client.calls == 1
+        assert eth.price_precision == 2
+        assert len(registry) == 2
+
+    def test_unknown_symbol(self):
+        """Símbolo inexistente retorna None."""
+        registry = SymbolRegistry()
+        assert asyncio.run(registry.get(FakeClient([exchange_symbol('BTCUSDT')]), 'XYZUSDT')) is None
+
+    def test_stale_refreshes_in_background(self):
+        """TTL vencido devolve o cache e recarrega em background."""
+        client = FakeClient([exchange_symbol('BTCUSDT')])
+        registry = SymbolRegistry(ttl=0)
+
+        async def run():
+            await registry.load(client)
+            info = await registry.get(client, 'BTCUSDT')
+            await asyncio.sleep(0)
+            await registry._refresh_task
+            return info
+
+        assert asyncio.run(run()).symbol == 'BTCUSDT'
+        assert client.calls == 2
+
+    def test_persists_and_falls_back_to_db(self):
+        """Salva no banco e usa o catálogo salvo se a API falhar."""
+        repo = FakeRepo()
+        asyncio.run(SymbolRegistry(repo=repo).load(FakeClient([exchange_symbol('BTCUSDT')])))
+        assert [s.symbol for s in repo.saved] == ['BTCUSDT']
+
+        rows = [{'symbol': 'BTCUSDT', 'base_asset': 'BTC', 'quote_asset': 'USDT',
+                 'tick_size': '0.10', 'lot_size': '0.001', 'min_notional': '100'}]
+        registry = SymbolRegistry(repo=FakeRepo(rows))
+        info = asyncio.run(registry.get(FakeClient([], fail=True), 'BTCUSDT'))
+
+        assert info.price_precision == 1
+        assert info.qty_precision == 3
@@ -0,0 +1,138 @@
+"""
+📒 TESTS DO TRADE JOURNAL
+==========================
+Append O(1), dedup, métricas diárias, compactação e import do JSON antigo.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from trade_journal import TradeJournal
+
+
+def trade(symbol='BTCUSDT', pnl=1.0, time='2024-01-01 10:00:00'):
+    return {'symbol': symbol, 'side': 'LONG', 'entry': 100, 'exit': 101,
+            'quantity': 1, 'pnl': pnl, 'time': time}
+
+
+def file_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class TestTradeJournal:
+    """Testes para TradeJournal."""
+
+    def test_append_is_one_line(self, tmp_path):
+        path = str(tmp_path / 'history.jsonl')
+        journal = TradeJournal(path)
+
+        assert journal.append(trade(pnl=1.0))
+        assert journal.append(trade(pnl=2.0, time='2024-01-01 11:00:00'))
+        assert not journal.append(trade(pnl=1.0))  # duplicado
+
+        assert len(file_lines(path)) == 2
+        assert len(journal) == 2
+
+    def test_no_truncation(self, tmp_path):
+        """Histórico não é mais cortado em 100/500 registros."""
+        journal = TradeJournal(str(tmp_path / 'history.jsonl'))
+        journal.extend(trade(pnl=i, time=f'2024-01-01 10:{i // 60:02d}:{i % 60:02d}') for i in range(700))
+
+        reloaded = TradeJournal(str(tmp_path / 'history.jsonl'))
+        assert len(reloaded) == 700
+        assert reloaded.recent(50)[-1]['pnl'] == 699
+
+    def test_daily_metrics_index(self, tmp_path):
+        journal = TradeJournal(str(tmp_path / 'history.jsonl'))
+        journal.append(trade(pnl=2.0, time='2024-01-01 10:00:00'))
+        journal.append(trade(pnl=-0.5, time='2024-01-01 12:00:00'))
+        journal.append(trade(pnl=1.0, time='2024-01-02 09:00:00'))
+
+        assert journal.daily_metrics() == [
+            {'date': '2024-01-01', 'pnl': 1.5, 'trades': 2},
+            {'date': '2024-01-02', 'pnl': 1.0, 'trades': 1}
+        ]
+        assert journal.daily_metrics(1)[0]['date'] == '2024-01-02'
+
+    def test_time_only_records_get_date(self, tmp_path):
+        """Registros do bot com 'time' = HH:MM:SS ganham o dia da gravação."""
+        journal = TradeJournal(str(tmp_path / 'history.jsonl'))
+        journal.append(trade(time='14:30:00'))
+        assert len(journal.records[0]['date']) == 10
+
+    def test_out_of_order_sync_is_compacted(self, tmp_path):
+        """Sync retroativo fora de ordem: memória ordenada; arquivo compactado depois."""
+        path = str(tmp_path / 'history.jsonl')
+        journal = TradeJournal(path, compact_every=3)
+        journal.append(trade(pnl=3.0, time='2024-01-03 10:00:00'))
+        journal.extend([trade(pnl=1.0, time='2024-01-01 10:00:00')])
+
+        assert [r['pnl'] for r in journal.records] == [1.0, 3.0]
+        assert [r['pnl'] for r in file_lines(path)] == [3.0, 1.0]
+
+        journal.append(trade(pnl=4.0, time='2024-01-04 10:00:00'))  # 3ª gravação -> compacta
+        assert [r['pnl'] for r in file_lines(path)] == [1.0, 3.0, 4.0]
+
+    def test_iso_times_sort_with_spaced_times(self, tmp_path):
+        """'time' ISO com 'T' ordena junto dos registros com espaço (sem compactar à toa)."""
+        path = str(tmp_path / 'history.jsonl')
+        journal = TradeJournal(path, compact_every=3)
+        journal.append(trade(pnl=1.0, time='2024-01-01 10:00:00'))
+        journal.append(trade(pnl=2.0, time='2024-01-01T11:00:00'))
+        journal.append(trade(pnl=3.0, time='2024-01-01 12:00:00'))
+
+        assert [r['pnl'] for r in journal.records] == [1.0, 2.0, 3.0]
+        assert not journal._unsorted
+
+    def test_corrupt_line_dropped_on_load(self, tmp_path):
+        path = tmp_path / 'history.jsonl'
+        path.write_text(json.dumps(trade()) + '\n{"symbol": "ETH')
+
+        journal = TradeJournal(str(path))
+        assert len(journal) == 1
+        assert len(file_lines(str(path))) == 1  # compactado na carga
+
+    def test_imports_legacy_json(self, tmp_path):
+        legacy = tmp_path / 'trade_history.json'
+        legacy.write_text(json.dumps([trade(pnl=1.0), trade(pnl=2.0, time='2024-01-01 11:00:00')], indent=4))
+
+        journal = TradeJournal(str(tmp_path / 'history.jsonl'), legacy_path=str(legacy))
+        assert len(journal) == 2
+
+        # Segunda inicialização não importa de novo
+        again = TradeJournal(str(tmp_path / 'history.jsonl'), legacy_path=str(legacy))
+        assert len(again) == 2
+
+    def test_legacy_time_only_records_keep_their_days(self, tmp_path):
+        """Import de registros só com HH:MM:SS: dias estimados e totais do daily_metrics.json antigo."""
+        legacy = tmp_path / 'trade_history.json'
+        legacy.write_text(json.dumps([
+            trade(pnl=5.0, time='22:00:00'),    # 2024-03-04
+            trade(pnl=-1.0, time='09:00:00'),   # 2024-03-05
+            trade(pnl=2.0, time='15:00:00'),    # 2024-03-05
+            trade(pnl=3.0, time='08:00:00'),    # 2024-03-06 (data do arquivo)
+        ]))
+        mtime = datetime(2024, 3, 6, 12).timestamp()
+        os.utime(legacy, (mtime, mtime))
+        metrics = tmp_path / 'daily_metrics.json'
+        # 05/03 teve um trade a mais que já tinha saído do histórico (limite de 100)
+        metrics.write_text(json.dumps([{'date': '2024-03-05', 'pnl': 4.0, 'trades': 3},
+                                       {'date': '2024-03-06', 'pnl': 3.0, 'trades': 1}]))
+
+        path = str(tmp_path / 'history.jsonl')
+        journal = TradeJournal(path, legacy_path=str(legacy), metrics_path=str(metrics))
+        expected = [
+            {'date': '2024-03-04', 'pnl': 5.0, 'trades': 1},
+            {'date': '2024-03-05', 'pnl': 4.0, 'trades': 3},
+            {'date': '2024-03-06', 'pnl': 3.0, 'trades': 1}
+        ]
+        assert journal.daily_metrics() == expected
+        assert [r['date'] for r in journal.recent(0)] == ['2024-03-04', '2024-03-05', '2024-03-05', '2024-03-06']
+
+        # Totais sobrevivem ao restart; trades novos somam por cima
+        again = TradeJournal(path, legacy_path=str(legacy), metrics_path=str(metrics))
+        assert again.daily_metrics() == expected
+        again.append(trade(pnl=1.0, time='2024-03-06 20:00:00'))
+        assert again.daily_metrics()[-1] == {'date': '2024-03-06', 'pnl': 4.0, 'trades': 2}
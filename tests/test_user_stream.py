@@ -0,0 +1,129 @@
+"""
+👤 TESTS DO USER DATA STREAM
+=============================
+Parsing de ORDER_TRADE_UPDATE / ACCOUNT_UPDATE e cache de posições.
+"""
+
+import asyncio
+
+import pytest
+
+from user_stream import OrderUpdate, UserDataStream
+
+
+def order_event(status='FILLED', execution='TRADE', reduce_only=True, rp='1.25', order_id=42):
+    return {
+        'e': 'ORDER_TRADE_UPDATE', 'T': 1700000000000,
+        'o': {
+            's': 'BTCUSDT', 'c': 'abc', 'S': 'SELL', 'o': 'STOP_MARKET', 'ot': 'STOP_MARKET',
+            'x': execution, 'X': status, 'i': order_id, 'l': '0.010', 'L': '50125.5',
+            'z': '0.010', 'ap': '50125.5', 'rp': rp, 'n': '0.2', 'N': 'USDT',
+            'R': reduce_only, 'cp': False, 'T': 1700000000001
+        }
+    }
+
+
+def account_event(amt, entry='50000'):
+    return {
+        'e': 'ACCOUNT_UPDATE',
+        'a': {
+            'm': 'ORDER',
+            'B': [{'a': 'USDT', 'wb': '105.5', 'cw': '105.5', 'bc': '0'}],
+            'P': [{'s': 'BTCUSDT', 'pa': amt, 'ep': entry, 'up': '0', 'mt': 'cross', 'ps': 'BOTH'}]
+        }
+    }
+
+
+class FakeClient:
+    """Cliente mínimo para o resync (snapshot REST de posições)."""
+
+    def __init__(self, positions):
+        self._positions = positions
+
+    async def futures_position_information(self):
+        return self._positions
+
+
+class TestOrderUpdate:
+    """Testes para OrderUpdate."""
+
+    def test_from_event(self):
+        """Campos do evento são convertidos para tipos nativos."""
+        update = OrderUpdate.from_event(order_event())
+
+        assert update.symbol == 'BTCUSDT'
+        assert update.order_id == 42
+        assert update.last_qty == 0.01
+        assert update.last_price == 50125.5
+        assert update.realized_pnl == 1.25
+        assert update.commission == 0.2
+        assert update.is_fill and update.is_closing
+
+    def test_new_order_is_not_fill(self):
+        """Ordem apenas registrada (NEW) não é execução."""
+        update = OrderUpdate.from_event(order_event(status='NEW', execution='NEW', rp='0'))
+        assert not update.is_fill
+
+    def test_entry_fill_is_not_closing(self):
+        """Fill de entrada (sem reduceOnly e sem PnL) não fecha posição."""
+        update = OrderUpdate.from_event(order_event(reduce_only=False, rp='0'))
+        assert update.is_fill and not update.is_closing
+
+
+class TestUserDataStream:
+    """Testes para UserDataStream (sem rede)."""
+
+    def test_order_callback(self):
+        """ORDER_TRADE_UPDATE chama o callback (async) com o evento normalizado."""
+        received = []
+
+        async def on_order(update):
+            received.append(update)
+
+        stream = UserDataStream(None, on_order_update=on_order)
+        asyncio.run(stream.handle_message(order_event()))
+
+        assert len(received) == 1
+        assert received[0].status == 'FILLED'
+        assert stream.events == 1
+
+    def test_account_update_tracks_positions(self):
+        """ACCOUNT_UPDATE mantém o cache de posições no formato REST."""
+        changes = []
+        stream = UserDataStream(None, on_account_update=lambda reason, p: changes.append((reason, p)))
+
+        asyncio.run(stream.handle_message(account_event('0.010')))
+        assert float(stream.positions['BTCUSDT']['positionAmt']) == 0.01
+        assert float(stream.positions['BTCUSDT']['entryPrice']) == 50000
+        assert stream.balances['USDT'] == 105.5
+
+        asyncio.run(stream.handle_message(account_event('0', entry='0')))
+        assert 'BTCUSDT' not in stream.positions
+        assert [reason for reason, _ in changes] == ['ORDER', 'ORDER']
+        assert float(changes[-1][1][0]['positionAmt']) == 0
+
+    def test_resync_loads_open_positions(self):
+        """Resync guarda só posições abertas e avisa o callback."""
+        snapshots = []
+        client = FakeClient([
+            {'symbol': 'BTCUSDT', 'positionAmt': '0.01', 'entryPrice': '50000',
+             'unRealizedProfit': '1', 'markPrice': '50100'},
+            {'symbol': 'ETHUSDT', 'positionAmt': '0', 'entryPrice': '0',
+             'unRealizedProfit': '0', 'markPrice': '3000'}
+        ])
+        stream = UserDataStream(client, on_resync=snapshots.append)
+
+        asyncio.run(stream.resync())
+
+        assert list(stream.positions) == ['BTCUSDT']
+        assert list(snapshots[0]) == ['BTCUSDT']
+
+    @pytest.mark.parametrize("event", [
+        {'e': 'listenKeyExpired', 'E': 1700000000000},
+        {'e': 'error', 'm': 'Max reconnect retries reached'}
+    ])
+    def test_expired_or_error_forces_reconnect(self, event):
+        """listenKey expirado ou erro do socket viram exceção (o loop reconecta)."""
+        stream = UserDataStream(None)
+        with pytest.raises(ConnectionError):
+            asyncio.run(stream.handle_message(event))
@@ -0,0 +1,214 @@
+"""
+📮 TESTS DA FILA WRITE-BEHIND
+==============================
+Coalescência por símbolo, journal local e recuperação após falha do banco.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from database.write_behind import OperationJournal, WriteBehindQueue
+from metrics import MetricsRegistry
+
+
+class FakeRepo:
+    """Trade + position repo em memória; `down=True` simula banco fora do ar."""
+
+    def __init__(self):
+        self.calls = []
+        self.down = False
+
+    async def _record(self, *call):
+        if self.down:
+            raise ConnectionError('banco fora do ar')
+        await asyncio.sleep(0)
+        self.calls.append(call)
+
+    async def save_trade(self, data):
+        await self._record('save_trade', data['symbol'], data.get('entry_time'))
+
+    async def close_trade(self, trade_id, exit_price, pnl, pnl_percent, close_reason='MANUAL'):
+        await self._record('close_trade', trade_id, close_reason)
+
+    async def save_positions(self, rows):
+        await self._record('save_positions', [(r['symbol'], r['current_price']) for r in rows])
+
+    async def delete_position(self, symbol):
+        await self._record('delete_position', symbol)
+
+
+def position(symbol, price):
+    return {'symbol': symbol, 'side': 'LONG', 'quantity': 1, 'entry_price': 100, 'current_price': price}
+
+
+@pytest.fixture
+def repo():
+    return FakeRepo()
+
+
+@pytest.fixture
+def queue(repo, tmp_path):
+    return WriteBehindQueue(repo, repo, flush_interval=0.01, journal_path=str(tmp_path / 'journal.jsonl'),
+                            metrics=MetricsRegistry())
+
+
+class TestWriteBehindQueue:
+    """Testes para WriteBehindQueue."""
+
+    def test_positions_coalesce_per_symbol(self, queue, repo):
+        """Várias atualizações do mesmo símbolo viram um único upsert em lote."""
+        for price in (101, 102, 103):
+            queue.save_position(position('BTCUSDT', price))
+        queue.save_position(position('ETHUSDT', 50))
+        assert queue.pending == 2
+
+        asyncio.run(queue.flush())
+        assert repo.calls == [('save_positions', [('BTCUSDT', 103), ('ETHUSDT', 50)])]
+
+    def test_trade_order_preserved(self, queue, repo):
+        """Trades na ordem; delete antes do re-insert da mesma posição."""
+        queue.save_position(position('BTCUSDT', 101))
+        queue.delete_position('BTCUSDT')
+        queue.save_trade({'symbol': 'BTCUSDT'})
+        queue.close_trade(1, 110, 5, 1, 'TP')
+        queue.save_position(position('BTCUSDT', 99))
+
+        asyncio.run(queue.flush())
+        assert repo.calls == [
+            ('save_trade', 'BTCUSDT', None),
+            ('close_trade', 1, 'TP'),
+            ('delete_position', 'BTCUSDT'),
+            ('save_positions', [('BTCUSDT', 99)])
+        ]
+
+    def test_db_down_spills_to_journal(self, queue, repo):
+        """Banco fora: nada se perde; o próximo flush reaplica o journal em ordem."""
+        entry_time = datetime(2024, 1, 1, 12, 30)
+        repo.down = True
+        queue.save_trade({'symbol': 'BTCUSDT', 'entry_time': entry_time})
+        queue.save_position(position('BTCUSDT', 101))
+
+        assert asyncio.run(queue.flush()) == 0
+        assert queue.pending == 0
+        assert len(queue.journal) == 2
+        assert queue.status()['failures'] == 1
+
+        repo.down = False
+        queue.save_position(position('ETHUSDT', 50))
+        assert asyncio.run(queue.flush()) == 3
+
+        assert repo.calls == [
+            ('save_trade', 'BTCUSDT', entry_time),
+            ('save_positions', [('BTCUSDT', 101)]),
+            ('save_positions', [('ETHUSDT', 50)])
+        ]
+        assert len(queue.journal) == 0
+
+    def test_outage_journal_coalesces_positions(self, queue, repo):
+        """Flushes seguidos com o banco fora não acumulam snapshots velhos de posição."""
+        repo.down = True
+        queue.save_trade({'symbol': 'BTCUSDT'})
+        for price in range(101, 111):
+            queue.save_position(position('BTCUSDT', price))
+            queue.save_position(position('ETHUSDT', price / 2))
+            asyncio.run(queue.flush())
+        queue.delete_position('ETHUSDT')
+        asyncio.run(queue.flush())
+
+        assert len(queue.journal) == 3  # trade + delete + um upsert em lote
+        repo.down = False
+        asyncio.run(queue.flush())
+        assert repo.calls == [
+            ('save_trade', 'BTCUSDT', None),
+            ('delete_position', 'ETHUSDT'),
+            ('save_positions', [('BTCUSDT', 110)])
+        ]
+
+    def test_journal_capped(self, repo, tmp_path):
+        """Acima de max_journal as operações mais antigas são descartadas e contadas."""
+        queue = WriteBehindQueue(repo, repo, journal_path=str(tmp_path / 'j.jsonl'), max_journal=3,
+                                 metrics=MetricsRegistry())
+        repo.down = True
+        for i in range(5):
+            queue.save_trade({'symbol': f'S{i}'})
+        asyncio.run(queue.flush())
+
+        assert len(queue.journal) == 3
+        assert queue.status()['dropped'] == 2
+        assert queue.dropped_count.get() == 2
+        repo.down = False
+        asyncio.run(queue.flush())
+        assert [c[1] for c in repo.calls] == ['S2', 'S3', 'S4']
+
+    def test_backoff_while_db_down(self, queue, repo):
+        repo.down = True
+        queue.max_backoff = 0.05
+        queue.save_trade({'symbol': 'A'})
+        delays = []
+        for _ in range(4):
+            asyncio.run(queue.flush())
+            delays.append(queue._flush_delay())
+        assert delays == [0.02, 0.04, 0.05, 0.05]
+
+        repo.down = False
+        asyncio.run(queue.flush())
+        assert queue._flush_delay() == queue.flush_interval
+
+    def test_journal_survives_restart(self, repo, tmp_path):
+        """stop() com banco fora grava o journal; uma nova fila reaplica na inicialização."""
+        path = str(tmp_path / 'journal.jsonl')
+
+        async def first_run():
+            queue = WriteBehindQueue(repo, repo, flush_interval=10, journal_path=path)
+            await queue.start()
+            repo.down = True
+            queue.save_trade({'symbol': 'BTCUSDT'})
+            await queue.stop()
+
+        async def second_run():
+            repo.down = False
+            queue = WriteBehindQueue(repo, repo, flush_interval=10, journal_path=path)
+            await queue.start()
+            await queue.stop()
+
+        asyncio.run(first_run())
+        assert len(OperationJournal(path)) == 1
+        asyncio.run(second_run())
+        assert repo.calls == [('save_trade', 'BTCUSDT', None)]
+        assert len(OperationJournal(path)) == 0
+
+    def test_full_buffer_spills_without_blocking(self, repo, tmp_path):
+        queue = WriteBehindQueue(repo, repo, max_pending=3, journal_path=str(tmp_path / 'j.jsonl'))
+        for i in range(3):
+            queue.save_trade({'symbol': f'S{i}'})
+
+        assert queue.pending == 0
+        assert len(queue.journal) == 3
+
+    def test_spill_during_flush_is_kept(self, queue, repo):
+        """Linhas anexadas ao journal enquanto o flush espera o banco não são apagadas."""
+        async def scenario():
+            queue.save_trade({'symbol': 'A'})
+            flushing = asyncio.create_task(queue.flush())
+            await asyncio.sleep(0)          # flush parado dentro do repo
+            queue.save_trade({'symbol': 'B'})
+            queue.spill()
+            await flushing
+            return len(queue.journal)
+
+        assert asyncio.run(scenario()) == 1
+        asyncio.run(queue.flush())
+        assert [c[1] for c in repo.calls] == ['A', 'B']
+
+    def test_background_flush(self, queue, repo):
+        async def scenario():
+            await queue.start()
+            queue.save_position(position('BTCUSDT', 101))
+            await asyncio.sleep(0.05)
+            calls = list(repo.calls)
+            await queue.stop()
+            return calls
+
+        assert asyncio.run(scenario()) == [('save_positions', [('BTCUSDT', 101)])]
@@ -0,0 +1,284 @@
+"""
+📒 TRADE JOURNAL
+================
+Histórico de trades fechados em JSONL append-only.
+
+- Gravar um trade = acrescentar uma linha (O(1), sem reescrever o arquivo)
+- Índices em memória: chaves para dedup e PnL/trades por dia
+- Sem limite de tamanho (o histórico não é mais truncado em 100/500)
+- Compactação periódica: reescreve ordenado, sem duplicatas nem linhas corrompidas
+- Importa o trade_history.json antigo na primeira execução: registros só com
+  hora ganham o dia estimado (infer_dates) e os totais por dia vêm do
+  daily_metrics.json antigo (guardados em <journal>.seed.json)
+"""
+
+import json
+import os
+from bisect import insort
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+
+def record_key(record: Dict) -> str:
+    """Chave de dedup (mesma regra usada no sync retroativo: symbol + pnl + time)."""
+    return f"{record.get('symbol')}_{record.get('pnl')}_{record.get('time')}"
+
+
+def record_date(record: Dict) -> str:
+    """Dia do trade (YYYY-MM-DD); registros só com hora usam o dia da gravação."""
+    if record.get('date'):
+        return record['date']
+    time_str = str(record.get('time', '')).replace('T', ' ')
+    if ' ' in time_str:
+        return time_str.split(' ')[0]
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def has_real_date(record: Dict) -> bool:
+    """Registro com dia conhecido ('date' gravado ou 'time' com data)."""
+    return bool(record.get('date')) or ' ' in str(record.get('time', '')) or 'T' in str(record.get('time', ''))
+
+
+def infer_dates(records: List[Dict], last_day: date) -> List[str]:
+    """
+    Dia (YYYY-MM-DD) de cada registro de um histórico em ordem cronológica.
+
+    Registros só com HH:MM:SS (AutonomousBot.now()) não têm dia: andando do
+    fim para o começo a partir de `last_day`, cada vez que a hora "cresce" o
+    dia volta um. É uma estimativa (dias sem trade não aparecem) - não serve
+    como chave de dedup.
+    """
+    dates = [''] * len(records)
+    day, previous = last_day, None
+    for i in range(len(records) - 1, -1, -1):
+        record = records[i]
+        time_str = str(record.get('time', ''))
+        if has_real_date(record):
+            dates[i] = record_date(record)
+            day = date.fromisoformat(dates[i])
+            previous = time_str.replace('T', ' ').split(' ')[-1][:8]
+            continue
+        if previous is not None and time_str > previous:
+            day -= timedelta(days=1)
+        dates[i] = day.isoformat()
+        previous = time_str
+    return dates
+
+
+def _sort_key(record: Dict) -> str:
+    time_str = str(record.get('time', '')).replace('T', ' ')
+    return time_str if ' ' in time_str else f"{record_date(record)} {time_str}"
+
+
+class TradeJournal:
+    """
+    Journal append-only de trades fechados.
+
+    Os registros mantêm o formato do antigo trade_history.json, com um campo
+    'date' a mais (para agregar por dia mesmo quando 'time' é só HH:MM:SS).
+    """
+
+    def __init__(self, path: str = 'trade_history.jsonl', legacy_path: Optional[str] = None,
+                 compact_every: int = 1000, metrics_path: Optional[str] = None):
+        self.path = path
+        self.seed_path = path + '.seed.json'
+        self.compact_every = compact_every
+
+        self.records: List[Dict] = []
+        self._keys = set()
+        self._daily: Dict[str, Dict] = {}
+        self._garbage = 0      # Linhas no arquivo que a compactação removeria
+        self._unsorted = False
+        self.appends = 0
+        self.version = 0       # Muda a cada trade novo (fingerprint para o dashboard)
+
+        # Dias com totais do daily_metrics.json antigo: registros importados
+        # desses dias não somam de novo (o arquivo antigo já os contava)
+        self._seed: Dict[str, Dict] = self._load_seed()
+        self._daily.update((day, dict(totals)) for day, totals in self._seed.items())
+
+        self._load()
+        if legacy_path and not self.records and os.path.exists(legacy_path):
+            self._import_legacy(legacy_path, metrics_path)
+
+    @classmethod
+    def from_env(cls, legacy_path: Optional[str] = 'trade_history.json') -> 'TradeJournal':
+        return cls(
+            os.getenv('TRADE_JOURNAL_PATH', 'trade_history.jsonl'),
+            legacy_path=legacy_path,
+            compact_every=int(os.getenv('TRADE_JOURNAL_COMPACT_EVERY', 1000)),
+            metrics_path='daily_metrics.json'
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        last_key = ''
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    self._garbage += 1  # Linha truncada (queda durante a escrita)
+                    continue
+                if not self._index(record):
+                    self._garbage += 1
+                    continue
+                key = _sort_key(record)
+                if key < last_key:
+                    self._unsorted = True
+                last_key = max(last_key, key)
+                self.records.append(record)
+
+        if self._unsorted:
+            self.records.sort(key=_sort_key)
+        if self._garbage or self._unsorted:
+            self.compact()
+
+    def _load_seed(self) -> Dict[str, Dict]:
+        try:
+            with open(self.seed_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _import_legacy(self, legacy_path: str, metrics_path: Optional[str] = None):
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        # Totais por dia corretos do bot antigo (últimos 30 dias)
+        seed = {}
+        if metrics_path and os.path.exists(metrics_path):
+            try:
+                with open(metrics_path, 'r', encoding='utf-8') as f:
+                    seed = {m['date']: {'date': m['date'], 'pnl': float(m.get('pnl') or 0),
+                                        'trades': int(m.get('trades') or 0)}
+                            for m in json.load(f) if m.get('date')}
+            except (OSError, ValueError, TypeError, KeyError):
+                seed = {}
+        if seed:
+            with open(self.seed_path, 'w', encoding='utf-8') as f:
+                json.dump(seed, f)
+            self._seed = seed
+            self._daily.update((day, dict(totals)) for day, totals in seed.items())
+
+        # Só HH:MM:SS: dia estimado a partir da data do arquivo antigo
+        last_day = datetime.fromtimestamp(os.path.getmtime(legacy_path)).date()
+        records = []
+        for record, day in zip(history, infer_dates(history, last_day)):
+            record = dict(record, legacy=True)
+            if not has_real_date(record):
+                record['date'] = day
+                record['date_estimated'] = True
+            records.append(record)
+
+        added = self.extend(records)
+        if added:
+            print(f"[trade_journal] {added} trades importados de {legacy_path}")
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def _index(self, record: Dict) -> bool:
+        """Indexar um registro; False se já existe."""
+        key = record_key(record)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        record.setdefault('date', record_date(record))
+        if record.get('legacy') and record['date'] in self._seed:
+            return True  # Dia já contado pelo daily_metrics.json antigo
+
+        day = self._daily.setdefault(record['date'], {'date': record['date'], 'pnl': 0.0, 'trades': 0})
+        day['pnl'] += float(record.get('pnl') or 0)
+        day['trades'] += 1
+        return True
+
+    def _write_lines(self, records: Iterable[Dict]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in records))
+            f.flush()
+
+    def _insert(self, record: Dict):
+        self.version += 1
+        if not self.records or _sort_key(record) >= _sort_key(self.records[-1]):
+            self.records.append(record)
+        else:
+            # Registro antigo (sync retroativo): fica em ordem na memória; arquivo compacta depois
+            insort(self.records, record, key=_sort_key)
+            self._unsorted = True
+
+    def append(self, record: Dict) -> bool:
+        """Acrescentar um trade fechado. Retorna False se já estava no journal."""
+        record = dict(record)
+        if not self._index(record):
+            return False
+        self._write_lines([record])
+        self._insert(record)
+        self._after_append(1)
+        return True
+
+    def extend(self, records: Iterable[Dict]) -> int:
+        """Acrescentar vários trades (uma escrita só). Retorna quantos eram novos."""
+        new = []
+        for record in records:
+            record = dict(record)
+            if self._index(record):
+                new.append(record)
+        if not new:
+            return 0
+        self._write_lines(new)
+        for record in new:
+            self._insert(record)
+        self._after_append(len(new))
+        return len(new)
+
+    def _after_append(self, count: int):
+        self.appends += count
+        if self.compact_every and self.appends >= self.compact_every and (self._unsorted or self._garbage):
+            self.compact()
+
+    def compact(self):
+        """Reescrever o arquivo a partir da memória (ordenado, sem duplicatas), de forma atômica."""
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in self.records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._garbage = 0
+        self._unsorted = False
+        self.appends = 0
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def __contains__(self, record: Dict) -> bool:
+        return record_key(record) in self._keys
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Últimos `limit` trades (ordem cronológica)."""
+        return self.records[-limit:] if limit else list(self.records)
+
+    def daily_metrics(self, days: Optional[int] = None) -> List[Dict]:
+        """PnL e número de trades por dia (ordem cronológica)."""
+        metrics = [dict(self._daily[d]) for d in sorted(self._daily)]
+        return metrics[-days:] if days else metrics
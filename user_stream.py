@@ -0,0 +1,248 @@
+"""
+👤 USER DATA STREAM
+===================
+Eventos da conta (ordens e posições) em tempo real via listenKey.
+
+- ORDER_TRADE_UPDATE: execuções exatas (preço, quantidade, PnL realizado, taxa)
+- ACCOUNT_UPDATE: saldos e posições (mesmo formato de futures_position_information)
+- Keepalive do listenKey e reconexão com backoff
+- Ressincronização via REST a cada (re)conexão (eventos perdidos no intervalo)
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from binance import BinanceSocketManager
+
+
+# ============================================================================
+# EVENTOS
+# ============================================================================
+
+@dataclass
+class OrderUpdate:
+    """Evento ORDER_TRADE_UPDATE normalizado."""
+    symbol: str
+    order_id: int
+    client_order_id: str
+    side: str
+    order_type: str
+    orig_type: str
+    execution_type: str
+    status: str
+    reduce_only: bool
+    close_position: bool
+    last_qty: float
+    last_price: float
+    filled_qty: float
+    avg_price: float
+    realized_pnl: float
+    commission: float
+    commission_asset: str
+    trade_time: int
+
+    @classmethod
+    def from_event(cls, data: Dict) -> 'OrderUpdate':
+        o = data['o']
+        return cls(
+            symbol=o['s'],
+            order_id=int(o['i']),
+            client_order_id=o.get('c', ''),
+            side=o['S'],
+            order_type=o['o'],
+            orig_type=o.get('ot', o['o']),
+            execution_type=o['x'],
+            status=o['X'],
+            reduce_only=bool(o.get('R', False)),
+            close_position=bool(o.get('cp', False)),
+            last_qty=float(o.get('l', 0)),
+            last_price=float(o.get('L', 0)),
+            filled_qty=float(o.get('z', 0)),
+            avg_price=float(o.get('ap', 0)),
+            realized_pnl=float(o.get('rp', 0)),
+            commission=float(o.get('n', 0)),
+            commission_asset=o.get('N') or '',
+            trade_time=int(o.get('T', data.get('T', 0)))
+        )
+
+    @property
+    def is_fill(self) -> bool:
+        """True se o evento é uma execução (total ou parcial)."""
+        return self.execution_type == 'TRADE' and self.last_qty > 0
+
+    @property
+    def is_closing(self) -> bool:
+        """True se a execução reduz/fecha a posição."""
+        return self.reduce_only or self.close_position or self.realized_pnl != 0
+
+
+def position_from_event(p: Dict, mark_price: Optional[float] = None) -> Dict:
+    """Converter posição do ACCOUNT_UPDATE para o formato REST."""
+    entry = float(p['ep'])
+    return {
+        'symbol': p['s'],
+        'positionAmt': p['pa'],
+        'entryPrice': p['ep'],
+        'unRealizedProfit': p.get('up', '0'),
+        'markPrice': str(mark_price if mark_price is not None else entry),
+        'positionSide': p.get('ps', 'BOTH')
+    }
+
+
+# ============================================================================
+# STREAM
+# ============================================================================
+
+class UserDataStream:
+    """
+    Consumidor do user data stream de Futures.
+
+    Callbacks (podem ser síncronos ou async):
+        on_order_update(OrderUpdate)
+        on_account_update(reason, positions)   - posições alteradas (formato REST)
+        on_resync(positions)                   - snapshot REST após (re)conexão
+    """
+
+    def __init__(
+        self,
+        client,
+        on_order_update: Optional[Callable] = None,
+        on_account_update: Optional[Callable] = None,
+        on_resync: Optional[Callable] = None,
+        keepalive_interval: float = 30 * 60,
+        max_backoff: float = 60.0
+    ):
+        self.client = client
+        self.on_order_update = on_order_update
+        self.on_account_update = on_account_update
+        self.on_resync = on_resync
+        self.keepalive_interval = keepalive_interval
+        self.max_backoff = max_backoff
+
+        # Posições abertas (qty != 0) no formato de futures_position_information
+        self.positions: Dict[str, Dict] = {}
+        self.balances: Dict[str, float] = {}
+
+        self.events = 0
+        self.reconnects = 0
+        self.last_event_at: Optional[float] = None
+        self.connected = False
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Iniciar o stream em background."""
+        if self._task:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Parar o stream e aguardar a task terminar."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    async def _run(self):
+        backoff = 1.0
+        while self._running:
+            try:
+                # O socket da biblioteca obtém o listenKey e faz o keepalive (PUT)
+                bsm = BinanceSocketManager(self.client, user_timeout=self.keepalive_interval)
+                socket = bsm.futures_user_socket()
+                async with socket as stream:
+                    # Eventos que chegarem durante o resync ficam na fila do socket
+                    await self.resync()
+                    self.connected = True
+                    backoff = 1.0
+                    while self._running:
+                        msg = await stream.recv()
+                        await self.handle_message(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.connected = False
+                if not self._running:
+                    break
+                self.reconnects += 1
+                print(f"[user_stream] Stream caiu ({e}). Reconectando em {backoff:.0f}s...")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def resync(self):
+        """Recarregar posições via REST (carga inicial e após reconexão)."""
+        positions = await self.client.futures_position_information()
+        self.positions = {
+            p['symbol']: p for p in positions if float(p['positionAmt']) != 0
+        }
+        if self.on_resync:
+            await self._call(self.on_resync, dict(self.positions))
+
+    # ------------------------------------------------------------------
+    # Mensagens
+    # ------------------------------------------------------------------
+
+    async def handle_message(self, msg: Dict):
+        """Processar um evento do user data stream."""
+        event = msg.get('e')
+
+        if event == 'error':
+            raise ConnectionError(msg.get('m', 'erro no websocket'))
+        if event == 'listenKeyExpired':
+            raise ConnectionError('listenKey expirou')
+
+        self.events += 1
+        self.last_event_at = time.monotonic()
+
+        if event == 'ORDER_TRADE_UPDATE':
+            update = OrderUpdate.from_event(msg)
+            if self.on_order_update:
+                await self._call(self.on_order_update, update)
+
+        elif event == 'ACCOUNT_UPDATE':
+            account = msg.get('a', {})
+            for b in account.get('B', []):
+                self.balances[b['a']] = float(b['wb'])
+
+            changed = []
+            for p in account.get('P', []):
+                if p.get('ps', 'BOTH') != 'BOTH':
+                    continue  # Bot opera em one-way mode
+                previous = self.positions.get(p['s'])
+                mark = float(previous['markPrice']) if previous else None
+                position = position_from_event(p, mark)
+                if float(position['positionAmt']) != 0:
+                    self.positions[p['s']] = position
+                else:
+                    self.positions.pop(p['s'], None)
+                changed.append(position)
+
+            if changed and self.on_account_update:
+                await self._call(self.on_account_update, account.get('m', ''), changed)
+
+    @staticmethod
+    async def _call(callback: Callable, *args):
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            await result
+
+    def status(self) -> Dict:
+        return {
+            'connected': self.connected,
+            'events': self.events,
+            'reconnects': self.reconnects,
+            'open_positions': len(self.positions)
+        }